@@ -1,8 +1,201 @@
 from django.contrib import admin
+from django.contrib.postgres.search import SearchQuery
+from django.core.paginator import Paginator
+from django.db import connections
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
 
-from .models import Repositorio, GitUser, Issue, Commit
+from .models import SEARCH_CONFIG, Repositorio, GitUser, Issue, Commit, SyncRun
+from .services.partitioning import delete_repository
+from .services.search import SHA_PATTERN
+from .tasks import enqueue_repo_sync, sync_commit_metadata_task, sync_issue_metadata_task, sync_repo_metadata_task
 
-admin.site.register(Repositorio)
-admin.site.register(GitUser)
-admin.site.register(Issue)
-admin.site.register(Commit)
\ No newline at end of file
+# Abaixo disso a contagem exata é barata e a estimativa do planner pode ser imprecisa
+ESTIMATED_COUNT_THRESHOLD = 10000
+# Changelists filtradas contam no máximo isso (a paginação para aí)
+FILTERED_COUNT_LIMIT = 10000
+
+# Soma das partições (tabelas particionadas têm reltuples = -1 na tabela pai) ou a própria tabela
+_RELTUPLES_SQL = """
+    SELECT COALESCE(
+        (SELECT SUM(GREATEST(c.reltuples, 0)) FROM pg_inherits i
+         JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass),
+        (SELECT GREATEST(reltuples, 0) FROM pg_class WHERE oid = %s::regclass)
+    )
+"""
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginador do admin para tabelas grandes: sem filtros, usa a estimativa de linhas do
+    planner (pg_class.reltuples, atualizada pelo ANALYZE/autovacuum) em vez de COUNT(*);
+    com filtros, conta no máximo FILTERED_COUNT_LIMIT linhas.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if queryset.query.where:
+            return queryset[:FILTERED_COUNT_LIMIT].count()
+        table = queryset.model._meta.db_table
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(_RELTUPLES_SQL, [table, table])
+            estimate = int(cursor.fetchone()[0] or 0)
+        if estimate < ESTIMATED_COUNT_THRESHOLD:
+            return queryset.count()
+        return estimate
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Base dos admins de tabelas com milhões de linhas: sem COUNT(*) completo e sem dropdowns de FKs."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class RepositoryFilter(admin.SimpleListFilter):
+    """
+    Filtro por repositório sem listar todos os repositórios na barra lateral (importações
+    de organizações criam milhares): só o repositório filtrado aparece. O filtro é aplicado
+    pelos links "Issues"/"Commits" da lista de repositórios (?repository=<id>).
+    """
+    title = "repositório"
+    parameter_name = 'repository'
+
+    def lookups(self, request, model_admin):
+        value = self.value()
+        if not value or not value.isdigit():
+            return ()
+        return Repositorio.objects.filter(id=int(value)).values_list('id', 'full_name')
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value and value.isdigit():
+            return queryset.filter(repository_id=int(value))
+        return queryset
+
+
+def _enqueue_for_selected(modeladmin, request, queryset, task, resource, label, backfill=False, **kwargs):
+    enqueued = skipped = 0
+    for repo_id in queryset.values_list('id', flat=True):
+        if enqueue_repo_sync(task, repo_id, resource, backfill=backfill, **kwargs):
+            enqueued += 1
+        else:
+            skipped += 1
+    modeladmin.message_user(
+        request, f"{label}: {enqueued} repositório(s) enfileirado(s), {skipped} já tinha(m) sincronização pendente."
+    )
+
+
+@admin.register(Repositorio)
+class RepositorioAdmin(admin.ModelAdmin):
+    list_display = ('full_name', 'platform', 'active', 'stars_count', 'last_sync_issues_at', 'last_sync_commits_at',
+                    'changelist_links')
+    list_filter = ('platform', 'active', 'archived')
+    search_fields = ('full_name',)
+    actions = ('sync_metadata', 'sync_issues', 'sync_commits', 'full_sync')
+
+    def get_deleted_objects(self, objs, request):
+        # A confirmação padrão lista cada commit/issue que será apagado (passa pelo coletor)
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        delete_repository(obj)
+
+    def delete_queryset(self, request, queryset):
+        for repo_obj in queryset:
+            delete_repository(repo_obj)
+
+    @admin.display(description="Dados")
+    def changelist_links(self, obj):
+        return format_html(
+            '<a href="{}?repository={}">Issues</a> · <a href="{}?repository={}">Commits</a>',
+            reverse('admin:core_issue_changelist'), obj.pk, reverse('admin:core_commit_changelist'), obj.pk,
+        )
+
+    @admin.action(description="Sincronizar metadados dos repositórios selecionados")
+    def sync_metadata(self, request, queryset):
+        _enqueue_for_selected(self, request, queryset, sync_repo_metadata_task, 'metadata', "Metadados")
+
+    @admin.action(description="Sincronizar issues (incremental) dos repositórios selecionados")
+    def sync_issues(self, request, queryset):
+        _enqueue_for_selected(self, request, queryset, sync_issue_metadata_task, 'issues', "Issues")
+
+    @admin.action(description="Sincronizar commits (incremental) dos repositórios selecionados")
+    def sync_commits(self, request, queryset):
+        _enqueue_for_selected(self, request, queryset, sync_commit_metadata_task, 'commits', "Commits")
+
+    @admin.action(description="Sincronização completa (issues e commits, fila de backfill)")
+    def full_sync(self, request, queryset):
+        _enqueue_for_selected(self, request, queryset, sync_issue_metadata_task, 'issues', "Issues (completa)",
+                              backfill=True, full_sync=True)
+        _enqueue_for_selected(self, request, queryset, sync_commit_metadata_task, 'commits', "Commits (completa)",
+                              backfill=True, full_sync=True)
+
+
+@admin.register(GitUser)
+class GitUserAdmin(LargeTableAdmin):
+    list_display = ('username', 'user_type', 'external_id')
+    list_filter = ('user_type',)
+    # Prefixo do username e ID exato: consultas que usam os índices
+    search_fields = ('^username', '=external_id')
+
+
+@admin.register(Issue)
+class IssueAdmin(LargeTableAdmin):
+    list_display = ('number', 'title', 'repository', 'state', 'is_pull_request', 'author', 'created_at_git')
+    list_select_related = ('repository', 'author')
+    list_filter = ('state', RepositoryFilter, ('created_at_git', admin.DateFieldListFilter))
+    raw_id_fields = ('author', 'closed_by', 'assignees', 'milestone')
+    autocomplete_fields = ('repository',)
+    readonly_fields = ('synced_at', 'payload_hash')
+    search_fields = ('title',)
+    search_help_text = "Número da issue ou texto do título/corpo (busca textual)."
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('search_vector')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Busca pelo índice full-text (search_vector) em vez de ILIKE em título e corpo
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.lstrip('#').isdigit():
+            return queryset.filter(number=int(search_term.lstrip('#'))), False
+        return queryset.filter(search_vector=SearchQuery(search_term, config=SEARCH_CONFIG, search_type='websearch')), False
+
+
+@admin.register(Commit)
+class CommitAdmin(LargeTableAdmin):
+    list_display = ('short_sha', 'headline', 'repository', 'author', 'committer_date_git')
+    list_select_related = ('repository', 'author')
+    list_filter = (RepositoryFilter, ('committer_date_git', admin.DateFieldListFilter))
+    raw_id_fields = ('author', 'committer', 'author_identity', 'committer_identity', 'issues')
+    autocomplete_fields = ('repository',)
+    readonly_fields = ('synced_at', 'payload_hash', 'files_synced_at', 'generation')
+    search_fields = ('message',)
+    search_help_text = "SHA (completo ou prefixo) ou texto da mensagem (busca textual)."
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('search_vector')
+
+    @admin.display(description="Mensagem")
+    def headline(self, obj):
+        return obj.message.splitlines()[0][:100] if obj.message else ''
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if SHA_PATTERN.match(search_term):
+            return queryset.filter(sha__startswith=search_term.lower()), False
+        return queryset.filter(search_vector=SearchQuery(search_term, config=SEARCH_CONFIG, search_type='websearch')), False
+
+
+@admin.register(SyncRun)
+class SyncRunAdmin(admin.ModelAdmin):
+    list_display = ('repository', 'resource', 'profiler', 'status', 'started_at', 'finished_at')
+    list_filter = ('resource', 'status', 'profiler')
+    raw_id_fields = ('repository',)
+    readonly_fields = ('profile_summary', 'stats', 'options', 'error')
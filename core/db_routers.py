@@ -0,0 +1,143 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from core.services.metrics import DB_REPLICA_LAG_SECONDS
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+PRIMARY_ALIAS = 'default'
+REPLICA_ALIAS = 'replica'
+# Atraso da réplica: 0 quando ela já aplicou todo o WAL recebido (primário ocioso não conta como
+# atraso); NULL quando o banco não é uma réplica (ex: desenvolvimento apontando para o primário).
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+# Leituras do contexto atual (requisição, comando, tarefa) podem ir para a réplica
+_read_from_replica = ContextVar('read_from_replica', default=False)
+# Leituras do contexto atual precisam ver o que acabou de ser gravado
+_pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+
+_lag_lock = threading.Lock()
+_lag_checked_at = None
+_lag_seconds = None
+
+
+def _check_replica_lag():
+    """Consulta o atraso da réplica (segundos). Retorna None se ela estiver inacessível."""
+    try:
+        with connections[REPLICA_ALIAS].cursor() as cursor:
+            cursor.execute(REPLICA_LAG_SQL)
+            lag = cursor.fetchone()[0]
+    except DatabaseError as e:
+        print(f"Réplica '{REPLICA_ALIAS}' indisponível, lendo do primário: {e}")
+        connections[REPLICA_ALIAS].close()
+        return None
+    return float(lag or 0)
+
+
+def replica_lag():
+    """
+    Atraso da réplica em segundos (None se indisponível). A consulta é feita no máximo
+    uma vez a cada REPLICA_LAG_CHECK_INTERVAL segundos por processo.
+    """
+    global _lag_checked_at, _lag_seconds
+    now = time.monotonic()
+    if _lag_checked_at is not None and now - _lag_checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return _lag_seconds
+    with _lag_lock:
+        if _lag_checked_at is None or now - _lag_checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL:
+            _lag_seconds = _check_replica_lag()
+            _lag_checked_at = time.monotonic()
+            if _lag_seconds is not None:
+                DB_REPLICA_LAG_SECONDS.labels(REPLICA_ALIAS).set(_lag_seconds)
+    return _lag_seconds
+
+
+def replica_available():
+    """A réplica está configurada, acessível e com atraso até REPLICA_MAX_LAG segundos."""
+    if REPLICA_ALIAS not in settings.DATABASES:
+        return False
+    lag = replica_lag()
+    return lag is not None and lag <= settings.REPLICA_MAX_LAG
+
+
+def read_alias():
+    """
+    Alias para leituras longas que precisam de uma visão única dos dados (ex: exportações):
+    escolhido uma vez, no início, e usado com `.using(alias)` em todas as consultas, em vez
+    de o roteador reavaliar a réplica a cada consulta.
+    """
+    return REPLICA_ALIAS if replica_available() else PRIMARY_ALIAS
+
+
+@contextmanager
+def replica_reads():
+    """Envia as leituras feitas dentro do bloco para a réplica (quando disponível)."""
+    token = _read_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Mantém as leituras do bloco no primário, mesmo dentro de `replica_reads`."""
+    token = _pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+def read_from_replica(view):
+    """Decorator para views somente leitura (síncronas ou assíncronas): leituras vão para a réplica."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def _async_view(*args, **kwargs):
+            with replica_reads():
+                return await view(*args, **kwargs)
+        return _async_view
+
+    @wraps(view)
+    def _view(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return _view
+
+
+class ReplicaRouter:
+    """
+    Leituras marcadas com `replica_reads`/`read_from_replica` vão para a réplica, a menos
+    que o contexto esteja fixado no primário (PrimaryPinningMiddleware, `primary_reads`),
+    que haja uma transação aberta no primário ou que a réplica esteja atrasada/indisponível.
+    Todas as gravações (e portanto as sincronizações) e migrações ficam no primário.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            _read_from_replica.get()
+            and not _pinned_to_primary.get()
+            and not connections[PRIMARY_ALIAS].in_atomic_block
+            and replica_available()
+        ):
+            return REPLICA_ALIAS
+        return PRIMARY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica e primário têm os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_ALIAS
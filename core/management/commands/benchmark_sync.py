@@ -0,0 +1,83 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.benchmark import compare_results, run_sync_benchmark, save_results
+
+
+class Command(BaseCommand):
+    help = ("Mede a vazão da sincronização (metadados, issues e commits) contra um servidor falso "
+            "local da API do GitHub, usando o banco configurado. Grava os resultados em JSON para "
+            "comparar versões (--baseline).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--issues', type=int, default=1000, help="Issues no repositório sintético (padrão: 1000).")
+        parser.add_argument('--commits', type=int, default=2000, help="Commits no repositório sintético (padrão: 2000).")
+        parser.add_argument('--users', type=int, default=50, help="Usuários distintos (padrão: 50).")
+        parser.add_argument('--latency', type=float, default=0.0,
+                            help="Latência simulada por requisição, em segundos (padrão: 0).")
+        parser.add_argument('--passes', type=int, default=2,
+                            help="Execuções seguidas; a partir da segunda nada muda (padrão: 2).")
+        parser.add_argument('--seed', type=int, default=42, help="Semente dos dados sintéticos (padrão: 42).")
+        parser.add_argument('--output', help="Arquivo JSON de saída (padrão: benchmarks/sync-<data>-<revisão>.json).")
+        parser.add_argument('--baseline', help="JSON de uma execução anterior para comparar.")
+        parser.add_argument('--tolerance', type=float, default=0.10,
+                            help="Piora relativa tolerada antes de marcar regressão (padrão: 0.10).")
+        parser.add_argument('--keep', action='store_true', help="Mantém o repositório sintético no banco ao final.")
+
+    def handle(self, *args, **options):
+        if options['passes'] < 1:
+            raise CommandError("Use pelo menos 1 passe.")
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Não foi possível ler a linha de base: {e}")
+
+        results = run_sync_benchmark(
+            issues=options['issues'], commits=options['commits'], users=options['users'],
+            latency=options['latency'], passes=options['passes'], seed=options['seed'], keep=options['keep'],
+        )
+        path = save_results(results, options['output'])
+
+        for entry in results['passes']:
+            for stage, metrics in entry['stages'].items():
+                self.stdout.write(
+                    f"passe {entry['pass']} {stage:<8} {metrics['seconds']:>8.2f}s  "
+                    f"{metrics['api_calls']:>5} chamadas  {metrics['pages_per_second'] or 0:>8.1f} pág/s  "
+                    f"{metrics['rows_per_second'] or 0:>9.1f} linhas/s  "
+                    f"{metrics['queries_per_page'] or 0:>6.1f} consultas/pág  RSS {metrics['peak_rss_mb']} MB"
+                )
+                if 'transform_seconds' in metrics:
+                    self.stdout.write(
+                        f"{'':>17}fetch {metrics['fetch_seconds']:.2f}s  transform {metrics['transform_seconds']:.2f}s  "
+                        f"persist {metrics['persist_seconds']:.2f}s"
+                    )
+        for resource, decoding in results.get('decoding', {}).items():
+            page_kb = decoding['page_bytes'] / 1024
+            for strategy, metrics in decoding.items():
+                if strategy == 'page_bytes':
+                    continue
+                self.stdout.write(
+                    f"decodificação {resource:<8} {strategy:<7} {metrics['ms_per_page']:>8.2f} ms/pág  "
+                    f"{metrics['page_kb']:>8.1f} KB em memória (corpo {page_kb:.1f} KB)"
+                )
+        self.stdout.write(self.style.SUCCESS(f"Resultados gravados em {path}."))
+
+        if baseline is None:
+            return
+        if baseline.get('params') != results['params']:
+            self.stdout.write(self.style.WARNING("Parâmetros diferentes da linha de base: a comparação pode não ser válida."))
+        regressions = 0
+        for pass_number, stage, metric, old, new, change, regression in compare_results(
+                baseline, results, tolerance=options['tolerance']):
+            line = f"passe {pass_number} {stage:<8} {metric:<17} {old:>10} -> {new:>10} ({change:+.1%})"
+            if regression:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(f"{line}  REGRESSÃO"))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(f"{regressions} métricas pioraram mais que {options['tolerance']:.0%} em relação à linha de base.")
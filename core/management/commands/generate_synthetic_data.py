@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.synthetic_data import (
+    BASE_COMMITS,
+    BASE_ISSUES,
+    BASE_USERS,
+    COPY_CHUNK_SIZE,
+    generate_synthetic_dataset,
+)
+
+
+class Command(BaseCommand):
+    help = ("Gera repositórios sintéticos determinísticos (mesma semente = mesmos dados) para testes "
+            "de carga e de planos de consulta: autores em lei de potência, commits de merge, ciclo de "
+            "vida de issues, labels e mensagens com 'fixes #N'. Grava via COPY. "
+            f"Por repositório, com --scale 1: {BASE_COMMITS} commits e {BASE_ISSUES} issues "
+            f"({BASE_USERS} usuários compartilhados).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repos', type=int, default=1, help="Número de repositórios (padrão: 1).")
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help="Fator de escala dos tamanhos por repositório (padrão: 1; 10 = 1 milhão de commits).")
+        parser.add_argument('--seed', type=int, default=42, help="Semente (padrão: 42).")
+        parser.add_argument('--years', type=int, default=5, help="Anos de histórico (padrão: 5).")
+        parser.add_argument('--replace', action='store_true',
+                            help="Apaga e recria os repositórios sintéticos já gerados com a mesma semente.")
+        parser.add_argument('--chunk-size', type=int, default=COPY_CHUNK_SIZE,
+                            help=f"Linhas por bloco de COPY (padrão: {COPY_CHUNK_SIZE}).")
+
+    def handle(self, *args, **options):
+        if options['repos'] < 1 or options['scale'] <= 0:
+            raise CommandError("Use --repos >= 1 e --scale > 0.")
+        try:
+            results = generate_synthetic_dataset(
+                repos=options['repos'], scale=options['scale'], seed=options['seed'],
+                years=options['years'], replace=options['replace'], chunk_size=options['chunk_size'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for repo, counts, seconds in results:
+            rows = sum(counts.values())
+            summary = ', '.join(f"{table}: {count}" for table, count in counts.items())
+            self.stdout.write(f"{repo.full_name}: {summary} ({seconds:.1f}s, {rows / seconds:,.0f} linhas/s)")
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} repositórios sintéticos gerados."))
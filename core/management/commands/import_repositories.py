@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.git_sync import import_owner_repositories
+from core.tasks import import_owner_repositories_task
+
+
+class Command(BaseCommand):
+    help = "Descobre e importa em lote todos os repositórios de uma organização (ou usuário) do GitHub."
+
+    def add_arguments(self, parser):
+        parser.add_argument('owner', help="Login da organização ou do usuário no GitHub.")
+        parser.add_argument('--user', action='store_true',
+                            help="Trata `owner` como usuário (/users/{user}/repos) em vez de organização.")
+        parser.add_argument('--workers', type=int, default=4,
+                            help="Número de páginas buscadas em paralelo (padrão: 4).")
+        parser.add_argument('--async', dest='run_async', action='store_true',
+                            help="Enfileira a importação no Celery em vez de rodar no processo atual.")
+
+    def handle(self, *args, **options):
+        owner = options['owner']
+        owner_type = 'user' if options['user'] else 'org'
+
+        if options['run_async']:
+            import_owner_repositories_task.delay(owner, owner_type=owner_type)
+            self.stdout.write(self.style.SUCCESS(f"Importação de repositórios de '{owner}' enfileirada."))
+            return
+
+        try:
+            created, updated = import_owner_repositories(owner, owner_type=owner_type, max_workers=options['workers'])
+        except Exception as e:
+            raise CommandError(f"Erro ao importar repositórios de '{owner}': {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Importação de '{owner}' concluída: {created} criados, {updated} atualizados."
+        ))
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.partitioning import (
+    PARTITION_COUNT_DEFAULT,
+    PARTITIONABLE_MODELS,
+    build_drop_old_sql,
+    build_partition_sql,
+    check_partitionable,
+    execute_sql,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Converte core_commit e/ou core_issue em tabelas particionadas por HASH(repository_id). "
+        "Sem --execute, apenas imprime o SQL. A tabela original fica como *_old para rollback "
+        "até ser removida com --drop-old. As FKs que apontam para a tabela são removidas. Consultas filtradas "
+        "por repositório passam a ler uma só partição; com hash, vários repositórios dividem a "
+        "mesma partição, então apagar um repositório (partitioning.delete_repository, usado pelo "
+        "admin) continua sendo um DELETE por repository_id, só que em uma partição menor, e não um "
+        "DROP de partição. As tabelas M2M (ex: core_commit_issues) não têm repository_id e "
+        "continuam sem particionamento."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('tables', nargs='*',
+                            help=f"Tabelas a converter: {', '.join(PARTITIONABLE_MODELS)} (padrão: todas).")
+        parser.add_argument('--partitions', type=int, default=PARTITION_COUNT_DEFAULT,
+                            help=f"Número de partições hash (padrão: {PARTITION_COUNT_DEFAULT}).")
+        parser.add_argument('--execute', action='store_true',
+                            help="Executa o SQL (em uma transação, com a tabela bloqueada durante a cópia).")
+        parser.add_argument('--drop-old', action='store_true',
+                            help="Remove as tabelas *_old de uma conversão anterior já validada.")
+
+    def handle(self, *args, **options):
+        names = options['tables'] or list(PARTITIONABLE_MODELS)
+        unknown = [name for name in names if name not in PARTITIONABLE_MODELS]
+        if unknown:
+            raise CommandError(f"Tabelas inválidas: {', '.join(unknown)}. Opções: {', '.join(PARTITIONABLE_MODELS)}.")
+        models = [PARTITIONABLE_MODELS[name] for name in names]
+
+        if options['drop_old']:
+            statements = [statement for model in models for statement in build_drop_old_sql(model)]
+        else:
+            if options['partitions'] < 2:
+                raise CommandError("Use pelo menos 2 partições.")
+            problems = [problem for model in models for problem in check_partitionable(model)]
+            if problems:
+                raise CommandError("Não é possível particionar:\n" + "\n".join(problems))
+            statements = [
+                statement
+                for model in models
+                for statement in build_partition_sql(model, partitions=options['partitions'])
+            ]
+
+        if not options['execute']:
+            self.stdout.write(";\n".join(statements) + ";")
+            return
+
+        execute_sql(statements)
+        self.stdout.write(self.style.SUCCESS(f"{len(statements)} instruções executadas com sucesso."))
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Repositorio
+from core.services.git_sync import sync_repository_commits, sync_repository_issues
+from core.services.profiling import PROFILERS, run_profiled_sync
+from core.tasks import enqueue_repo_sync, sync_commit_metadata_task, sync_issue_metadata_task
+
+SYNC_FUNCTIONS = {
+    'issues': (sync_repository_issues, sync_issue_metadata_task),
+    'commits': (sync_repository_commits, sync_commit_metadata_task),
+}
+
+
+class Command(BaseCommand):
+    help = ("Roda a sincronização de issues ou commits de um repositório sob o profiler "
+            "(amostragem ou cProfile), registrando também as consultas SQL com a pilha de origem. "
+            "O artefato e o resumo ficam gravados em um SyncRun.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('repository', help="Repositório: ID ou nome completo (owner/name).")
+        parser.add_argument('resource', choices=list(SYNC_FUNCTIONS), help="Recurso a sincronizar.")
+        parser.add_argument('--profiler', choices=PROFILERS, default='sample',
+                            help="'sample' (padrão, baixo custo) ou 'cprofile' (determinístico, mais lento).")
+        parser.add_argument('--full', action='store_true',
+                            help="Sincronização completa (ignora a data da última sincronização).")
+        parser.add_argument('--async', dest='run_async', action='store_true',
+                            help="Enfileira a tarefa com profile=True em vez de rodar no processo atual.")
+        parser.add_argument('--top', type=int, default=10, help="Linhas do resumo exibidas (padrão: 10).")
+
+    def handle(self, *args, **options):
+        identifier = options['repository']
+        lookup = {'id': int(identifier)} if identifier.isdigit() else {'full_name': identifier}
+        try:
+            repo = Repositorio.objects.get(**lookup)
+        except Repositorio.DoesNotExist:
+            raise CommandError(f"Repositório '{identifier}' não encontrado.")
+
+        resource = options['resource']
+        sync_function, task = SYNC_FUNCTIONS[resource]
+        if options['run_async']:
+            enqueue_repo_sync(task, repo.id, resource, backfill=options['full'],
+                              full_sync=options['full'], profile=True, profiler=options['profiler'])
+            self.stdout.write(self.style.SUCCESS(f"Sincronização de {resource} de {repo.full_name} enfileirada com profiling."))
+            return
+
+        since = None if options['full'] else getattr(repo, f"last_sync_{resource}_at")
+        run = run_profiled_sync(repo, resource, sync_function, profiler=options['profiler'],
+                                options={'since': str(since), 'full_sync': options['full']}, since_datetime=since)
+
+        summary = run.profile_summary
+        top = options['top']
+        self.stdout.write(f"\nTempo total: {summary['wall_seconds']:.2f}s")
+        self.stdout.write(f"Consultas SQL: {summary['sql']['count']} em {summary['sql']['seconds']:.2f}s")
+        for query in summary['sql']['top'][:top]:
+            self.stdout.write(f"  {query['seconds']:>8.3f}s {query['count']:>6}x  {query['sql'][:100]}")
+            for frame in query['stack']:
+                self.stdout.write(f"{'':>20}{frame}")
+        self.stdout.write("Funções mais caras (tempo acumulado):")
+        for row in summary['profiler']['top_cumulative'][:top]:
+            cost = f"{row['cumulative_seconds']:>8.3f}s" if 'cumulative_seconds' in row else f"{row['percent']:>7.1f}%"
+            self.stdout.write(f"  {cost}  {row['function']}")
+        self.stdout.write(self.style.SUCCESS(f"SyncRun {run.id} gravado; artefato em {run.profile_file.name}."))
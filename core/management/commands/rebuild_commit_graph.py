@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Repositorio
+from core.services.commit_graph import rebuild_commit_graph
+
+
+class Command(BaseCommand):
+    help = "Cria as arestas do grafo de commits (a partir de parents_shas) e calcula as gerações que faltam."
+
+    def add_arguments(self, parser):
+        parser.add_argument('repo_ids', nargs='*', type=int,
+                            help="IDs dos repositórios. Se omitido, processa todos os repositórios ativos.")
+
+    def handle(self, *args, **options):
+        repos = Repositorio.objects.all()
+        if options['repo_ids']:
+            repos = repos.filter(id__in=options['repo_ids'])
+        else:
+            repos = repos.filter(active=True)
+
+        for repo in repos:
+            try:
+                created = rebuild_commit_graph(repo)
+            except Exception as e:
+                raise CommandError(f"Erro ao reconstruir o grafo de commits de '{repo.full_name}': {e}")
+            pending = repo.commits.filter(generation__isnull=True).count()
+            self.stdout.write(self.style.SUCCESS(
+                f"{repo.full_name}: {created} arestas criadas, {pending} commits ainda sem geração."
+            ))
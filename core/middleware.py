@@ -0,0 +1,47 @@
+from contextlib import nullcontext
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from core.db_routers import primary_reads
+from django.conf import settings
+
+# Cookie que mantém as leituras do cliente no primário logo após uma gravação
+PIN_PRIMARY_COOKIE = 'pin_primary'
+_SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class PrimaryPinningMiddleware:
+    """
+    Requisições que gravam (POST etc., como os formulários que enfileiram sincronizações)
+    fixam as leituras do cliente no primário por REPLICA_PIN_SECONDS, via cookie: a página
+    exibida após o redirect já enxerga o que acabou de ser gravado, mesmo com a réplica atrasada.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _pinning(self, request):
+        if request.method not in _SAFE_METHODS or PIN_PRIMARY_COOKIE in request.COOKIES:
+            return primary_reads()
+        return nullcontext()
+
+    def _process_response(self, request, response):
+        if request.method not in _SAFE_METHODS:
+            response.set_cookie(PIN_PRIMARY_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self._pinning(request):
+            response = self.get_response(request)
+        return self._process_response(request, response)
+
+    async def __acall__(self, request):
+        with self._pinning(request):
+            response = await self.get_response(request)
+        return self._process_response(request, response)
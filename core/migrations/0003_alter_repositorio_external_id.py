@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_alter_repositorio_clone_url_ssh'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='repositorio',
+            name='external_id',
+            field=models.CharField(blank=True, db_index=True, help_text='ID único do repositório na plataforma externa (ex: GitHub ID). Útil para APIs.', max_length=100, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:15
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_repositorio_external_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepositoryMetricSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Dia do snapshot.')),
+                ('stars_count', models.PositiveIntegerField(default=0)),
+                ('forks_count', models.PositiveIntegerField(default=0)),
+                ('open_issues_count', models.PositiveIntegerField(default=0)),
+                ('repository', models.ForeignKey(help_text='Repositório ao qual este snapshot pertence.', on_delete=django.db.models.deletion.CASCADE, related_name='metric_snapshots', to='core.repositorio')),
+            ],
+            options={
+                'verbose_name': 'Snapshot de Métricas',
+                'verbose_name_plural': 'Snapshots de Métricas',
+                'ordering': ['repository', 'date'],
+                'indexes': [django.contrib.postgres.indexes.BrinIndex(fields=['date'], name='core_metric_date_brin')],
+                'unique_together': {('repository', 'date')},
+            },
+        ),
+    ]
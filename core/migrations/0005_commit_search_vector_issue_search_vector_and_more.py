@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_repositorymetricsnapshot'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='commit',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('message', config='english'), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='english', weight='A'), '||', django.contrib.postgres.search.SearchVector('body', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='commit',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='core_commit_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='commit',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['sha'], name='core_commit_sha_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='core_issue_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('title'), name='gin_trgm_ops'), name='core_issue_title_trgm'),
+        ),
+    ]
@@ -0,0 +1,184 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:17
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+BATCH_SIZE = 2000
+
+
+def _label_names(labels):
+    return [label['name'] if isinstance(label, dict) else label for label in labels or []]
+
+
+def _normalize_batch(issues, Label, Milestone, IssueLabel, Issue):
+    """Cria Labels/Milestones de um lote de issues e converte os JSONs antigos."""
+    labels_data = {}
+    milestones_data = {}
+    for issue in issues:
+        for label in issue.labels or []:
+            if isinstance(label, dict) and label.get('id') is not None:
+                labels_data[(issue.repository_id, str(label['id']))] = label
+        milestone = issue.milestone
+        if isinstance(milestone, dict) and milestone.get('id') is not None:
+            milestones_data[(issue.repository_id, str(milestone['id']))] = milestone
+
+    Label.objects.bulk_create([
+        Label(repository_id=repo_id, external_id=external_id, name=label.get('name') or '',
+              color=label.get('color'), description=(label.get('description') or '')[:512] or None)
+        for (repo_id, external_id), label in labels_data.items()
+    ], ignore_conflicts=True)
+    Milestone.objects.bulk_create([
+        Milestone(repository_id=repo_id, external_id=external_id, number=milestone.get('number') or 0,
+                  title=milestone.get('title') or '', state=milestone.get('state'),
+                  due_on=milestone.get('due_on'), web_url=milestone.get('html_url'))
+        for (repo_id, external_id), milestone in milestones_data.items()
+    ], ignore_conflicts=True)
+
+    repo_ids = {issue.repository_id for issue in issues}
+    label_ids = {
+        (repo_id, external_id): pk
+        for pk, repo_id, external_id in Label.objects.filter(repository_id__in=repo_ids)
+        .values_list('id', 'repository_id', 'external_id')
+    }
+    milestone_ids = {
+        (repo_id, external_id): pk
+        for pk, repo_id, external_id in Milestone.objects.filter(repository_id__in=repo_ids)
+        .values_list('id', 'repository_id', 'external_id')
+    }
+
+    links = []
+    for issue in issues:
+        for label in issue.labels or []:
+            if isinstance(label, dict) and label.get('id') is not None:
+                label_id = label_ids.get((issue.repository_id, str(label['id'])))
+                if label_id:
+                    links.append(IssueLabel(issue_id=issue.id, label_id=label_id))
+        milestone = issue.milestone
+        if isinstance(milestone, dict) and milestone.get('id') is not None:
+            issue.milestone_ref_id = milestone_ids.get((issue.repository_id, str(milestone['id'])))
+        issue.labels = _label_names(issue.labels)
+
+    IssueLabel.objects.bulk_create(links, ignore_conflicts=True)
+    Issue.objects.bulk_update(issues, ['labels', 'milestone_ref'])
+
+
+def normalize_labels_and_milestones(apps, schema_editor):
+    Issue = apps.get_model('core', 'Issue')
+    Label = apps.get_model('core', 'Label')
+    Milestone = apps.get_model('core', 'Milestone')
+    IssueLabel = apps.get_model('core', 'IssueLabel')
+
+    batch = []
+    queryset = Issue.objects.only('id', 'repository_id', 'labels', 'milestone').order_by('id')
+    for issue in queryset.iterator(chunk_size=BATCH_SIZE):
+        batch.append(issue)
+        if len(batch) >= BATCH_SIZE:
+            _normalize_batch(batch, Label, Milestone, IssueLabel, Issue)
+            batch = []
+    if batch:
+        _normalize_batch(batch, Label, Milestone, IssueLabel, Issue)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_commit_search_vector_issue_search_vector_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Label',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('external_id', models.CharField(help_text='ID único da label na plataforma Git.', max_length=100)),
+                ('name', models.CharField(help_text='Nome da label (ex: bug).', max_length=255)),
+                ('color', models.CharField(blank=True, help_text='Cor da label em hexadecimal (sem #).', max_length=10, null=True)),
+                ('description', models.CharField(blank=True, help_text='Descrição da label.', max_length=512, null=True)),
+                ('repository', models.ForeignKey(help_text='Repositório ao qual esta label pertence.', on_delete=django.db.models.deletion.CASCADE, related_name='labels', to='core.repositorio')),
+            ],
+            options={
+                'verbose_name': 'Label',
+                'verbose_name_plural': 'Labels',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='IssueLabel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('issue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.issue')),
+                ('label', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.label')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='issue_labels',
+            field=models.ManyToManyField(blank=True, help_text='Labels da issue (normalizadas por repositório).', related_name='issues', through='core.IssueLabel', to='core.label'),
+        ),
+        migrations.CreateModel(
+            name='Milestone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('external_id', models.CharField(help_text='ID único da milestone na plataforma Git.', max_length=100)),
+                ('number', models.IntegerField(help_text='Número da milestone dentro do repositório.')),
+                ('title', models.CharField(help_text='Título da milestone.', max_length=255)),
+                ('state', models.CharField(blank=True, help_text='Estado da milestone (open, closed).', max_length=20, null=True)),
+                ('due_on', models.DateTimeField(blank=True, help_text='Data prevista de entrega.', null=True)),
+                ('web_url', models.URLField(blank=True, help_text='URL da milestone na interface web.', max_length=512, null=True)),
+                ('repository', models.ForeignKey(help_text='Repositório ao qual esta milestone pertence.', on_delete=django.db.models.deletion.CASCADE, related_name='milestones', to='core.repositorio')),
+            ],
+            options={
+                'verbose_name': 'Milestone',
+                'verbose_name_plural': 'Milestones',
+                'ordering': ['number'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='label',
+            index=models.Index(fields=['repository', 'name'], name='core_label_reposit_9b62e1_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='label',
+            unique_together={('repository', 'external_id')},
+        ),
+        migrations.AddIndex(
+            model_name='issuelabel',
+            index=models.Index(fields=['label', 'issue'], name='core_issuel_label_i_f43125_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='issuelabel',
+            unique_together={('issue', 'label')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='milestone',
+            unique_together={('repository', 'external_id')},
+        ),
+        # A milestone deixa de ser um JSON e passa a ser uma FK: cria a coluna nova,
+        # copia os dados e só então remove o JSON antigo.
+        migrations.AddField(
+            model_name='issue',
+            name='milestone_ref',
+            field=models.ForeignKey(blank=True, help_text='Milestone da issue.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='issues', to='core.milestone'),
+        ),
+        migrations.RunPython(normalize_labels_and_milestones, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='issue',
+            name='milestone',
+        ),
+        migrations.RenameField(
+            model_name='issue',
+            old_name='milestone_ref',
+            new_name='milestone',
+        ),
+        migrations.AlterField(
+            model_name='issue',
+            name='labels',
+            field=models.JSONField(blank=True, help_text='Array JSON com os nomes das labels/tags da issue.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['labels'], name='core_issue_labels_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
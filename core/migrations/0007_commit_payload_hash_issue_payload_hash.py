@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_normalize_issue_labels_milestones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commit',
+            name='payload_hash',
+            field=models.CharField(blank=True, help_text='Hash do payload normalizado da API (evita regravar commits sem mudanças).', max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='payload_hash',
+            field=models.CharField(blank=True, help_text='Hash do payload normalizado da API (evita regravar issues sem mudanças).', max_length=16, null=True),
+        ),
+    ]
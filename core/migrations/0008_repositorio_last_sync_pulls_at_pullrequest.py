@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_commit_payload_hash_issue_payload_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='repositorio',
+            name='last_sync_pulls_at',
+            field=models.DateTimeField(blank=True, help_text='Data/hora da última sincronização de pull requests.', null=True),
+        ),
+        migrations.CreateModel(
+            name='PullRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('external_id', models.CharField(help_text='ID único do pull request na plataforma Git.', max_length=100)),
+                ('number', models.IntegerField(db_index=True, help_text='Número do pull request dentro do repositório (ex: #123).')),
+                ('title', models.CharField(help_text='Título do pull request.', max_length=512)),
+                ('body', models.TextField(blank=True, help_text='Corpo/descrição do pull request.', null=True)),
+                ('state', models.CharField(choices=[('open', 'Open'), ('closed', 'Closed')], db_index=True, help_text='Estado atual do pull request (aberto, fechado).', max_length=20)),
+                ('draft', models.BooleanField(default=False, help_text='Indica se o pull request é um rascunho.')),
+                ('base_ref', models.CharField(help_text='Branch de destino (base).', max_length=255)),
+                ('base_sha', models.CharField(blank=True, help_text='SHA da base no momento da sincronização.', max_length=40, null=True)),
+                ('head_ref', models.CharField(help_text='Branch de origem (head).', max_length=255)),
+                ('head_sha', models.CharField(blank=True, help_text='SHA do último commit do head.', max_length=40, null=True)),
+                ('merge_commit_sha', models.CharField(blank=True, db_index=True, help_text='SHA do commit de merge (quando mergeado).', max_length=40, null=True)),
+                ('created_at_git', models.DateTimeField(db_index=True, help_text='Data e hora de criação do pull request.')),
+                ('updated_at_git', models.DateTimeField(db_index=True, help_text='Data e hora da última atualização do pull request.')),
+                ('closed_at_git', models.DateTimeField(blank=True, help_text='Data e hora de fechamento do pull request.', null=True)),
+                ('merged_at', models.DateTimeField(blank=True, db_index=True, help_text='Data e hora do merge (nulo se não foi mergeado).', null=True)),
+                ('web_url', models.URLField(blank=True, help_text='URL do pull request na interface web.', max_length=512, null=True)),
+                ('synced_at', models.DateTimeField(auto_now_add=True, help_text='Data e hora da sincronização deste pull request para o seu sistema.')),
+                ('payload_hash', models.CharField(blank=True, help_text='Hash do payload normalizado da API (evita regravar PRs sem mudanças).', max_length=16, null=True)),
+                ('author', models.ForeignKey(blank=True, help_text='Usuário que abriu o pull request.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='authored_pull_requests', to='core.gituser')),
+                ('merge_commit', models.ForeignKey(blank=True, help_text='Commit de merge já sincronizado (vinculado pelo SHA).', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='merged_pull_requests', to='core.commit')),
+                ('repository', models.ForeignKey(help_text='Repositório ao qual este pull request pertence.', on_delete=django.db.models.deletion.CASCADE, related_name='pull_requests', to='core.repositorio')),
+                ('requested_reviewers', models.ManyToManyField(blank=True, help_text='Usuários com revisão solicitada.', related_name='review_requested_pull_requests', to='core.gituser')),
+            ],
+            options={
+                'verbose_name': 'Pull Request',
+                'verbose_name_plural': 'Pull Requests',
+                'ordering': ['-created_at_git'],
+                'unique_together': {('repository', 'external_id')},
+            },
+        ),
+    ]
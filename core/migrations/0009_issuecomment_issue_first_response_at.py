@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_repositorio_last_sync_pulls_at_pullrequest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='first_response_at',
+            field=models.DateTimeField(blank=True, help_text='Data do primeiro comentário de outra pessoa que não o autor (calculada na sincronização).', null=True),
+        ),
+        migrations.AddField(
+            model_name='repositorio',
+            name='last_sync_comments_at',
+            field=models.DateTimeField(blank=True, help_text='Data/hora da última sincronização de comentários de issues.', null=True),
+        ),
+        migrations.CreateModel(
+            name='IssueComment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('issue_number', models.IntegerField(help_text='Número da issue comentada (usado para vincular depois).')),
+                ('external_id', models.CharField(help_text='ID único do comentário na plataforma Git.', max_length=100)),
+                ('author_association', models.CharField(blank=True, help_text='Relação do autor com o repositório (OWNER, MEMBER, CONTRIBUTOR, NONE...).', max_length=30, null=True)),
+                ('body', models.TextField(blank=True, help_text='Texto do comentário.', null=True)),
+                ('created_at_git', models.DateTimeField(help_text='Data e hora de criação do comentário.')),
+                ('updated_at_git', models.DateTimeField(help_text='Data e hora da última edição do comentário.')),
+                ('web_url', models.URLField(blank=True, help_text='URL do comentário na interface web.', max_length=512, null=True)),
+                ('synced_at', models.DateTimeField(auto_now_add=True, help_text='Data e hora da sincronização deste comentário para o seu sistema.')),
+                ('payload_hash', models.CharField(blank=True, help_text='Hash do payload normalizado da API (evita regravar comentários sem mudanças).', max_length=16, null=True)),
+                ('author', models.ForeignKey(blank=True, help_text='Usuário que escreveu o comentário.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='issue_comments', to='core.gituser')),
+                ('issue', models.ForeignKey(blank=True, help_text='Issue comentada (nulo enquanto a issue não foi sincronizada).', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='core.issue')),
+                ('repository', models.ForeignKey(help_text='Repositório ao qual este comentário pertence.', on_delete=django.db.models.deletion.CASCADE, related_name='issue_comments', to='core.repositorio')),
+            ],
+            options={
+                'verbose_name': 'Comentário de Issue',
+                'verbose_name_plural': 'Comentários de Issues',
+                'ordering': ['created_at_git'],
+                'indexes': [models.Index(fields=['issue', 'created_at_git'], name='core_issuec_issue_i_e43990_idx'), models.Index(fields=['repository', 'issue_number'], name='core_issuec_reposit_9f0103_idx')],
+                'unique_together': {('repository', 'external_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_issuecomment_issue_first_response_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commit',
+            name='generation',
+            field=models.PositiveIntegerField(blank=True, help_text='Número de geração do commit no grafo (poda consultas de ancestralidade).', null=True),
+        ),
+        migrations.CreateModel(
+            name='CommitParent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('parent_sha', models.CharField(help_text='SHA do commit pai.', max_length=40)),
+                ('position', models.PositiveSmallIntegerField(default=0, help_text='Posição do pai na lista de pais (0 = primeiro pai).')),
+                ('commit', models.ForeignKey(help_text='Commit filho.', on_delete=django.db.models.deletion.CASCADE, related_name='parent_edges', to='core.commit')),
+                ('parent', models.ForeignKey(blank=True, help_text='Commit pai (nulo enquanto o pai não foi sincronizado).', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='child_edges', to='core.commit')),
+            ],
+            options={
+                'verbose_name': 'Pai de Commit',
+                'verbose_name_plural': 'Pais de Commits',
+                'indexes': [models.Index(fields=['parent', 'commit'], name='core_commitparent_parent_idx'), models.Index(condition=models.Q(('parent__isnull', True)), fields=['parent_sha'], name='core_commitparent_unresolved')],
+                'unique_together': {('commit', 'position')},
+            },
+        ),
+    ]
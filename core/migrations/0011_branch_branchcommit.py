@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_commit_graph'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Branch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Nome da branch (ex: main).', max_length=255)),
+                ('head_sha', models.CharField(help_text='SHA do head da branch na plataforma Git.', max_length=40)),
+                ('synced_head_sha', models.CharField(blank=True, help_text='SHA do head até onde os commits e a associação já foram sincronizados.', max_length=40, null=True)),
+                ('protected', models.BooleanField(default=False, help_text='Indica se a branch é protegida.')),
+                ('synced_at', models.DateTimeField(blank=True, help_text='Data/hora da última sincronização desta branch.', null=True)),
+                ('repository', models.ForeignKey(help_text='Repositório ao qual esta branch pertence.', on_delete=django.db.models.deletion.CASCADE, related_name='branches', to='core.repositorio')),
+            ],
+            options={
+                'verbose_name': 'Branch',
+                'verbose_name_plural': 'Branches',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BranchCommit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.branch')),
+                ('commit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.commit')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='branch',
+            name='commits',
+            field=models.ManyToManyField(blank=True, help_text='Commits alcançáveis a partir do head da branch.', related_name='branches', through='core.BranchCommit', to='core.commit'),
+        ),
+        migrations.AddIndex(
+            model_name='branchcommit',
+            index=models.Index(fields=['commit', 'branch'], name='core_branch_commit__7e4dd9_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='branchcommit',
+            unique_together={('branch', 'commit')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='branch',
+            unique_together={('repository', 'name')},
+        ),
+    ]
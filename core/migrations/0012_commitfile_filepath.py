@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_branch_branchcommit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commit',
+            name='files_synced_at',
+            field=models.DateTimeField(blank=True, help_text='Data/hora em que os arquivos alterados (CommitFile) foram sincronizados.', null=True),
+        ),
+        migrations.CreateModel(
+            name='FilePath',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(help_text='Caminho do arquivo no repositório.', max_length=1024)),
+                ('repository', models.ForeignKey(help_text='Repositório ao qual este caminho pertence.', on_delete=django.db.models.deletion.CASCADE, related_name='file_paths', to='core.repositorio')),
+            ],
+            options={
+                'verbose_name': 'Caminho de Arquivo',
+                'verbose_name_plural': 'Caminhos de Arquivos',
+                'unique_together': {('repository', 'path')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CommitFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('added', 'Added'), ('modified', 'Modified'), ('removed', 'Removed'), ('renamed', 'Renamed'), ('copied', 'Copied'), ('changed', 'Changed'), ('unchanged', 'Unchanged')], help_text='Tipo de alteração do arquivo.', max_length=10)),
+                ('additions', models.PositiveIntegerField(default=0, help_text='Linhas adicionadas no arquivo.')),
+                ('deletions', models.PositiveIntegerField(default=0, help_text='Linhas deletadas no arquivo.')),
+                ('committed_at', models.DateTimeField(help_text='Data do committer do commit (desnormalizada).')),
+                ('commit', models.ForeignKey(help_text='Commit que alterou o arquivo.', on_delete=django.db.models.deletion.CASCADE, related_name='files', to='core.commit')),
+                ('repository', models.ForeignKey(help_text='Repositório do commit (desnormalizado).', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.repositorio')),
+                ('path', models.ForeignKey(help_text='Caminho do arquivo alterado.', on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='core.filepath')),
+                ('previous_path', models.ForeignKey(blank=True, help_text='Caminho anterior (apenas em arquivos renomeados).', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.filepath')),
+            ],
+            options={
+                'verbose_name': 'Arquivo de Commit',
+                'verbose_name_plural': 'Arquivos de Commits',
+                'indexes': [models.Index(fields=['repository', 'committed_at'], include=('path', 'additions', 'deletions'), name='core_commitfile_hotspot_idx'), models.Index(fields=['path', 'committed_at'], name='core_commitfile_path_idx')],
+                'unique_together': {('commit', 'path')},
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_commitfile_filepath'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Identity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Nome configurado no Git (user.name).', max_length=255)),
+                ('email', models.CharField(db_index=True, help_text='E-mail configurado no Git (user.email), em minúsculas.', max_length=255)),
+                ('user', models.ForeignKey(blank=True, help_text='Usuário da plataforma ao qual esta identidade foi associada.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='identities', to='core.gituser')),
+            ],
+            options={
+                'verbose_name': 'Identidade Git',
+                'verbose_name_plural': 'Identidades Git',
+            },
+        ),
+        migrations.AddField(
+            model_name='commit',
+            name='author_identity',
+            field=models.ForeignKey(blank=True, help_text='Identidade Git (nome/e-mail) do autor.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='authored_commits', to='core.identity'),
+        ),
+        migrations.AddField(
+            model_name='commit',
+            name='committer_identity',
+            field=models.ForeignKey(blank=True, help_text='Identidade Git (nome/e-mail) do committer.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='committed_commits', to='core.identity'),
+        ),
+        migrations.AddIndex(
+            model_name='commit',
+            index=models.Index(fields=['repository', 'author_identity'], name='core_commit_author_ident_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='identity',
+            unique_together={('email', 'name')},
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_identity'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='branchcommit',
+            name='commit',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to='core.commit'),
+        ),
+        migrations.AlterField(
+            model_name='commit',
+            name='issues',
+            field=models.ManyToManyField(blank=True, db_constraint=False, help_text='Issues vinculadas a este commit através da mensagem.', related_name='linked_commits', to='core.issue'),
+        ),
+        migrations.AlterField(
+            model_name='commitfile',
+            name='commit',
+            field=models.ForeignKey(db_constraint=False, help_text='Commit que alterou o arquivo.', on_delete=django.db.models.deletion.CASCADE, related_name='files', to='core.commit'),
+        ),
+        migrations.AlterField(
+            model_name='commitparent',
+            name='commit',
+            field=models.ForeignKey(db_constraint=False, help_text='Commit filho.', on_delete=django.db.models.deletion.CASCADE, related_name='parent_edges', to='core.commit'),
+        ),
+        migrations.AlterField(
+            model_name='commitparent',
+            name='parent',
+            field=models.ForeignKey(blank=True, db_constraint=False, help_text='Commit pai (nulo enquanto o pai não foi sincronizado).', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='child_edges', to='core.commit'),
+        ),
+        migrations.AlterField(
+            model_name='issue',
+            name='assignees',
+            field=models.ManyToManyField(blank=True, db_constraint=False, help_text='Usuários atribuídos a esta issue.', related_name='assigned_issues', to='core.gituser'),
+        ),
+        migrations.AlterField(
+            model_name='issuecomment',
+            name='issue',
+            field=models.ForeignKey(blank=True, db_constraint=False, help_text='Issue comentada (nulo enquanto a issue não foi sincronizada).', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='core.issue'),
+        ),
+        migrations.AlterField(
+            model_name='issuelabel',
+            name='issue',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to='core.issue'),
+        ),
+        migrations.AlterField(
+            model_name='pullrequest',
+            name='merge_commit',
+            field=models.ForeignKey(blank=True, db_constraint=False, help_text='Commit de merge já sincronizado (vinculado pelo SHA).', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='merged_pull_requests', to='core.commit'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_drop_fk_constraints_to_commit_issue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(choices=[('issues', 'Issues'), ('commits', 'Commits')], help_text='Recurso sincronizado.', max_length=20)),
+                ('status', models.CharField(choices=[('running', 'Em andamento'), ('success', 'Concluída'), ('failed', 'Falhou')], default='running', help_text='Situação da execução.', max_length=10)),
+                ('profiler', models.CharField(choices=[('cprofile', 'cProfile (determinístico)'), ('sample', 'Amostragem de pilhas')], default='sample', help_text='Profiler usado na execução.', max_length=10)),
+                ('options', models.JSONField(blank=True, help_text='Parâmetros da sincronização (since, until, full_sync...).', null=True)),
+                ('stats', models.JSONField(blank=True, help_text="Contadores da execução ({'inserted', 'updated', 'skipped'}).", null=True)),
+                ('error', models.TextField(blank=True, help_text='Mensagem de erro, se a execução falhou.', null=True)),
+                ('profile_file', models.FileField(blank=True, help_text='Artefato do profiler (.prof do cProfile ou pilhas agregadas .folded).', null=True, upload_to='sync_profiles/%Y/%m/')),
+                ('profile_summary', models.JSONField(blank=True, help_text='Resumo: funções mais caras e consultas SQL com a pilha de origem.', null=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True, help_text='Início da execução.')),
+                ('finished_at', models.DateTimeField(blank=True, help_text='Fim da execução.', null=True)),
+                ('repository', models.ForeignKey(help_text='Repositório sincronizado.', on_delete=django.db.models.deletion.CASCADE, related_name='sync_runs', to='core.repositorio')),
+            ],
+            options={
+                'verbose_name': 'Execução de Sincronização',
+                'verbose_name_plural': 'Execuções de Sincronização',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['repository', 'resource', '-started_at'], name='core_syncrun_repo_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_sync_run'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='commit',
+            index=models.Index(condition=models.Q(('generation__isnull', True)), fields=['repository'], name='core_commit_generation_pending'),
+        ),
+    ]
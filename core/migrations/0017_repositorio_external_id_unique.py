@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:46
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def clear_invalid_external_ids(apps, schema_editor):
+    """
+    Antes da restrição única: IDs vazios (ou 'None', gravado quando a API não trazia o id)
+    viram NULL e, se o mesmo ID aparece em mais de um repositório (ex: cadastrado de novo
+    após ser renomeado), só o registro mais antigo o mantém; os demais voltam a ser
+    identificados pelo full_name.
+    """
+    Repositorio = apps.get_model('core', 'Repositorio')
+    Repositorio.objects.filter(external_id__in=['', 'None']).update(external_id=None)
+    duplicated = (
+        Repositorio.objects.filter(external_id__isnull=False)
+        .values('external_id').annotate(total=Count('id'), first_id=Min('id')).filter(total__gt=1)
+    )
+    for row in duplicated:
+        Repositorio.objects.filter(external_id=row['external_id']).exclude(id=row['first_id']).update(external_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_commit_generation_pending_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_invalid_external_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='repositorio',
+            name='external_id',
+            field=models.CharField(blank=True, help_text='ID único do repositório na plataforma externa (ex: GitHub ID). Útil para APIs.', max_length=100, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,66 @@
+from django.db import migrations
+
+
+# FKs removidas pela 0014: (tabela, coluna, tabela referenciada)
+FOREIGN_KEYS = [
+    ('core_branchcommit', 'commit_id', 'core_commit'),
+    ('core_commit_issues', 'commit_id', 'core_commit'),
+    ('core_commit_issues', 'issue_id', 'core_issue'),
+    ('core_commitfile', 'commit_id', 'core_commit'),
+    ('core_commitparent', 'commit_id', 'core_commit'),
+    ('core_commitparent', 'parent_id', 'core_commit'),
+    ('core_issue_assignees', 'issue_id', 'core_issue'),
+    ('core_issue_assignees', 'gituser_id', 'core_gituser'),
+    ('core_issuecomment', 'issue_id', 'core_issue'),
+    ('core_issuelabel', 'issue_id', 'core_issue'),
+    ('core_pullrequest', 'merge_commit_id', 'core_commit'),
+]
+
+
+def _constraint_name(table, column):
+    return f"{table}_{column}_fk"[:63]
+
+
+def restore_foreign_keys(apps, schema_editor):
+    """
+    Recria as FKs para core_commit/core_issue nas instalações que não particionaram essas
+    tabelas (o PostgreSQL não aceita FK para uma tabela particionada pelo `id` sozinho).
+    NOT VALID: passam a valer para as novas linhas sem varrer (nem bloquear) as existentes.
+    O estado do Django continua com db_constraint=False; o comando partition_tables remove
+    essas FKs antes de converter a tabela.
+    """
+    quote = schema_editor.quote_name
+    with schema_editor.connection.cursor() as cursor:
+        for table, column, referenced_table in FOREIGN_KEYS:
+            name = _constraint_name(table, column)
+            cursor.execute(
+                "SELECT (SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)), "
+                "EXISTS (SELECT 1 FROM pg_constraint WHERE conname = %s AND conrelid = to_regclass(%s))",
+                [referenced_table, name, table],
+            )
+            relkind, exists = cursor.fetchone()
+            if relkind != 'r' or exists:
+                continue
+            schema_editor.execute(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} FOREIGN KEY ({quote(column)}) "
+                f"REFERENCES {quote(referenced_table)} (id) DEFERRABLE INITIALLY DEFERRED NOT VALID"
+            )
+
+
+def drop_foreign_keys(apps, schema_editor):
+    quote = schema_editor.quote_name
+    for table, column, _ in FOREIGN_KEYS:
+        schema_editor.execute(
+            f"ALTER TABLE {quote(table)} DROP CONSTRAINT IF EXISTS {quote(_constraint_name(table, column))}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_repositorio_external_id_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_foreign_keys, drop_foreign_keys),
+    ]
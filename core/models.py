@@ -1,7 +1,13 @@
 from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.utils import timezone
 import json
 
+# Configuração de texto do PostgreSQL usada na busca textual (stemming/stopwords)
+SEARCH_CONFIG = 'english'
+
 
 class Repositorio(models.Model):
     name = models.CharField(max_length=255, help_text="Nome do repositório (ex: my-project)")
@@ -23,7 +29,9 @@ class Repositorio(models.Model):
         default='github',
         help_text="Plataforma Git onde o repositório está hospedado."
     )
-    external_id = models.CharField(max_length=100, blank=True, null=True,
+    # Único: a importação em lote faz upsert por ele (ON CONFLICT). O Postgres trata NULLs como
+    # distintos, então repositórios cadastrados manualmente (ainda sem ID) não conflitam entre si.
+    external_id = models.CharField(max_length=100, blank=True, null=True, unique=True,
                                    help_text="ID único do repositório na plataforma externa (ex: GitHub ID). Útil para APIs.")
     clone_url_http = models.URLField(max_length=512, blank=True, null=True,
                                      help_text="URL para clonar o repositório via HTTPS")
@@ -57,6 +65,10 @@ class Repositorio(models.Model):
                                                help_text="Data/hora da última sincronização de issues.")
     last_sync_commits_at = models.DateTimeField(blank=True, null=True,
                                                 help_text="Data/hora da última sincronização de commits.")
+    last_sync_pulls_at = models.DateTimeField(blank=True, null=True,
+                                              help_text="Data/hora da última sincronização de pull requests.")
+    last_sync_comments_at = models.DateTimeField(blank=True, null=True,
+                                                 help_text="Data/hora da última sincronização de comentários de issues.")
     created_at = models.DateTimeField(auto_now_add=True,
                                       help_text="Data/hora de criação do registro no seu sistema.")
     updated_at = models.DateTimeField(auto_now=True,
@@ -88,6 +100,34 @@ class Repositorio(models.Model):
         return self.commit_set.count()
     
 
+class RepositoryMetricSnapshot(models.Model):
+    """
+    Série temporal (append-only) das métricas de um repositório: uma linha por
+    repositório por dia, atualizada (upsert) se houver mais de uma sincronização no mesmo dia.
+    """
+    repository = models.ForeignKey('Repositorio', on_delete=models.CASCADE, related_name='metric_snapshots',
+                                   help_text="Repositório ao qual este snapshot pertence.")
+    date = models.DateField(help_text="Dia do snapshot.")
+    # Inteiros de 4 bytes: menores que bigint e suficientes para as contagens do GitHub
+    stars_count = models.PositiveIntegerField(default=0)
+    forks_count = models.PositiveIntegerField(default=0)
+    open_issues_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Snapshot de Métricas"
+        verbose_name_plural = "Snapshots de Métricas"
+        ordering = ['repository', 'date']
+        # O índice único (repository, date) também atende às consultas por intervalo de um repositório
+        unique_together = (('repository', 'date'),)
+        indexes = [
+            # Índice BRIN: minúsculo e eficiente para varreduras por intervalo de datas (tabela append-only)
+            BrinIndex(fields=['date'], name='core_metric_date_brin'),
+        ]
+
+    def __str__(self):
+        return f"{self.repository_id} @ {self.date}"
+
+
 class GitUser(models.Model):
     external_id = models.CharField(max_length=100, unique=True, db_index=True,
                                    help_text="ID único do usuário na plataforma Git (ex: GitHub user ID)")
@@ -107,6 +147,28 @@ class GitUser(models.Model):
         ordering = ['username']
 
 
+class Identity(models.Model):
+    """
+    Identidade Git (nome + e-mail do commit), armazenada uma única vez.
+    Quando o e-mail aparece em algum commit vinculado a uma conta da plataforma,
+    `user` passa a apontar para o GitUser correspondente.
+    """
+    name = models.CharField(max_length=255, help_text="Nome configurado no Git (user.name).")
+    email = models.CharField(max_length=255, db_index=True,
+                             help_text="E-mail configurado no Git (user.email), em minúsculas.")
+    user = models.ForeignKey('GitUser', on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='identities',
+                             help_text="Usuário da plataforma ao qual esta identidade foi associada.")
+
+    class Meta:
+        verbose_name = "Identidade Git"
+        verbose_name_plural = "Identidades Git"
+        unique_together = (('email', 'name'),)
+
+    def __str__(self):
+        return f"{self.name} <{self.email}>"
+
+
 class Issue(models.Model):
     # Relacionamento com Repositório
     repository = models.ForeignKey('Repositorio', on_delete=models.CASCADE, related_name='issues',
@@ -136,7 +198,10 @@ class Issue(models.Model):
     author = models.ForeignKey(GitUser, on_delete=models.SET_NULL, null=True, blank=True,
                                related_name='authored_issues',
                                help_text="Usuário que criou a issue.")
-    assignees = models.ManyToManyField(GitUser, blank=True,
+    # db_constraint=False: as FKs para core_issue/core_commit não são gerenciadas pelo Django para
+    # permitir o particionamento dessas tabelas (comando partition_tables, que as remove); enquanto
+    # elas não são particionadas a migração 0018 mantém as FKs no banco (NOT VALID).
+    assignees = models.ManyToManyField(GitUser, blank=True, db_constraint=False,
                                        related_name='assigned_issues',
                                        help_text="Usuários atribuídos a esta issue.")
     closed_by = models.ForeignKey(GitUser, on_delete=models.SET_NULL, null=True, blank=True,
@@ -144,12 +209,19 @@ class Issue(models.Model):
                                   help_text="Usuário que fechou a issue (se aplicável).")
 
     # Outras informações
+    # Cópia compacta (apenas os nomes) para consultas ad-hoc; filtros devem usar `issue_labels`
     labels = models.JSONField(blank=True, null=True,
-                              help_text="Array JSON de labels/tags da issue.")
-    milestone = models.JSONField(blank=True, null=True,
-                                 help_text="Informações da milestone da issue (JSON).")
+                              help_text="Array JSON com os nomes das labels/tags da issue.")
+    issue_labels = models.ManyToManyField('Label', through='IssueLabel', blank=True,
+                                          related_name='issues',
+                                          help_text="Labels da issue (normalizadas por repositório).")
+    milestone = models.ForeignKey('Milestone', on_delete=models.SET_NULL, null=True, blank=True,
+                                  related_name='issues',
+                                  help_text="Milestone da issue.")
     comments_count = models.IntegerField(default=0,
                                          help_text="Número de comentários na issue.")
+    first_response_at = models.DateTimeField(blank=True, null=True,
+                                             help_text="Data do primeiro comentário de outra pessoa que não o autor (calculada na sincronização).")
     is_pull_request = models.BooleanField(default=False,
                                           help_text="Indica se esta 'issue' é na verdade um pull request (algumas APIs tratam PRs como issues).")
     web_url = models.URLField(max_length=512, blank=True, null=True,
@@ -158,6 +230,16 @@ class Issue(models.Model):
     # Metadados da Aplicação
     synced_at = models.DateTimeField(auto_now_add=True,
                                      help_text="Data e hora da sincronização desta issue para o seu sistema.")
+    payload_hash = models.CharField(max_length=16, blank=True, null=True,
+                                    help_text="Hash do payload normalizado da API (evita regravar issues sem mudanças).")
+
+    # Busca textual: coluna gerada pelo próprio PostgreSQL (sempre atualizada a cada escrita)
+    search_vector = models.GeneratedField(
+        expression=SearchVector('title', weight='A', config=SEARCH_CONFIG)
+                   + SearchVector('body', weight='B', config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = "Issue"
@@ -165,6 +247,13 @@ class Issue(models.Model):
         ordering = ['-created_at_git'] # Ordena pelas mais recentes por padrão
         # Garante que não haja duas issues com o mesmo número no mesmo repositório
         unique_together = (('repository', 'external_id'),) # Use external_id para garantir unicidade global da issue no Git
+        indexes = [
+            GinIndex(fields=['search_vector'], name='core_issue_search_gin'),
+            # Consultas ad-hoc no JSON de labels (ex: labels__contains=['bug'])
+            GinIndex(fields=['labels'], name='core_issue_labels_gin', opclasses=['jsonb_path_ops']),
+            # Trigramas: buscas por trecho do título (title__icontains gera UPPER(title) LIKE '%...%')
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='core_issue_title_trgm'),
+        ]
 
     def __str__(self):
         return f"#{self.number} - {self.title} ({self.repository.full_name})"
@@ -176,11 +265,123 @@ class Issue(models.Model):
             return self.closed_at_git - self.created_at_git
         return None
 
+    @property
+    def time_to_first_response(self):
+        """Tempo entre a abertura da issue e o primeiro comentário de outra pessoa."""
+        if self.first_response_at and self.created_at_git:
+            return self.first_response_at - self.created_at_git
+        return None
+
     @property
     def is_open(self):
         return self.state == 'open'
 
 
+class Label(models.Model):
+    """Label de issue, armazenada uma única vez por repositório."""
+    repository = models.ForeignKey('Repositorio', on_delete=models.CASCADE, related_name='labels',
+                                   help_text="Repositório ao qual esta label pertence.")
+    external_id = models.CharField(max_length=100,
+                                   help_text="ID único da label na plataforma Git.")
+    name = models.CharField(max_length=255, help_text="Nome da label (ex: bug).")
+    color = models.CharField(max_length=10, blank=True, null=True,
+                             help_text="Cor da label em hexadecimal (sem #).")
+    description = models.CharField(max_length=512, blank=True, null=True,
+                                   help_text="Descrição da label.")
+
+    class Meta:
+        verbose_name = "Label"
+        verbose_name_plural = "Labels"
+        ordering = ['name']
+        unique_together = (('repository', 'external_id'),)
+        indexes = [
+            models.Index(fields=['repository', 'name']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class IssueLabel(models.Model):
+    """Tabela de ligação entre Issue e Label."""
+    issue = models.ForeignKey('Issue', on_delete=models.CASCADE, db_constraint=False)
+    label = models.ForeignKey('Label', on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = (('issue', 'label'),)
+        indexes = [
+            # Filtros por label (ex: "issues com a label bug") partem da label para as issues
+            models.Index(fields=['label', 'issue']),
+        ]
+
+
+class IssueComment(models.Model):
+    """Comentário de issue (ou de pull request, que o GitHub também trata como issue)."""
+    repository = models.ForeignKey('Repositorio', on_delete=models.CASCADE, related_name='issue_comments',
+                                   help_text="Repositório ao qual este comentário pertence.")
+    issue = models.ForeignKey('Issue', on_delete=models.CASCADE, null=True, blank=True, db_constraint=False,
+                              related_name='comments',
+                              help_text="Issue comentada (nulo enquanto a issue não foi sincronizada).")
+    issue_number = models.IntegerField(help_text="Número da issue comentada (usado para vincular depois).")
+    external_id = models.CharField(max_length=100,
+                                   help_text="ID único do comentário na plataforma Git.")
+    author = models.ForeignKey('GitUser', on_delete=models.SET_NULL, null=True, blank=True,
+                               related_name='issue_comments',
+                               help_text="Usuário que escreveu o comentário.")
+    author_association = models.CharField(max_length=30, blank=True, null=True,
+                                          help_text="Relação do autor com o repositório (OWNER, MEMBER, CONTRIBUTOR, NONE...).")
+    body = models.TextField(blank=True, null=True, help_text="Texto do comentário.")
+    created_at_git = models.DateTimeField(help_text="Data e hora de criação do comentário.")
+    updated_at_git = models.DateTimeField(help_text="Data e hora da última edição do comentário.")
+    web_url = models.URLField(max_length=512, blank=True, null=True,
+                              help_text="URL do comentário na interface web.")
+
+    # Metadados da Aplicação
+    synced_at = models.DateTimeField(auto_now_add=True,
+                                     help_text="Data e hora da sincronização deste comentário para o seu sistema.")
+    payload_hash = models.CharField(max_length=16, blank=True, null=True,
+                                    help_text="Hash do payload normalizado da API (evita regravar comentários sem mudanças).")
+
+    class Meta:
+        verbose_name = "Comentário de Issue"
+        verbose_name_plural = "Comentários de Issues"
+        ordering = ['created_at_git']
+        unique_together = (('repository', 'external_id'),)
+        indexes = [
+            # Primeira resposta por issue: MIN(created_at_git) dos comentários da issue
+            models.Index(fields=['issue', 'created_at_git']),
+            models.Index(fields=['repository', 'issue_number']),
+        ]
+
+    def __str__(self):
+        return f"Comentário {self.external_id} em #{self.issue_number}"
+
+
+class Milestone(models.Model):
+    """Milestone de issues, armazenada uma única vez por repositório."""
+    repository = models.ForeignKey('Repositorio', on_delete=models.CASCADE, related_name='milestones',
+                                   help_text="Repositório ao qual esta milestone pertence.")
+    external_id = models.CharField(max_length=100,
+                                   help_text="ID único da milestone na plataforma Git.")
+    number = models.IntegerField(help_text="Número da milestone dentro do repositório.")
+    title = models.CharField(max_length=255, help_text="Título da milestone.")
+    state = models.CharField(max_length=20, blank=True, null=True,
+                             help_text="Estado da milestone (open, closed).")
+    due_on = models.DateTimeField(blank=True, null=True,
+                                  help_text="Data prevista de entrega.")
+    web_url = models.URLField(max_length=512, blank=True, null=True,
+                              help_text="URL da milestone na interface web.")
+
+    class Meta:
+        verbose_name = "Milestone"
+        verbose_name_plural = "Milestones"
+        ordering = ['number']
+        unique_together = (('repository', 'external_id'),)
+
+    def __str__(self):
+        return self.title
+
+
 class Commit(models.Model):
     # Relacionamento com Repositório
     repository = models.ForeignKey('Repositorio', on_delete=models.CASCADE, related_name='commits',
@@ -205,6 +406,14 @@ class Commit(models.Model):
                                   related_name='committed_commits',
                                   help_text="Usuário que é o committer (quem aplicou) do commit.")
 
+    # Nome/e-mail do Git: sempre presentes, mesmo quando o e-mail não está vinculado a uma conta
+    author_identity = models.ForeignKey('Identity', on_delete=models.SET_NULL, null=True, blank=True,
+                                        related_name='authored_commits',
+                                        help_text="Identidade Git (nome/e-mail) do autor.")
+    committer_identity = models.ForeignKey('Identity', on_delete=models.SET_NULL, null=True, blank=True,
+                                           related_name='committed_commits',
+                                           help_text="Identidade Git (nome/e-mail) do committer.")
+
     # Datas (importante: autor e committer têm datas diferentes no Git)
     author_date_git = models.DateTimeField(db_index=True,
                                            help_text="Data e hora em que o autor fez o commit.")
@@ -220,6 +429,11 @@ class Commit(models.Model):
     # Lista de SHAs dos commits pais. A maioria dos commits tem um pai, mas merges têm dois ou mais.
     parents_shas = models.JSONField(blank=True, null=True,
                                     help_text="Lista JSON dos SHAs dos commits pais.")
+    # Número de geração: 1 para commits sem pais, 1 + maior geração dos pais nos demais.
+    # Pais ainda não sincronizados não contam (o commit é recalculado quando eles chegarem).
+    # Nulo só entre a gravação do commit e o fim da sincronização.
+    generation = models.PositiveIntegerField(blank=True, null=True,
+                                             help_text="Número de geração do commit no grafo (poda consultas de ancestralidade).")
 
     # Informações de Verificação (assinatura GPG, etc.)
     verification_status = models.CharField(max_length=50, blank=True, null=True,
@@ -230,15 +444,26 @@ class Commit(models.Model):
     # URL na Web
     web_url = models.URLField(max_length=512, blank=True, null=True,
                               help_text="URL do commit na interface web da plataforma Git.")
+    files_synced_at = models.DateTimeField(blank=True, null=True,
+                                           help_text="Data/hora em que os arquivos alterados (CommitFile) foram sincronizados.")
 
     # Vinculação com Issues (Many-to-Many)
     # Este campo será preenchido após parsing da mensagem do commit
-    issues = models.ManyToManyField('Issue', blank=True, related_name='linked_commits',
+    issues = models.ManyToManyField('Issue', blank=True, related_name='linked_commits', db_constraint=False,
                                     help_text="Issues vinculadas a este commit através da mensagem.")
 
     # Metadados da Aplicação
     synced_at = models.DateTimeField(auto_now_add=True,
                                      help_text="Data e hora da sincronização deste commit para o seu sistema.")
+    payload_hash = models.CharField(max_length=16, blank=True, null=True,
+                                    help_text="Hash do payload normalizado da API (evita regravar commits sem mudanças).")
+
+    # Busca textual: coluna gerada pelo próprio PostgreSQL (sempre atualizada a cada escrita)
+    search_vector = models.GeneratedField(
+        expression=SearchVector('message', config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         verbose_name = "Commit"
@@ -246,6 +471,16 @@ class Commit(models.Model):
         ordering = ['-committer_date_git'] # Ordena pelos commits mais recentes por padrão
         # Garante que não haja dois commits com o mesmo SHA no mesmo repositório
         unique_together = (('repository', 'sha'),)
+        indexes = [
+            GinIndex(fields=['search_vector'], name='core_commit_search_gin'),
+            # Trigramas: buscas por SHA curto/parcial (LIKE 'abc12%')
+            GinIndex(fields=['sha'], name='core_commit_sha_trgm', opclasses=['gin_trgm_ops']),
+            # Agregados por autor (GROUP BY author_identity dentro do repositório)
+            models.Index(fields=['repository', 'author_identity'], name='core_commit_author_ident_idx'),
+            # Commits com a geração pendente (poucos por vez: os gravados na sincronização em curso)
+            models.Index(fields=['repository'], condition=models.Q(generation__isnull=True),
+                         name='core_commit_generation_pending'),
+        ]
 
     def __str__(self):
         return f"{self.short_sha} - {self.message[:50]}... ({self.repository.full_name})"
@@ -258,4 +493,270 @@ class Commit(models.Model):
     @property
     def is_merge_commit(self):
         # Um merge commit tem mais de um pai
-        return len(self.parents_shas) > 1 if self.parents_shas else False
\ No newline at end of file
+        return len(self.parents_shas) > 1 if self.parents_shas else False
+
+
+class FilePath(models.Model):
+    """Caminho de arquivo armazenado uma única vez por repositório (as alterações apontam para o ID)."""
+    repository = models.ForeignKey('Repositorio', on_delete=models.CASCADE, related_name='file_paths',
+                                   help_text="Repositório ao qual este caminho pertence.")
+    path = models.CharField(max_length=1024, help_text="Caminho do arquivo no repositório.")
+
+    class Meta:
+        verbose_name = "Caminho de Arquivo"
+        verbose_name_plural = "Caminhos de Arquivos"
+        unique_together = (('repository', 'path'),)
+
+    def __str__(self):
+        return self.path
+
+
+class CommitFile(models.Model):
+    """Alteração de um arquivo em um commit."""
+    STATUS_CHOICES = [
+        ('added', 'Added'),
+        ('modified', 'Modified'),
+        ('removed', 'Removed'),
+        ('renamed', 'Renamed'),
+        ('copied', 'Copied'),
+        ('changed', 'Changed'),
+        ('unchanged', 'Unchanged'),
+    ]
+
+    commit = models.ForeignKey('Commit', on_delete=models.CASCADE, related_name='files', db_constraint=False,
+                               help_text="Commit que alterou o arquivo.")
+    path = models.ForeignKey('FilePath', on_delete=models.CASCADE, related_name='changes',
+                             help_text="Caminho do arquivo alterado.")
+    previous_path = models.ForeignKey('FilePath', on_delete=models.CASCADE, null=True, blank=True,
+                                      related_name='+',
+                                      help_text="Caminho anterior (apenas em arquivos renomeados).")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES,
+                              help_text="Tipo de alteração do arquivo.")
+    additions = models.PositiveIntegerField(default=0, help_text="Linhas adicionadas no arquivo.")
+    deletions = models.PositiveIntegerField(default=0, help_text="Linhas deletadas no arquivo.")
+
+    # Cópias do commit para que as análises por período não precisem de JOIN com Commit
+    repository = models.ForeignKey('Repositorio', on_delete=models.CASCADE, related_name='+',
+                                   help_text="Repositório do commit (desnormalizado).")
+    committed_at = models.DateTimeField(help_text="Data do committer do commit (desnormalizada).")
+
+    class Meta:
+        verbose_name = "Arquivo de Commit"
+        verbose_name_plural = "Arquivos de Commits"
+        unique_together = (('commit', 'path'),)
+        indexes = [
+            # "Arquivos mais alterados nos últimos N dias": varredura só do índice (index-only scan)
+            models.Index(fields=['repository', 'committed_at'], include=['path', 'additions', 'deletions'],
+                         name='core_commitfile_hotspot_idx'),
+            # Histórico de alterações de um arquivo
+            models.Index(fields=['path', 'committed_at'], name='core_commitfile_path_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.status} {self.path_id} @ {self.commit_id}"
+
+
+class CommitParent(models.Model):
+    """Aresta do grafo de commits: `commit` tem `parent` como pai (na posição `position`)."""
+    commit = models.ForeignKey('Commit', on_delete=models.CASCADE, related_name='parent_edges', db_constraint=False,
+                               help_text="Commit filho.")
+    parent = models.ForeignKey('Commit', on_delete=models.CASCADE, null=True, blank=True, db_constraint=False,
+                               related_name='child_edges',
+                               help_text="Commit pai (nulo enquanto o pai não foi sincronizado).")
+    parent_sha = models.CharField(max_length=40, help_text="SHA do commit pai.")
+    position = models.PositiveSmallIntegerField(default=0,
+                                                help_text="Posição do pai na lista de pais (0 = primeiro pai).")
+
+    class Meta:
+        verbose_name = "Pai de Commit"
+        verbose_name_plural = "Pais de Commits"
+        unique_together = (('commit', 'position'),)
+        indexes = [
+            # Caminhadas para os descendentes (filhos de um commit)
+            models.Index(fields=['parent', 'commit'], name='core_commitparent_parent_idx'),
+            # Arestas cujo pai ainda não chegou, vinculadas pelo SHA a cada sincronização
+            models.Index(fields=['parent_sha'], condition=models.Q(parent__isnull=True),
+                         name='core_commitparent_unresolved'),
+        ]
+
+    def __str__(self):
+        return f"{self.commit_id} -> {self.parent_sha[:7]}"
+
+
+class Branch(models.Model):
+    """Branch monitorada de um repositório, com o SHA do head na última sincronização."""
+    repository = models.ForeignKey('Repositorio', on_delete=models.CASCADE, related_name='branches',
+                                   help_text="Repositório ao qual esta branch pertence.")
+    name = models.CharField(max_length=255, help_text="Nome da branch (ex: main).")
+    head_sha = models.CharField(max_length=40, help_text="SHA do head da branch na plataforma Git.")
+    synced_head_sha = models.CharField(max_length=40, blank=True, null=True,
+                                       help_text="SHA do head até onde os commits e a associação já foram sincronizados.")
+    protected = models.BooleanField(default=False, help_text="Indica se a branch é protegida.")
+    commits = models.ManyToManyField('Commit', through='BranchCommit', blank=True,
+                                     related_name='branches',
+                                     help_text="Commits alcançáveis a partir do head da branch.")
+    synced_at = models.DateTimeField(blank=True, null=True,
+                                     help_text="Data/hora da última sincronização desta branch.")
+
+    class Meta:
+        verbose_name = "Branch"
+        verbose_name_plural = "Branches"
+        ordering = ['name']
+        unique_together = (('repository', 'name'),)
+
+    def __str__(self):
+        return f"{self.name} ({self.head_sha[:7]})"
+
+    @property
+    def has_moved(self):
+        return self.head_sha != self.synced_head_sha
+
+
+class BranchCommit(models.Model):
+    """Associação compacta (apenas os dois IDs) entre branch e commit."""
+    branch = models.ForeignKey('Branch', on_delete=models.CASCADE)
+    commit = models.ForeignKey('Commit', on_delete=models.CASCADE, db_constraint=False)
+
+    class Meta:
+        unique_together = (('branch', 'commit'),)
+        indexes = [
+            # "Em quais branches está o commit X?"
+            models.Index(fields=['commit', 'branch']),
+        ]
+
+
+class PullRequest(models.Model):
+    # Relacionamento com Repositório
+    repository = models.ForeignKey('Repositorio', on_delete=models.CASCADE, related_name='pull_requests',
+                                   help_text="Repositório ao qual este pull request pertence.")
+
+    # Identificação do Pull Request na Plataforma Git
+    external_id = models.CharField(max_length=100,
+                                   help_text="ID único do pull request na plataforma Git.")
+    number = models.IntegerField(db_index=True,
+                                 help_text="Número do pull request dentro do repositório (ex: #123).")
+    title = models.CharField(max_length=512, help_text="Título do pull request.")
+    body = models.TextField(blank=True, null=True,
+                            help_text="Corpo/descrição do pull request.")
+    state = models.CharField(max_length=20, db_index=True,
+                             choices=[('open', 'Open'), ('closed', 'Closed')],
+                             help_text="Estado atual do pull request (aberto, fechado).")
+    draft = models.BooleanField(default=False, help_text="Indica se o pull request é um rascunho.")
+
+    # Pessoas envolvidas
+    author = models.ForeignKey('GitUser', on_delete=models.SET_NULL, null=True, blank=True,
+                               related_name='authored_pull_requests',
+                               help_text="Usuário que abriu o pull request.")
+    requested_reviewers = models.ManyToManyField('GitUser', blank=True,
+                                                 related_name='review_requested_pull_requests',
+                                                 help_text="Usuários com revisão solicitada.")
+
+    # Branches (base = destino, head = origem)
+    base_ref = models.CharField(max_length=255, help_text="Branch de destino (base).")
+    base_sha = models.CharField(max_length=40, blank=True, null=True,
+                                help_text="SHA da base no momento da sincronização.")
+    head_ref = models.CharField(max_length=255, help_text="Branch de origem (head).")
+    head_sha = models.CharField(max_length=40, blank=True, null=True,
+                                help_text="SHA do último commit do head.")
+
+    # Merge
+    merge_commit_sha = models.CharField(max_length=40, blank=True, null=True, db_index=True,
+                                        help_text="SHA do commit de merge (quando mergeado).")
+    merge_commit = models.ForeignKey('Commit', on_delete=models.SET_NULL, null=True, blank=True, db_constraint=False,
+                                     related_name='merged_pull_requests',
+                                     help_text="Commit de merge já sincronizado (vinculado pelo SHA).")
+
+    # Datas e Tempos
+    created_at_git = models.DateTimeField(db_index=True,
+                                          help_text="Data e hora de criação do pull request.")
+    updated_at_git = models.DateTimeField(db_index=True,
+                                          help_text="Data e hora da última atualização do pull request.")
+    closed_at_git = models.DateTimeField(blank=True, null=True,
+                                         help_text="Data e hora de fechamento do pull request.")
+    merged_at = models.DateTimeField(blank=True, null=True, db_index=True,
+                                     help_text="Data e hora do merge (nulo se não foi mergeado).")
+
+    web_url = models.URLField(max_length=512, blank=True, null=True,
+                              help_text="URL do pull request na interface web.")
+
+    # Metadados da Aplicação
+    synced_at = models.DateTimeField(auto_now_add=True,
+                                     help_text="Data e hora da sincronização deste pull request para o seu sistema.")
+    payload_hash = models.CharField(max_length=16, blank=True, null=True,
+                                    help_text="Hash do payload normalizado da API (evita regravar PRs sem mudanças).")
+
+    class Meta:
+        verbose_name = "Pull Request"
+        verbose_name_plural = "Pull Requests"
+        ordering = ['-created_at_git']
+        unique_together = (('repository', 'external_id'),)
+
+    def __str__(self):
+        return f"PR #{self.number} - {self.title}"
+
+    @property
+    def is_merged(self):
+        return self.merged_at is not None
+
+    @property
+    def lead_time(self):
+        """Tempo entre a abertura e o merge do pull request, se mergeado."""
+        if self.merged_at and self.created_at_git:
+            return self.merged_at - self.created_at_git
+        return None
+
+
+class SyncRun(models.Model):
+    """Execução de uma sincronização com profiling ligado (artefato do profiler + resumo)."""
+    RESOURCE_CHOICES = [
+        ('issues', 'Issues'),
+        ('commits', 'Commits'),
+    ]
+    STATUS_CHOICES = [
+        ('running', 'Em andamento'),
+        ('success', 'Concluída'),
+        ('failed', 'Falhou'),
+    ]
+    PROFILER_CHOICES = [
+        ('cprofile', 'cProfile (determinístico)'),
+        ('sample', 'Amostragem de pilhas'),
+    ]
+    repository = models.ForeignKey(Repositorio, on_delete=models.CASCADE, related_name='sync_runs',
+                                   help_text="Repositório sincronizado.")
+    resource = models.CharField(max_length=20, choices=RESOURCE_CHOICES,
+                                help_text="Recurso sincronizado.")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='running',
+                              help_text="Situação da execução.")
+    profiler = models.CharField(max_length=10, choices=PROFILER_CHOICES, default='sample',
+                                help_text="Profiler usado na execução.")
+    options = models.JSONField(blank=True, null=True,
+                               help_text="Parâmetros da sincronização (since, until, full_sync...).")
+    stats = models.JSONField(blank=True, null=True,
+                             help_text="Contadores da execução ({'inserted', 'updated', 'skipped'}).")
+    error = models.TextField(blank=True, null=True,
+                             help_text="Mensagem de erro, se a execução falhou.")
+    profile_file = models.FileField(upload_to='sync_profiles/%Y/%m/', blank=True, null=True,
+                                    help_text="Artefato do profiler (.prof do cProfile ou pilhas agregadas .folded).")
+    profile_summary = models.JSONField(blank=True, null=True,
+                                       help_text="Resumo: funções mais caras e consultas SQL com a pilha de origem.")
+    started_at = models.DateTimeField(auto_now_add=True,
+                                      help_text="Início da execução.")
+    finished_at = models.DateTimeField(blank=True, null=True,
+                                       help_text="Fim da execução.")
+
+    class Meta:
+        verbose_name = "Execução de Sincronização"
+        verbose_name_plural = "Execuções de Sincronização"
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['repository', 'resource', '-started_at'], name='core_syncrun_repo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.repository} - {self.resource} em {self.started_at:%Y-%m-%d %H:%M}"
+
+    @property
+    def duration(self):
+        if self.finished_at and self.started_at:
+            return self.finished_at - self.started_at
+        return None
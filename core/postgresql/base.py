@@ -0,0 +1,18 @@
+import time
+
+from core.services.metrics import observe_db_connection
+from django.db.backends.postgresql import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Backend PostgreSQL do Django que mede cada conexão obtida: o tempo para abrir uma
+    conexão nova (modo direto) ou para retirar uma conexão do pool (DB_POOL=True).
+    Com conexões persistentes ou pool, a taxa de conexões abertas deve ficar próxima de zero.
+    """
+
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        connection = super().get_new_connection(conn_params)
+        observe_db_connection(self.alias, time.perf_counter() - started, pool=self.pool)
+        return connection
@@ -0,0 +1,228 @@
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from core.models import Repositorio
+from core.services import git_sync, github_api, github_payloads
+from core.services.fake_github import FakeGitHubServer, SyntheticRepository
+from django.db import connection
+from prometheus_client import REGISTRY
+
+BENCHMARK_OWNER = 'benchmark'
+BENCHMARK_RESULTS_DIR = 'benchmarks'
+# Etapas medidas, na ordem em que rodam (cada uma recebe o Repositorio)
+BENCHMARK_STAGES = {
+    'metadata': git_sync.sync_repository_metadata,
+    'issues': git_sync.sync_repository_issues,
+    'commits': git_sync.sync_repository_commits,
+}
+# Métricas comparadas com a linha de base: True = maior é melhor
+COMPARED_METRICS = {
+    'pages_per_second': True, 'rows_per_second': True, 'queries_per_page': False, 'seconds': False,
+    'transform_seconds': False,
+}
+# Etapas acumuladas em `sync_stage_seconds` (a `persist` inclui a `transform`)
+SYNC_STAGES = ('fetch', 'transform', 'persist')
+# Páginas decodificadas por estratégia no micro-benchmark de decodificação
+DECODE_REPEAT = 20
+
+
+def _peak_rss_mb():
+    """Pico de memória residente do processo (ru_maxrss é em KB no Linux e em bytes no macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if platform.system() == 'Darwin' else 1024), 1)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+@contextmanager
+def _point_api_to(base_url):
+    """Aponta o cliente da API para o servidor falso (e não envia o token real)."""
+    original = github_api.GITHUB_API_BASE_URL, github_api.GITHUB_API_TOKEN
+    github_api.GITHUB_API_BASE_URL, github_api.GITHUB_API_TOKEN = base_url, None
+    try:
+        yield
+    finally:
+        github_api.GITHUB_API_BASE_URL, github_api.GITHUB_API_TOKEN = original
+
+
+class _QueryCounter:
+    """Conta as consultas SQL executadas (via `connection.execute_wrapper`)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _stage_seconds(resource):
+    """
+    Tempo acumulado até agora (soma do histograma do Prometheus) em cada etapa de um recurso.
+    O benchmark sincroniza um repositório por vez, então a diferença antes/depois é a do repositório.
+    """
+    return {
+        stage: REGISTRY.get_sample_value('sync_stage_seconds_sum', {'resource': resource, 'stage': stage}) or 0.0
+        for stage in SYNC_STAGES
+    }
+
+
+def _run_stage(name, repo_obj, server):
+    server.reset_counters()
+    counter = _QueryCounter()
+    stages_before = _stage_seconds(name)
+    started = time.perf_counter()
+    with connection.execute_wrapper(counter):
+        stats = BENCHMARK_STAGES[name](repo_obj)
+    seconds = time.perf_counter() - started
+    stages_after = _stage_seconds(name)
+    rows = sum(stats.values()) if stats else 1 # Metadados: um registro por execução
+    pages = server.requests
+    return {
+        'seconds': round(seconds, 3),
+        'api_calls': server.requests,
+        'not_modified': server.not_modified,
+        'pages_per_second': round(pages / seconds, 2) if seconds else None,
+        'rows': rows,
+        'rows_per_second': round(rows / seconds, 1) if seconds else None,
+        'queries': counter.count,
+        'queries_per_page': round(counter.count / pages, 1) if pages else None,
+        'write_stats': stats,
+        'peak_rss_mb': _peak_rss_mb(),
+        **{f'{stage}_seconds': round(stages_after[stage] - stages_before[stage], 3) for stage in SYNC_STAGES},
+    }
+
+
+def _decode_strategies():
+    """Estratégias comparadas: json da biblioteca padrão, orjson (se instalado) e a usada pelo sync."""
+    strategies = {'json': lambda content, slim: json.loads(content)}
+    if github_payloads.orjson is not None:
+        strategies['orjson'] = lambda content, slim: github_payloads.orjson.loads(content)
+    strategies['sync'] = lambda content, slim: [slim(item) for item in github_payloads.decode_json(content)]
+    return strategies
+
+
+def run_decode_benchmark(dataset, per_page=github_api.PER_PAGE_DEFAULT, repeat=DECODE_REPEAT):
+    """
+    Mede a decodificação de uma página cheia de issues e de commits do repositório sintético:
+    tempo médio por página e memória ocupada pela página decodificada (tracemalloc), para
+    cada estratégia de `_decode_strategies` ('sync' = decode_json + slim_*, o caminho real).
+    """
+    pages = {
+        'issues': (json.dumps(dataset.issues[:per_page]).encode('utf-8'), github_payloads.slim_issue),
+        'commits': (json.dumps(dataset.commits[:per_page]).encode('utf-8'), github_payloads.slim_commit),
+    }
+    results = {}
+    for resource, (content, slim) in pages.items():
+        results[resource] = {'page_bytes': len(content)}
+        for strategy, decode in _decode_strategies().items():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                decode(content, slim)
+            seconds = (time.perf_counter() - started) / repeat
+
+            tracemalloc.start()
+            try:
+                page = decode(content, slim)
+                page_kb = tracemalloc.get_traced_memory()[0] / 1024
+            finally:
+                tracemalloc.stop()
+            del page
+            results[resource][strategy] = {'ms_per_page': round(seconds * 1000, 3), 'page_kb': round(page_kb, 1)}
+    return results
+
+
+def run_sync_benchmark(issues=1000, commits=2000, users=50, latency=0.0, passes=2, seed=42, keep=False):
+    """
+    Roda as sincronizações de metadados, issues e commits de ponta a ponta contra um
+    servidor falso local do GitHub e o banco configurado, sem gastar cota da API.
+    O primeiro passe grava tudo (carga inicial); os seguintes recebem os mesmos payloads
+    e medem o caminho sem mudanças (linhas ignoradas pelo payload_hash).
+    O repositório sintético é apagado no início e, sem `keep`, também no fim.
+    Retorna o dicionário de resultados (ver `save_results`).
+    """
+    dataset = SyntheticRepository(
+        owner=BENCHMARK_OWNER, name=f'synthetic-{seed}-{issues}i-{commits}c',
+        issues=issues, commits=commits, users=users, seed=seed,
+    )
+    full_name = f'{dataset.owner}/{dataset.name}'
+    Repositorio.objects.filter(full_name=full_name).delete()
+    repo_obj = Repositorio.objects.create(owner=dataset.owner, name=dataset.name, full_name=full_name)
+
+    results = {
+        'started_at': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'hostname': platform.node(),
+        },
+        'params': {
+            'issues': issues, 'commits': commits, 'users': users,
+            'latency': latency, 'passes': passes, 'seed': seed,
+        },
+        'passes': [],
+    }
+    try:
+        with FakeGitHubServer([dataset], latency=latency) as server, _point_api_to(server.base_url):
+            for pass_number in range(1, passes + 1):
+                stages = {}
+                for name in BENCHMARK_STAGES:
+                    stages[name] = _run_stage(name, repo_obj, server)
+                results['passes'].append({'pass': pass_number, 'stages': stages})
+    finally:
+        if not keep:
+            repo_obj.delete()
+    results['decoding'] = run_decode_benchmark(dataset)
+    results['peak_rss_mb'] = _peak_rss_mb()
+    return results
+
+
+def save_results(results, output_path=None):
+    """Grava os resultados em JSON (padrão: benchmarks/sync-<data>-<revisão>.json) e retorna o caminho."""
+    if output_path is None:
+        stamp = results['started_at'].replace(':', '').replace('-', '')[:15]
+        output_path = os.path.join(BENCHMARK_RESULTS_DIR, f"sync-{stamp}-{results['revision'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    return output_path
+
+
+def compare_results(baseline, current, tolerance=0.10):
+    """
+    Compara duas execuções passe a passe e etapa a etapa. Retorna uma lista de
+    (passe, etapa, métrica, valor de base, valor atual, variação relativa, regressão?),
+    onde regressão = piora maior que `tolerance` (10% por padrão).
+    """
+    rows = []
+    baseline_passes = {entry['pass']: entry['stages'] for entry in baseline.get('passes', [])}
+    for entry in current.get('passes', []):
+        for stage, metrics in entry['stages'].items():
+            base_metrics = baseline_passes.get(entry['pass'], {}).get(stage)
+            if not base_metrics:
+                continue
+            for metric, higher_is_better in COMPARED_METRICS.items():
+                old, new = base_metrics.get(metric), metrics.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                regression = change < -tolerance if higher_is_better else change > tolerance
+                rows.append((entry['pass'], stage, metric, old, new, change, regression))
+    return rows
@@ -0,0 +1,298 @@
+from core.models import Commit, CommitParent, Repositorio
+from django.db import connection
+from django.db.models import OuterRef, Subquery
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+GENERATION_BATCH_SIZE = 10000
+# Profundidade inicial (em gerações) do aprofundamento iterativo de intervalos e merge-base
+GRAPH_WALK_STEP = 1000
+
+# Ancestrais de um commit (incluindo ele mesmo). A caminhada não desce abaixo de
+# `min_generation`: como a geração sempre diminui do filho para o pai, nenhum commit
+# com geração menor pode levar a um commit de geração maior.
+_ANCESTORS_CTE = """
+{name}(id) AS (
+    SELECT %s::bigint
+    UNION
+    SELECT e.parent_id
+    FROM {edge_table} e
+    JOIN {name} a ON e.commit_id = a.id
+    JOIN {commit_table} p ON p.id = e.parent_id
+    WHERE p.generation IS NULL OR p.generation >= %s
+)"""
+
+
+def _ancestors_cte(name):
+    return _ANCESTORS_CTE.format(
+        name=name,
+        edge_table=CommitParent._meta.db_table,
+        commit_table=Commit._meta.db_table,
+    )
+
+
+def add_commit_edges(repo_obj: Repositorio, parents_by_commit_id):
+    """
+    Grava, em lote, as arestas commit -> pai dos commits informados
+    (`parents_by_commit_id`: {id do commit: [SHAs dos pais]}). Pais ainda não
+    sincronizados ficam com `parent` nulo e são vinculados depois por `link_commit_parents`.
+    """
+    parent_shas = {sha for shas in parents_by_commit_id.values() for sha in shas or []}
+    if not parent_shas:
+        return 0
+    parent_ids = dict(
+        Commit.objects.filter(repository=repo_obj, sha__in=parent_shas).values_list('sha', 'id')
+    )
+    edges = [
+        CommitParent(commit_id=commit_id, parent_id=parent_ids.get(sha), parent_sha=sha, position=position)
+        for commit_id, shas in parents_by_commit_id.items()
+        for position, sha in enumerate(shas or [])
+    ]
+    CommitParent.objects.bulk_create(edges, ignore_conflicts=True)
+    return len(edges)
+
+
+def link_commit_parents(repo_obj: Repositorio):
+    """
+    Vincula, em um único UPDATE, as arestas cujo commit pai acabou de ser sincronizado.
+    Os filhos dessas arestas (e seus descendentes) tinham a geração calculada sem esse pai
+    e voltam a ficar pendentes, para serem recalculados por `update_commit_generations`.
+    """
+    pending_edges = CommitParent.objects.filter(
+        commit__repository=repo_obj, parent__isnull=True,
+        parent_sha__in=Commit.objects.filter(repository=repo_obj).values('sha'),
+    )
+    child_ids = list(pending_edges.values_list('commit_id', flat=True).distinct())
+    if not child_ids:
+        return 0
+    parent_id = Commit.objects.filter(repository=repo_obj, sha=OuterRef('parent_sha')).values('id')[:1]
+    linked = pending_edges.update(parent_id=Subquery(parent_id))
+    _reset_generations(child_ids)
+    return linked
+
+
+def _reset_generations(commit_ids):
+    """Zera a geração dos commits informados e de todos os seus descendentes."""
+    sql = (
+        f"WITH RECURSIVE descendants(id) AS ("
+        f" SELECT unnest(%s::bigint[])"
+        f" UNION"
+        f" SELECT e.commit_id FROM {CommitParent._meta.db_table} e JOIN descendants d ON e.parent_id = d.id"
+        f") UPDATE {Commit._meta.db_table} SET generation = NULL"
+        f" WHERE id IN (SELECT id FROM descendants) AND generation IS NOT NULL"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [list(commit_ids)])
+        return cursor.rowcount
+
+
+def update_commit_generations(repo_obj: Repositorio, batch_size=GENERATION_BATCH_SIZE):
+    """
+    Calcula o número de geração dos commits do repositório que ainda não o têm: os gravados
+    nesta execução e os que `link_commit_parents` voltou a deixar pendentes.
+    Pais ainda não sincronizados (sincronizações com `since` ou rasas) são ignorados: o
+    commit entra como raiz e é recalculado quando o pai chegar. Retorna quantos commits foram atualizados.
+    """
+    parents = {
+        commit_id: []
+        for commit_id in Commit.objects.filter(repository=repo_obj, generation__isnull=True).values_list('id', flat=True)
+    }
+    if not parents:
+        return 0
+    edges = CommitParent.objects.filter(
+        commit__repository=repo_obj, commit__generation__isnull=True, parent__isnull=False,
+    ).values_list('commit_id', 'parent_id', 'parent__generation')
+    for commit_id, parent_id, parent_generation in edges.iterator(chunk_size=10000):
+        parents[commit_id].append((parent_id, parent_generation))
+
+    # Ordem topológica iterativa (históricos longos estourariam a recursão do Python)
+    generations = {}
+    for start in parents:
+        stack = [start]
+        while stack:
+            commit_id = stack[-1]
+            if commit_id in generations:
+                stack.pop()
+                continue
+            generation = 1
+            waiting = False
+            for parent_id, parent_generation in parents[commit_id]:
+                if parent_generation is None:
+                    # Pai também pendente: calcula o pai primeiro
+                    if parent_id not in generations:
+                        stack.append(parent_id)
+                        waiting = True
+                        continue
+                    parent_generation = generations[parent_id]
+                generation = max(generation, parent_generation + 1)
+            if waiting:
+                continue
+            generations[commit_id] = generation
+            stack.pop()
+
+    to_update = list(generations.items())
+    # UPDATE ... FROM unnest(): o bulk_update do Django monta um CASE WHEN por linha,
+    # o que fica muito lento com as centenas de milhares de commits de um backfill.
+    # synced_at também muda: a exportação incremental (parquet_export) se guia por ele.
+    sql = (
+        f"UPDATE {Commit._meta.db_table} AS c SET generation = v.generation, synced_at = %s "
+        f"FROM unnest(%s::bigint[], %s::integer[]) AS v(id, generation) WHERE c.id = v.id"
+    )
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        for i in range(0, len(to_update), batch_size):
+            batch = to_update[i:i + batch_size]
+            cursor.execute(sql, [now, [row[0] for row in batch], [row[1] for row in batch]])
+    return len(to_update)
+
+
+def update_commit_graph(repo_obj: Repositorio):
+    """Vincula as arestas pendentes e calcula as gerações que faltam. Retorna (arestas vinculadas, gerações calculadas)."""
+    linked = link_commit_parents(repo_obj)
+    generated = update_commit_generations(repo_obj)
+    return linked, generated
+
+
+def rebuild_commit_graph(repo_obj: Repositorio, batch_size=GENERATION_BATCH_SIZE):
+    """
+    Cria as arestas que faltam a partir de `Commit.parents_shas` (commits gravados antes
+    da tabela de arestas existir) e atualiza o grafo. Retorna o número de arestas criadas.
+    """
+    missing = (
+        Commit.objects
+        .filter(repository=repo_obj, parent_edges__isnull=True, parents_shas__isnull=False)
+        .exclude(parents_shas=[])
+        .values_list('id', 'parents_shas')
+    )
+    created = 0
+    batch = {}
+    for commit_id, parents_shas in missing.iterator(chunk_size=batch_size):
+        batch[commit_id] = parents_shas
+        if len(batch) >= batch_size:
+            created += add_commit_edges(repo_obj, batch)
+            batch = {}
+    created += add_commit_edges(repo_obj, batch)
+    update_commit_graph(repo_obj)
+    return created
+
+
+def _get_commit_node(repo_obj: Repositorio, sha):
+    """Retorna (id, geração) do commit pelo SHA, ou lança Commit.DoesNotExist."""
+    node = Commit.objects.filter(repository=repo_obj, sha=sha).values_list('id', 'generation').first()
+    if node is None:
+        raise Commit.DoesNotExist(f"Commit {sha} não encontrado em {repo_obj.full_name}.")
+    return node
+
+
+def is_ancestor(repo_obj: Repositorio, ancestor_sha, descendant_sha):
+    """
+    Indica se `ancestor_sha` é alcançável a partir de `descendant_sha` (ex: "o commit X
+    está na branch padrão?" -> is_ancestor(repo, X, sha_da_branch)). A caminhada é podada
+    pela geração do ancestral procurado.
+    """
+    ancestor_id, ancestor_generation = _get_commit_node(repo_obj, ancestor_sha)
+    descendant_id, descendant_generation = _get_commit_node(repo_obj, descendant_sha)
+    if ancestor_id == descendant_id:
+        return True
+    if ancestor_generation is not None and descendant_generation is not None \
+            and ancestor_generation >= descendant_generation:
+        return False
+
+    sql = f"WITH RECURSIVE {_ancestors_cte('ancestors')} SELECT EXISTS (SELECT 1 FROM ancestors WHERE id = %s)"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [descendant_id, ancestor_generation or 0, ancestor_id])
+        return cursor.fetchone()[0]
+
+
+def ancestors_of(repo_obj: Repositorio, sha, min_generation=None):
+    """
+    QuerySet com os ancestrais do commit (incluindo ele mesmo), ordenados do mais novo
+    para o mais antigo. `min_generation` limita a profundidade da caminhada.
+    """
+    commit_id, _ = _get_commit_node(repo_obj, sha)
+    sql = f"WITH RECURSIVE {_ancestors_cte('ancestors')} SELECT id FROM ancestors"
+    return (
+        Commit.objects
+        .filter(id__in=RawSQL(sql, [commit_id, min_generation or 0]))
+        .order_by('-generation', '-committer_date_git')
+    )
+
+
+def _generation_thresholds(top_generation):
+    """
+    Limites de geração decrescentes para o aprofundamento iterativo (top-1000, top-2000,
+    top-4000, ..., 0). Com limite `g`, a caminhada encontra exatamente os ancestrais com
+    geração >= g, então a busca pode parar assim que a resposta não depender dos demais.
+    """
+    if not top_generation:
+        yield 0
+        return
+    step = GRAPH_WALK_STEP
+    while top_generation - step > 0:
+        yield top_generation - step
+        step *= 2
+    yield 0
+
+
+def _range_sql():
+    return (
+        f"WITH RECURSIVE {_ancestors_cte('head_ancestors')}, {_ancestors_cte('base_ancestors')}, "
+        f"commit_range AS (SELECT id FROM head_ancestors EXCEPT SELECT id FROM base_ancestors) "
+    )
+
+
+def commits_between(repo_obj: Repositorio, base_sha, head_sha):
+    """
+    QuerySet com os commits alcançáveis a partir de `head_sha` mas não de `base_sha`
+    (equivalente a `git log base..head`, ex: commits entre duas tags).
+    A caminhada é aprofundada por geração até nenhum commit do intervalo ter um pai
+    abaixo do limite (ramos antigos mergeados depois da base continuam entrando).
+    """
+    base_id, base_generation = _get_commit_node(repo_obj, base_sha)
+    head_id, head_generation = _get_commit_node(repo_obj, head_sha)
+    top_generation = None if base_generation is None or head_generation is None \
+        else max(base_generation, head_generation)
+
+    frontier_sql = _range_sql() + (
+        f"SELECT EXISTS (SELECT 1 FROM commit_range r "
+        f"JOIN {CommitParent._meta.db_table} e ON e.commit_id = r.id "
+        f"JOIN {Commit._meta.db_table} p ON p.id = e.parent_id WHERE p.generation < %s)"
+    )
+    with connection.cursor() as cursor:
+        for threshold in _generation_thresholds(top_generation):
+            params = [head_id, threshold, base_id, threshold]
+            cursor.execute(frontier_sql, params + [threshold])
+            if not cursor.fetchone()[0]:
+                break
+
+    return (
+        Commit.objects
+        .filter(id__in=RawSQL(_range_sql() + "SELECT id FROM commit_range", params))
+        .order_by('-generation', '-committer_date_git')
+    )
+
+
+def merge_base(repo_obj: Repositorio, sha_a, sha_b):
+    """
+    Retorna o melhor ancestral comum dos dois commits (o de maior geração, como o
+    `git merge-base`), ou None se não houver ancestral comum sincronizado.
+    A busca é aprofundada por geração até o primeiro ancestral comum aparecer.
+    """
+    id_a, generation_a = _get_commit_node(repo_obj, sha_a)
+    id_b, generation_b = _get_commit_node(repo_obj, sha_b)
+    top_generation = None if generation_a is None or generation_b is None \
+        else min(generation_a, generation_b)
+    sql = (
+        f"WITH RECURSIVE {_ancestors_cte('ancestors_a')}, {_ancestors_cte('ancestors_b')} "
+        f"SELECT c.id FROM ancestors_a JOIN ancestors_b USING (id) "
+        f"JOIN {Commit._meta.db_table} c ON c.id = ancestors_a.id "
+        f"ORDER BY c.generation DESC NULLS LAST LIMIT 1"
+    )
+    row = None
+    with connection.cursor() as cursor:
+        for threshold in _generation_thresholds(top_generation):
+            cursor.execute(sql, [id_a, threshold, id_b, threshold])
+            row = cursor.fetchone()
+            if row:
+                break
+    return Commit.objects.get(id=row[0]) if row else None
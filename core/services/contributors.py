@@ -0,0 +1,45 @@
+from core.models import Commit
+from django.db.models import Case, Count, F, Max, Min, When
+
+
+def commit_counts_by_author(repository_id, since=None, limit=None):
+    """
+    Número de commits por autor do repositório em UMA consulta agrupada (índice
+    core_commit_author_ident_idx). Identidades associadas ao mesmo GitUser são somadas;
+    as que não têm conta vinculada aparecem pelo nome/e-mail do Git, então ninguém fica de fora.
+    Retorno: [{'user_id', 'username', 'identity_id', 'name', 'email', 'commits', 'first_commit', 'last_commit'}, ...]
+    """
+    queryset = Commit.objects.filter(repository_id=repository_id, author_identity__isnull=False)
+    if since:
+        queryset = queryset.filter(committer_date_git__gte=since)
+
+    rows = (
+        queryset
+        # Identidades sem usuário são agrupadas individualmente; as demais, pelo usuário
+        .annotate(unlinked_identity=Case(When(author_identity__user__isnull=True, then=F('author_identity'))))
+        .values('author_identity__user', 'unlinked_identity')
+        .annotate(
+            commits=Count('*'),
+            first_commit=Min('committer_date_git'),
+            last_commit=Max('committer_date_git'),
+            username=Max('author_identity__user__username'),
+            name=Max('author_identity__name'),
+            email=Max('author_identity__email'),
+        )
+        .order_by('-commits')
+    )
+    if limit:
+        rows = rows[:limit]
+    return [
+        {
+            'user_id': row['author_identity__user'],
+            'username': row['username'],
+            'identity_id': row['unlinked_identity'],
+            'name': row['name'],
+            'email': row['email'],
+            'commits': row['commits'],
+            'first_commit': row['first_commit'],
+            'last_commit': row['last_commit'],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,278 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+FAKE_RATE_LIMIT = 5000
+# A janela do rate limit é renovada antes de chegar perto do limite, para o cliente
+# nunca entrar na espera de `_send_github_request` (que distorceria o benchmark)
+FAKE_RATE_LIMIT_FLOOR = 100
+
+
+def _iso(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class SyntheticRepository:
+    """
+    Repositório sintético determinístico (mesma `seed` = mesmos payloads), no formato
+    da API REST do GitHub: metadados, issues (com PRs misturados), commits e usuários.
+    Os commits formam uma linha principal com merges periódicos de ramos curtos.
+    """
+
+    def __init__(self, owner='benchmark', name='synthetic', issues=1000, commits=2000, users=50,
+                 pull_request_ratio=0.2, seed=42):
+        self.owner = owner
+        self.name = name
+        self.seed = seed
+        rng = random.Random(seed)
+        start = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+        self.users = [self._user(i) for i in range(users)]
+        self.labels = [
+            {'id': 9000 + i, 'name': name, 'color': 'ededed', 'description': None}
+            for i, name in enumerate(['bug', 'enhancement', 'docs', 'question', 'performance'])
+        ]
+        self.milestones = [
+            {'id': 8000 + i, 'number': i + 1, 'title': f'v{i + 1}.0', 'state': 'open',
+             'due_on': _iso(start + timedelta(days=90 * (i + 1))), 'html_url': f'https://github.com/{owner}/{name}/milestone/{i + 1}'}
+            for i in range(4)
+        ]
+        self.repo = {
+            'id': 700000 + seed, 'name': name, 'full_name': f'{owner}/{name}',
+            'description': 'Repositório sintético para benchmark', 'language': 'Python',
+            'stargazers_count': rng.randint(0, 50000), 'forks_count': rng.randint(0, 5000),
+            'open_issues_count': 0, 'default_branch': 'main', 'private': False, 'archived': False,
+            'html_url': f'https://github.com/{owner}/{name}',
+            'clone_url': f'https://github.com/{owner}/{name}.git', 'ssh_url': f'git@github.com:{owner}/{name}.git',
+        }
+        self.issues = [self._issue(number, rng, start, pull_request_ratio) for number in range(1, issues + 1)]
+        self.repo['open_issues_count'] = sum(1 for issue in self.issues if issue['state'] == 'open')
+        self.commits = self._commits(commits, rng, start)
+
+    def _user(self, i):
+        # Mesmo formato do objeto de usuário da API (com as URLs que o sync não usa)
+        login = f'dev{i}'
+        api_url = f'https://api.github.com/users/{login}'
+        return {
+            'login': login, 'id': 100000 + i, 'node_id': f'MDQ6VXNlcj{100000 + i}',
+            'avatar_url': f'https://avatars.githubusercontent.com/u/{100000 + i}?v=4', 'gravatar_id': '',
+            'url': api_url, 'html_url': f'https://github.com/{login}',
+            'followers_url': f'{api_url}/followers', 'following_url': f'{api_url}/following{{/other_user}}',
+            'gists_url': f'{api_url}/gists{{/gist_id}}', 'starred_url': f'{api_url}/starred{{/owner}}{{/repo}}',
+            'subscriptions_url': f'{api_url}/subscriptions', 'organizations_url': f'{api_url}/orgs',
+            'repos_url': f'{api_url}/repos', 'events_url': f'{api_url}/events{{/privacy}}',
+            'received_events_url': f'{api_url}/received_events', 'type': 'User',
+            'user_view_type': 'public', 'site_admin': False,
+        }
+
+    def _issue(self, number, rng, start, pull_request_ratio):
+        created_at = start + timedelta(hours=number * 3)
+        closed = rng.random() < 0.6
+        author = rng.choice(self.users)
+        issue = {
+            'id': 5000000 + number, 'number': number,
+            'title': f'Issue {number}: {rng.choice(["falha", "melhoria", "erro", "lentidão"])} no módulo {rng.randint(1, 40)}',
+            'body': ' '.join(rng.choice(['parser', 'cache', 'sync', 'api', 'timeout', 'crash']) for _ in range(30)),
+            'state': 'closed' if closed else 'open',
+            'created_at': _iso(created_at),
+            'updated_at': _iso(created_at + timedelta(days=rng.randint(0, 30))),
+            'closed_at': _iso(created_at + timedelta(days=rng.randint(1, 30))) if closed else None,
+            'user': author, 'closed_by': rng.choice(self.users) if closed else None,
+            'comments': rng.randint(0, 20),
+            'labels': rng.sample(self.labels, rng.randint(0, 3)),
+            'milestone': rng.choice(self.milestones + [None]),
+            'assignees': rng.sample(self.users, rng.randint(0, 2)),
+            'html_url': f'https://github.com/{self.owner}/{self.name}/issues/{number}',
+        }
+        # Campos da API que o sync não usa (aumentam o payload como na API real)
+        api_url = f'https://api.github.com/repos/{self.owner}/{self.name}/issues/{number}'
+        issue.update({
+            'url': api_url, 'repository_url': f'https://api.github.com/repos/{self.owner}/{self.name}',
+            'labels_url': f'{api_url}/labels{{/name}}', 'comments_url': f'{api_url}/comments',
+            'events_url': f'{api_url}/events', 'timeline_url': f'{api_url}/timeline',
+            'node_id': f'I_kwDOSynth{number:08d}', 'locked': False, 'active_lock_reason': None,
+            'author_association': 'CONTRIBUTOR', 'state_reason': 'completed' if closed else None,
+            'performed_via_github_app': None,
+            'reactions': {'url': f'{api_url}/reactions', 'total_count': 0, '+1': 0, '-1': 0, 'laugh': 0,
+                          'hooray': 0, 'confused': 0, 'heart': 0, 'rocket': 0, 'eyes': 0},
+        })
+        if rng.random() < pull_request_ratio:
+            issue['pull_request'] = {'url': f'https://api.github.com/repos/{self.owner}/{self.name}/pulls/{number}'}
+        return issue
+
+    def _commits(self, count, rng, start):
+        """Gera os commits do mais novo para o mais antigo (ordem da API `/commits`)."""
+        commits = []
+        mainline_sha = None
+        branch_sha = None
+        for i in range(count):
+            sha = hashlib.sha1(f'{self.seed}:{i}'.encode()).hexdigest()
+            if i % 10 == 7 and mainline_sha:
+                # Commit de ramo curto, partindo da linha principal
+                parents = [mainline_sha]
+                branch_sha = sha
+            elif i % 10 == 9 and branch_sha:
+                # Merge do ramo de volta na linha principal
+                parents = [mainline_sha, branch_sha]
+                branch_sha = None
+                mainline_sha = sha
+            else:
+                parents = [mainline_sha] if mainline_sha else []
+                mainline_sha = sha
+            author = rng.choice(self.users)
+            date = _iso(start + timedelta(minutes=i * 37))
+            api_url = f'https://api.github.com/repos/{self.owner}/{self.name}'
+            commits.append({
+                'sha': sha,
+                'node_id': f'C_kwDOSynth{i:08d}',
+                'commit': {
+                    'author': {'name': author['login'].title(), 'email': f"{author['login']}@example.com", 'date': date},
+                    'committer': {'name': 'GitHub', 'email': 'noreply@github.com', 'date': date},
+                    'message': f'Commit {i}: ajusta {rng.choice(["parser", "cache", "sync", "api"])} (#{rng.randint(1, 500)})',
+                    'tree': {'sha': hashlib.sha1(f'tree:{sha}'.encode()).hexdigest(), 'url': f'{api_url}/git/trees/{sha}'},
+                    'url': f'{api_url}/git/commits/{sha}',
+                    'comment_count': 0,
+                    'verification': {'verified': False, 'reason': 'unsigned', 'signature': None,
+                                     'payload': None, 'verified_at': None},
+                },
+                'url': f'{api_url}/commits/{sha}',
+                'html_url': f'https://github.com/{self.owner}/{self.name}/commit/{sha}',
+                'comments_url': f'{api_url}/commits/{sha}/comments',
+                'author': author, 'committer': None,
+                'parents': [
+                    {'sha': parent, 'url': f'{api_url}/commits/{parent}',
+                     'html_url': f'https://github.com/{self.owner}/{self.name}/commit/{parent}'}
+                    for parent in parents
+                ],
+            })
+        commits.reverse()
+        return commits
+
+
+class _FakeGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass # Sem log por requisição no terminal
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split('/') if part]
+        dataset = server.repositories.get(tuple(parts[1:3])) if len(parts) >= 3 and parts[0] == 'repos' else None
+        if dataset is None:
+            return self._send(404, {'message': 'Not Found'})
+
+        resource = parts[3] if len(parts) > 3 else None
+        if resource is None:
+            return self._send(200, dataset.repo)
+        if resource == 'issues' and len(parts) == 4:
+            items = dataset.issues
+            if query.get('since'):
+                items = [issue for issue in items if issue['updated_at'] >= query['since']]
+        elif resource == 'commits' and len(parts) == 4:
+            items = dataset.commits
+            if query.get('since'):
+                items = [c for c in items if c['commit']['committer']['date'] >= query['since']]
+            if query.get('until'):
+                items = [c for c in items if c['commit']['committer']['date'] <= query['until']]
+        elif resource == 'branches':
+            items = [{'name': 'main', 'commit': {'sha': dataset.commits[0]['sha'] if dataset.commits else None}, 'protected': True}]
+        else:
+            return self._send(404, {'message': 'Not Found'})
+        self._send_page(url.path, query, items)
+
+    def _send_page(self, path, query, items):
+        page = max(int(query.get('page', 1)), 1)
+        per_page = min(max(int(query.get('per_page', 30)), 1), 100)
+        last_page = max((len(items) + per_page - 1) // per_page, 1)
+        links = []
+        base = f"http://{self.headers.get('Host')}{path}"
+        for rel, target in (('next', page + 1), ('last', last_page)):
+            if page < last_page:
+                links.append(f'<{base}?{urlencode({**query, "page": target})}>; rel="{rel}"')
+        if page > 1:
+            links.append(f'<{base}?{urlencode({**query, "page": 1})}>; rel="first"')
+        start = (page - 1) * per_page
+        self._send(200, items[start:start + per_page], {'Link': ', '.join(links)} if links else None)
+
+    def _send(self, status, payload, extra_headers=None):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        body = json.dumps(payload).encode('utf-8')
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        not_modified = status == 200 and self.headers.get('If-None-Match') == etag
+        remaining = server.count_request(not_modified)
+        if not_modified:
+            status, body = 304, b''
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('X-RateLimit-Limit', str(FAKE_RATE_LIMIT))
+        self.send_header('X-RateLimit-Remaining', str(remaining))
+        self.send_header('X-RateLimit-Reset', str(int(time.time()) + 3600))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeGitHubServer:
+    """
+    Servidor HTTP local que imita a API REST do GitHub para os repositórios sintéticos
+    informados: paginação com cabeçalho `Link`, cabeçalhos X-RateLimit-*, ETag com
+    respostas 304 para `If-None-Match` e latência fixa por requisição (em segundos).
+    Uso: `with FakeGitHubServer([repo]) as server: ... server.base_url ...`
+    """
+
+    def __init__(self, repositories, latency=0.0, host='127.0.0.1', port=0):
+        self.httpd = ThreadingHTTPServer((host, port), _FakeGitHubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.repositories = {(repo.owner, repo.name): repo for repo in repositories}
+        self.httpd.latency = latency
+        self.httpd.count_request = self._count_request
+        self._lock = threading.Lock()
+        self._thread = None
+        self.requests = 0
+        self.not_modified = 0
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count_request(self, not_modified):
+        with self._lock:
+            self.requests += 1
+            if not_modified:
+                self.not_modified += 1
+            used = self.requests % (FAKE_RATE_LIMIT - FAKE_RATE_LIMIT_FLOOR)
+        return FAKE_RATE_LIMIT - used
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+            self.not_modified = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
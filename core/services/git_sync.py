@@ -1,33 +1,122 @@
 from core.services import github_api # Importa as funções da API
-from core.models import Repositorio, Issue, Commit, GitUser
+from core.services.metrics import record_sync_rows, stage_timer, track_page_write
+from core.services.commit_graph import add_commit_edges, ancestors_of, commits_between, is_ancestor, update_commit_graph
+from core.services.metrics_history import record_metric_snapshots
+from core.models import Repositorio, Branch, BranchCommit, Issue, IssueComment, Commit, CommitFile, FilePath, GitUser, Identity, Label, IssueLabel, Milestone, PullRequest
 from django.db import transaction
-from datetime import datetime
+from django.db.models import Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
 from django.utils import timezone
+import hashlib
+import json
 import requests
 import re # Para parsing de mensagens de commit
 
 # Regex para encontrar referências a issues na mensagem de commit
 ISSUE_REF_PATTERN = re.compile(r'(?:fix(?:es|ed)?|close(?:s|d)?|resolve(?:s|d)?)\s#(\d+)', re.IGNORECASE)
 
-def _get_or_create_git_user(user_data):
-    """Auxiliar para obter ou criar um GitUser."""
-    if not user_data or 'id' not in user_data:
-        return None
-    user, created = GitUser.objects.get_or_create(
-        external_id=str(user_data['id']), # IDs podem vir como int
-        defaults={
-            'username': user_data.get('login'),
-            'avatar_url': user_data.get('avatar_url'),
-            'web_url': user_data.get('html_url'),
-            'user_type': user_data.get('type'),
-        }
+def _bulk_upsert_labels(repo_obj: Repositorio, issues_data):
+    """
+    Grava (upsert) em uma única consulta todas as labels presentes em uma página de issues.
+    Retorna um dicionário {external_id da label: id da Label}.
+    """
+    labels_data = {}
+    for issue_data in issues_data:
+        for label_data in issue_data.get('labels') or []:
+            labels_data[str(label_data['id'])] = label_data # Deduplica: a mesma label aparece em várias issues
+    if not labels_data:
+        return {}
+    labels = Label.objects.bulk_create(
+        [
+            Label(
+                repository=repo_obj,
+                external_id=external_id,
+                name=label_data.get('name') or '',
+                color=label_data.get('color'),
+                description=(label_data.get('description') or '')[:512] or None,
+            )
+            for external_id, label_data in labels_data.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['repository', 'external_id'],
+        update_fields=['name', 'color', 'description'],
+    )
+    return {label.external_id: label.id for label in labels}
+
+
+def _bulk_upsert_milestones(repo_obj: Repositorio, issues_data):
+    """
+    Grava (upsert) em uma única consulta todas as milestones presentes em uma página de issues.
+    Retorna um dicionário {external_id da milestone: id da Milestone}.
+    """
+    milestones_data = {
+        str(issue_data['milestone']['id']): issue_data['milestone']
+        for issue_data in issues_data
+        if issue_data.get('milestone')
+    }
+    if not milestones_data:
+        return {}
+    milestones = Milestone.objects.bulk_create(
+        [
+            Milestone(
+                repository=repo_obj,
+                external_id=external_id,
+                number=milestone_data.get('number') or 0,
+                title=milestone_data.get('title') or '',
+                state=milestone_data.get('state'),
+                due_on=_parse_git_datetime(milestone_data.get('due_on')),
+                web_url=milestone_data.get('html_url'),
+            )
+            for external_id, milestone_data in milestones_data.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['repository', 'external_id'],
+        update_fields=['number', 'title', 'state', 'due_on', 'web_url'],
     )
-    # Se não foi criado, mas o username ou avatar_url mudaram, atualizar aqui
-    if not created and (user.username != user_data.get('login') or user.avatar_url != user_data.get('avatar_url')):
-        user.username = user_data.get('login')
-        user.avatar_url = user_data.get('avatar_url')
-        user.save()
-    return user
+    return {milestone.external_id: milestone.id for milestone in milestones}
+
+
+def _bulk_set_issue_labels(issue_label_ids):
+    """
+    Substitui as labels das issues informadas em lote.
+    `issue_label_ids`: dicionário {id da Issue: [ids das Labels]}.
+    """
+    if not issue_label_ids:
+        return
+    IssueLabel.objects.filter(issue_id__in=list(issue_label_ids)).delete()
+    IssueLabel.objects.bulk_create([
+        IssueLabel(issue_id=issue_id, label_id=label_id)
+        for issue_id, label_ids in issue_label_ids.items()
+        for label_id in label_ids
+    ])
+
+
+# Campos de Repositorio preenchidos a partir do payload de repositório da API
+REPO_METADATA_FIELDS = [
+    'description', 'language', 'stars_count', 'forks_count', 'open_issues_count',
+    'default_branch', 'is_private', 'archived', 'web_url', 'clone_url_http',
+    'clone_url_ssh', 'external_id',
+]
+
+
+def _apply_repo_data(repo_obj: Repositorio, repo_data):
+    """Copia os metadados do payload de repositório da API para o objeto (sem salvar)."""
+    repo_obj.description = repo_data.get('description')
+    repo_obj.language = repo_data.get('language')
+    repo_obj.stars_count = repo_data.get('stargazers_count', 0)
+    repo_obj.forks_count = repo_data.get('forks_count', 0)
+    repo_obj.open_issues_count = repo_data.get('open_issues_count', 0)
+    repo_obj.default_branch = repo_data.get('default_branch', 'main')
+    repo_obj.is_private = repo_data.get('private', False)
+    repo_obj.archived = repo_data.get('archived', False)
+    repo_obj.web_url = repo_data.get('html_url')
+    repo_obj.clone_url_http = repo_data.get('clone_url')
+    repo_obj.clone_url_ssh = repo_data.get('ssh_url')
+    if repo_data.get('id') is not None:
+        repo_obj.external_id = str(repo_data['id'])
 
 
 def sync_repository_metadata(repo_obj: Repositorio):
@@ -35,103 +124,413 @@ def sync_repository_metadata(repo_obj: Repositorio):
     Sincroniza os metadados gerais de um repositório (estrelas, descrição, etc.).
     """
     try:
-        repo_data = github_api.get_repo_data(repo_obj.owner, repo_obj.name)
-        repo_obj.description = repo_data.get('description')
-        repo_obj.language = repo_data.get('language')
-        repo_obj.stars_count = repo_data.get('stargazers_count', 0)
-        repo_obj.forks_count = repo_data.get('forks_count', 0)
-        repo_obj.open_issues_count = repo_data.get('open_issues_count', 0)
-        repo_obj.default_branch = repo_data.get('default_branch', 'main')
-        repo_obj.is_private = repo_data.get('private', False)
-        repo_obj.archived = repo_data.get('archived', False)
-        repo_obj.web_url = repo_data.get('html_url')
-        repo_obj.clone_url_http = repo_data.get('clone_url')
-        repo_obj.clone_url_ssh = repo_data.get('ssh_url')
-        repo_obj.external_id = str(repo_data.get('id'))
+        with stage_timer('metadata', 'fetch'):
+            repo_data = github_api.get_repo_data(repo_obj.owner, repo_obj.name)
+        _apply_repo_data(repo_obj, repo_data)
         repo_obj.save()
+        record_metric_snapshots([repo_obj]) # Guarda o histórico de estrelas/forks/issues do dia
         print(f"Metadados do repositório {repo_obj.full_name} sincronizados.")
     except Exception as e:
         print(f"Erro ao sincronizar metadados para {repo_obj.full_name}: {e}")
 
 
+# Máximo de repositórios por requisição GraphQL (aliases) na atualização em lote
+GRAPHQL_METADATA_BATCH_SIZE = 100
+
+
+def _graphql_repo_to_rest(node):
+    """Converte o nó GraphQL de repositório para o formato do payload REST (usado por `_apply_repo_data`)."""
+    return {
+        'id': node['databaseId'],
+        'description': node.get('description'),
+        'language': (node.get('primaryLanguage') or {}).get('name'),
+        'stargazers_count': node.get('stargazerCount', 0),
+        'forks_count': node.get('forkCount', 0),
+        # No REST, open_issues_count também conta os pull requests abertos
+        'open_issues_count': node['issues']['totalCount'] + node['pullRequests']['totalCount'],
+        'default_branch': (node.get('defaultBranchRef') or {}).get('name', 'main'),
+        'private': node.get('isPrivate', False),
+        'archived': node.get('isArchived', False),
+        'html_url': node.get('url'),
+        'clone_url': f"{node['url']}.git" if node.get('url') else None,
+        'ssh_url': node.get('sshUrl'),
+    }
+
+
+def refresh_repositories_metadata(repos, batch_size=GRAPHQL_METADATA_BATCH_SIZE):
+    """
+    Atualiza os metadados de vários repositórios usando consultas GraphQL com aliases
+    (até `batch_size` repositórios por requisição) e grava tudo com um único
+    `bulk_update` por lote, apenas para as linhas cujos valores realmente mudaram.
+    Retorna uma tupla (repositórios alterados, requisições feitas).
+    """
+    repos = list(repos)
+    changed_total = 0
+    requests_count = 0
+
+    for start in range(0, len(repos), batch_size):
+        batch = repos[start:start + batch_size]
+        nodes = github_api.fetch_repos_metadata_graphql([(repo.owner, repo.name) for repo in batch])
+        requests_count += 1
+
+        now = timezone.now()
+        found_repos = []
+        changed_repos = []
+        changed_fields = set()
+        for repo_obj, node in zip(batch, nodes):
+            if node is None:
+                print(f"Repositório {repo_obj.full_name} não encontrado via GraphQL. Ignorando.")
+                continue
+            found_repos.append(repo_obj)
+            before = {field: getattr(repo_obj, field) for field in REPO_METADATA_FIELDS}
+            _apply_repo_data(repo_obj, _graphql_repo_to_rest(node))
+            diff = {field for field in REPO_METADATA_FIELDS if getattr(repo_obj, field) != before[field]}
+            if diff:
+                repo_obj.updated_at = now
+                changed_repos.append(repo_obj)
+                changed_fields |= diff
+
+        if changed_repos:
+            Repositorio.objects.bulk_update(changed_repos, sorted(changed_fields) + ['updated_at'])
+        # O snapshot diário é gravado mesmo sem mudanças, para manter a série contínua
+        record_metric_snapshots(found_repos)
+        changed_total += len(changed_repos)
+
+    print(f"Metadados atualizados via GraphQL: {changed_total} de {len(repos)} repositórios alterados "
+          f"({requests_count} requisições).")
+    return changed_total, requests_count
+
+
+def import_owner_repositories(owner, owner_type='org', max_workers=4, batch_size=500):
+    """
+    Descobre todos os repositórios de uma organização (ou usuário) e grava/atualiza
+    os registros de Repositorio em lote, já com os metadados que
+    `sync_repository_metadata` preencheria. A gravação é um upsert pelo `external_id`
+    (INSERT ... ON CONFLICT), então importações simultâneas ou concorrendo com a
+    sincronização de metadados não duplicam repositórios nem abortam o lote.
+    Repositórios cadastrados manualmente (sem `external_id`) são identificados pelo `full_name`.
+    As páginas após a primeira são buscadas em paralelo.
+    Retorna uma tupla (criados, atualizados).
+    """
+    print(f"Descobrindo repositórios de {owner} ({owner_type})...")
+    repos_data, last_page = github_api.fetch_owner_repos(owner, owner_type=owner_type, page=1)
+
+    if last_page > 1:
+        def _fetch_page(page):
+            return github_api.fetch_owner_repos(owner, owner_type=owner_type, page=page)[0]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for page_data in executor.map(_fetch_page, range(2, last_page + 1)):
+                repos_data.extend(page_data)
+
+    # Remove duplicatas (um repositório pode mudar de página durante a paginação)
+    repos_by_external_id = {str(repo_data['id']): repo_data for repo_data in repos_data}
+    external_id_by_full_name = {
+        repo_data['full_name']: external_id for external_id, repo_data in repos_by_external_id.items()
+    }
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Cadastrados manualmente: recebem o external_id para o upsert abaixo cair na mesma linha
+        manual = list(Repositorio.objects.filter(full_name__in=list(external_id_by_full_name), external_id__isnull=True))
+        for repo_obj in manual:
+            repo_obj.external_id = external_id_by_full_name[repo_obj.full_name]
+        Repositorio.objects.bulk_update(manual, ['external_id'], batch_size=batch_size)
+
+        existing = set(
+            Repositorio.objects.filter(external_id__in=list(repos_by_external_id)).values_list('external_id', flat=True)
+        )
+        repos = []
+        for repo_data in repos_by_external_id.values():
+            # Nome/proprietário podem mudar (repositório renomeado ou transferido)
+            repo_obj = Repositorio(
+                platform='github',
+                owner=repo_data['owner']['login'],
+                name=repo_data['name'],
+                full_name=repo_data['full_name'],
+                updated_at=now,
+            )
+            _apply_repo_data(repo_obj, repo_data)
+            repos.append(repo_obj)
+
+        # No Postgres o bulk_create com update_conflicts devolve o id de cada linha (nova ou existente)
+        Repositorio.objects.bulk_create(
+            repos,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['external_id'],
+            update_fields=['owner', 'name', 'full_name', 'updated_at']
+                          + [field for field in REPO_METADATA_FIELDS if field != 'external_id'],
+        )
+        record_metric_snapshots(repos)
+
+    updated = len(existing)
+    created = len(repos) - updated
+    print(f"Importação de {owner} concluída: {created} repositórios criados, "
+          f"{updated} atualizados ({last_page} páginas da API).")
+    return created, updated
+
+
+def _parse_git_datetime(value):
+    """Converte uma data ISO 8601 da API (ex: '2024-01-01T12:00:00Z') em datetime com timezone."""
+    if not value:
+        return None
+    return _parse_iso_datetime(value)
+
+
+@lru_cache(maxsize=8192)
+def _parse_iso_datetime(value):
+    # As mesmas datas se repetem muito (author/committer date, commits de um mesmo push, milestones);
+    # datetimes são imutáveis, então a mesma instância pode ser devolvida
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _format_since(value):
+    """Formata um datetime para o padrão ISO 8601 em UTC esperado pela API ('YYYY-MM-DDTHH:MM:SSZ')."""
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        value = value.astimezone(dt_timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec='seconds') + 'Z'
+
+
+def _payload_hash(normalized_payload):
+    """
+    Hash compacto (16 caracteres hex) do payload normalizado de uma issue/commit.
+    Usado para detectar, em memória, linhas que não mudaram desde a última sincronização.
+    """
+    encoded = json.dumps(normalized_payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(encoded.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _new_write_stats():
+    """Contadores de escrita por execução: linhas inseridas, atualizadas e ignoradas (sem mudanças)."""
+    return {'inserted': 0, 'updated': 0, 'skipped': 0}
+
+
+def _bulk_upsert_git_users(users_data):
+    """
+    Upsert em lote de GitUser: grava os usuários novos e atualiza
+    apenas os que mudaram, com um número fixo de consultas por página.
+    Retorna um dicionário {external_id: id do GitUser}.
+    """
+    users_by_external_id = {}
+    for user_data in users_data:
+        if user_data and 'id' in user_data:
+            users_by_external_id[str(user_data['id'])] = user_data
+    if not users_by_external_id:
+        return {}
+
+    existing = {
+        user.external_id: user
+        for user in GitUser.objects.filter(external_id__in=list(users_by_external_id))
+    }
+    to_create = []
+    to_update = []
+    for external_id, user_data in users_by_external_id.items():
+        user = existing.get(external_id)
+        if user is None:
+            to_create.append(GitUser(
+                external_id=external_id,
+                username=user_data.get('login'),
+                avatar_url=user_data.get('avatar_url'),
+                web_url=user_data.get('html_url'),
+                user_type=user_data.get('type'),
+            ))
+        elif user.username != user_data.get('login') or user.avatar_url != user_data.get('avatar_url'):
+            user.username = user_data.get('login')
+            user.avatar_url = user_data.get('avatar_url')
+            to_update.append(user)
+
+    if to_create:
+        # ignore_conflicts: outro worker pode ter criado o mesmo usuário ao mesmo tempo
+        GitUser.objects.bulk_create(to_create, ignore_conflicts=True)
+        existing.update({
+            user.external_id: user
+            for user in GitUser.objects.filter(external_id__in=[user.external_id for user in to_create])
+        })
+    if to_update:
+        GitUser.objects.bulk_update(to_update, ['username', 'avatar_url'])
+
+    return {external_id: user.id for external_id, user in existing.items()}
+
+
+def _user_external_id(user_data):
+    return str(user_data['id']) if user_data and 'id' in user_data else None
+
+
+def _normalize_issue_payload(issue_data):
+    """Extrai apenas os campos persistidos de uma issue, em formato estável para o hash."""
+    milestone_data = issue_data.get('milestone')
+    return {
+        'number': issue_data['number'],
+        'title': issue_data['title'],
+        'body': issue_data.get('body'),
+        'state': issue_data['state'],
+        'created_at': issue_data['created_at'],
+        'updated_at': issue_data['updated_at'],
+        'closed_at': issue_data.get('closed_at'),
+        'user': _user_external_id(issue_data.get('user')),
+        'closed_by': _user_external_id(issue_data.get('closed_by')),
+        'comments': issue_data.get('comments', 0),
+        'labels': [
+            [str(label_data['id']), label_data.get('name'), label_data.get('color'), label_data.get('description')]
+            for label_data in issue_data.get('labels') or []
+        ],
+        'milestone': [
+            str(milestone_data['id']), milestone_data.get('number'), milestone_data.get('title'),
+            milestone_data.get('state'), milestone_data.get('due_on'), milestone_data.get('html_url'),
+        ] if milestone_data else None,
+        'assignees': sorted(_user_external_id(assignee) for assignee in issue_data.get('assignees') or []),
+        'html_url': issue_data.get('html_url'),
+    }
+
+
+# Campos de Issue regravados quando o payload muda
+ISSUE_WRITE_FIELDS = [
+    'number', 'title', 'body', 'state', 'created_at_git', 'updated_at_git', 'closed_at_git',
+    'author', 'closed_by', 'comments_count', 'labels', 'milestone', 'is_pull_request', 'web_url',
+    'payload_hash', 'synced_at',
+]
+
+
+def _bulk_write_issues(repo_obj: Repositorio, issues_data, stats):
+    """
+    Grava uma página de issues em lote. Compara o hash do payload de cada issue com o
+    hash armazenado e só insere/atualiza as que são novas ou mudaram; as demais são
+    ignoradas sem nenhuma escrita no banco. Atualiza os contadores em `stats`.
+    """
+    payloads = {}
+    with stage_timer('issues', 'transform'):
+        for issue_data in issues_data:
+            payloads[str(issue_data['id'])] = (issue_data, _payload_hash(_normalize_issue_payload(issue_data)))
+    if not payloads:
+        return
+
+    existing = {
+        external_id: (issue_id, payload_hash)
+        for external_id, issue_id, payload_hash in Issue.objects.filter(
+            repository=repo_obj, external_id__in=list(payloads)
+        ).values_list('external_id', 'id', 'payload_hash')
+    }
+    changed = {
+        external_id: payload
+        for external_id, payload in payloads.items()
+        if external_id not in existing or existing[external_id][1] != payload[1]
+    }
+    stats['skipped'] += len(payloads) - len(changed)
+    if not changed:
+        return
+
+    changed_data = [issue_data for issue_data, _ in changed.values()]
+    users = []
+    for issue_data in changed_data:
+        users.append(issue_data.get('user'))
+        users.append(issue_data.get('closed_by'))
+        users.extend(issue_data.get('assignees') or [])
+    user_ids = _bulk_upsert_git_users(users)
+    label_ids = _bulk_upsert_labels(repo_obj, changed_data)
+    milestone_ids = _bulk_upsert_milestones(repo_obj, changed_data)
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    assignee_ids = {}
+    issue_label_ids = {}
+    for external_id, (issue_data, payload_hash) in changed.items():
+        issue = Issue(
+            repository=repo_obj,
+            external_id=external_id,
+            number=issue_data['number'],
+            title=issue_data['title'],
+            body=issue_data.get('body'),
+            state=issue_data['state'],
+            created_at_git=_parse_git_datetime(issue_data['created_at']),
+            updated_at_git=_parse_git_datetime(issue_data['updated_at']),
+            closed_at_git=_parse_git_datetime(issue_data.get('closed_at')),
+            author_id=user_ids.get(_user_external_id(issue_data.get('user'))),
+            closed_by_id=user_ids.get(_user_external_id(issue_data.get('closed_by'))),
+            comments_count=issue_data.get('comments', 0),
+            labels=[label_data.get('name') for label_data in issue_data.get('labels') or []],
+            milestone_id=milestone_ids.get(str(issue_data['milestone']['id'])) if issue_data.get('milestone') else None,
+            is_pull_request='pull_request' in issue_data,
+            web_url=issue_data.get('html_url'),
+            payload_hash=payload_hash,
+            synced_at=now,
+        )
+        if external_id in existing:
+            issue.id = existing[external_id][0]
+            to_update.append(issue)
+        else:
+            to_create.append(issue)
+        assignee_ids[external_id] = {
+            user_ids[_user_external_id(assignee)]
+            for assignee in issue_data.get('assignees') or []
+            if _user_external_id(assignee) in user_ids
+        }
+        issue_label_ids[external_id] = [
+            label_ids[str(label_data['id'])] for label_data in issue_data.get('labels') or []
+        ]
+
+    Issue.objects.bulk_create(to_create)
+    Issue.objects.bulk_update(to_update, ISSUE_WRITE_FIELDS)
+    stats['inserted'] += len(to_create)
+    stats['updated'] += len(to_update)
+
+    # Relações M2M só são regravadas para as issues que mudaram
+    written = {issue.external_id: issue.id for issue in to_create + to_update}
+    Assignees = Issue.assignees.through
+    Assignees.objects.filter(issue_id__in=list(written.values())).delete()
+    Assignees.objects.bulk_create([
+        Assignees(issue_id=written[external_id], gituser_id=user_id)
+        for external_id, user_id_set in assignee_ids.items()
+        for user_id in user_id_set
+    ])
+    _bulk_set_issue_labels({written[external_id]: ids for external_id, ids in issue_label_ids.items()})
+
+
 def sync_repository_issues(repo_obj: Repositorio, state='all', since_datetime=None):
     """
     Baixa e grava issues de um repositório, com suporte a filtro e paginação.
     `since_datetime`: datetime object para buscar issues ATUALIZADAS a partir dessa data.
+    Retorna os contadores da execução ({'inserted', 'updated', 'skipped'}).
     """
     print(f"Iniciando sincronização de issues para {repo_obj.full_name}...")
     page = 1
     has_more = True
-    processed_count = 0
+    stats = _new_write_stats()
     issues_ids_in_batch = set() # Para evitar duplicatas na mesma execução
 
     while has_more:
         try:
             # Converte datetime para string ISO 8601 exigida pela API
-            since_str = since_datetime.isoformat() + 'Z' if since_datetime else None
-            issues_data = github_api.fetch_repo_issues(
-                repo_obj.owner, repo_obj.name,
-                state=state,
-                since=since_str,
-                page=page
-            )
+            since_str = _format_since(since_datetime)
+            with stage_timer('issues', 'fetch'):
+                issues_data = github_api.fetch_repo_issues(
+                    repo_obj.owner, repo_obj.name,
+                    state=state,
+                    since=since_str,
+                    page=page
+                )
 
             if not issues_data:
                 has_more = False
                 break
 
-            with transaction.atomic(): # Garante que todas as operações no DB sejam atômicas
-                for issue_data in issues_data:
-                    # Algumas APIs retornam PRs como Issues.
-                    if 'pull_request' in issue_data:
-                        continue # Pule pull requests se tiver um modelo separado para eles
-
-                    # Evita processar a mesma issue se por algum motivo vier duplicada na paginação
-                    if issue_data['id'] in issues_ids_in_batch:
-                        continue
-                    issues_ids_in_batch.add(issue_data['id'])
-
-
-                    author_obj = _get_or_create_git_user(issue_data.get('user'))
-                    closed_by_obj = _get_or_create_git_user(issue_data.get('closed_by'))
-
-                    issue, created = Issue.objects.update_or_create(
-                        repository=repo_obj,
-                        external_id=str(issue_data['id']),
-                        defaults={
-                            'number': issue_data['number'],
-                            'title': issue_data['title'],
-                            'body': issue_data['body'],
-                            'state': issue_data['state'],
-                            'created_at_git': datetime.fromisoformat(issue_data['created_at'].replace('Z', '+00:00')),
-                            'updated_at_git': datetime.fromisoformat(issue_data['updated_at'].replace('Z', '+00:00')),
-                            'closed_at_git': datetime.fromisoformat(issue_data['closed_at'].replace('Z', '+00:00')) if issue_data['closed_at'] else None,
-                            'author': author_obj,
-                            'comments_count': issue_data.get('comments', 0),
-                            'labels': issue_data.get('labels'),
-                            'milestone': issue_data.get('milestone'),
-                            'is_pull_request': 'pull_request' in issue_data,
-                            'web_url': issue_data.get('html_url'),
-                            'synced_at': timezone.now(),
-                        }
-                    )
-                    issue.closed_by = closed_by_obj # Atribui o closed_by separadamente
-                    issue.save()
-
-                    # Lida com assignees (Many-to-Many)
-                    assignees_to_add = []
-                    for assignee_data in issue_data.get('assignees', []):
-                        assignee_obj = _get_or_create_git_user(assignee_data)
-                        if assignee_obj:
-                            assignees_to_add.append(assignee_obj)
-                    issue.assignees.set(assignees_to_add) # .set() remove os antigos e adiciona os novos
-
-                    if created:
-                        processed_count += 1
-                        # print(f"  Issue #{issue.number} criada.")
-                    else:
-                        # print(f"  Issue #{issue.number} atualizada.")
-                        pass # Já existe, mas foi atualizada
+            page_issues_data = []
+            for issue_data in issues_data:
+                # Algumas APIs retornam PRs como Issues.
+                if 'pull_request' in issue_data:
+                    continue # Pule pull requests se tiver um modelo separado para eles
+
+                # Evita processar a mesma issue se por algum motivo vier duplicada na paginação
+                if issue_data['id'] in issues_ids_in_batch:
+                    continue
+                issues_ids_in_batch.add(issue_data['id'])
+                page_issues_data.append(issue_data)
+
+            with track_page_write('issues'), transaction.atomic(): # Garante que todas as operações no DB sejam atômicas
+                _bulk_write_issues(repo_obj, page_issues_data, stats)
 
             if len(issues_data) < github_api.PER_PAGE_DEFAULT: # PER_PAGE_DEFAULT = 100
                 has_more = False # Se menos do que o total por página, é a última página
@@ -153,9 +552,258 @@ def sync_repository_issues(repo_obj: Repositorio, state='all', since_datetime=No
             has_more = False
             # Logar erro e considerar re-agendar ou notificar
 
+    # Comentários que chegaram antes das suas issues passam a apontar para elas
+    link_issue_comments(repo_obj)
+
     repo_obj.last_sync_issues_at = timezone.now()
     repo_obj.save(update_fields=['last_sync_issues_at']) # Atualiza apenas o campo da data de sincronização
-    print(f"Sincronização de issues para {repo_obj.full_name} concluída. {processed_count} novas/atualizadas issues.")
+    print(f"Sincronização de issues para {repo_obj.full_name} concluída. {stats['inserted']} inseridas, "
+          f"{stats['updated']} atualizadas, {stats['skipped']} sem mudanças (ignoradas).")
+    record_sync_rows('issues', stats)
+    return stats
+
+
+def _identity_key(person_data):
+    """Chave (nome, e-mail em minúsculas) de uma identidade Git a partir de `commit['author']`/`commit['committer']`."""
+    return (
+        (person_data.get('name') or '')[:255],
+        (person_data.get('email') or '').strip().lower()[:255],
+    )
+
+
+def _bulk_resolve_identities(commits_data, user_ids):
+    """
+    Grava as identidades Git (nome/e-mail) ainda desconhecidas de uma página de commits e
+    associa ao GitUser as que aparecem em commits vinculados a uma conta da plataforma.
+    Quando uma identidade ganha um usuário, os commits antigos dela sem autor são corrigidos.
+    Retorna {(nome, e-mail): (id da Identity, id do GitUser ou None)}.
+    """
+    keys = set()
+    linked_users = {}
+    for commit_data in commits_data:
+        for role in ('author', 'committer'):
+            key = _identity_key(commit_data['commit'][role])
+            keys.add(key)
+            user_id = user_ids.get(_user_external_id(commit_data.get(role)))
+            if user_id:
+                linked_users[key] = user_id
+    if not keys:
+        return {}
+
+    def _load(emails):
+        return {
+            (identity.name, identity.email): identity
+            for identity in Identity.objects.filter(email__in=emails)
+        }
+
+    identities = _load({email for _, email in keys})
+    missing = keys - identities.keys()
+    if missing:
+        # ignore_conflicts: outro worker pode ter gravado a mesma identidade ao mesmo tempo
+        Identity.objects.bulk_create(
+            [Identity(name=name, email=email, user_id=linked_users.get((name, email))) for name, email in missing],
+            ignore_conflicts=True,
+        )
+        identities.update(_load({email for _, email in missing}))
+
+    newly_linked = []
+    for key, user_id in linked_users.items():
+        identity = identities.get(key)
+        if identity is not None and identity.user_id is None:
+            identity.user_id = user_id
+            newly_linked.append(identity)
+    if newly_linked:
+        Identity.objects.bulk_update(newly_linked, ['user'])
+        newly_linked_ids = [identity.id for identity in newly_linked]
+        now = timezone.now()
+        for role in ('author', 'committer'):
+            identity_user = Identity.objects.filter(id=OuterRef(f'{role}_identity_id')).values('user_id')[:1]
+            Commit.objects.filter(**{
+                f'{role}__isnull': True,
+                f'{role}_identity_id__in': newly_linked_ids,
+            }).update(**{f'{role}_id': Subquery(identity_user)}, synced_at=now)
+
+    return {
+        key: (identity.id, identity.user_id)
+        for key, identity in identities.items()
+        if key in keys
+    }
+
+
+def _normalize_commit_payload(commit_data):
+    """
+    Extrai apenas os campos persistidos de um commit, em formato estável para o hash.
+    As estatísticas (`stats`) ficam de fora: só vêm no detalhe do commit (gravadas por
+    `_bulk_write_commit_files`) e alternar listagem/detalhe mudaria o hash a cada vez.
+    """
+    commit_info = commit_data['commit']
+    verification = commit_info.get('verification') or {}
+    return {
+        'message': commit_info['message'],
+        'author': _user_external_id(commit_data.get('author')),
+        'committer': _user_external_id(commit_data.get('committer')),
+        'author_identity': list(_identity_key(commit_info['author'])),
+        'committer_identity': list(_identity_key(commit_info['committer'])),
+        'author_date': commit_info['author']['date'],
+        'committer_date': commit_info['committer']['date'],
+        'parents': [parent['sha'] for parent in commit_data['parents']],
+        'verification': [verification.get('verified'), verification.get('reason')],
+        'html_url': commit_data['html_url'],
+    }
+
+
+# Campos de Commit regravados quando o payload muda. As estatísticas (additions, deletions...)
+# só vêm no detalhe do commit e são gravadas por `_bulk_write_commit_files`.
+COMMIT_WRITE_FIELDS = [
+    'short_sha', 'message', 'author', 'committer', 'author_identity', 'committer_identity',
+    'author_date_git', 'committer_date_git', 'parents_shas', 'verification_status', 'verification_reason', 'web_url', 'payload_hash', 'synced_at',
+]
+
+
+def _bulk_write_commits(repo_obj: Repositorio, commits_data, stats):
+    """
+    Grava uma página de commits em lote, usando o hash do payload para ignorar os
+    commits que já estão gravados sem mudanças. Também vincula (em lote) os commits
+    gravados às issues referenciadas na mensagem. Atualiza os contadores em `stats`.
+    """
+    with stage_timer('commits', 'transform'):
+        payloads = {
+            commit_data['sha']: (commit_data, _payload_hash(_normalize_commit_payload(commit_data)))
+            for commit_data in commits_data
+        }
+    if not payloads:
+        return
+
+    existing = {
+        sha: (commit_id, payload_hash)
+        for sha, commit_id, payload_hash in Commit.objects.filter(
+            repository=repo_obj, sha__in=list(payloads)
+        ).values_list('sha', 'id', 'payload_hash')
+    }
+    changed = {
+        sha: payload
+        for sha, payload in payloads.items()
+        if sha not in existing or existing[sha][1] != payload[1]
+    }
+    stats['skipped'] += len(payloads) - len(changed)
+    # Commits sem mudança não são regravados, mas podem referenciar issues sincronizadas depois deles
+    unchanged_refs = {
+        existing[sha][0]: _referenced_issue_numbers(commit_data['commit']['message'])
+        for sha, (commit_data, _) in payloads.items()
+        if sha not in changed
+    }
+    # Fontes que já trazem a lista de arquivos (ex: detalhe do commit) gravam os CommitFile junto,
+    # mesmo sem mudança no hash (as estatísticas e os arquivos não entram nele)
+    details = [commit_data for commit_data, _ in payloads.values() if 'files' in commit_data]
+    if not changed:
+        _bulk_link_commit_issues(repo_obj, {}, unchanged_refs)
+        if details:
+            _bulk_write_commit_files(repo_obj, details)
+        return
+
+    users = []
+    for commit_data, _ in changed.values():
+        users.append(commit_data.get('author'))
+        users.append(commit_data.get('committer'))
+    user_ids = _bulk_upsert_git_users(users)
+    identities = _bulk_resolve_identities([commit_data for commit_data, _ in changed.values()], user_ids)
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    linked_issue_numbers = {}
+    for commit_sha, (commit_data, payload_hash) in changed.items():
+        commit_info = commit_data['commit']
+        verification = commit_info.get('verification')
+        author_identity = identities[_identity_key(commit_info['author'])]
+        committer_identity = identities[_identity_key(commit_info['committer'])]
+        commit = Commit(
+            repository=repo_obj,
+            sha=commit_sha,
+            short_sha=commit_sha[:7],
+            message=commit_info['message'],
+            # Sem conta vinculada no payload: usa o usuário já associado à identidade Git
+            author_id=user_ids.get(_user_external_id(commit_data.get('author'))) or author_identity[1],
+            committer_id=user_ids.get(_user_external_id(commit_data.get('committer'))) or committer_identity[1],
+            author_identity_id=author_identity[0],
+            committer_identity_id=committer_identity[0],
+            author_date_git=_parse_git_datetime(commit_info['author']['date']),
+            committer_date_git=_parse_git_datetime(commit_info['committer']['date']),
+            additions=commit_data['stats']['additions'] if 'stats' in commit_data else 0,
+            deletions=commit_data['stats']['deletions'] if 'stats' in commit_data else 0,
+            total_changes=commit_data['stats']['total'] if 'stats' in commit_data else 0,
+            parents_shas=[p['sha'] for p in commit_data['parents']],
+            verification_status=verification['verified'] if verification else 'unverified',
+            verification_reason=verification['reason'] if verification else '',
+            web_url=commit_data['html_url'],
+            payload_hash=payload_hash,
+            synced_at=now,
+        )
+        if commit_sha in existing:
+            commit.id = existing[commit_sha][0]
+            to_update.append(commit)
+        else:
+            to_create.append(commit)
+        # Lógica para vincular issues ao commit (parsing da mensagem)
+        linked_issue_numbers[commit_sha] = _referenced_issue_numbers(commit_info['message'])
+
+    Commit.objects.bulk_create(to_create)
+    Commit.objects.bulk_update(to_update, COMMIT_WRITE_FIELDS)
+    stats['inserted'] += len(to_create)
+    stats['updated'] += len(to_update)
+
+    # Arestas do grafo (os pais de um commit nunca mudam: só os commits novos precisam delas)
+    add_commit_edges(repo_obj, {commit.id: commit.parents_shas for commit in to_create})
+
+    if details:
+        _bulk_write_commit_files(repo_obj, details)
+
+    written = {commit.sha: commit.id for commit in to_create + to_update}
+    _bulk_link_commit_issues(
+        repo_obj,
+        {written[commit_sha]: numbers for commit_sha, numbers in linked_issue_numbers.items()},
+        unchanged_refs,
+    )
+
+
+def _referenced_issue_numbers(message):
+    return {int(num) for num in ISSUE_REF_PATTERN.findall(message or '')}
+
+
+def _bulk_link_commit_issues(repo_obj: Repositorio, rewritten, unchanged):
+    """
+    Grava os vínculos commit <-> issue a partir das referências na mensagem, com uma consulta
+    para todas as issues referenciadas na página. `rewritten` e `unchanged`: {id do commit:
+    números referenciados}. Os vínculos dos commits regravados são refeitos; nos commits sem
+    mudança só entram os que faltam (a issue pode ter sido sincronizada depois do commit).
+    """
+    CommitIssues = Commit.issues.through
+    if rewritten:
+        CommitIssues.objects.filter(commit_id__in=list(rewritten)).delete()
+    unchanged = {commit_id: numbers for commit_id, numbers in unchanged.items() if numbers}
+    all_numbers = set().union(*rewritten.values(), *unchanged.values())
+    if not all_numbers:
+        return
+
+    issue_ids_by_number = {}
+    for issue_id, number in Issue.objects.filter(
+        repository=repo_obj, number__in=all_numbers
+    ).values_list('id', 'number'):
+        issue_ids_by_number.setdefault(number, []).append(issue_id)
+    links = {
+        (commit_id, issue_id)
+        for commit_id, numbers in [*rewritten.items(), *unchanged.items()]
+        for number in numbers
+        for issue_id in issue_ids_by_number.get(number, [])
+    }
+    if unchanged and links:
+        links.difference_update(
+            CommitIssues.objects.filter(commit_id__in=list(unchanged)).values_list('commit_id', 'issue_id')
+        )
+    CommitIssues.objects.bulk_create(
+        [CommitIssues(commit_id=commit_id, issue_id=issue_id) for commit_id, issue_id in links],
+        ignore_conflicts=True,
+    )
 
 
 def sync_repository_commits(repo_obj: Repositorio, since_datetime=None, until_datetime=None):
@@ -163,78 +811,42 @@ def sync_repository_commits(repo_obj: Repositorio, since_datetime=None, until_da
     Baixa e grava commits de um repositório, com suporte a filtro e paginação.
     `since_datetime`: datetime object para buscar commits feitos a partir desta data.
     `until_datetime`: datetime object para buscar commits feitos até esta data.
+    Retorna os contadores da execução ({'inserted', 'updated', 'skipped'}).
     """
     print(f"Iniciando sincronização de commits para {repo_obj.full_name}...")
     page = 1
     has_more = True
-    processed_count = 0
+    stats = _new_write_stats()
     commits_shas_in_batch = set() # Para evitar duplicatas na mesma execução
 
     while has_more:
         try:
             # Converte datetime para string ISO 8601 exigida pela API
-            since_str = since_datetime.isoformat() + 'Z' if since_datetime else None
-            until_str = until_datetime.isoformat() + 'Z' if until_datetime else None
-
-            commits_data = github_api.fetch_repo_commits(
-                repo_obj.owner, repo_obj.name,
-                since=since_str, # Passa o filtro 'since'
-                until=until_str, # Passa o filtro 'until'
-                page=page
-            )
+            since_str = _format_since(since_datetime)
+            until_str = _format_since(until_datetime)
+
+            with stage_timer('commits', 'fetch'):
+                commits_data = github_api.fetch_repo_commits(
+                    repo_obj.owner, repo_obj.name,
+                    since=since_str, # Passa o filtro 'since'
+                    until=until_str, # Passa o filtro 'until'
+                    page=page
+                )
 
             if not commits_data:
                 has_more = False
                 break
 
-            with transaction.atomic():
-                for commit_data in commits_data:
-                    commit_sha = commit_data['sha']
-                    if commit_sha in commits_shas_in_batch:
-                        continue
-                    commits_shas_in_batch.add(commit_sha)
-
-                    author_obj = _get_or_create_git_user(commit_data['author'])
-                    committer_obj = _get_or_create_git_user(commit_data['committer'])
-
-                    commit, created = Commit.objects.update_or_create(
-                        repository=repo_obj,
-                        sha=commit_sha,
-                        defaults={
-                            'short_sha': commit_sha[:7],
-                            'message': commit_data['commit']['message'],
-                            'author': author_obj,
-                            'committer': committer_obj,
-                            'author_date_git': datetime.fromisoformat(commit_data['commit']['author']['date'].replace('Z', '+00:00')),
-                            'committer_date_git': datetime.fromisoformat(commit_data['commit']['committer']['date'].replace('Z', '+00:00')),
-                            'additions': commit_data['stats']['additions'] if 'stats' in commit_data else 0,
-                            'deletions': commit_data['stats']['deletions'] if 'stats' in commit_data else 0,
-                            'total_changes': commit_data['stats']['total'] if 'stats' in commit_data else 0,
-                            'parents_shas': [p['sha'] for p in commit_data['parents']],
-                            'verification_status': commit_data['commit']['verification']['verified'] if 'verification' in commit_data['commit'] else 'unverified',
-                            'verification_reason': commit_data['commit']['verification']['reason'] if 'verification' in commit_data['commit'] else '',
-                            'web_url': commit_data['html_url'],
-                            'synced_at': timezone.now(),
-                        }
-                    )
-
-                    # Lógica para vincular issues ao commit (parsing da mensagem)
-                    linked_issue_numbers = []
-                    if 'commit' in commit_data and 'message' in commit_data['commit']:
-                        linked_issue_numbers = [int(num) for num in ISSUE_REF_PATTERN.findall(commit_data['commit']['message'])]
-                    
-                    if linked_issue_numbers:
-                        issues_to_link = Issue.objects.filter(
-                            repository=repo_obj,
-                            number__in=linked_issue_numbers
-                        )
-                        commit.issues.set(issues_to_link)
-
-                    if created:
-                        processed_count += 1
-                        # print(f"  Commit {commit.short_sha} criado.")
-                    # else:
-                        # print(f"  Commit {commit.short_sha} atualizado.")
+            page_commits_data = []
+            for commit_data in commits_data:
+                commit_sha = commit_data['sha']
+                if commit_sha in commits_shas_in_batch:
+                    continue
+                commits_shas_in_batch.add(commit_sha)
+                page_commits_data.append(commit_data)
+
+            with track_page_write('commits'), transaction.atomic():
+                _bulk_write_commits(repo_obj, page_commits_data, stats)
 
             if len(commits_data) < github_api.PER_PAGE_DEFAULT:
                 has_more = False
@@ -251,9 +863,686 @@ def sync_repository_commits(repo_obj: Repositorio, since_datetime=None, until_da
             print(f"Erro inesperado ao processar commits para {repo_obj.full_name} (página {page}): {e}")
             has_more = False
 
+    # Arestas cujo pai chegou nesta execução e gerações dos commits novos
+    update_commit_graph(repo_obj)
+    # PRs mergeados cujo commit de merge acabou de chegar passam a apontar para ele
+    link_merged_pull_requests(repo_obj)
+
     repo_obj.last_sync_commits_at = timezone.now()
     repo_obj.save(update_fields=['last_sync_commits_at'])
-    print(f"Sincronização de commits para {repo_obj.full_name} concluída. {processed_count} novas/atualizadas commits.")
+    print(f"Sincronização de commits para {repo_obj.full_name} concluída. {stats['inserted']} inseridos, "
+          f"{stats['updated']} atualizados, {stats['skipped']} sem mudanças (ignorados).")
+    record_sync_rows('commits', stats)
+    return stats
+
+
+BRANCH_MEMBERSHIP_BATCH_SIZE = 5000
+
+
+def _walk_branch_commits(repo_obj: Repositorio, branch: Branch, stats, seen_shas):
+    """
+    Baixa os commits de uma branch a partir do seu head, do mais novo para o mais antigo,
+    parando na página em que aparece o primeiro commit já conhecido (gravado antes ou por
+    outra branch nesta mesma execução), desde que todos os pais dos commits novos já
+    tenham sido vistos ou estejam no banco: commits de um ramo mergeado podem ser mais
+    antigos que o primeiro commit conhecido e só aparecem nas páginas seguintes.
+    Retorna True se a caminhada terminou sem erros.
+    """
+    page = 1
+    open_parents = set() # Pais de commits novos ainda não vistos nem gravados
+    while True:
+        try:
+            with stage_timer('branches', 'fetch'):
+                commits_data = github_api.fetch_repo_commits(
+                    repo_obj.owner, repo_obj.name,
+                    sha=branch.head_sha,
+                    page=page
+                )
+            if not commits_data:
+                return True
+
+            page_shas = [commit_data['sha'] for commit_data in commits_data]
+            known_shas = seen_shas.intersection(page_shas)
+            known_shas.update(
+                Commit.objects.filter(repository=repo_obj, sha__in=page_shas).values_list('sha', flat=True)
+            )
+            new_commits_data = [commit_data for commit_data in commits_data if commit_data['sha'] not in known_shas]
+            seen_shas.update(page_shas)
+
+            with track_page_write('branches'), transaction.atomic():
+                _bulk_write_commits(repo_obj, new_commits_data, stats)
+
+            open_parents.update(parent['sha'] for commit_data in new_commits_data for parent in commit_data['parents'])
+            open_parents.difference_update(seen_shas)
+            if open_parents:
+                open_parents.difference_update(
+                    Commit.objects.filter(repository=repo_obj, sha__in=open_parents).values_list('sha', flat=True)
+                )
+
+            # Daqui para trás o histórico já está no banco
+            if (known_shas and not open_parents) or len(commits_data) < github_api.PER_PAGE_DEFAULT:
+                return True
+            page += 1
+
+        except github_api.GitHubAPIError as e:
+            print(f"Erro da API do GitHub ao sincronizar a branch {branch.name} de {repo_obj.full_name} (página {page}): {e}")
+            return False
+        except requests.exceptions.RequestException as e:
+            print(f"Erro de conexão ao sincronizar a branch {branch.name} de {repo_obj.full_name} (página {page}): {e}")
+            return False
+        except Exception as e:
+            print(f"Erro inesperado ao processar a branch {branch.name} de {repo_obj.full_name} (página {page}): {e}")
+            return False
+
+
+def _update_branch_membership(repo_obj: Repositorio, branch: Branch):
+    """
+    Atualiza a tabela BranchCommit de uma branch que se moveu, usando o grafo de commits:
+    em um avanço normal só entram os commits entre o head anterior e o novo; em um
+    force-push (head anterior não é ancestral do novo) a associação é refeita.
+    """
+    if branch.synced_head_sha and is_ancestor(repo_obj, branch.synced_head_sha, branch.head_sha):
+        commit_ids = commits_between(repo_obj, branch.synced_head_sha, branch.head_sha)
+    else:
+        BranchCommit.objects.filter(branch=branch).delete()
+        commit_ids = ancestors_of(repo_obj, branch.head_sha)
+
+    batch = []
+    for commit_id in commit_ids.order_by().values_list('id', flat=True).iterator(chunk_size=BRANCH_MEMBERSHIP_BATCH_SIZE):
+        batch.append(BranchCommit(branch=branch, commit_id=commit_id))
+        if len(batch) >= BRANCH_MEMBERSHIP_BATCH_SIZE:
+            BranchCommit.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    BranchCommit.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def sync_repository_branches(repo_obj: Repositorio):
+    """
+    Sincroniza as branches do repositório: lista as branches, guarda o head de cada uma
+    e só percorre as que se moveram desde a última sincronização. Os commits são
+    deduplicados por (repositório, sha) entre as branches, e cada caminhada para no
+    primeiro commit já conhecido. Retorna os contadores de commits da execução.
+    """
+    print(f"Iniciando sincronização de branches para {repo_obj.full_name}...")
+    branches_data = []
+    page = 1
+    while True:
+        with stage_timer('branches', 'fetch'):
+            page_data = github_api.fetch_repo_branches(repo_obj.owner, repo_obj.name, page=page)
+        branches_data.extend(page_data)
+        if len(page_data) < github_api.PER_PAGE_DEFAULT:
+            break
+        page += 1
+
+    # Upsert das branches (o head vem na própria listagem) e remoção das que sumiram
+    existing = {branch.name: branch for branch in Branch.objects.filter(repository=repo_obj)}
+    to_create = []
+    to_update = []
+    for branch_data in branches_data:
+        branch = existing.get(branch_data['name'])
+        head_sha = branch_data['commit']['sha']
+        protected = branch_data.get('protected', False)
+        if branch is None:
+            to_create.append(Branch(repository=repo_obj, name=branch_data['name'], head_sha=head_sha, protected=protected))
+        elif branch.head_sha != head_sha or branch.protected != protected:
+            branch.head_sha = head_sha
+            branch.protected = protected
+            to_update.append(branch)
+    Branch.objects.bulk_create(to_create)
+    Branch.objects.bulk_update(to_update, ['head_sha', 'protected'])
+    Branch.objects.filter(repository=repo_obj).exclude(
+        name__in=[branch_data['name'] for branch_data in branches_data]
+    ).delete()
+
+    moved = [
+        branch for branch in Branch.objects.filter(repository=repo_obj)
+        if branch.has_moved
+    ]
+    stats = _new_write_stats()
+    seen_shas = set()
+    walked = [branch for branch in moved if _walk_branch_commits(repo_obj, branch, stats, seen_shas)]
+
+    # Grafo primeiro: a associação branch <-> commit é calculada a partir dele
+    update_commit_graph(repo_obj)
+    link_merged_pull_requests(repo_obj)
+
+    now = timezone.now()
+    for branch in walked:
+        try:
+            with transaction.atomic():
+                _update_branch_membership(repo_obj, branch)
+                branch.synced_head_sha = branch.head_sha
+                branch.synced_at = now
+                branch.save(update_fields=['synced_head_sha', 'synced_at'])
+        except Commit.DoesNotExist as e:
+            print(f"Não foi possível atualizar a branch {branch.name} de {repo_obj.full_name}: {e}")
+
+    print(f"Sincronização de branches para {repo_obj.full_name} concluída. {len(branches_data)} branches, "
+          f"{len(moved)} com head novo, {stats['inserted']} commits inseridos.")
+    record_sync_rows('branches', stats)
+    return stats
+
+COMMIT_FILES_BATCH_SIZE = 100
+
+
+def _bulk_intern_file_paths(repo_obj: Repositorio, paths):
+    """Grava os caminhos ainda desconhecidos do repositório e retorna {caminho: id do FilePath}."""
+    paths = set(paths)
+    if not paths:
+        return {}
+    path_ids = dict(FilePath.objects.filter(repository=repo_obj, path__in=paths).values_list('path', 'id'))
+    missing = paths - path_ids.keys()
+    if missing:
+        # ignore_conflicts: outro worker pode ter gravado o mesmo caminho ao mesmo tempo
+        FilePath.objects.bulk_create([FilePath(repository=repo_obj, path=path) for path in missing], ignore_conflicts=True)
+        path_ids.update(FilePath.objects.filter(repository=repo_obj, path__in=missing).values_list('path', 'id'))
+    return path_ids
+
+
+def _bulk_write_commit_files(repo_obj: Repositorio, details):
+    """
+    Grava em lote os arquivos alterados (CommitFile) e as estatísticas de uma lista de
+    detalhes de commits (payload de /commits/{sha}). Retorna o número de arquivos gravados.
+    """
+    commits = {
+        commit.sha: commit
+        for commit in Commit.objects.filter(
+            repository=repo_obj, sha__in=[detail['sha'] for detail in details]
+        ).only('id', 'sha', 'committer_date_git')
+    }
+    paths = set()
+    for detail in details:
+        for file_data in detail.get('files') or []:
+            paths.add(file_data['filename'])
+            if file_data.get('previous_filename'):
+                paths.add(file_data['previous_filename'])
+    path_ids = _bulk_intern_file_paths(repo_obj, paths)
+
+    now = timezone.now()
+    files = []
+    for detail in details:
+        commit = commits.get(detail['sha'])
+        if commit is None:
+            continue
+        stats_data = detail.get('stats') or {}
+        commit.additions = stats_data.get('additions', 0)
+        commit.deletions = stats_data.get('deletions', 0)
+        commit.total_changes = stats_data.get('total', 0)
+        commit.files_synced_at = now
+        commit.synced_at = now
+        for file_data in detail.get('files') or []:
+            files.append(CommitFile(
+                commit_id=commit.id,
+                path_id=path_ids[file_data['filename']],
+                previous_path_id=path_ids.get(file_data.get('previous_filename')),
+                status=file_data['status'],
+                additions=file_data.get('additions', 0),
+                deletions=file_data.get('deletions', 0),
+                repository_id=repo_obj.id,
+                committed_at=commit.committer_date_git,
+            ))
+
+    CommitFile.objects.filter(commit_id__in=[commit.id for commit in commits.values()]).delete()
+    # ignore_conflicts: o mesmo caminho pode aparecer duas vezes (ex: removido e recriado em um rename)
+    CommitFile.objects.bulk_create(files, ignore_conflicts=True)
+    Commit.objects.bulk_update(list(commits.values()), ['additions', 'deletions', 'total_changes', 'files_synced_at', 'synced_at'])
+    return len(files)
+
+
+def _fetch_commit_detail_with_files(repo_obj: Repositorio, sha):
+    """Busca o detalhe de um commit, juntando todas as páginas da lista de arquivos."""
+    detail = github_api.fetch_commit_detail(repo_obj.owner, repo_obj.name, sha)
+    page = 1
+    files_page = detail.get('files') or []
+    while len(files_page) == github_api.PER_PAGE_DEFAULT:
+        page += 1
+        files_page = github_api.fetch_commit_detail(repo_obj.owner, repo_obj.name, sha, page=page).get('files') or []
+        detail['files'].extend(files_page)
+    return detail
+
+
+def sync_commit_files(repo_obj: Repositorio, limit=500, max_workers=4):
+    """
+    Busca (em paralelo) o detalhe dos commits mais recentes que ainda não têm os arquivos
+    alterados e grava os CommitFile em lote. A listagem de commits não traz os arquivos,
+    então é uma requisição por commit: `limit` controla quantos são processados por execução.
+    Retorna uma tupla (commits processados, arquivos gravados).
+    """
+    shas = list(
+        Commit.objects
+        .filter(repository=repo_obj, files_synced_at__isnull=True)
+        .order_by('-committer_date_git')
+        .values_list('sha', flat=True)[:limit]
+    )
+    print(f"Iniciando sincronização de arquivos de {len(shas)} commits para {repo_obj.full_name}...")
+
+    def _fetch(sha):
+        try:
+            return _fetch_commit_detail_with_files(repo_obj, sha)
+        except (github_api.GitHubAPIError, requests.exceptions.RequestException) as e:
+            print(f"Erro ao buscar o detalhe do commit {sha[:7]} de {repo_obj.full_name}: {e}")
+            return None
+
+    processed = 0
+    written = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for i in range(0, len(shas), COMMIT_FILES_BATCH_SIZE):
+            details = [
+                detail for detail in executor.map(_fetch, shas[i:i + COMMIT_FILES_BATCH_SIZE])
+                if detail is not None
+            ]
+            with transaction.atomic():
+                written += _bulk_write_commit_files(repo_obj, details)
+            processed += len(details)
+
+    print(f"Sincronização de arquivos para {repo_obj.full_name} concluída. "
+          f"{processed} commits, {written} arquivos alterados.")
+    return processed, written
+
+def _normalize_pull_request_payload(pull_data):
+    """Extrai apenas os campos persistidos de um pull request, em formato estável para o hash."""
+    return {
+        'number': pull_data['number'],
+        'title': pull_data['title'],
+        'body': pull_data.get('body'),
+        'state': pull_data['state'],
+        'draft': pull_data.get('draft', False),
+        'user': _user_external_id(pull_data.get('user')),
+        'requested_reviewers': sorted(_user_external_id(user) for user in pull_data.get('requested_reviewers') or []),
+        'base': [pull_data['base']['ref'], pull_data['base'].get('sha')],
+        'head': [pull_data['head']['ref'], pull_data['head'].get('sha')],
+        'merge_commit_sha': pull_data.get('merge_commit_sha'),
+        'created_at': pull_data['created_at'],
+        'updated_at': pull_data['updated_at'],
+        'closed_at': pull_data.get('closed_at'),
+        'merged_at': pull_data.get('merged_at'),
+        'html_url': pull_data.get('html_url'),
+    }
+
+
+# Campos de PullRequest regravados quando o payload muda
+PULL_REQUEST_WRITE_FIELDS = [
+    'number', 'title', 'body', 'state', 'draft', 'author', 'base_ref', 'base_sha', 'head_ref',
+    'head_sha', 'merge_commit_sha', 'created_at_git', 'updated_at_git', 'closed_at_git',
+    'merged_at', 'web_url', 'payload_hash', 'synced_at',
+]
+
+
+def _bulk_write_pull_requests(repo_obj: Repositorio, pulls_data, stats):
+    """
+    Grava uma página de pull requests em lote, ignorando (pelo hash do payload)
+    os que não mudaram desde a última sincronização. Atualiza os contadores em `stats`.
+    """
+    payloads = {
+        str(pull_data['id']): (pull_data, _payload_hash(_normalize_pull_request_payload(pull_data)))
+        for pull_data in pulls_data
+    }
+    if not payloads:
+        return
+
+    existing = {
+        external_id: (pull_id, payload_hash)
+        for external_id, pull_id, payload_hash in PullRequest.objects.filter(
+            repository=repo_obj, external_id__in=list(payloads)
+        ).values_list('external_id', 'id', 'payload_hash')
+    }
+    changed = {
+        external_id: payload
+        for external_id, payload in payloads.items()
+        if external_id not in existing or existing[external_id][1] != payload[1]
+    }
+    stats['skipped'] += len(payloads) - len(changed)
+    if not changed:
+        return
+
+    users = []
+    for pull_data, _ in changed.values():
+        users.append(pull_data.get('user'))
+        users.extend(pull_data.get('requested_reviewers') or [])
+    user_ids = _bulk_upsert_git_users(users)
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    reviewer_ids = {}
+    for external_id, (pull_data, payload_hash) in changed.items():
+        pull = PullRequest(
+            repository=repo_obj,
+            external_id=external_id,
+            number=pull_data['number'],
+            title=pull_data['title'],
+            body=pull_data.get('body'),
+            state=pull_data['state'],
+            draft=pull_data.get('draft', False),
+            author_id=user_ids.get(_user_external_id(pull_data.get('user'))),
+            base_ref=pull_data['base']['ref'],
+            base_sha=pull_data['base'].get('sha'),
+            head_ref=pull_data['head']['ref'],
+            head_sha=pull_data['head'].get('sha'),
+            merge_commit_sha=pull_data.get('merge_commit_sha'),
+            created_at_git=_parse_git_datetime(pull_data['created_at']),
+            updated_at_git=_parse_git_datetime(pull_data['updated_at']),
+            closed_at_git=_parse_git_datetime(pull_data.get('closed_at')),
+            merged_at=_parse_git_datetime(pull_data.get('merged_at')),
+            web_url=pull_data.get('html_url'),
+            payload_hash=payload_hash,
+            synced_at=now,
+        )
+        if external_id in existing:
+            pull.id = existing[external_id][0]
+            to_update.append(pull)
+        else:
+            to_create.append(pull)
+        reviewer_ids[external_id] = {
+            user_ids[_user_external_id(user)]
+            for user in pull_data.get('requested_reviewers') or []
+            if _user_external_id(user) in user_ids
+        }
+
+    PullRequest.objects.bulk_create(to_create)
+    PullRequest.objects.bulk_update(to_update, PULL_REQUEST_WRITE_FIELDS)
+    stats['inserted'] += len(to_create)
+    stats['updated'] += len(to_update)
+
+    written = {pull.external_id: pull.id for pull in to_create + to_update}
+    Reviewers = PullRequest.requested_reviewers.through
+    Reviewers.objects.filter(pullrequest_id__in=list(written.values())).delete()
+    Reviewers.objects.bulk_create([
+        Reviewers(pullrequest_id=written[external_id], gituser_id=user_id)
+        for external_id, user_id_set in reviewer_ids.items()
+        for user_id in user_id_set
+    ])
+
+
+def link_merged_pull_requests(repo_obj: Repositorio):
+    """
+    Vincula, em um único UPDATE, os pull requests mergeados do repositório aos
+    commits de merge já sincronizados (casando `merge_commit_sha` com `Commit.sha`).
+    Retorna o número de pull requests vinculados.
+    """
+    merge_commit_id = Commit.objects.filter(
+        repository_id=OuterRef('repository_id'),
+        sha=OuterRef('merge_commit_sha'),
+    ).values('id')[:1]
+    return (
+        PullRequest.objects
+        .filter(repository=repo_obj, merged_at__isnull=False, merge_commit__isnull=True,
+                merge_commit_sha__in=Commit.objects.filter(repository=repo_obj).values('sha'))
+        .update(merge_commit_id=Subquery(merge_commit_id))
+    )
+
+
+def sync_repository_pull_requests(repo_obj: Repositorio, since_datetime=None):
+    """
+    Baixa e grava os pull requests de um repositório de forma incremental.
+    Os PRs são paginados do mais recentemente atualizado para o mais antigo, e a
+    paginação para assim que aparece um PR atualizado antes de `since_datetime`
+    (normalmente `last_sync_pulls_at`). Ao final, vincula os PRs mergeados aos commits.
+    Retorna os contadores da execução ({'inserted', 'updated', 'skipped'}).
+    """
+    print(f"Iniciando sincronização de pull requests para {repo_obj.full_name}...")
+    started_at = timezone.now() # Marca d'água: PRs atualizados durante a execução entram na próxima
+    page = 1
+    has_more = True
+    completed = False
+    stats = _new_write_stats()
+    pulls_ids_in_batch = set() # Para evitar duplicatas na mesma execução
+
+    while has_more:
+        try:
+            with stage_timer('pulls', 'fetch'):
+                pulls_data = github_api.fetch_repo_pulls(repo_obj.owner, repo_obj.name, page=page)
+
+            if not pulls_data:
+                completed = True
+                break
+
+            page_pulls_data = []
+            for pull_data in pulls_data:
+                if since_datetime and _parse_git_datetime(pull_data['updated_at']) < since_datetime:
+                    # Ordenado por atualização decrescente: o restante já foi sincronizado antes
+                    has_more = False
+                    break
+                if pull_data['id'] in pulls_ids_in_batch:
+                    continue
+                pulls_ids_in_batch.add(pull_data['id'])
+                page_pulls_data.append(pull_data)
+
+            with track_page_write('pulls'), transaction.atomic():
+                _bulk_write_pull_requests(repo_obj, page_pulls_data, stats)
+
+            if len(pulls_data) < github_api.PER_PAGE_DEFAULT:
+                has_more = False
+            completed = not has_more
+
+            page += 1
+
+        except github_api.GitHubAPIError as e:
+            print(f"Erro da API do GitHub ao sincronizar pull requests para {repo_obj.full_name} (página {page}): {e}")
+            has_more = False
+        except requests.exceptions.RequestException as e:
+            print(f"Erro de conexão ao sincronizar pull requests para {repo_obj.full_name} (página {page}): {e}")
+            has_more = False
+        except Exception as e:
+            print(f"Erro inesperado ao processar pull requests para {repo_obj.full_name} (página {page}): {e}")
+            has_more = False
+
+    linked = link_merged_pull_requests(repo_obj)
+
+    # Só avança a marca d'água se a paginação terminou sem erros
+    if completed:
+        repo_obj.last_sync_pulls_at = started_at
+        repo_obj.save(update_fields=['last_sync_pulls_at'])
+    print(f"Sincronização de pull requests para {repo_obj.full_name} concluída. {stats['inserted']} inseridos, "
+          f"{stats['updated']} atualizados, {stats['skipped']} sem mudanças (ignorados), {linked} vinculados a commits.")
+    record_sync_rows('pulls', stats)
+    return stats
+
+
+
+def _issue_number_from_url(issue_url):
+    """Extrai o número da issue da `issue_url` do comentário (ex: .../issues/123 -> 123)."""
+    return int(issue_url.rstrip('/').rsplit('/', 1)[1])
+
+
+def _normalize_issue_comment_payload(comment_data):
+    """Extrai apenas os campos persistidos de um comentário, em formato estável para o hash."""
+    return {
+        'issue_url': comment_data['issue_url'],
+        'user': _user_external_id(comment_data.get('user')),
+        'author_association': comment_data.get('author_association'),
+        'body': comment_data.get('body'),
+        'created_at': comment_data['created_at'],
+        'updated_at': comment_data['updated_at'],
+        'html_url': comment_data.get('html_url'),
+    }
+
+
+# Campos de IssueComment regravados quando o payload muda
+ISSUE_COMMENT_WRITE_FIELDS = [
+    'issue', 'issue_number', 'author', 'author_association', 'body', 'created_at_git',
+    'updated_at_git', 'web_url', 'payload_hash', 'synced_at',
+]
+
+
+def _bulk_write_issue_comments(repo_obj: Repositorio, comments_data, stats):
+    """
+    Grava uma página de comentários em lote, ignorando (pelo hash do payload) os que
+    não mudaram. Atualiza os contadores em `stats` e retorna os IDs das issues afetadas.
+    """
+    payloads = {
+        str(comment_data['id']): (comment_data, _payload_hash(_normalize_issue_comment_payload(comment_data)))
+        for comment_data in comments_data
+    }
+    if not payloads:
+        return set()
+
+    existing = {
+        external_id: (comment_id, payload_hash)
+        for external_id, comment_id, payload_hash in IssueComment.objects.filter(
+            repository=repo_obj, external_id__in=list(payloads)
+        ).values_list('external_id', 'id', 'payload_hash')
+    }
+    changed = {
+        external_id: payload
+        for external_id, payload in payloads.items()
+        if external_id not in existing or existing[external_id][1] != payload[1]
+    }
+    stats['skipped'] += len(payloads) - len(changed)
+    if not changed:
+        return set()
+
+    user_ids = _bulk_upsert_git_users(comment_data.get('user') for comment_data, _ in changed.values())
+    issue_numbers = {_issue_number_from_url(comment_data['issue_url']) for comment_data, _ in changed.values()}
+    issue_ids = dict(
+        Issue.objects.filter(repository=repo_obj, number__in=issue_numbers).values_list('number', 'id')
+    )
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    for external_id, (comment_data, payload_hash) in changed.items():
+        issue_number = _issue_number_from_url(comment_data['issue_url'])
+        comment = IssueComment(
+            repository=repo_obj,
+            external_id=external_id,
+            issue_id=issue_ids.get(issue_number),
+            issue_number=issue_number,
+            author_id=user_ids.get(_user_external_id(comment_data.get('user'))),
+            author_association=comment_data.get('author_association'),
+            body=comment_data.get('body'),
+            created_at_git=_parse_git_datetime(comment_data['created_at']),
+            updated_at_git=_parse_git_datetime(comment_data['updated_at']),
+            web_url=comment_data.get('html_url'),
+            payload_hash=payload_hash,
+            synced_at=now,
+        )
+        if external_id in existing:
+            comment.id = existing[external_id][0]
+            to_update.append(comment)
+        else:
+            to_create.append(comment)
+
+    IssueComment.objects.bulk_create(to_create)
+    IssueComment.objects.bulk_update(to_update, ISSUE_COMMENT_WRITE_FIELDS)
+    stats['inserted'] += len(to_create)
+    stats['updated'] += len(to_update)
+    return {comment.issue_id for comment in to_create + to_update if comment.issue_id}
+
+
+def update_issues_first_response(issue_ids, batch_size=1000):
+    """
+    Recalcula `Issue.first_response_at` (primeiro comentário de alguém que não o autor
+    da issue nem um bot) para as issues informadas, com um UPDATE por lote.
+    """
+    issue_ids = list(issue_ids)
+    first_response = (
+        IssueComment.objects
+        .filter(issue_id=OuterRef('pk'))
+        # Coalesce: em issues sem autor conhecido, `author_id = NULL` descartaria todos os comentários
+        .exclude(author_id=Coalesce(OuterRef('author_id'), Value(0)))
+        .exclude(author__user_type='Bot')
+        .values('issue_id')
+        .annotate(first=Min('created_at_git'))
+        .values('first')
+    )
+    updated = 0
+    now = timezone.now()
+    for i in range(0, len(issue_ids), batch_size):
+        updated += Issue.objects.filter(id__in=issue_ids[i:i + batch_size]).update(
+            first_response_at=Subquery(first_response), synced_at=now,
+        )
+    return updated
+
+
+def link_issue_comments(repo_obj: Repositorio):
+    """
+    Vincula às issues os comentários que chegaram antes da própria issue ser sincronizada
+    e recalcula a primeira resposta dessas issues. Retorna o número de issues afetadas.
+    """
+    pending_numbers = (
+        IssueComment.objects
+        .filter(repository=repo_obj, issue__isnull=True)
+        .values('issue_number')
+    )
+    issue_ids = list(
+        Issue.objects.filter(repository=repo_obj, number__in=pending_numbers).values_list('id', flat=True)
+    )
+    if not issue_ids:
+        return 0
+
+    issue_id = Issue.objects.filter(
+        repository_id=OuterRef('repository_id'),
+        number=OuterRef('issue_number'),
+    ).values('id')[:1]
+    # Só os comentários cuja issue já existe: os de PRs (que não viram Issue) ficam pendentes sem ser regravados
+    IssueComment.objects.filter(
+        repository=repo_obj, issue__isnull=True,
+        issue_number__in=Issue.objects.filter(id__in=issue_ids).values('number'),
+    ).update(issue_id=Subquery(issue_id))
+    update_issues_first_response(issue_ids)
+    return len(issue_ids)
+
+
+def sync_repository_issue_comments(repo_obj: Repositorio, since_datetime=None):
+    """
+    Baixa e grava os comentários das issues de um repositório pelo endpoint agregado
+    (/repos/{owner}/{repo}/issues/comments), de forma incremental a partir de `since_datetime`
+    (normalmente `last_sync_comments_at`). Ao final, recalcula a primeira resposta das issues afetadas.
+    Retorna os contadores da execução ({'inserted', 'updated', 'skipped'}).
+    """
+    print(f"Iniciando sincronização de comentários para {repo_obj.full_name}...")
+    started_at = timezone.now() # Marca d'água: comentários editados durante a execução entram na próxima
+    page = 1
+    has_more = True
+    completed = False
+    stats = _new_write_stats()
+    touched_issue_ids = set()
+    since_str = _format_since(since_datetime)
+
+    while has_more:
+        try:
+            with stage_timer('comments', 'fetch'):
+                comments_data = github_api.fetch_repo_issue_comments(
+                    repo_obj.owner, repo_obj.name,
+                    since=since_str,
+                    page=page
+                )
+
+            if not comments_data:
+                completed = True
+                break
+
+            with track_page_write('comments'), transaction.atomic():
+                touched_issue_ids |= _bulk_write_issue_comments(repo_obj, comments_data, stats)
+
+            if len(comments_data) < github_api.PER_PAGE_DEFAULT:
+                has_more = False
+                completed = True
+
+            page += 1
+
+        except github_api.GitHubAPIError as e:
+            print(f"Erro da API do GitHub ao sincronizar comentários para {repo_obj.full_name} (página {page}): {e}")
+            has_more = False
+        except requests.exceptions.RequestException as e:
+            print(f"Erro de conexão ao sincronizar comentários para {repo_obj.full_name} (página {page}): {e}")
+            has_more = False
+        except Exception as e:
+            print(f"Erro inesperado ao processar comentários para {repo_obj.full_name} (página {page}): {e}")
+            has_more = False
+
+    update_issues_first_response(touched_issue_ids)
+
+    # Só avança a marca d'água se a paginação terminou sem erros
+    if completed:
+        repo_obj.last_sync_comments_at = started_at
+        repo_obj.save(update_fields=['last_sync_comments_at'])
+    print(f"Sincronização de comentários para {repo_obj.full_name} concluída. {stats['inserted']} inseridos, "
+          f"{stats['updated']} atualizados, {stats['skipped']} sem mudanças (ignorados), "
+          f"primeira resposta recalculada em {len(touched_issue_ids)} issues.")
+    record_sync_rows('comments', stats)
+    return stats
 
 # def sync_repository_commits(repo_obj: Repositorio, since_datetime=None, until_datetime=None):
 #     """
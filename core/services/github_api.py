@@ -1,20 +1,38 @@
-import requests
+import hashlib
+import json
 import os
 import time
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+
+from core.services import metrics
+from core.services.github_payloads import decode_json, slim_commit, slim_issue
+from core.services.github_transport import get_transport
 
 # Constantes para a API do GitHub
-GITHUB_API_BASE_URL = "https://api.github.com"
+GITHUB_API_BASE_URL = os.getenv("GITHUB_API_BASE_URL", "https://api.github.com") # Sobrescrito pelo benchmark (servidor falso local)
 GITHUB_API_TOKEN = os.getenv("GITHUB_TOKEN") # Obtenha do .env
 PER_PAGE_DEFAULT = 100
+# Por quanto tempo (segundos) o ETag e o corpo de uma resposta ficam guardados para requisições condicionais
+ETAG_CACHE_TIMEOUT = 7 * 24 * 60 * 60
 
 class GitHubAPIError(Exception):
     """Exceção customizada para erros da API do GitHub."""
     pass
 
-def _make_github_request(url, params=None, headers=None, page=1, per_page=100):
+def _etag_cache_key(url, params):
+    digest = hashlib.blake2b(json.dumps([url, sorted(params.items())], default=str).encode('utf-8'), digest_size=16)
+    return f"github-etag:{digest.hexdigest()}"
+
+def _send_github_request(url, params=None, headers=None, page=1, per_page=100, conditional=False):
     """
     Função auxiliar genérica para fazer requisições à API do GitHub.
     Lida com autenticação, paginação e tratamento básico de erros/rate limits.
+    Retorna o objeto `Response` completo (útil quando os cabeçalhos, como `Link`, são necessários).
+    `conditional`: envia o ETag da última resposta (If-None-Match); um 304 não conta no
+    rate limit e a resposta devolvida traz o corpo guardado no cache. Ignorado nos
+    transportes de gravação e replay.
     """
     if headers is None:
         headers = {}
@@ -27,10 +45,21 @@ def _make_github_request(url, params=None, headers=None, page=1, per_page=100):
     params['page'] = page
     params['per_page'] = per_page
 
-    response = requests.get(url, headers=headers, params=params)
+    transport = get_transport() # Rede real, gravação ou replay (ver github_transport)
+    conditional = conditional and transport.conditional_requests
+    cached = None
+    if conditional:
+        etag_key = _etag_cache_key(url, params)
+        cached = cache.get(etag_key)
+        if cached:
+            headers['If-None-Match'] = cached['etag']
+
+    started = time.perf_counter()
+    response = transport.send('GET', url, headers=headers, params=params)
+    metrics.observe_github_response('GET', url, response, time.perf_counter() - started, token=GITHUB_API_TOKEN)
 
-    # Lidar com Rate Limits (GitHub envia cabeçalhos X-RateLimit-*)
-    if 'X-RateLimit-Remaining' in response.headers and int(response.headers['X-RateLimit-Remaining']) < 50:
+    # Lidar com Rate Limits (GitHub envia cabeçalhos X-RateLimit-*); no replay não há espera
+    if not transport.replaying and 'X-RateLimit-Remaining' in response.headers and int(response.headers['X-RateLimit-Remaining']) < 50:
         reset_time = int(response.headers['X-RateLimit-Reset'])
         sleep_duration = max(0, reset_time - time.time()) + 10 # Adiciona uma margem
         print(f"Baixo limite de taxa restante ({response.headers['X-RateLimit-Remaining']}). Dormindo por {sleep_duration} segundos.")
@@ -38,17 +67,56 @@ def _make_github_request(url, params=None, headers=None, page=1, per_page=100):
 
     response.raise_for_status() # Levanta um HTTPError para 4xx/5xx responses
 
-    return response.json()
+    if conditional:
+        hit = response.status_code == 304 and cached is not None
+        metrics.observe_conditional_request(url, hit)
+        if hit:
+            response._content = cached['content']
+            if cached.get('link') and 'Link' not in response.headers:
+                response.headers['Link'] = cached['link']
+        elif response.headers.get('ETag'):
+            cache.set(etag_key, {
+                'etag': response.headers['ETag'],
+                'content': response.content,
+                'link': response.headers.get('Link'),
+            }, ETAG_CACHE_TIMEOUT)
+
+    return response
+
+def _make_github_request(url, params=None, headers=None, page=1, per_page=100, conditional=False, slim=None):
+    """
+    Faz a requisição à API do GitHub e retorna o corpo JSON já decodificado.
+    `slim`: função aplicada a cada item de uma listagem para manter só os campos usados
+    (ver `core.services.github_payloads`).
+    """
+    response = _send_github_request(url, params=params, headers=headers, page=page, per_page=per_page,
+                                    conditional=conditional)
+    data = decode_json(response.content)
+    if slim is not None and isinstance(data, list):
+        return [slim(item) for item in data]
+    return data
+
+def _get_last_page(response):
+    """
+    Lê o número da última página a partir do cabeçalho `Link` (rel="last").
+    Se não houver cabeçalho (resultado em uma única página), retorna 1.
+    """
+    last_url = response.links.get('last', {}).get('url')
+    if not last_url:
+        return 1
+    query = parse_qs(urlparse(last_url).query)
+    return int(query.get('page', [1])[0])
 
 def get_repo_data(owner, repo_name):
     """Busca dados gerais de um repositório."""
     url = f"{GITHUB_API_BASE_URL}/repos/{owner}/{repo_name}"
-    return _make_github_request(url)
+    return _make_github_request(url, conditional=True) # Metadados mudam pouco: 304 não gasta cota
 
 def fetch_repo_issues(owner, repo_name, state='all', since=None, page=1, per_page=100):
     """
     Busca issues de um repositório com paginação e filtros.
     `since`: Apenas issues atualizadas a partir desta data (ISO 8601).
+    Cada issue vem reduzida aos campos persistidos (`github_payloads.slim_issue`).
     """
     url = f"{GITHUB_API_BASE_URL}/repos/{owner}/{repo_name}/issues"
     params = {'state': state, 'direction': 'asc'} # Ordena por data de criação ascendente
@@ -56,7 +124,7 @@ def fetch_repo_issues(owner, repo_name, state='all', since=None, page=1, per_pag
     if since:
         params['since'] = since # "YYYY-MM-DDTHH:MM:SSZ"
 
-    return _make_github_request(url, params=params, page=page, per_page=per_page)
+    return _make_github_request(url, params=params, page=page, per_page=per_page, slim=slim_issue)
 
 def fetch_repo_commits(owner, repo_name, since=None, until=None, sha=None, page=1, per_page=100):
     """
@@ -64,6 +132,7 @@ def fetch_repo_commits(owner, repo_name, since=None, until=None, sha=None, page=
     `since`: Apenas commits feitos a partir desta data.
     `until`: Apenas commits feitos até esta data.
     `sha`: Branch, tag ou SHA para iniciar a busca.
+    Cada commit vem reduzido aos campos persistidos (`github_payloads.slim_commit`).
     """
     url = f"{GITHUB_API_BASE_URL}/repos/{owner}/{repo_name}/commits"
     params = {'direction': 'asc'} # Ordena por data do committer ascendente
@@ -75,6 +144,134 @@ def fetch_repo_commits(owner, repo_name, since=None, until=None, sha=None, page=
     if sha:
         params['sha'] = sha # Ex: 'main' ou 'a1b2c3d'
 
+    return _make_github_request(url, params=params, page=page, per_page=per_page, slim=slim_commit)
+
+def fetch_commit_detail(owner, repo_name, sha, page=1, per_page=100):
+    """
+    Busca um commit específico, incluindo as estatísticas e a lista de arquivos alterados
+    (`files`), que não vêm na listagem de commits. A lista de arquivos é paginada.
+    """
+    url = f"{GITHUB_API_BASE_URL}/repos/{owner}/{repo_name}/commits/{sha}"
+    return _make_github_request(url, page=page, per_page=per_page)
+
+def fetch_repo_branches(owner, repo_name, page=1, per_page=100):
+    """
+    Busca as branches de um repositório com paginação.
+    Cada branch traz o SHA do seu head em `commit.sha`.
+    """
+    url = f"{GITHUB_API_BASE_URL}/repos/{owner}/{repo_name}/branches"
+    return _make_github_request(url, page=page, per_page=per_page, conditional=True)
+
+def fetch_owner_repos(owner, owner_type='org', page=1, per_page=100):
+    """
+    Busca uma página dos repositórios de uma organização (`/orgs/{org}/repos`)
+    ou de um usuário (`/users/{user}/repos`).
+    Retorna uma tupla (lista de repositórios, número da última página), permitindo
+    que as páginas restantes sejam buscadas em paralelo.
+    """
+    if owner_type == 'user':
+        url = f"{GITHUB_API_BASE_URL}/users/{owner}/repos"
+        params = {'type': 'owner'}
+    else:
+        url = f"{GITHUB_API_BASE_URL}/orgs/{owner}/repos"
+        params = {'type': 'all'}
+    params.update({'sort': 'full_name', 'direction': 'asc'}) # Ordem estável entre páginas
+
+    response = _send_github_request(url, params=params, page=page, per_page=per_page)
+    return decode_json(response.content), _get_last_page(response)
+
+# Fragmento GraphQL com os mesmos metadados que `get_repo_data` traz via REST
+_REPO_METADATA_FRAGMENT = """
+fragment RepoMetadata on Repository {
+  databaseId
+  description
+  primaryLanguage { name }
+  stargazerCount
+  forkCount
+  issues(states: OPEN) { totalCount }
+  pullRequests(states: OPEN) { totalCount }
+  defaultBranchRef { name }
+  isPrivate
+  isArchived
+  url
+  sshUrl
+}
+"""
+
+def _make_github_graphql_request(query, variables=None):
+    """
+    Faz uma requisição à API GraphQL do GitHub (exige token).
+    Retorna o payload completo ({'data': ..., 'errors': [...]}), pois erros parciais
+    (ex: um repositório não encontrado) não invalidam o resto da resposta.
+    """
+    headers = {'Accept': 'application/vnd.github.v4+json'}
+    if GITHUB_API_TOKEN:
+        headers['Authorization'] = f"bearer {GITHUB_API_TOKEN}"
+
+    transport = get_transport()
+    url = f"{GITHUB_API_BASE_URL}/graphql"
+    started = time.perf_counter()
+    response = transport.send('POST', url, json_body={'query': query, 'variables': variables or {}}, headers=headers)
+    metrics.observe_github_response('POST', url, response, time.perf_counter() - started, token=GITHUB_API_TOKEN)
+
+    if not transport.replaying and 'X-RateLimit-Remaining' in response.headers and int(response.headers['X-RateLimit-Remaining']) < 50:
+        reset_time = int(response.headers['X-RateLimit-Reset'])
+        sleep_duration = max(0, reset_time - time.time()) + 10
+        print(f"Baixo limite de taxa GraphQL restante ({response.headers['X-RateLimit-Remaining']}). Dormindo por {sleep_duration} segundos.")
+        time.sleep(sleep_duration)
+
+    response.raise_for_status()
+
+    payload = decode_json(response.content)
+    if payload.get('data') is None:
+        raise GitHubAPIError(f"Erro na consulta GraphQL: {payload.get('errors')}")
+    return payload
+
+def fetch_repos_metadata_graphql(repos):
+    """
+    Busca os metadados de vários repositórios em UMA requisição GraphQL, usando aliases.
+    `repos`: lista de tuplas (owner, name) — recomenda-se no máximo ~100 por chamada.
+    Retorna uma lista alinhada com `repos`, com o nó GraphQL de cada repositório
+    (ou None se o repositório não foi encontrado/acessível).
+    """
+    if not repos:
+        return []
+    # json.dumps gera literais de string válidos em GraphQL (aspas e escapes)
+    selections = "\n".join(
+        f"  r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{ ...RepoMetadata }}"
+        for i, (owner, name) in enumerate(repos)
+    )
+    query = f"query {{\n{selections}\n}}\n{_REPO_METADATA_FRAGMENT}"
+
+    payload = _make_github_graphql_request(query)
+    for error in payload.get('errors') or []:
+        print(f"Aviso GraphQL: {error.get('message')}")
+
+    data = payload['data']
+    return [data.get(f"r{i}") for i in range(len(repos))]
+
+def fetch_repo_pulls(owner, repo_name, state='all', sort='updated', direction='desc', page=1, per_page=100):
+    """
+    Busca pull requests de um repositório com paginação.
+    Por padrão ordena pelos atualizados mais recentemente, o que permite parar a
+    paginação assim que aparecer um PR anterior à última sincronização.
+    """
+    url = f"{GITHUB_API_BASE_URL}/repos/{owner}/{repo_name}/pulls"
+    params = {'state': state, 'sort': sort, 'direction': direction}
+    return _make_github_request(url, params=params, page=page, per_page=per_page)
+
+def fetch_repo_issue_comments(owner, repo_name, since=None, page=1, per_page=100):
+    """
+    Busca os comentários de TODAS as issues (e PRs) de um repositório em um único endpoint,
+    evitando uma requisição por issue. Ordena pela atualização, do mais antigo para o mais novo.
+    `since`: Apenas comentários atualizados a partir desta data (ISO 8601).
+    """
+    url = f"{GITHUB_API_BASE_URL}/repos/{owner}/{repo_name}/issues/comments"
+    params = {'sort': 'updated', 'direction': 'asc'}
+
+    if since:
+        params['since'] = since # "YYYY-MM-DDTHH:MM:SSZ"
+
     return _make_github_request(url, params=params, page=page, per_page=per_page)
 
 # Exemplo de como obter o total (pode não ser direto para todas as APIs)
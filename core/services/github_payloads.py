@@ -0,0 +1,80 @@
+"""
+Decodificação das respostas da API do GitHub.
+
+As listagens de issues e commits trazem dezenas de campos que o sync não usa (URLs
+de cada recurso do usuário, reactions, tree, node_id...). `decode_json` usa o orjson
+quando instalado (bem mais rápido que o `json` da biblioteca padrão e sem passar o corpo
+para `str`) e as funções `slim_*` reduzem cada item aos campos lidos por
+`core.services.git_sync`, para que uma página decodificada ocupe menos memória.
+"""
+import json
+
+try:
+    import orjson
+except ImportError: # Dependência opcional: sem ela usa o json da biblioteca padrão
+    orjson = None
+
+# Campos de cada objeto lidos pelo sync (o resto do payload é descartado)
+USER_FIELDS = ('id', 'login', 'avatar_url', 'html_url', 'type')
+LABEL_FIELDS = ('id', 'name', 'color', 'description')
+MILESTONE_FIELDS = ('id', 'number', 'title', 'state', 'due_on', 'html_url')
+ISSUE_FIELDS = ('id', 'number', 'title', 'body', 'state', 'created_at', 'updated_at', 'closed_at', 'comments', 'html_url')
+GIT_PERSON_FIELDS = ('name', 'email', 'date')
+VERIFICATION_FIELDS = ('verified', 'reason')
+
+
+def decode_json(content):
+    """Decodifica um corpo JSON (bytes ou str) com o orjson, se disponível."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _pick(data, fields):
+    # Só copia as chaves presentes: os `.get(campo, padrão)` do sync continuam valendo
+    return {field: data[field] for field in fields if field in data}
+
+
+def _slim_user(user_data):
+    return _pick(user_data, USER_FIELDS) if user_data else user_data
+
+
+def slim_issue(issue_data):
+    """Reduz uma issue da listagem (`/issues`) aos campos persistidos."""
+    issue = _pick(issue_data, ISSUE_FIELDS)
+    for role in ('user', 'closed_by'):
+        if role in issue_data:
+            issue[role] = _slim_user(issue_data[role])
+    if 'assignees' in issue_data:
+        issue['assignees'] = [_slim_user(assignee) for assignee in issue_data['assignees'] or []]
+    if 'labels' in issue_data:
+        issue['labels'] = [_pick(label_data, LABEL_FIELDS) for label_data in issue_data['labels'] or []]
+    if 'milestone' in issue_data:
+        milestone_data = issue_data['milestone']
+        issue['milestone'] = _pick(milestone_data, MILESTONE_FIELDS) if milestone_data else milestone_data
+    if 'pull_request' in issue_data:
+        issue['pull_request'] = True # O sync só verifica a presença da chave
+    return issue
+
+
+def slim_commit(commit_data):
+    """Reduz um commit da listagem (`/commits`) aos campos persistidos."""
+    commit_info = commit_data['commit']
+    info = {'message': commit_info['message']}
+    for role in ('author', 'committer'):
+        info[role] = _pick(commit_info[role], GIT_PERSON_FIELDS)
+    if commit_info.get('verification') is not None:
+        info['verification'] = _pick(commit_info['verification'], VERIFICATION_FIELDS)
+
+    commit = {
+        'sha': commit_data['sha'],
+        'html_url': commit_data['html_url'],
+        'commit': info,
+        'parents': [{'sha': parent['sha']} for parent in commit_data['parents']],
+    }
+    for role in ('author', 'committer'):
+        if role in commit_data:
+            commit[role] = _slim_user(commit_data[role])
+    if 'stats' in commit_data:
+        commit['stats'] = commit_data['stats']
+    return commit
@@ -0,0 +1,251 @@
+import gzip
+import json
+import os
+import re
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+import requests
+from celery.signals import task_postrun, task_prerun
+from requests.structures import CaseInsensitiveDict
+
+# Seleção do transporte pelo ambiente:
+#   GITHUB_TRANSPORT=live   (padrão) requisições reais
+#   GITHUB_TRANSPORT=record requisições reais, gravadas no diretório GITHUB_CASSETTE
+#   GITHUB_TRANSPORT=replay respostas lidas de GITHUB_CASSETTE (arquivo ou diretório), sem rede
+GITHUB_TRANSPORT = os.getenv('GITHUB_TRANSPORT', 'live')
+GITHUB_CASSETTE = os.getenv('GITHUB_CASSETTE', 'cassettes')
+# Parâmetros ignorados ao casar uma requisição com a gravação: dependem do horário da execução
+REPLAY_IGNORED_PARAMS = ('since', 'until')
+# Cabeçalhos de requisição que nunca são gravados
+_SECRET_HEADERS = {'authorization'}
+
+
+class CassetteMiss(requests.exceptions.RequestException):
+    """Requisição sem resposta gravada no cassete (o modo replay nunca acessa a rede)."""
+    pass
+
+
+def _request_key(method, url, params=None, json_body=None, ignored_params=()):
+    """Chave estável de uma requisição: método, URL, parâmetros ordenados e corpo JSON."""
+    params = {key: str(value) for key, value in (params or {}).items()
+              if value is not None and key not in ignored_params}
+    return json.dumps([method.upper(), url, sorted(params.items()), json_body], sort_keys=True)
+
+
+class LiveTransport:
+    """Transporte padrão: faz a requisição HTTP real com `requests`."""
+    replaying = False
+    # Requisições condicionais (ETag/304) dependem do cache local: gravação e replay as desligam
+    conditional_requests = True
+
+    def send(self, method, url, headers=None, params=None, json_body=None):
+        return requests.request(method, url, headers=headers, params=params, json=json_body)
+
+    def close(self):
+        pass
+
+
+class RecordingTransport(LiveTransport):
+    """
+    Faz as requisições reais e grava cada troca (requisição sem credenciais, status,
+    cabeçalhos e corpo da resposta) em um cassete por execução de sincronização:
+    `{directory}/github-<recurso>-<repositório>-<data>-<pid>.jsonl.gz` (ver `run()`; as
+    tarefas Celery abrem o seu automaticamente). Requisições fora de uma execução vão para
+    `github-process-<data>-<pid>.jsonl.gz`. O arquivo só é criado na primeira troca e cada
+    registro é descarregado no disco ao ser gravado, então o cassete continua legível mesmo
+    se o processo morrer no meio da sincronização.
+    Sem requisições condicionais: um 304 gravado (corpo vazio) não teria o que responder
+    em um replay com o cache de ETags vazio.
+    """
+    conditional_requests = False
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = None
+        self._file = None
+        self._label = 'process'
+        self._lock = threading.Lock() # sync_commit_files faz requisições em várias threads
+
+    @contextmanager
+    def run(self, label):
+        """
+        Grava as trocas feitas dentro do bloco em um cassete próprio, identificado por `label`.
+        O processo do worker (prefork) roda uma tarefa por vez, então todas as threads do
+        processo gravam no cassete da execução corrente.
+        """
+        with self._lock:
+            self._close_file()
+            previous, self._label = self._label, label
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._close_file()
+                self._label = previous
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open_file(self):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now(dt_timezone.utc).strftime('%Y%m%dT%H%M%S')
+        label = re.sub(r'[^\w.-]+', '_', self._label)
+        self.path = os.path.join(self.directory, f"github-{label}-{stamp}-{os.getpid()}.jsonl.gz")
+        self._file = gzip.open(self.path, 'at', encoding='utf-8')
+
+    def send(self, method, url, headers=None, params=None, json_body=None):
+        response = super().send(method, url, headers=headers, params=params, json_body=json_body)
+        record = {
+            'method': method.upper(),
+            'url': url,
+            'params': params,
+            'json': json_body,
+            'request_headers': {key: value for key, value in (headers or {}).items() if key.lower() not in _SECRET_HEADERS},
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+            'body': response.content.decode('utf-8', errors='replace'),
+            'elapsed': response.elapsed.total_seconds(),
+        }
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._open_file()
+            self._file.write(line)
+            self._file.flush()
+        return response
+
+    def close(self):
+        with self._lock:
+            self._close_file()
+
+
+def load_cassette(path):
+    """Lê as trocas gravadas em um arquivo .jsonl.gz ou em todos os arquivos de um diretório (em ordem de nome)."""
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith('.jsonl.gz'))
+    else:
+        files = [path]
+    records = []
+    for file_path in files:
+        with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        records.append(json.loads(line))
+            except (EOFError, ValueError):
+                # Gravação interrompida: aproveita as trocas completas
+                pass
+    return records
+
+
+class ReplayTransport:
+    """
+    Responde a partir de um cassete gravado, sem rede e sem esperas (o rate limit
+    gravado é ignorado). Requisições repetidas recebem as respostas na ordem em que
+    foram gravadas; depois da última, a última é repetida. Requisição sem gravação
+    lança `CassetteMiss`.
+    """
+    replaying = True
+    conditional_requests = False
+
+    def __init__(self, path, ignored_params=REPLAY_IGNORED_PARAMS):
+        self.ignored_params = ignored_params
+        self._responses = defaultdict(deque)
+        self._lock = threading.Lock()
+        for record in load_cassette(path):
+            key = _request_key(record['method'], record['url'], record['params'], record['json'], ignored_params)
+            self._responses[key].append(record)
+
+    def send(self, method, url, headers=None, params=None, json_body=None):
+        key = _request_key(method, url, params, json_body, self.ignored_params)
+        with self._lock:
+            queue = self._responses.get(key)
+            if not queue:
+                raise CassetteMiss(f"Sem resposta gravada para {method.upper()} {url} {params or ''}")
+            record = queue.popleft() if len(queue) > 1 else queue[0]
+
+        response = requests.Response()
+        response.status_code = record['status']
+        response.reason = record.get('reason')
+        response.headers = CaseInsensitiveDict(record['headers'])
+        # O corpo gravado já está descomprimido
+        response.headers.pop('Content-Encoding', None)
+        response._content = record['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = requests.Request(method, url, params=params).prepare().url
+        return response
+
+    def close(self):
+        pass
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def _transport_from_env():
+    if GITHUB_TRANSPORT == 'record':
+        return RecordingTransport(GITHUB_CASSETTE)
+    if GITHUB_TRANSPORT == 'replay':
+        return ReplayTransport(GITHUB_CASSETTE)
+    if GITHUB_TRANSPORT != 'live':
+        raise ValueError(f"GITHUB_TRANSPORT inválido: {GITHUB_TRANSPORT!r} (use live, record ou replay).")
+    return LiveTransport()
+
+
+def get_transport():
+    """Transporte em uso pelo cliente da API (criado na primeira chamada a partir do ambiente)."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = _transport_from_env()
+    return _transport
+
+
+def set_transport(transport):
+    """Troca o transporte (ex: `set_transport(ReplayTransport('cassettes/run1.jsonl.gz'))`) e devolve o anterior."""
+    global _transport
+    with _transport_lock:
+        previous, _transport = _transport, transport
+    return previous
+
+
+@contextmanager
+def cassette_run(resource, key=None):
+    """
+    Abre um cassete para uma execução de sincronização (`resource` + repositório `key`)
+    quando o transporte está gravando; nos demais modos não faz nada.
+    """
+    transport = get_transport()
+    if not isinstance(transport, RecordingTransport):
+        yield None
+        return
+    label = resource if key is None else f"{resource}-{key}"
+    with transport.run(label[:100]):
+        yield transport
+
+
+_task_cassettes = {}
+
+
+@task_prerun.connect
+def _open_task_cassette(task_id=None, task=None, args=None, kwargs=None, **extra):
+    # O primeiro argumento das tarefas de sincronização é o repositório (ou o owner, na importação)
+    key = (kwargs or {}).get('repo_id', args[0] if args else None)
+    run = cassette_run(task.name.rsplit('.', 1)[-1], key)
+    run.__enter__()
+    _task_cassettes[task_id] = run
+
+
+@task_postrun.connect
+def _close_task_cassette(task_id=None, **extra):
+    run = _task_cassettes.pop(task_id, None)
+    if run is not None:
+        run.__exit__(None, None, None)
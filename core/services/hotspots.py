@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from core.models import CommitFile
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+HOTSPOT_DAYS_DEFAULT = 90
+HOTSPOT_LIMIT_DEFAULT = 20
+
+
+def top_changed_paths(repository_id, days=HOTSPOT_DAYS_DEFAULT, limit=HOTSPOT_LIMIT_DEFAULT):
+    """
+    Arquivos mais alterados do repositório nos últimos `days` dias, em UMA consulta agregada
+    (atendida pelo índice core_commitfile_hotspot_idx, sem JOIN com Commit).
+    Retorno: [{'path': str, 'changes': int, 'total_additions': int, 'total_deletions': int, 'churn': int}, ...]
+    """
+    since = timezone.now() - timedelta(days=days)
+    return list(
+        CommitFile.objects
+        .filter(repository_id=repository_id, committed_at__gte=since)
+        .values('path_id')
+        .annotate(
+            changes=Count('*'),
+            total_additions=Sum('additions'),
+            total_deletions=Sum('deletions'),
+            churn=Sum(F('additions') + F('deletions')),
+        )
+        .order_by('-changes', '-churn')
+        .values('changes', 'total_additions', 'total_deletions', 'churn', path=F('path__path'))[:limit]
+    )
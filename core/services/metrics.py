@@ -0,0 +1,254 @@
+import hashlib
+import re
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from celery.signals import before_task_publish, task_postrun, task_prerun, worker_process_shutdown
+from celery.utils.log import current_process_index
+from django.conf import settings
+from django.db import connection
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram, push_to_gateway
+
+# Os gauges declaram como são agregados entre os processos do Gunicorn quando /metrics
+# usa o modo multiprocesso (PROMETHEUS_MULTIPROC_DIR, ver gunicorn.conf.py); fora dele o
+# parâmetro multiprocess_mode é ignorado.
+
+# Buckets (segundos) para requisições à API e etapas de uma página
+_FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Buckets (segundos) para duração de tarefas e espera na fila
+_SLOW_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 1800, 3600, 4 * 3600, 12 * 3600)
+
+GITHUB_REQUEST_SECONDS = Histogram(
+    'github_api_request_seconds', "Latência das requisições à API do GitHub.",
+    ['method', 'endpoint', 'status'], buckets=_FAST_BUCKETS,
+)
+GITHUB_RATE_LIMIT_REMAINING = Gauge(
+    'github_api_rate_limit_remaining', "Requisições restantes na janela de rate limit, por token.",
+    ['token', 'resource'], multiprocess_mode='livemostrecent',
+)
+GITHUB_CONDITIONAL_REQUESTS = Counter(
+    'github_api_conditional_requests_total', "Requisições condicionais (ETag): hit = 304, miss = corpo novo.",
+    ['endpoint', 'result'],
+)
+SYNC_STAGE_SECONDS = Histogram(
+    'sync_stage_seconds', "Tempo de cada etapa (fetch, transform, persist) por página sincronizada.",
+    ['resource', 'stage'], buckets=_FAST_BUCKETS,
+)
+SYNC_PAGES = Counter('sync_pages_total', "Páginas gravadas.", ['resource'])
+SYNC_ROWS = Counter('sync_rows_total', "Linhas processadas por resultado (inserted, updated, skipped).", ['resource', 'result'])
+SYNC_QUERIES_PER_PAGE = Histogram(
+    'sync_queries_per_page', "Consultas SQL executadas para gravar uma página.",
+    ['resource'], buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+TASK_QUEUE_WAIT_SECONDS = Histogram(
+    'celery_task_queue_wait_seconds', "Tempo entre a publicação da tarefa e o início da execução.",
+    ['task', 'queue'], buckets=_SLOW_BUCKETS,
+)
+TASK_SECONDS = Histogram(
+    'celery_task_seconds', "Duração da execução das tarefas.",
+    ['task', 'state'], buckets=_SLOW_BUCKETS,
+)
+DB_CONNECTIONS_OPENED = Counter(
+    'db_connections_opened_total', "Conexões obtidas pelo Django (direct = conexão nova; pool = retirada do pool).",
+    ['alias', 'mode'],
+)
+DB_CONNECTION_SECONDS = Histogram(
+    'db_connection_acquire_seconds', "Tempo para abrir uma conexão nova ou esperar uma conexão livre do pool.",
+    ['alias', 'mode'], buckets=_FAST_BUCKETS,
+)
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_connections', "Conexões dos pools (size, available) e requisições esperando (waiting), somadas entre os processos.",
+    ['alias', 'state'], multiprocess_mode='livesum',
+)
+DB_REPLICA_LAG_SECONDS = Gauge(
+    'db_replica_lag_seconds', "Atraso de replicação medido pelo roteador de leituras (core.db_routers).",
+    ['alias'], multiprocess_mode='livemax',
+)
+
+# Cabeçalho da mensagem Celery com o instante (epoch) da publicação
+PUBLISHED_AT_HEADER = 'published_at'
+
+_SHA_PATTERN = re.compile(r'^[0-9a-f]{40}$')
+_task_started = {}
+_last_push = 0.0
+_push_lock = threading.Lock()
+_push_timer = None
+
+
+def _endpoint_label(url):
+    """
+    Caminho da URL com owner, repositório, SHAs e números trocados por marcadores,
+    para manter a cardinalidade baixa (ex: '/repos/{owner}/{repo}/commits/{sha}').
+    """
+    parts = [part for part in urlparse(url).path.split('/') if part]
+    if len(parts) >= 3 and parts[0] == 'repos':
+        parts[1:3] = ['{owner}', '{repo}']
+    elif len(parts) >= 2 and parts[0] in ('users', 'orgs'):
+        parts[1] = '{owner}'
+    for i, part in enumerate(parts):
+        if _SHA_PATTERN.match(part):
+            parts[i] = '{sha}'
+        elif part.isdigit():
+            parts[i] = '{number}'
+    return '/' + '/'.join(parts)
+
+
+def _token_label(token):
+    """Identifica o token sem expô-lo (8 primeiros caracteres do SHA-256)."""
+    if not token:
+        return 'anonymous'
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:8]
+
+
+def observe_github_response(method, url, response, seconds, token=None):
+    """Registra a latência da requisição e o rate limit informado nos cabeçalhos da resposta."""
+    GITHUB_REQUEST_SECONDS.labels(method, _endpoint_label(url), response.status_code).observe(seconds)
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    if remaining is not None:
+        resource = response.headers.get('X-RateLimit-Resource', 'core')
+        GITHUB_RATE_LIMIT_REMAINING.labels(_token_label(token), resource).set(int(remaining))
+
+
+def observe_conditional_request(url, hit):
+    GITHUB_CONDITIONAL_REQUESTS.labels(_endpoint_label(url), 'hit' if hit else 'miss').inc()
+
+
+def observe_db_connection(alias, seconds, pool=None):
+    """Registra uma conexão obtida pelo backend do banco e, com pool, a ocupação atual do pool."""
+    mode = 'pool' if pool is not None else 'direct'
+    DB_CONNECTIONS_OPENED.labels(alias, mode).inc()
+    DB_CONNECTION_SECONDS.labels(alias, mode).observe(seconds)
+    if pool is not None:
+        stats = pool.get_stats()
+        DB_POOL_CONNECTIONS.labels(alias, 'size').set(stats.get('pool_size', 0))
+        DB_POOL_CONNECTIONS.labels(alias, 'available').set(stats.get('pool_available', 0))
+        DB_POOL_CONNECTIONS.labels(alias, 'waiting').set(stats.get('requests_waiting', 0))
+
+
+@contextmanager
+def stage_timer(resource, stage):
+    """
+    Mede uma etapa da sincronização (ex: `with stage_timer('issues', 'fetch'): ...`).
+    Sem rótulo de repositório: importações de organizações inteiras criariam uma série por repo.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        SYNC_STAGE_SECONDS.labels(resource, stage).observe(seconds)
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def track_page_write(resource):
+    """
+    Mede a gravação de uma página: tempo da etapa `persist` (inclui a transformação
+    feita dentro dos `_bulk_write_*`), consultas SQL executadas e total de páginas.
+    """
+    counter = _QueryCounter()
+    with stage_timer(resource, 'persist'), connection.execute_wrapper(counter):
+        yield
+    SYNC_QUERIES_PER_PAGE.labels(resource).observe(counter.count)
+    SYNC_PAGES.labels(resource).inc()
+
+
+def record_sync_rows(resource, stats):
+    """Soma os contadores de uma execução ({'inserted', 'updated', 'skipped'}) às métricas."""
+    for result, count in stats.items():
+        SYNC_ROWS.labels(resource, result).inc(count)
+
+
+def _instance_label():
+    # Índice estável do processo filho no pool do Celery (o pid muda a cada reciclagem
+    # e deixaria um grupo órfão no Pushgateway); 'main' fora do pool (ex: worker solo)
+    index = current_process_index(base=0)
+    return f"{socket.gethostname()}-{'main' if index is None else index}"
+
+
+def push_metrics(force=False):
+    """
+    Envia as métricas deste processo ao Pushgateway (PROMETHEUS_PUSHGATEWAY_URL), no máximo
+    uma vez a cada METRICS_PUSH_INTERVAL segundos. Um pedido dentro do intervalo não é
+    descartado: agenda um envio para o fim do intervalo (thread daemon), então as métricas
+    da última tarefa antes de o worker ficar ocioso também chegam ao Pushgateway.
+    Cada processo do worker usa o próprio grupo (instance = host-índice do processo no pool),
+    então processos não sobrescrevem as métricas uns dos outros e o processo que substitui
+    um reciclado reaproveita o grupo dele.
+    """
+    global _last_push, _push_timer
+    gateway = getattr(settings, 'PROMETHEUS_PUSHGATEWAY_URL', None)
+    if not gateway:
+        return
+    with _push_lock:
+        now = time.monotonic()
+        wait = _last_push + getattr(settings, 'METRICS_PUSH_INTERVAL', 15) - now
+        if not force and wait > 0:
+            if _push_timer is None:
+                _push_timer = threading.Timer(wait, _push_pending_metrics)
+                _push_timer.daemon = True
+                _push_timer.start()
+            return
+        if _push_timer is not None:
+            _push_timer.cancel()
+            _push_timer = None
+        _last_push = now
+    _push_to_gateway(gateway)
+
+
+def _push_pending_metrics():
+    global _push_timer
+    with _push_lock:
+        _push_timer = None
+    push_metrics()
+
+
+def _push_to_gateway(gateway):
+    try:
+        push_to_gateway(
+            gateway, job='repositoriogit-celery', registry=REGISTRY,
+            grouping_key={'instance': _instance_label()}, timeout=5,
+        )
+    except Exception as e:
+        print(f"Erro ao enviar métricas ao Pushgateway: {e}")
+
+
+@before_task_publish.connect
+def _stamp_published_at(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+@task_prerun.connect
+def _task_started_handler(task_id=None, task=None, **kwargs):
+    now = time.time()
+    _task_started[task_id] = time.perf_counter()
+    published_at = getattr(task.request, PUBLISHED_AT_HEADER, None) \
+        or (task.request.headers or {}).get(PUBLISHED_AT_HEADER)
+    if published_at:
+        queue = (task.request.delivery_info or {}).get('routing_key') or 'unknown'
+        TASK_QUEUE_WAIT_SECONDS.labels(task.name, queue).observe(max(now - float(published_at), 0))
+
+
+@task_postrun.connect
+def _task_finished_handler(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_SECONDS.labels(task.name, state or 'unknown').observe(time.perf_counter() - started)
+    push_metrics()
+
+
+@worker_process_shutdown.connect
+def _push_on_shutdown(**kwargs):
+    push_metrics(force=True)
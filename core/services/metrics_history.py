@@ -0,0 +1,72 @@
+from core.models import RepositoryMetricSnapshot
+from django.db.models import DateField, F, Max
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+# Granularidades aceitas para o downsampling da série temporal
+TREND_BUCKETS = ('day', 'week', 'month', 'quarter', 'year')
+
+
+def record_metric_snapshots(repos, date=None):
+    """
+    Grava (upsert) o snapshot do dia para cada repositório informado, em uma única
+    consulta. Várias sincronizações no mesmo dia apenas atualizam a linha existente.
+    """
+    date = date or timezone.localdate()
+    snapshots = [
+        RepositoryMetricSnapshot(
+            repository_id=repo_obj.id,
+            date=date,
+            stars_count=repo_obj.stars_count or 0,
+            forks_count=repo_obj.forks_count or 0,
+            open_issues_count=repo_obj.open_issues_count or 0,
+        )
+        for repo_obj in repos
+        if repo_obj.id is not None
+    ]
+    if not snapshots:
+        return 0
+    RepositoryMetricSnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['repository', 'date'],
+        update_fields=['stars_count', 'forks_count', 'open_issues_count'],
+    )
+    return len(snapshots)
+
+
+def get_metric_trend(repository_ids, start_date, end_date, bucket='day'):
+    """
+    Retorna a série temporal das métricas dos repositórios no intervalo [start_date, end_date],
+    agrupada por `bucket` ('day', 'week', 'month', 'quarter' ou 'year') em UMA consulta.
+    Em cada período é usado o maior valor observado.
+    Retorno: {repository_id: [{'date': date, 'stars': int, 'forks': int, 'open_issues': int}, ...]}
+    """
+    if bucket not in TREND_BUCKETS:
+        raise ValueError(f"Granularidade inválida: {bucket}. Use uma de {', '.join(TREND_BUCKETS)}.")
+
+    queryset = RepositoryMetricSnapshot.objects.filter(
+        repository_id__in=repository_ids,
+        date__range=(start_date, end_date),
+    )
+    if bucket == 'day':
+        queryset = queryset.annotate(period=F('date'))
+    else:
+        queryset = queryset.annotate(period=Trunc('date', bucket, output_field=DateField()))
+
+    rows = (
+        queryset
+        .values('repository_id', 'period')
+        .annotate(stars=Max('stars_count'), forks=Max('forks_count'), open_issues=Max('open_issues_count'))
+        .order_by('repository_id', 'period')
+    )
+
+    trend = {repo_id: [] for repo_id in repository_ids}
+    for row in rows:
+        trend[row['repository_id']].append({
+            'date': row['period'],
+            'stars': row['stars'],
+            'forks': row['forks'],
+            'open_issues': row['open_issues'],
+        })
+    return trend
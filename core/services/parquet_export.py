@@ -0,0 +1,219 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from core.db_routers import PRIMARY_ALIAS, read_alias
+from core.models import Commit, GitUser, Issue, Repositorio
+
+EXPORT_BATCH_SIZE = 50000
+EXPORT_STATE_FILE = '_export_state.json'
+# Cada exportação incremental relê esta janela antes da marca d'água: o synced_at é gravado
+# com a hora do início da escrita, então uma transação que termina depois da leitura anterior
+# pode ter linhas com synced_at menor que a marca. As linhas relidas saem repetidas.
+EXPORT_WATERMARK_OVERLAP = timedelta(minutes=15)
+
+# Tabela exportada -> (modelo, campo de data usado na partição por mês, colunas)
+# Tipos das colunas: 'int', 'str', 'bool', 'datetime' e 'list' (lista de strings).
+# `repository_id` e `month` não são gravados nos arquivos: vêm do caminho (partição no estilo Hive).
+EXPORT_TABLES = {
+    'commits': (Commit, 'committer_date_git', [
+        ('id', 'int'), ('sha', 'str'), ('message', 'str'),
+        ('author_id', 'int'), ('committer_id', 'int'),
+        ('author_identity_id', 'int'), ('committer_identity_id', 'int'),
+        ('author_date_git', 'datetime'), ('committer_date_git', 'datetime'),
+        ('additions', 'int'), ('deletions', 'int'), ('total_changes', 'int'),
+        ('parents_shas', 'list'), ('generation', 'int'), ('verification_status', 'str'),
+        ('synced_at', 'datetime'),
+    ]),
+    'issues': (Issue, 'created_at_git', [
+        ('id', 'int'), ('number', 'int'), ('title', 'str'), ('state', 'str'),
+        ('author_id', 'int'), ('closed_by_id', 'int'), ('milestone_id', 'int'), ('labels', 'list'),
+        ('comments_count', 'int'), ('is_pull_request', 'bool'),
+        ('created_at_git', 'datetime'), ('updated_at_git', 'datetime'), ('closed_at_git', 'datetime'),
+        ('first_response_at', 'datetime'), ('synced_at', 'datetime'),
+    ]),
+}
+# GitUser não tem repositório nem synced_at: é exportado inteiro, em um único arquivo
+USER_COLUMNS = [('id', 'int'), ('external_id', 'str'), ('username', 'str'), ('user_type', 'str')]
+
+
+def _import_pyarrow():
+    """Importa o pyarrow só quando a exportação é usada (dependência opcional)."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("A exportação Parquet requer o pacote 'pyarrow' (pip install pyarrow).") from e
+    return pyarrow
+
+
+def _arrow_schema(pa, columns):
+    types = {
+        'int': pa.int64(),
+        'str': pa.string(),
+        'bool': pa.bool_(),
+        'datetime': pa.timestamp('us', tz='UTC'),
+        'list': pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def load_export_state(output_dir):
+    """Lê o estado da exportação incremental ({tabela: maior synced_at exportado, em ISO 8601})."""
+    path = os.path.join(output_dir, EXPORT_STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_export_state(output_dir, state):
+    """Grava o estado de forma atômica (arquivo temporário + rename)."""
+    path = os.path.join(output_dir, EXPORT_STATE_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+class _PartitionWriter:
+    """
+    Escreve as linhas de uma partição (repositório + mês) em record batches de tamanho fixo.
+    As linhas chegam ordenadas por partição, então só um arquivo fica aberto por vez.
+    """
+
+    def __init__(self, pa, schema, columns, batch_size):
+        self.pa = pa
+        self.schema = schema
+        self.columns = columns
+        self.batch_size = batch_size
+        self.partition = None
+        self.writer = None
+        self.buffer = None
+        self.files = 0
+        self.rows = 0
+
+    def write(self, partition, path, row):
+        if partition != self.partition:
+            self.close()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.writer = self.pa.parquet.ParquetWriter(path, self.schema, compression='zstd')
+            self.partition = partition
+            self.buffer = [[] for _ in self.columns]
+            self.files += 1
+        for values, value in zip(self.buffer, row):
+            values.append(value)
+        self.rows += 1
+        if len(self.buffer[0]) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self.buffer and self.buffer[0]:
+            self.writer.write_batch(self.pa.RecordBatch.from_arrays(
+                [self.pa.array(values, type=field.type) for values, field in zip(self.buffer, self.schema)],
+                schema=self.schema,
+            ))
+            self.buffer = [[] for _ in self.columns]
+
+    def close(self):
+        if self.writer is not None:
+            self._flush()
+            self.writer.close()
+            self.writer = None
+        self.partition = None
+
+
+def export_table(table, output_dir, repository_ids=None, since=None, batch_size=EXPORT_BATCH_SIZE, using=PRIMARY_ALIAS):
+    """
+    Exporta uma tabela (`commits` ou `issues`) para arquivos Parquet particionados em
+    `{output_dir}/{table}/repository_id={id}/month={AAAA-MM}/part-{execução}.parquet`.
+    As linhas são lidas com cursor do lado do servidor (`.iterator()`), repositório por
+    repositório e ordenadas pela data da partição, então o uso de memória é constante.
+    `since`: exporta apenas as linhas com `synced_at` maior que este datetime (incremental).
+    Linhas regravadas depois de exportadas aparecem de novo em uma parte nova: quem lê
+    deve ficar com a versão de maior `synced_at` de cada `id`.
+    `using`: alias do banco de onde todas as linhas são lidas.
+    Retorna (linhas exportadas, arquivos criados, maior synced_at exportado).
+    """
+    pa = _import_pyarrow()
+    model, date_field, columns = EXPORT_TABLES[table]
+    schema = _arrow_schema(pa, columns)
+    field_names = [name for name, _ in columns]
+    date_index = field_names.index(date_field)
+    synced_at_index = field_names.index('synced_at')
+    run_id = datetime.now(dt_timezone.utc).strftime('%Y%m%dT%H%M%S')
+
+    if repository_ids is None:
+        repository_ids = list(Repositorio.objects.using(using).order_by('id').values_list('id', flat=True))
+
+    writer = _PartitionWriter(pa, schema, columns, batch_size)
+    max_synced_at = None
+    try:
+        for repository_id in repository_ids:
+            queryset = model.objects.using(using).filter(repository_id=repository_id)
+            if since:
+                queryset = queryset.filter(synced_at__gt=since)
+            rows = queryset.order_by(date_field, 'id').values_list(*field_names).iterator(chunk_size=batch_size)
+            for row in rows:
+                month = row[date_index].strftime('%Y-%m')
+                path = os.path.join(
+                    output_dir, table, f"repository_id={repository_id}", f"month={month}", f"part-{run_id}.parquet"
+                )
+                writer.write((repository_id, month), path, row)
+                if max_synced_at is None or row[synced_at_index] > max_synced_at:
+                    max_synced_at = row[synced_at_index]
+            writer.close()
+    finally:
+        writer.close()
+    return writer.rows, writer.files, max_synced_at
+
+
+def export_users(output_dir, batch_size=EXPORT_BATCH_SIZE, using=PRIMARY_ALIAS):
+    """Exporta a tabela de usuários inteira para `{output_dir}/users/users.parquet` (sobrescreve)."""
+    pa = _import_pyarrow()
+    schema = _arrow_schema(pa, USER_COLUMNS)
+    path = os.path.join(output_dir, 'users', 'users.parquet')
+    tmp_path = f"{path}.tmp"
+    writer = _PartitionWriter(pa, schema, USER_COLUMNS, batch_size)
+    try:
+        rows = GitUser.objects.using(using).order_by('id').values_list(*[name for name, _ in USER_COLUMNS]).iterator(chunk_size=batch_size)
+        for row in rows:
+            writer.write('users', tmp_path, row)
+    finally:
+        writer.close()
+    if writer.files:
+        os.replace(tmp_path, path)
+    return writer.rows
+
+
+def export_to_parquet(output_dir, tables=('commits', 'issues', 'users'), repository_ids=None,
+                      full=False, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Exporta as tabelas pedidas. Por padrão é incremental: cada tabela continua a partir do
+    maior `synced_at` da exportação anterior (guardado em `_export_state.json`), menos
+    EXPORT_WATERMARK_OVERLAP. Toda escrita que muda uma coluna exportada atualiza o `synced_at`.
+    As leituras vão para a réplica, se ela estiver disponível no início da exportação; o
+    alias é escolhido uma vez e usado em todas as consultas. Linhas gravadas no primário e
+    ainda não replicadas ficam para a próxima exportação enquanto o atraso da réplica
+    (limitado por REPLICA_MAX_LAG) for menor que EXPORT_WATERMARK_OVERLAP.
+    Retorna {tabela: número de linhas exportadas}.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    state = {} if full else load_export_state(output_dir)
+    exported = {}
+    using = read_alias()
+    for table in tables:
+        if table == 'users':
+            exported[table] = export_users(output_dir, batch_size=batch_size, using=using)
+            continue
+        since = datetime.fromisoformat(state[table]) - EXPORT_WATERMARK_OVERLAP if state.get(table) else None
+        rows, files, max_synced_at = export_table(
+            table, output_dir, repository_ids=repository_ids, since=since, batch_size=batch_size, using=using
+        )
+        print(f"Exportação de {table}: {rows} linhas em {files} arquivos.")
+        exported[table] = rows
+        # Exportações parciais (alguns repositórios) não avançam a marca d'água global
+        if max_synced_at and repository_ids is None:
+            state[table] = max_synced_at.isoformat()
+            save_export_state(output_dir, state)
+    return exported
@@ -0,0 +1,184 @@
+from core.models import Branch, BranchCommit, Commit, CommitFile, CommitParent, Issue, IssueComment, IssueLabel, PullRequest
+from django.db import connection, transaction
+
+PARTITION_COUNT_DEFAULT = 16
+PARTITION_KEY = 'repository_id'
+# Tabelas que podem ser convertidas: todas têm `repository_id` e nenhuma FK no banco apontando para elas
+PARTITIONABLE_MODELS = {
+    'commit': Commit,
+    'issue': Issue,
+}
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+def _old_name(name):
+    """Nome da tabela/índice antigo (mantido para rollback), respeitando o limite de 63 caracteres."""
+    return f"{name[:59]}_old"
+
+
+def is_partitioned(table):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def check_partitionable(model):
+    """
+    Retorna a lista de problemas que impedem a conversão da tabela do modelo
+    (lista vazia = pode converter).
+    """
+    table = model._meta.db_table
+    problems = []
+    if is_partitioned(table):
+        problems.append(f"{table} já é uma tabela particionada.")
+    return problems
+
+
+def _incoming_foreign_keys(cursor, table):
+    """FKs de outras tabelas que apontam para `table`: [(tabela, constraint)]."""
+    cursor.execute(
+        "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+        "WHERE contype = 'f' AND confrelid = to_regclass(%s)",
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def build_partition_sql(model, partitions=PARTITION_COUNT_DEFAULT):
+    """
+    Gera o SQL que converte a tabela do modelo em uma tabela particionada por
+    HASH(repository_id) com `partitions` partições, copiando os dados:
+
+    1. remove as FKs que apontam para a tabela (recriadas NOT VALID pela migração 0018 nas
+       instalações não particionadas) e renomeia a tabela atual (e seus índices) para *_old,
+       que fica para rollback;
+    2. cria a nova tabela com as mesmas colunas, defaults, colunas geradas, identity e CHECKs;
+    3. cria as partições, a PK (id, repository_id), os índices e as FKs de saída;
+    4. copia as linhas e ajusta a sequência do `id`.
+
+    Limitações do PostgreSQL refletidas aqui: a PK e todo índice único precisam conter
+    `repository_id` (índices únicos sem ele são recriados como índices comuns), e nenhuma
+    FK pode apontar para a tabela particionada (por isso as FKs para Commit/Issue usam
+    db_constraint=False no Django e o CASCADE fica a cargo de `delete_repository`).
+    """
+    table = model._meta.db_table
+    old_table = _old_name(table)
+    pk_name = f"{table}_pkey"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = %s AND is_generated = 'NEVER' "
+            "ORDER BY ordinal_position",
+            [table],
+        )
+        columns = ', '.join(_quote(row[0]) for row in cursor.fetchall())
+        cursor.execute(
+            "SELECT i.relname, pg_get_indexdef(i.oid), ix.indisunique, "
+            "       EXISTS (SELECT 1 FROM pg_attribute a WHERE a.attrelid = t.oid "
+            "               AND a.attname = %s AND a.attnum = ANY (ix.indkey)) "
+            "FROM pg_index ix JOIN pg_class i ON i.oid = ix.indexrelid JOIN pg_class t ON t.oid = ix.indrelid "
+            "WHERE t.oid = to_regclass(%s) AND NOT ix.indisprimary",
+            [PARTITION_KEY, table],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE contype = 'f' AND conrelid = to_regclass(%s)",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        incoming_foreign_keys = _incoming_foreign_keys(cursor, table)
+
+    sql = [f"LOCK TABLE {_quote(table)} IN ACCESS EXCLUSIVE MODE"]
+    sql += [
+        f"ALTER TABLE {_quote(referencing_table)} DROP CONSTRAINT {_quote(name)}"
+        for referencing_table, name in incoming_foreign_keys
+    ]
+    sql += [
+        f"ALTER TABLE {_quote(table)} RENAME TO {_quote(old_table)}",
+        f"ALTER INDEX {_quote(pk_name)} RENAME TO {_quote(_old_name(pk_name))}",
+    ]
+    sql += [f"ALTER INDEX {_quote(name)} RENAME TO {_quote(_old_name(name))}" for name, _, _, _ in indexes]
+    sql.append(
+        f"CREATE TABLE {_quote(table)} (LIKE {_quote(old_table)} INCLUDING DEFAULTS INCLUDING GENERATED "
+        f"INCLUDING IDENTITY INCLUDING CONSTRAINTS INCLUDING STORAGE) "
+        f"PARTITION BY HASH ({_quote(PARTITION_KEY)})"
+    )
+    sql += [
+        f"CREATE TABLE {_quote(f'{table}_p{remainder:02d}')} PARTITION OF {_quote(table)} "
+        f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        for remainder in range(partitions)
+    ]
+    sql.append(
+        f"ALTER TABLE {_quote(table)} ADD CONSTRAINT {_quote(pk_name)} "
+        f"PRIMARY KEY (id, {_quote(PARTITION_KEY)})"
+    )
+    for name, definition, unique, has_partition_key in indexes:
+        # As definições foram lidas antes do rename, então já apontam para o nome original (a nova tabela)
+        if unique and not has_partition_key:
+            definition = definition.replace('CREATE UNIQUE INDEX', 'CREATE INDEX', 1)
+        sql.append(definition)
+    sql += [
+        f"ALTER TABLE {_quote(table)} ADD CONSTRAINT {_quote(name)} {definition}"
+        for name, definition in foreign_keys
+    ]
+    sql += [
+        f"INSERT INTO {_quote(table)} ({columns}) SELECT {columns} FROM {_quote(old_table)}",
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {_quote(table)}",
+        f"ANALYZE {_quote(table)}",
+    ]
+    return sql
+
+
+def build_drop_old_sql(model):
+    """SQL que remove a tabela antiga (*_old) depois que a conversão foi validada."""
+    return [f"DROP TABLE IF EXISTS {_quote(_old_name(model._meta.db_table))}"]
+
+
+def execute_sql(statements):
+    """Executa as instruções em uma única transação (tudo ou nada)."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def delete_repository(repo_obj):
+    """
+    Apaga um repositório e todos os seus dados sem passar pelo coletor do Django, que
+    carrega os commits/issues em memória e os apaga em lotes de `WHERE id IN (...)`,
+    lendo todas as partições. Aqui cada tabela recebe um único DELETE filtrado por
+    `repository_id` (ou por um subselect nele), então nas tabelas particionadas só a
+    partição do repositório é lida. As tabelas pequenas (labels, branches, snapshots...)
+    ficam para o `delete()` normal no final. Retorna o número de linhas apagadas por modelo.
+    """
+    repository_id = repo_obj.pk
+    commits = Commit.objects.filter(repository_id=repository_id).values('id')
+    issues = Issue.objects.filter(repository_id=repository_id).values('id')
+    # Dependentes antes das tabelas principais (as FKs no banco, quando existem, são DEFERRABLE)
+    querysets = [
+        BranchCommit.objects.filter(branch__in=Branch.objects.filter(repository_id=repository_id).values('id')),
+        CommitFile.objects.filter(repository_id=repository_id),
+        CommitParent.objects.filter(commit_id__in=commits),
+        Commit.issues.through.objects.filter(commit_id__in=commits),
+        PullRequest.requested_reviewers.through.objects.filter(
+            pullrequest_id__in=PullRequest.objects.filter(repository_id=repository_id).values('id')
+        ),
+        PullRequest.objects.filter(repository_id=repository_id),
+        IssueLabel.objects.filter(issue_id__in=issues),
+        Issue.assignees.through.objects.filter(issue_id__in=issues),
+        IssueComment.objects.filter(repository_id=repository_id),
+        Commit.objects.filter(repository_id=repository_id),
+        Issue.objects.filter(repository_id=repository_id),
+    ]
+    deleted = {}
+    with transaction.atomic():
+        for queryset in querysets:
+            deleted[queryset.model._meta.label] = queryset._raw_delete(queryset.db)
+        _, remaining = repo_obj.delete()
+    for label, count in remaining.items():
+        deleted[label] = deleted.get(label, 0) + count
+    return deleted
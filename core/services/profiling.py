@@ -0,0 +1,225 @@
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+from core.models import Repositorio, SyncRun
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.utils import timezone
+
+PROFILERS = ('sample', 'cprofile')
+# Intervalo entre amostras do profiler por amostragem (segundos): ~200 amostras/s
+SAMPLE_INTERVAL = 0.005
+# Quadros do projeto guardados por consulta SQL (do mais interno para o mais externo)
+SQL_STACK_DEPTH = 4
+SUMMARY_TOP = 25
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Wrappers de consulta do próprio projeto não são a origem da consulta
+_IGNORED_FILES = {
+    os.path.abspath(__file__),
+    os.path.join(_PROJECT_ROOT, 'services', 'metrics.py'),
+    os.path.join(_PROJECT_ROOT, 'services', 'benchmark.py'),
+}
+# Listas de placeholders de tamanho variável (ex: IN (%s, %s, ...)) viram um único marcador
+_PLACEHOLDER_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_VALUES_LIST = re.compile(r'(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+')
+
+
+def _fingerprint(sql):
+    """SQL sem a variação de tamanho das listas de parâmetros, para agrupar consultas iguais."""
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    return _VALUES_LIST.sub(r'\1', sql)
+
+
+def _project_stack(frame, depth=SQL_STACK_DEPTH):
+    """Os `depth` quadros mais internos que pertencem ao código do projeto (core/), como 'arquivo:linha função'."""
+    stack = []
+    while frame is not None and len(stack) < depth:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_PROJECT_ROOT) and filename not in _IGNORED_FILES:
+            stack.append(f"{os.path.relpath(filename, os.path.dirname(_PROJECT_ROOT))}:{frame.f_lineno} {frame.f_code.co_name}")
+        frame = frame.f_back
+    return tuple(stack)
+
+
+class SqlRecorder:
+    """
+    `connection.execute_wrapper` que conta as consultas e acumula o tempo por
+    (consulta normalizada, pilha do projeto que a disparou).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.by_origin = defaultdict(lambda: [0, 0.0])
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            entry = self.by_origin[(_fingerprint(sql), _project_stack(sys._getframe(1)))]
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def summary(self, top=SUMMARY_TOP):
+        slowest = sorted(self.by_origin.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return {
+            'count': self.count,
+            'seconds': round(self.seconds, 4),
+            'top': [
+                {'sql': sql[:500], 'stack': list(stack), 'count': count, 'seconds': round(seconds, 4)}
+                for (sql, stack), (count, seconds) in slowest
+            ],
+        }
+
+
+class SamplingProfiler:
+    """
+    Profiler por amostragem: uma thread lê a pilha da thread perfilada a cada
+    `interval` segundos (sys._current_frames) e conta as pilhas iguais. O custo
+    não depende do número de chamadas, então pode ser ligado em produção.
+    O artefato usa o formato "folded" (uma pilha por linha + contagem), aceito
+    pelo flamegraph.pl e pelo speedscope.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._target = None
+        self._root = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            # Só os quadros abaixo de quem ligou o profiler (os de cima são iguais em toda amostra)
+            while frame is not None and frame is not self._root:
+                stack.append(f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._root = sys._getframe(1)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._root = None
+
+    def artifact(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()).encode('utf-8')
+
+    def summary(self, top=SUMMARY_TOP):
+        total = sum(self.stacks.values())
+        inclusive = Counter()
+        leaf = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            leaf[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+        return {
+            'samples': total,
+            'interval': self.interval,
+            'top_cumulative': [{'function': name, 'samples': count, 'percent': round(100 * count / total, 1)}
+                               for name, count in inclusive.most_common(top)] if total else [],
+            'top_self': [{'function': name, 'samples': count, 'percent': round(100 * count / total, 1)}
+                         for name, count in leaf.most_common(top)] if total else [],
+        }
+
+
+class _CProfileProfiler:
+    """cProfile (determinístico): mais detalhado, porém com custo proporcional ao número de chamadas."""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def artifact(self):
+        # Mesmo formato de `Profile.dump_stats` (abre com pstats, snakeviz, etc.)
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
+
+    def summary(self, top=SUMMARY_TOP):
+        stats = pstats.Stats(self.profile, stream=io.StringIO())
+
+        def _rows(sort_key):
+            rows = sorted(stats.stats.items(), key=lambda item: item[1][sort_key], reverse=True)[:top]
+            return [
+                {'function': f"{name} ({os.path.basename(filename)}:{line})", 'calls': calls,
+                 'self_seconds': round(tottime, 4), 'cumulative_seconds': round(cumtime, 4)}
+                for (filename, line, name), (_, calls, tottime, cumtime, _) in rows
+            ]
+
+        return {'total_seconds': round(stats.total_tt, 4), 'top_cumulative': _rows(3), 'top_self': _rows(2)}
+
+
+def _make_profiler(profiler):
+    if profiler == 'cprofile':
+        return _CProfileProfiler()
+    if profiler == 'sample':
+        return SamplingProfiler()
+    raise ValueError(f"Profiler inválido: {profiler!r} (use {', '.join(PROFILERS)}).")
+
+
+def run_profiled_sync(repo_obj: Repositorio, resource, sync_function, profiler='sample', options=None, **kwargs):
+    """
+    Executa `sync_function(repo_obj, **kwargs)` sob o profiler escolhido, registrando
+    também as consultas SQL (quantidade, tempo e pilha de origem). O artefato e o
+    resumo ficam no `SyncRun` criado para a execução. Exceções são registradas no
+    SyncRun e propagadas. Retorna o SyncRun.
+    """
+    profiling = _make_profiler(profiler)
+    run = SyncRun.objects.create(repository=repo_obj, resource=resource, profiler=profiler, options=options)
+    sql = SqlRecorder()
+    started = time.perf_counter()
+    try:
+        with connection.execute_wrapper(sql):
+            profiling.start()
+            try:
+                run.stats = sync_function(repo_obj, **kwargs)
+            finally:
+                profiling.stop()
+        run.status = 'success'
+    except Exception as e:
+        run.status = 'failed'
+        run.error = str(e)
+        raise
+    finally:
+        run.finished_at = timezone.now()
+        run.profile_summary = {
+            'wall_seconds': round(time.perf_counter() - started, 4),
+            'profiler': profiling.summary(),
+            'sql': sql.summary(),
+        }
+        extension = 'prof' if profiler == 'cprofile' else 'folded'
+        run.profile_file.save(
+            f"{repo_obj.owner}-{repo_obj.name}-{resource}-{run.id}.{extension}",
+            ContentFile(profiling.artifact()),
+            save=False,
+        )
+        run.save()
+    return run
@@ -0,0 +1,65 @@
+import re
+
+from core.models import SEARCH_CONFIG, Commit, Issue
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, Q
+
+# Um termo só com caracteres hexadecimais (4 a 40) é tratado como SHA (completo ou curto)
+SHA_PATTERN = re.compile(r'^[0-9a-f]{4,40}$', re.IGNORECASE)
+SEARCH_PAGE_SIZE_DEFAULT = 20
+SEARCH_PAGE_SIZE_MAX = 100
+
+
+def _paginate_without_count(queryset, page, per_page):
+    """
+    Pagina sem executar COUNT(*): busca uma linha a mais que o tamanho da página
+    apenas para saber se existe uma próxima página.
+    Retorna uma tupla (resultados, tem_proxima_pagina).
+    """
+    offset = (page - 1) * per_page
+    rows = list(queryset[offset:offset + per_page + 1])
+    return rows[:per_page], len(rows) > per_page
+
+
+def search_commits(text, repository_id=None, page=1, per_page=SEARCH_PAGE_SIZE_DEFAULT):
+    """
+    Busca commits pela mensagem (full-text, ordenado por relevância) ou,
+    se o termo parecer um SHA, pelo prefixo do SHA (índice de trigramas).
+    """
+    text = text.strip()
+    queryset = Commit.objects.select_related('repository', 'author')
+    if repository_id:
+        queryset = queryset.filter(repository_id=repository_id)
+
+    if SHA_PATTERN.match(text):
+        queryset = queryset.filter(sha__startswith=text.lower()).order_by('-committer_date_git', '-id')
+    else:
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        queryset = (
+            queryset
+            .filter(search_vector=query)
+            .annotate(rank=SearchRank(F('search_vector'), query))
+            .order_by('-rank', '-committer_date_git', '-id')
+        )
+
+    return _paginate_without_count(queryset.defer('search_vector'), page, per_page)
+
+
+def search_issues(text, repository_id=None, page=1, per_page=SEARCH_PAGE_SIZE_DEFAULT):
+    """
+    Busca issues pelo título/corpo (full-text, título com peso maior) e também por
+    trecho parcial do título (índice de trigramas), ordenando por relevância.
+    """
+    text = text.strip()
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    queryset = Issue.objects.select_related('repository', 'author')
+    if repository_id:
+        queryset = queryset.filter(repository_id=repository_id)
+
+    queryset = (
+        queryset
+        .filter(Q(search_vector=query) | Q(title__icontains=text))
+        .annotate(rank=SearchRank(F('search_vector'), query))
+        .order_by('-rank', '-created_at_git', '-id')
+    )
+    return _paginate_without_count(queryset.defer('search_vector'), page, per_page)
@@ -0,0 +1,106 @@
+import threading
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from redis.exceptions import LockError
+
+# Validade (em segundos) de um lock de sincronização. Enquanto a tarefa roda, uma thread
+# renova o lock a cada SYNC_LOCK_HEARTBEAT segundos; se o worker morrer, o lock expira
+# em poucos minutos e a tarefa reentregue (acks_late) não é descartada como duplicada.
+SYNC_LOCK_TIMEOUT = 10 * 60
+SYNC_LOCK_HEARTBEAT = SYNC_LOCK_TIMEOUT / 3
+# Tempo máximo que a marca de "já enfileirado" fica ativa sem que a tarefa comece.
+ENQUEUE_DEDUP_TIMEOUT = 60 * 60
+
+
+def _lock_key(repo_id, resource):
+    return f"sync-lock:{resource}:{repo_id}"
+
+
+def _enqueue_key(repo_id, resource):
+    return f"sync-enqueued:{resource}:{repo_id}"
+
+
+class _CacheLock:
+    """
+    Mesma interface do `redis.lock.Lock` sobre o cache do Django, para backends sem Redis
+    (ex: locmem em desenvolvimento e testes). Não é atômico entre processos.
+    """
+
+    def __init__(self, key, timeout):
+        self.name = key
+        self.timeout = timeout
+        self.token = uuid.uuid4().hex
+
+    def acquire(self, blocking=False):
+        return cache.add(self.name, self.token, self.timeout)
+
+    def reacquire(self):
+        if cache.get(self.name) != self.token:
+            raise LockError("Lock expirou e foi obtido por outro worker.")
+        cache.touch(self.name, self.timeout)
+        return True
+
+    def release(self):
+        if cache.get(self.name) != self.token:
+            raise LockError("Lock expirou e foi obtido por outro worker.")
+        cache.delete(self.name)
+
+
+def _make_lock(key, timeout):
+    backend = caches['default']
+    if isinstance(backend, RedisCache):
+        # Lock do redis-py: SET NX PX na aquisição e compare-and-delete/renovação em Lua.
+        # thread_local=False porque a renovação roda na thread de heartbeat.
+        client = backend._cache.get_client(key, write=True)
+        return client.lock(backend.make_key(key), timeout=timeout, thread_local=False)
+    return _CacheLock(key, timeout)
+
+
+def _heartbeat(lock, stop, interval):
+    while not stop.wait(interval):
+        try:
+            lock.reacquire()
+        except LockError:
+            print(f"Lock de sincronização {lock.name!r} perdido antes do fim da tarefa.")
+            return
+
+
+@contextmanager
+def repo_sync_lock(repo_id, resource, timeout=SYNC_LOCK_TIMEOUT, heartbeat=SYNC_LOCK_HEARTBEAT):
+    """
+    Lock por (repositório, recurso) guardado no Redis.
+    Garante que apenas uma sincronização de um mesmo recurso (issues, commits, ...)
+    rode por vez para cada repositório. Retorna True se o lock foi obtido.
+    O lock é renovado a cada `heartbeat` segundos enquanto o bloco roda e só é
+    liberado se ainda for deste worker (comparação e remoção atômicas).
+    """
+    lock = _make_lock(_lock_key(repo_id, resource), timeout)
+    acquired = lock.acquire(blocking=False)
+    stop = threading.Event()
+    if acquired:
+        threading.Thread(target=_heartbeat, args=(lock, stop, heartbeat), daemon=True).start()
+    try:
+        yield acquired
+    finally:
+        stop.set()
+        if acquired:
+            try:
+                lock.release()
+            except LockError:
+                pass # Expirou e pode ter sido pego por outro worker: não é mais nosso
+
+
+def mark_enqueued(repo_id, resource, timeout=ENQUEUE_DEDUP_TIMEOUT):
+    """
+    Marca que uma sincronização foi enfileirada. Retorna False se já existe uma
+    tarefa equivalente aguardando na fila (enfileiramentos duplicados colapsam).
+    """
+    return cache.add(_enqueue_key(repo_id, resource), 1, timeout)
+
+
+def clear_enqueued(repo_id, resource):
+    """Remove a marca de enfileiramento (chamado quando a tarefa começa a rodar)."""
+    cache.delete(_enqueue_key(repo_id, resource))
@@ -0,0 +1,329 @@
+import csv
+import hashlib
+import io
+import json
+import random
+import time
+from bisect import bisect
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import accumulate
+
+from core.models import Commit, CommitParent, GitUser, Identity, Issue, IssueLabel, Label, Repositorio
+from core.services.partitioning import delete_repository
+from django.db import connection, transaction
+
+SYNTHETIC_OWNER = 'synthetic'
+COPY_CHUNK_SIZE = 50000
+# Tamanhos por repositório com fator de escala 1 (escala 10 = 1 milhão de commits por repositório)
+BASE_COMMITS = 100000
+BASE_ISSUES = 20000
+BASE_USERS = 5000
+# Expoente da lei de potência dos autores (~1: poucos autores fazem a maior parte dos commits)
+AUTHOR_ZIPF_EXPONENT = 1.1
+# Fim fixo da linha do tempo sintética (mesma semente = mesmos dados, em qualquer dia)
+TIMELINE_END = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+LABELS = [
+    ('bug', 'd73a4a', 0.35), ('enhancement', 'a2eeef', 0.25), ('documentation', '0075ca', 0.1),
+    ('question', 'd876e3', 0.08), ('performance', 'fbca04', 0.07), ('good first issue', '7057ff', 0.05),
+    ('wontfix', 'ffffff', 0.04), ('duplicate', 'cfd3d7', 0.03), ('security', 'b60205', 0.02),
+]
+_VERBS = ['Adiciona', 'Corrige', 'Refatora', 'Remove', 'Atualiza', 'Melhora', 'Simplifica', 'Documenta']
+_OBJECTS = ['parser', 'cache de sessões', 'sincronização', 'cliente HTTP', 'serializador', 'migração',
+            'paginação', 'validação de formulário', 'tela de login', 'exportação CSV', 'fila de tarefas']
+_ISSUE_KINDS = ['Erro ao', 'Lentidão ao', 'Falha intermitente ao', 'Sugestão: melhorar', 'Dúvida sobre como']
+_ISSUE_ACTIONS = ['sincronizar repositórios grandes', 'abrir a página de commits', 'exportar relatórios',
+                  'autenticar com token', 'filtrar issues por label', 'processar webhooks', 'paginar resultados']
+
+
+def _reserve_ids(model, count):
+    """Reserva `count` ids consecutivos na sequência da tabela e retorna o primeiro."""
+    if count <= 0:
+        return None
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence(%s, 'id'), nextval(pg_get_serial_sequence(%s, 'id')) + %s - 1)",
+            [table, table, count],
+        )
+        return cursor.fetchone()[0] - count + 1
+
+
+def _copy_buffer(cursor, sql, buffer):
+    """Envia o CSV do buffer pelo COPY (psycopg2: copy_expert; psycopg 3, usado com DB_POOL: cursor.copy)."""
+    if hasattr(cursor.cursor, 'copy_expert'):
+        cursor.copy_expert(sql, buffer)
+    else:
+        with cursor.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def _copy_rows(model_or_table, columns, rows, chunk_size=COPY_CHUNK_SIZE):
+    """
+    Grava as linhas com COPY ... FROM STDIN (formato CSV, `None` = NULL), em blocos
+    de `chunk_size` linhas para manter a memória constante. Retorna o número de linhas.
+    """
+    table = model_or_table if isinstance(model_or_table, str) else model_or_table._meta.db_table
+    sql = f"COPY {connection.ops.quote_name(table)} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    total = 0
+    with connection.cursor() as cursor:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        pending = 0
+        for row in rows:
+            writer.writerow(row)
+            pending += 1
+            if pending >= chunk_size:
+                buffer.seek(0)
+                _copy_buffer(cursor, sql, buffer)
+                total += pending
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                pending = 0
+        if pending:
+            buffer.seek(0)
+            _copy_buffer(cursor, sql, buffer)
+            total += pending
+    return total
+
+
+class _WeightedChoice:
+    """Sorteio com pesos fixos em O(log n) (pesos acumulados + bisect)."""
+
+    def __init__(self, items, weights):
+        self.items = items
+        self.cumulative = list(accumulate(weights))
+        self.total = self.cumulative[-1]
+
+    def pick(self, rng):
+        return self.items[bisect(self.cumulative, rng.random() * self.total)]
+
+
+def ensure_synthetic_users(count, seed):
+    """
+    Garante `count` usuários sintéticos (e uma identidade Git para cada) para a semente,
+    reaproveitando os que já existem. Retorna a lista [(id do GitUser, id da Identity)].
+    """
+    prefix = f"synthetic:{seed}:"
+    existing = dict(GitUser.objects.filter(external_id__startswith=prefix).values_list('external_id', 'id'))
+    missing = [i for i in range(count) if f"{prefix}{i}" not in existing]
+    start = _reserve_ids(GitUser, len(missing))
+    _copy_rows(GitUser, ['id', 'external_id', 'username', 'user_type'], (
+        (start + n, f"{prefix}{i}", f"synth{seed}-dev{i}", 'User') for n, i in enumerate(missing)
+    ))
+    user_ids = {**existing, **{f"{prefix}{i}": start + n for n, i in enumerate(missing)}}
+
+    emails = {f"dev{i}.s{seed}@synthetic.invalid": user_ids[f"{prefix}{i}"] for i in range(count)}
+    identities = dict(Identity.objects.filter(email__in=list(emails)).values_list('email', 'id'))
+    missing_emails = [email for email in emails if email not in identities]
+    start = _reserve_ids(Identity, len(missing_emails))
+    _copy_rows(Identity, ['id', 'name', 'email', 'user_id'], (
+        (start + n, email.split('.')[0].title(), email, emails[email]) for n, email in enumerate(missing_emails)
+    ))
+    identities.update({email: start + n for n, email in enumerate(missing_emails)})
+    return [(user_ids[f"{prefix}{i}"], identities[f"dev{i}.s{seed}@synthetic.invalid"]) for i in range(count)]
+
+
+def _commit_graph(rng, count, branch_probability=0.08, max_open_branches=4):
+    """
+    Gera a topologia dos commits (do mais antigo para o mais novo): uma linha principal
+    de onde saem ramos curtos que voltam por commits de merge. Retorna, para cada
+    commit, a lista de índices dos pais.
+    """
+    parents = []
+    mainline = None
+    open_branches = [] # [índice do head do ramo, commits restantes]
+    for i in range(count):
+        if open_branches and rng.random() < 0.5:
+            branch = rng.choice(open_branches)
+            if branch[1] > 0:
+                parents.append([branch[0]])
+                branch[0] = i
+                branch[1] -= 1
+                continue
+            # Ramo terminado: merge na linha principal
+            open_branches.remove(branch)
+            parents.append([mainline, branch[0]])
+            mainline = i
+            continue
+        if mainline is not None and len(open_branches) < max_open_branches and rng.random() < branch_probability:
+            # Primeiro commit de um ramo novo, saindo da linha principal
+            parents.append([mainline])
+            open_branches.append([i, rng.randint(0, 6)])
+            continue
+        parents.append([mainline] if mainline is not None else [])
+        mainline = i
+    return parents
+
+
+def generate_repository(index, commits, issues, users, seed, years=5, chunk_size=COPY_CHUNK_SIZE):
+    """
+    Gera um repositório sintético completo (repositório, labels, issues com labels,
+    commits com pais, arestas do grafo, gerações e vínculos commit -> issue) via COPY,
+    em uma única transação. Retorna (repositório, {tabela: linhas gravadas}).
+    """
+    rng = random.Random(f"{seed}:{index}")
+    name = f"repo-{seed}-{index}"
+    end = TIMELINE_END
+    start = end - timedelta(days=365 * years)
+    span = (end - start).total_seconds()
+    counts = {}
+
+    with transaction.atomic():
+        repo = Repositorio.objects.create(
+            owner=SYNTHETIC_OWNER, name=name, full_name=f"{SYNTHETIC_OWNER}/{name}",
+            description=f"Repositório sintético (semente {seed})", language='Python',
+            stars_count=int(rng.paretovariate(1.2) * 10), forks_count=int(rng.paretovariate(1.3) * 2),
+            default_branch='main', web_url=f"https://example.invalid/{SYNTHETIC_OWNER}/{name}",
+        )
+        # Cada repositório tem seu próprio "núcleo" de autores frequentes dentro do conjunto de usuários
+        authors = list(users)
+        rng.shuffle(authors)
+        author_choice = _WeightedChoice(authors, [1 / (rank + 1) ** AUTHOR_ZIPF_EXPONENT for rank in range(len(authors))])
+
+        labels = Label.objects.bulk_create([
+            Label(repository=repo, external_id=f"synthetic:{repo.id}:{i}", name=label, color=color)
+            for i, (label, color, _) in enumerate(LABELS)
+        ])
+        label_choice = _WeightedChoice(list(zip(labels, LABELS)), [weight for _, _, weight in LABELS])
+
+        # --- Issues: abertura uniforme na linha do tempo, fechamento com atraso log-normal ---
+        issue_start = _reserve_ids(Issue, issues)
+        issue_created = sorted(start + timedelta(seconds=rng.random() * span) for _ in range(issues))
+        issue_labels = []
+
+        def _issue_rows():
+            for number in range(1, issues + 1):
+                created_at = issue_created[number - 1]
+                author_id = author_choice.pick(rng)[0]
+                closed_at = None
+                closed_by = None
+                if rng.random() < 0.8:
+                    closed_at = created_at + timedelta(hours=rng.lognormvariate(3, 1.8))
+                    if closed_at > end:
+                        closed_at = None
+                    else:
+                        closed_by = author_choice.pick(rng)[0]
+                comments = int(rng.expovariate(1 / 4))
+                first_response = created_at + timedelta(hours=rng.lognormvariate(1.5, 1.5)) if comments else None
+                updated_at = max(filter(None, [created_at, closed_at, first_response]))
+                chosen = {label_choice.pick(rng) for _ in range(rng.choice([0, 1, 1, 1, 2, 2, 3]))}
+                issue_id = issue_start + number - 1
+                issue_labels.extend((issue_id, label.id) for label, _ in chosen)
+                yield (
+                    issue_id, repo.id, f"synthetic:{repo.id}:{number}", number,
+                    f"{rng.choice(_ISSUE_KINDS)} {rng.choice(_ISSUE_ACTIONS)} ({rng.choice(_OBJECTS)})",
+                    f"Passos para reproduzir: {rng.choice(_ISSUE_ACTIONS)}.",
+                    'closed' if closed_at else 'open', created_at.isoformat(), updated_at.isoformat(),
+                    closed_at.isoformat() if closed_at else None,
+                    json.dumps(sorted(label_data[0] for _, label_data in chosen)),
+                    comments, 'f', f"https://example.invalid/{repo.full_name}/issues/{number}",
+                    end.isoformat(), author_id, closed_by,
+                    first_response.isoformat() if first_response and first_response < end else None,
+                )
+
+        counts['issues'] = _copy_rows(Issue, [
+            'id', 'repository_id', 'external_id', 'number', 'title', 'body', 'state', 'created_at_git',
+            'updated_at_git', 'closed_at_git', 'labels', 'comments_count', 'is_pull_request', 'web_url',
+            'synced_at', 'author_id', 'closed_by_id', 'first_response_at',
+        ], _issue_rows(), chunk_size)
+        start_id = _reserve_ids(IssueLabel, len(issue_labels))
+        counts['issue_labels'] = _copy_rows(IssueLabel, ['id', 'issue_id', 'label_id'], (
+            (start_id + n, issue_id, label_id) for n, (issue_id, label_id) in enumerate(issue_labels)
+        ), chunk_size)
+        del issue_labels
+
+        # --- Commits: linha principal + ramos com merge, autores em lei de potência ---
+        topology = _commit_graph(rng, commits)
+        commit_start = _reserve_ids(Commit, commits)
+        shas = [hashlib.sha1(f"{seed}:{index}:{i}".encode()).hexdigest() for i in range(commits)]
+        generations = []
+        commit_issue_links = []
+        step = span / max(commits, 1)
+
+        def _commit_rows():
+            for i, parent_indexes in enumerate(topology):
+                generation = 1 + max((generations[p] for p in parent_indexes), default=0)
+                generations.append(generation)
+                date = start + timedelta(seconds=step * i + rng.random() * step)
+                author_id, author_identity = author_choice.pick(rng)
+                if len(parent_indexes) > 1:
+                    message = f"Merge branch 'feature/{rng.choice(_OBJECTS).replace(' ', '-')}-{i}'"
+                else:
+                    message = f"{rng.choice(_VERBS)} {rng.choice(_OBJECTS)}"
+                    # Cerca de 1/4 dos commits referenciam uma issue já aberta nessa data
+                    opened = bisect(issue_created, date)
+                    if opened and rng.random() < 0.25:
+                        number = rng.randint(max(1, opened - 200), opened)
+                        message += f" (fixes #{number})"
+                        commit_issue_links.append((commit_start + i, issue_start + number - 1))
+                additions = int(rng.lognormvariate(2.5, 1.5))
+                deletions = int(rng.lognormvariate(2, 1.5))
+                yield (
+                    commit_start + i, repo.id, shas[i], shas[i][:7], message, date.isoformat(), date.isoformat(),
+                    additions, deletions, additions + deletions, json.dumps([shas[p] for p in parent_indexes]),
+                    'False', 'unsigned', f"https://example.invalid/{repo.full_name}/commit/{shas[i]}",
+                    end.isoformat(), author_id, author_id, author_identity, author_identity, generation,
+                )
+
+        counts['commits'] = _copy_rows(Commit, [
+            'id', 'repository_id', 'sha', 'short_sha', 'message', 'author_date_git', 'committer_date_git',
+            'additions', 'deletions', 'total_changes', 'parents_shas', 'verification_status',
+            'verification_reason', 'web_url', 'synced_at', 'author_id', 'committer_id',
+            'author_identity_id', 'committer_identity_id', 'generation',
+        ], _commit_rows(), chunk_size)
+
+        edge_count = sum(len(parent_indexes) for parent_indexes in topology)
+        edge_start = _reserve_ids(CommitParent, edge_count)
+        counts['commit_parents'] = _copy_rows(CommitParent,
+                                              ['id', 'commit_id', 'parent_id', 'parent_sha', 'position'], (
+            (edge_start + n, commit_start + i, commit_start + parent, shas[parent], position)
+            for n, (i, position, parent) in enumerate(
+                (i, position, parent)
+                for i, parent_indexes in enumerate(topology)
+                for position, parent in enumerate(parent_indexes)
+            )
+        ), chunk_size)
+
+        CommitIssues = Commit.issues.through
+        link_start = _reserve_ids(CommitIssues, len(commit_issue_links))
+        counts['commit_issues'] = _copy_rows(CommitIssues, ['id', 'commit_id', 'issue_id'], (
+            (link_start + n, commit_id, issue_id) for n, (commit_id, issue_id) in enumerate(commit_issue_links)
+        ), chunk_size)
+
+        repo.open_issues_count = Issue.objects.filter(repository=repo, state='open').count()
+        repo.last_sync_issues_at = repo.last_sync_commits_at = end
+        repo.save(update_fields=['open_issues_count', 'last_sync_issues_at', 'last_sync_commits_at'])
+    return repo, counts
+
+
+def generate_synthetic_dataset(repos=1, scale=1.0, seed=42, years=5, replace=False, chunk_size=COPY_CHUNK_SIZE):
+    """
+    Gera `repos` repositórios sintéticos determinísticos (mesma semente = mesmos dados).
+    `scale` multiplica os tamanhos base por repositório (BASE_COMMITS, BASE_ISSUES) e o
+    conjunto de usuários compartilhado (BASE_USERS). Ao final roda ANALYZE nas tabelas
+    afetadas para que o planejador enxergue os volumes novos. Retorna [(repositório, {tabela: linhas}, segundos)].
+    """
+    commits = max(int(BASE_COMMITS * scale), 1)
+    issues = max(int(BASE_ISSUES * scale), 1)
+    users = max(int(BASE_USERS * scale), 1)
+
+    names = [f"{SYNTHETIC_OWNER}/repo-{seed}-{index}" for index in range(repos)]
+    existing = Repositorio.objects.filter(full_name__in=names)
+    if existing.exists():
+        if not replace:
+            raise ValueError(f"Já existem repositórios sintéticos para a semente {seed}; use --replace (replace=True) para recriá-los.")
+        for repo in existing:
+            delete_repository(repo)
+
+    user_pool = ensure_synthetic_users(users, seed)
+    results = []
+    for index in range(repos):
+        started = time.perf_counter()
+        repo, counts = generate_repository(index, commits, issues, user_pool, seed, years=years, chunk_size=chunk_size)
+        results.append((repo, counts, time.perf_counter() - started))
+
+    with connection.cursor() as cursor:
+        for model in (GitUser, Identity, Issue, IssueLabel, Commit, CommitParent, Commit.issues.through):
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+    return results
@@ -5,16 +5,79 @@ from core.models import Repositorio
 from core.services.git_sync import (
     sync_repository_metadata, 
     sync_repository_issues,
-    sync_repository_commits
+    sync_repository_commits,
+    import_owner_repositories,
+    refresh_repositories_metadata,
+    sync_repository_pull_requests,
+    sync_repository_issue_comments,
+    sync_repository_branches,
+    sync_commit_files
 )
+from core.services import sync_locks
+from core.services.parquet_export import EXPORT_BATCH_SIZE, export_to_parquet
+from core.services.profiling import run_profiled_sync
 from datetime import datetime
 from django.utils import timezone
 
 # Se você precisar de outras tarefas, importe também:
 # from celery.schedules import crontab # Para agendamento mais complexo
 
+# Filas dedicadas (ver CELERY_TASK_QUEUES em settings.py):
+# - metadata: atualizações rápidas de metadados
+# - incremental: sincronizações incrementais de issues/commits
+# - backfill: sincronizações completas (longas), em workers separados
+QUEUE_METADATA = 'metadata'
+QUEUE_INCREMENTAL = 'incremental'
+QUEUE_BACKFILL = 'backfill'
 
-@shared_task(bind=True, default_retry_delay=300, max_retries=5)
+# Prioridades dentro de cada fila (no Redis, 0 = mais alta, 9 = mais baixa)
+PRIORITY_METADATA = 0
+PRIORITY_INCREMENTAL = 3
+PRIORITY_BACKFILL = 7
+
+# Intervalo para tentar de novo um backfill que encontrou outra sincronização em andamento
+LOCK_BUSY_RETRY_DELAY = 120
+
+
+def _sync_queue(resource, backfill=False):
+    """Retorna a (fila, prioridade) adequada para um recurso/tipo de sincronização."""
+    if resource == 'metadata':
+        return QUEUE_METADATA, PRIORITY_METADATA
+    if backfill:
+        return QUEUE_BACKFILL, PRIORITY_BACKFILL
+    return QUEUE_INCREMENTAL, PRIORITY_INCREMENTAL
+
+
+def enqueue_repo_sync(task, repo_id, resource, backfill=False, **kwargs):
+    """
+    Enfileira uma tarefa de sincronização na fila/prioridade corretas.
+    Se já houver uma tarefa equivalente (mesmo repositório, recurso e fila) aguardando,
+    o novo enfileiramento é descartado e a função retorna False.
+    """
+    queue, priority = _sync_queue(resource, backfill)
+    dedup_resource = f"{resource}:{queue}"
+    if not sync_locks.mark_enqueued(repo_id, dedup_resource):
+        return False
+    try:
+        task.apply_async(args=(repo_id,), kwargs=kwargs, queue=queue, priority=priority)
+    except Exception:
+        # Se o broker falhar, libera a marca para permitir uma nova tentativa
+        sync_locks.clear_enqueued(repo_id, dedup_resource)
+        raise
+    return True
+
+
+def _enqueue_after_commits(repo_id, full_sync=False):
+    """
+    Enfileira as sincronizações que dependem dos commits já gravados, ao fim de cada
+    sincronização de commits: pull requests (vínculo dos PRs mergeados aos commits) e
+    branches (commits das demais branches e associação branch <-> commit).
+    """
+    enqueue_repo_sync(sync_pull_request_task, repo_id, 'pulls', backfill=full_sync, full_sync=full_sync)
+    enqueue_repo_sync(sync_branches_task, repo_id, 'branches')
+
+
+@shared_task(bind=True, default_retry_delay=300, max_retries=5, acks_late=True, ignore_result=True)
 def sync_repo_metadata_task(self, repo_id: int):
     """
     Tarefa Celery para sincronizar os metadados gerais de um repositório
@@ -23,39 +86,49 @@ def sync_repo_metadata_task(self, repo_id: int):
     Args:
         repo_id (int): O ID primário (pk) do objeto Repositorio a ser sincronizado.
     """
-    try:
-        # Tenta obter a instância do Repositório pelo ID
-        repo = Repositorio.objects.get(id=repo_id)
-        print(f"Iniciando sincronização de metadados para o repositório ID: {repo_id} ({repo.full_name})...")
+    queue, _ = _sync_queue('metadata', backfill=False)
+    sync_locks.clear_enqueued(repo_id, f"metadata:{queue}")
 
-        # Chama a função de serviço que lida com a lógica de API e atualização do DB
-        sync_repository_metadata(repo)
+    # Impede que duas sincronizações do mesmo recurso rodem ao mesmo tempo para o mesmo repositório
+    with sync_locks.repo_sync_lock(repo_id, 'metadata') as acquired:
+        if not acquired:
+            print(f"Sincronização de metadados para o repositório ID {repo_id} já em andamento. Tarefa ignorada.")
+            return f"Sincronização de metadados já em andamento para o repositório ID {repo_id}."
 
-        print(f"Sincronização de metadados para '{repo.full_name}' concluída com sucesso.")
+        try:
+            # Tenta obter a instância do Repositório pelo ID
+            repo = Repositorio.objects.get(id=repo_id)
+            print(f"Iniciando sincronização de metadados para o repositório ID: {repo_id} ({repo.full_name})...")
 
-    except Repositorio.DoesNotExist:
-        # Se o repositório não for encontrado, significa que foi deletado ou o ID está errado.
-        print(f"Erro: Repositório com ID {repo_id} não encontrado no banco de dados. Tarefa ignorada.")
-        # Não tenta novamente, pois o objeto não existe.
-        return f"Repositório com ID {repo_id} não encontrado."
+            # Chama a função de serviço que lida com a lógica de API e atualização do DB
+            sync_repository_metadata(repo)
 
-    except Exception as e:
-        # Captura qualquer outra exceção que possa ocorrer durante a execução da tarefa
-        print(f"Erro inesperado na tarefa sync_repo_metadata_task para repo ID {repo_id}: {e}")
-        # Logar o erro completo para depuração (e.g., com Sentry)
+            print(f"Sincronização de metadados para '{repo.full_name}' concluída com sucesso.")
 
-        # Re-tenta a tarefa se houver um erro, para resiliência contra falhas temporárias de rede/API.
-        try:
-            print(f"Tentando novamente a tarefa sync_repo_metadata_task para repo ID {repo_id}...")
-            self.retry(exc=e) # `exc=e` passa a exceção original para o log do retry
-        except self.MaxRetriesExceededError:
-            print(f"Limite de tentativas excedido para sync_repo_metadata_task (repo ID: {repo_id}).")
-            # Aqui você pode enviar uma notificação final de falha.
-            return f"Falha após múltiplas tentativas para o repositório ID {repo_id}."
+        except Repositorio.DoesNotExist:
+            # Se o repositório não for encontrado, significa que foi deletado ou o ID está errado.
+            print(f"Erro: Repositório com ID {repo_id} não encontrado no banco de dados. Tarefa ignorada.")
+            # Não tenta novamente, pois o objeto não existe.
+            return f"Repositório com ID {repo_id} não encontrado."
+
+        except Exception as e:
+            # Captura qualquer outra exceção que possa ocorrer durante a execução da tarefa
+            print(f"Erro inesperado na tarefa sync_repo_metadata_task para repo ID {repo_id}: {e}")
+            # Logar o erro completo para depuração (e.g., com Sentry)
+
+            # Re-tenta a tarefa se houver um erro, para resiliência contra falhas temporárias de rede/API.
+            try:
+                print(f"Tentando novamente a tarefa sync_repo_metadata_task para repo ID {repo_id}...")
+                self.retry(exc=e) # `exc=e` passa a exceção original para o log do retry
+            except self.MaxRetriesExceededError:
+                print(f"Limite de tentativas excedido para sync_repo_metadata_task (repo ID: {repo_id}).")
+                # Aqui você pode enviar uma notificação final de falha.
+                return f"Falha após múltiplas tentativas para o repositório ID {repo_id}."
 
 
-@shared_task(bind=True, default_retry_delay=300, max_retries=5)
-def sync_issue_metadata_task(self, repo_id: int, state: str = 'all', since_datetime_str: str = None, full_sync: bool = False):
+@shared_task(bind=True, default_retry_delay=300, max_retries=5, acks_late=True, ignore_result=True)
+def sync_issue_metadata_task(self, repo_id: int, state: str = 'all', since_datetime_str: str = None, full_sync: bool = False,
+                             profile: bool = False, profiler: str = 'sample'):
     """
     Tarefa Celery para sincronizar issues de um repositório,
     com filtros de estado e data de atualização.
@@ -67,56 +140,80 @@ def sync_issue_metadata_task(self, repo_id: int, state: str = 'all', since_datet
                                   ATUALIZADAS a partir dessa data.
         full_sync (bool): Se True, ignora `last_sync_issues_at` e `since_datetime_str`
                           para uma sincronização completa (ignora filtro de data).
+        profile (bool): Se True, roda sob o profiler e grava o artefato e o resumo em um SyncRun.
+        profiler (str): 'sample' (amostragem, baixo custo) ou 'cprofile' (determinístico).
     """
-    try:
-        repo = Repositorio.objects.get(id=repo_id)
-        print(f"Iniciando sincronização de issues para o repositório ID: {repo_id} ({repo.full_name})...")
-        print(f"Filtros aplicados: estado='{state}', desde='{since_datetime_str}', full_sync={full_sync}")
-
-        # --- Lógica para determinar o 'since_datetime' efetivo ---
-        effective_since_datetime = None
-        if full_sync:
-            # Se full_sync for True, ignore qualquer data e faça uma sincronização completa.
+    queue, _ = _sync_queue('issues', backfill=full_sync)
+    sync_locks.clear_enqueued(repo_id, f"issues:{queue}")
+
+    # Impede que duas sincronizações do mesmo recurso rodem ao mesmo tempo para o mesmo repositório
+    with sync_locks.repo_sync_lock(repo_id, 'issues') as acquired:
+        if not acquired:
+            if full_sync:
+                # Backfills não podem ser descartados: tenta novamente mais tarde
+                print(f"Sincronização de issues para o repositório ID {repo_id} já em andamento. Reagendando backfill...")
+                raise self.retry(countdown=LOCK_BUSY_RETRY_DELAY, max_retries=None)
+            print(f"Sincronização de issues para o repositório ID {repo_id} já em andamento. Tarefa ignorada.")
+            return f"Sincronização de issues já em andamento para o repositório ID {repo_id}."
+
+        try:
+            repo = Repositorio.objects.get(id=repo_id)
+            print(f"Iniciando sincronização de issues para o repositório ID: {repo_id} ({repo.full_name})...")
+            print(f"Filtros aplicados: estado='{state}', desde='{since_datetime_str}', full_sync={full_sync}")
+
+            # --- Lógica para determinar o 'since_datetime' efetivo ---
             effective_since_datetime = None
-        elif since_datetime_str:
-            # Se 'since_datetime_str' for fornecido, use-o (convertendo de volta para datetime).
-            try:
-                # O .replace('Z', '+00:00') é para garantir compatibilidade com `datetime.fromisoformat`
-                # para strings ISO 8601 que terminam com 'Z' (Zulu time / UTC).
-                effective_since_datetime = datetime.fromisoformat(since_datetime_str.replace('Z', '+00:00'))
-            except ValueError:
-                print(f"Aviso: Formato de data 'since_datetime_str' inválido: {since_datetime_str}. Ignorando filtro de data.")
+            if full_sync:
+                # Se full_sync for True, ignore qualquer data e faça uma sincronização completa.
                 effective_since_datetime = None
-        else:
-            # Se nenhum filtro explícito de data e nem full_sync, use a última data de sincronização do repositório.
-            effective_since_datetime = repo.last_sync_issues_at
-        # --- Fim da lógica 'since_datetime' ---
+            elif since_datetime_str:
+                # Se 'since_datetime_str' for fornecido, use-o (convertendo de volta para datetime).
+                try:
+                    # O .replace('Z', '+00:00') é para garantir compatibilidade com `datetime.fromisoformat`
+                    # para strings ISO 8601 que terminam com 'Z' (Zulu time / UTC).
+                    effective_since_datetime = datetime.fromisoformat(since_datetime_str.replace('Z', '+00:00'))
+                except ValueError:
+                    print(f"Aviso: Formato de data 'since_datetime_str' inválido: {since_datetime_str}. Ignorando filtro de data.")
+                    effective_since_datetime = None
+            else:
+                # Se nenhum filtro explícito de data e nem full_sync, use a última data de sincronização do repositório.
+                effective_since_datetime = repo.last_sync_issues_at
+            # --- Fim da lógica 'since_datetime' ---
 
-        # Chama a função de service, passando os argumentos de filtro
-        sync_repository_issues(repo, state=state, since_datetime=effective_since_datetime)
+            # Chama a função de service, passando os argumentos de filtro
+            if profile:
+                run = run_profiled_sync(
+                    repo, 'issues', sync_repository_issues, profiler=profiler,
+                    options={'state': state, 'since': str(effective_since_datetime), 'full_sync': full_sync},
+                    state=state, since_datetime=effective_since_datetime,
+                )
+                print(f"Profiling da sincronização de issues gravado no SyncRun {run.id} ({run.profile_file.name}).")
+            else:
+                sync_repository_issues(repo, state=state, since_datetime=effective_since_datetime)
 
-        print(f"Sincronização de issues para '{repo.full_name}' concluída com sucesso.")
+            print(f"Sincronização de issues para '{repo.full_name}' concluída com sucesso.")
 
-    except Repositorio.DoesNotExist:
-        # Se o repositório não for encontrado, significa que foi deletado ou o ID está errado.
-        print(f"Erro: Repositório com ID {repo_id} não encontrado no banco de dados. Tarefa ignorada.")
-        return f"Repositório com ID {repo_id} não encontrado."
+        except Repositorio.DoesNotExist:
+            # Se o repositório não for encontrado, significa que foi deletado ou o ID está errado.
+            print(f"Erro: Repositório com ID {repo_id} não encontrado no banco de dados. Tarefa ignorada.")
+            return f"Repositório com ID {repo_id} não encontrado."
 
-    except Exception as e:
-        # Captura qualquer outra exceção que possa ocorrer durante a execução da tarefa
-        print(f"Erro inesperado na tarefa sync_issue_metadata_task para repo ID {repo_id}: {e}")
-        # Re-tenta a tarefa se houver um erro, para resiliência contra falhas temporárias de rede/API.
-        try:
-            print(f"Tentando novamente a tarefa sync_issue_metadata_task para repo ID {repo_id}...")
-            self.retry(exc=e)
-        except self.MaxRetriesExceededError:
-            print(f"Limite de tentativas excedido para sync_issue_metadata_task (repo ID: {repo_id}).")
-            # Aqui você pode enviar uma notificação final de falha.
-            return f"Falha após múltiplas tentativas para o repositório ID {repo_id}."
+        except Exception as e:
+            # Captura qualquer outra exceção que possa ocorrer durante a execução da tarefa
+            print(f"Erro inesperado na tarefa sync_issue_metadata_task para repo ID {repo_id}: {e}")
+            # Re-tenta a tarefa se houver um erro, para resiliência contra falhas temporárias de rede/API.
+            try:
+                print(f"Tentando novamente a tarefa sync_issue_metadata_task para repo ID {repo_id}...")
+                self.retry(exc=e)
+            except self.MaxRetriesExceededError:
+                print(f"Limite de tentativas excedido para sync_issue_metadata_task (repo ID: {repo_id}).")
+                # Aqui você pode enviar uma notificação final de falha.
+                return f"Falha após múltiplas tentativas para o repositório ID {repo_id}."
 
 
-@shared_task(bind=True, default_retry_delay=300, max_retries=5)
-def sync_commit_metadata_task(self, repo_id: int, since_datetime_str: str = None, until_datetime_str: str = None, full_sync: bool = False):
+@shared_task(bind=True, default_retry_delay=300, max_retries=5, acks_late=True, ignore_result=True)
+def sync_commit_metadata_task(self, repo_id: int, since_datetime_str: str = None, until_datetime_str: str = None, full_sync: bool = False,
+                              profile: bool = False, profiler: str = 'sample'):
     """
     Tarefa Celery para sincronizar commits de um repositório,
     com filtros de data de criação (since e until).
@@ -127,58 +224,344 @@ def sync_commit_metadata_task(self, repo_id: int, since_datetime_str: str = None
         until_datetime_str (str): String ISO 8601 da data/hora para buscar commits feitos até esta data.
         full_sync (bool): Se True, ignora `last_sync_commits_at` e `since_datetime_str`
                           para uma sincronização completa.
+        profile (bool): Se True, roda sob o profiler e grava o artefato e o resumo em um SyncRun.
+        profiler (str): 'sample' (amostragem, baixo custo) ou 'cprofile' (determinístico).
     """
-    try:
-        repo = Repositorio.objects.get(id=repo_id)
-        print(f"Iniciando sincronização de commits para o repositório ID: {repo_id} ({repo.full_name})...")
-        print(f"Filtros aplicados: desde='{since_datetime_str}', até='{until_datetime_str}', full_sync={full_sync}")
-
-        # --- Lógica para determinar o 'since_datetime' efetivo ---
-        effective_since_datetime = None
-        if full_sync:
-            effective_since_datetime = None # Força sincronização completa (ignora data de início)
-        elif since_datetime_str:
+    queue, _ = _sync_queue('commits', backfill=full_sync)
+    sync_locks.clear_enqueued(repo_id, f"commits:{queue}")
+
+    # Impede que duas sincronizações do mesmo recurso rodem ao mesmo tempo para o mesmo repositório
+    with sync_locks.repo_sync_lock(repo_id, 'commits') as acquired:
+        if not acquired:
+            if full_sync:
+                # Backfills não podem ser descartados: tenta novamente mais tarde
+                print(f"Sincronização de commits para o repositório ID {repo_id} já em andamento. Reagendando backfill...")
+                raise self.retry(countdown=LOCK_BUSY_RETRY_DELAY, max_retries=None)
+            print(f"Sincronização de commits para o repositório ID {repo_id} já em andamento. Tarefa ignorada.")
+            return f"Sincronização de commits já em andamento para o repositório ID {repo_id}."
+
+        try:
+            repo = Repositorio.objects.get(id=repo_id)
+            print(f"Iniciando sincronização de commits para o repositório ID: {repo_id} ({repo.full_name})...")
+            print(f"Filtros aplicados: desde='{since_datetime_str}', até='{until_datetime_str}', full_sync={full_sync}")
+
+            # --- Lógica para determinar o 'since_datetime' efetivo ---
+            effective_since_datetime = None
+            if full_sync:
+                effective_since_datetime = None # Força sincronização completa (ignora data de início)
+            elif since_datetime_str:
+                try:
+                    effective_since_datetime = datetime.fromisoformat(since_datetime_str.replace('Z', '+00:00'))
+                except ValueError:
+                    print(f"Aviso: Formato de data 'since_datetime_str' inválido: {since_datetime_str}. Ignorando filtro de data de início.")
+                    effective_since_datetime = None
+            else:
+                # Se nenhum filtro explícito de data de início e nem full_sync, use a última data de sincronização do repositório.
+                # Isso permite sincronização incremental padrão.
+                effective_since_datetime = repo.last_sync_commits_at
+            # --- Fim da lógica 'since_datetime' ---
+
+            # --- Lógica para determinar o 'until_datetime' efetivo ---
+            effective_until_datetime = None
+            if until_datetime_str:
+                try:
+                    effective_until_datetime = datetime.fromisoformat(until_datetime_str.replace('Z', '+00:00'))
+                except ValueError:
+                    print(f"Aviso: Formato de data 'until_datetime_str' inválido: {until_datetime_str}. Ignorando filtro de data de fim.")
+                    effective_until_datetime = None
+            # Se 'until_datetime_str' for None, o service buscará commits até o momento da execução, o que é o padrão.
+            # --- Fim da lógica 'until_datetime' ---
+
+
+            # Chama a função de service, passando os argumentos de filtro
+            if profile:
+                run = run_profiled_sync(
+                    repo, 'commits', sync_repository_commits, profiler=profiler,
+                    options={'since': str(effective_since_datetime), 'until': str(effective_until_datetime), 'full_sync': full_sync},
+                    since_datetime=effective_since_datetime, until_datetime=effective_until_datetime,
+                )
+                print(f"Profiling da sincronização de commits gravado no SyncRun {run.id} ({run.profile_file.name}).")
+            else:
+                sync_repository_commits(
+                    repo,
+                    since_datetime=effective_since_datetime,
+                    until_datetime=effective_until_datetime
+                )
+
+            print(f"Sincronização de commits para '{repo.full_name}' concluída com sucesso.")
+
+        except Repositorio.DoesNotExist:
+            print(f"Erro: Repositório com ID {repo_id} não encontrado no banco de dados. Tarefa ignorada.")
+            return f"Repositório com ID {repo_id} não encontrado."
+
+        except Exception as e:
+            print(f"Erro inesperado na tarefa sync_commit_metadata_task para repo ID {repo_id}: {e}")
             try:
-                effective_since_datetime = datetime.fromisoformat(since_datetime_str.replace('Z', '+00:00'))
-            except ValueError:
-                print(f"Aviso: Formato de data 'since_datetime_str' inválido: {since_datetime_str}. Ignorando filtro de data de início.")
-                effective_since_datetime = None
-        else:
-            # Se nenhum filtro explícito de data de início e nem full_sync, use a última data de sincronização do repositório.
-            # Isso permite sincronização incremental padrão.
-            effective_since_datetime = repo.last_sync_commits_at
-        # --- Fim da lógica 'since_datetime' ---
-
-        # --- Lógica para determinar o 'until_datetime' efetivo ---
-        effective_until_datetime = None
-        if until_datetime_str:
+                print(f"Tentando novamente a tarefa sync_commit_metadata_task para repo ID {repo_id}...")
+                self.retry(exc=e)
+            except self.MaxRetriesExceededError:
+                print(f"Limite de tentativas excedido para sync_commit_metadata_task (repo ID: {repo_id}).")
+                return f"Falha após múltiplas tentativas para o repositório ID {repo_id}."
+
+    # Só depois de soltar o lock de commits (as tarefas seguintes podem usar o mesmo lock)
+    _enqueue_after_commits(repo_id, full_sync=full_sync)
+
+
+@shared_task(bind=True, default_retry_delay=300, max_retries=5, acks_late=True, ignore_result=True)
+def import_owner_repositories_task(self, owner: str, owner_type: str = 'org'):
+    """
+    Tarefa Celery para descobrir e importar em lote todos os repositórios
+    de uma organização ou usuário do GitHub.
+
+    Args:
+        owner (str): Login da organização ou do usuário.
+        owner_type (str): 'org' para `/orgs/{org}/repos` ou 'user' para `/users/{user}/repos`.
+    """
+    with sync_locks.repo_sync_lock(f"{owner_type}:{owner}", 'import') as acquired:
+        if not acquired:
+            print(f"Importação de repositórios de {owner} já em andamento. Tarefa ignorada.")
+            return f"Importação de repositórios de {owner} já em andamento."
+
+        try:
+            created, updated = import_owner_repositories(owner, owner_type=owner_type)
+            print(f"Importação de repositórios de {owner} concluída: {created} criados, {updated} atualizados.")
+
+        except Exception as e:
+            print(f"Erro inesperado na tarefa import_owner_repositories_task para {owner}: {e}")
+            try:
+                print(f"Tentando novamente a tarefa import_owner_repositories_task para {owner}...")
+                self.retry(exc=e)
+            except self.MaxRetriesExceededError:
+                print(f"Limite de tentativas excedido para import_owner_repositories_task ({owner}).")
+                return f"Falha após múltiplas tentativas para importar os repositórios de {owner}."
+
+
+@shared_task(bind=True, default_retry_delay=300, max_retries=5, acks_late=True, ignore_result=True)
+def refresh_all_repositories_metadata_task(self):
+    """
+    Tarefa Celery (ideal para o Celery Beat) que atualiza estrelas, forks, issues abertas
+    e demais metadados de TODOS os repositórios ativos do GitHub, em lotes de ~100
+    repositórios por requisição GraphQL.
+    """
+    with sync_locks.repo_sync_lock('all', 'metadata-batch') as acquired:
+        if not acquired:
+            print("Atualização em lote de metadados já em andamento. Tarefa ignorada.")
+            return "Atualização em lote de metadados já em andamento."
+
+        try:
+            repos = Repositorio.objects.filter(active=True, platform='github').order_by('id')
+            changed, requests_count = refresh_repositories_metadata(repos)
+            print(f"Atualização em lote de metadados concluída: {changed} repositórios alterados em {requests_count} requisições.")
+
+        except Exception as e:
+            print(f"Erro inesperado na tarefa refresh_all_repositories_metadata_task: {e}")
+            try:
+                print("Tentando novamente a tarefa refresh_all_repositories_metadata_task...")
+                self.retry(exc=e)
+            except self.MaxRetriesExceededError:
+                print("Limite de tentativas excedido para refresh_all_repositories_metadata_task.")
+                return "Falha após múltiplas tentativas na atualização em lote de metadados."
+
+
+@shared_task(bind=True, default_retry_delay=300, max_retries=5, acks_late=True, ignore_result=True)
+def sync_pull_request_task(self, repo_id: int, full_sync: bool = False):
+    """
+    Tarefa Celery para sincronizar os pull requests de um repositório de forma incremental
+    (apenas os atualizados desde `last_sync_pulls_at`), vinculando os PRs mergeados aos commits.
+
+    Args:
+        repo_id (int): O ID primário (pk) do objeto Repositorio a ser sincronizado.
+        full_sync (bool): Se True, ignora `last_sync_pulls_at` e percorre todos os pull requests.
+    """
+    queue, _ = _sync_queue('pulls', backfill=full_sync)
+    sync_locks.clear_enqueued(repo_id, f"pulls:{queue}")
+
+    # Impede que duas sincronizações do mesmo recurso rodem ao mesmo tempo para o mesmo repositório
+    with sync_locks.repo_sync_lock(repo_id, 'pulls') as acquired:
+        if not acquired:
+            if full_sync:
+                # Backfills não podem ser descartados: tenta novamente mais tarde
+                print(f"Sincronização de pull requests para o repositório ID {repo_id} já em andamento. Reagendando backfill...")
+                raise self.retry(countdown=LOCK_BUSY_RETRY_DELAY, max_retries=None)
+            print(f"Sincronização de pull requests para o repositório ID {repo_id} já em andamento. Tarefa ignorada.")
+            return f"Sincronização de pull requests já em andamento para o repositório ID {repo_id}."
+
+        try:
+            repo = Repositorio.objects.get(id=repo_id)
+            print(f"Iniciando sincronização de pull requests para o repositório ID: {repo_id} ({repo.full_name})...")
+
+            since_datetime = None if full_sync else repo.last_sync_pulls_at
+            sync_repository_pull_requests(repo, since_datetime=since_datetime)
+
+            print(f"Sincronização de pull requests para '{repo.full_name}' concluída com sucesso.")
+
+        except Repositorio.DoesNotExist:
+            print(f"Erro: Repositório com ID {repo_id} não encontrado no banco de dados. Tarefa ignorada.")
+            return f"Repositório com ID {repo_id} não encontrado."
+
+        except Exception as e:
+            print(f"Erro inesperado na tarefa sync_pull_request_task para repo ID {repo_id}: {e}")
             try:
-                effective_until_datetime = datetime.fromisoformat(until_datetime_str.replace('Z', '+00:00'))
-            except ValueError:
-                print(f"Aviso: Formato de data 'until_datetime_str' inválido: {until_datetime_str}. Ignorando filtro de data de fim.")
-                effective_until_datetime = None
-        # Se 'until_datetime_str' for None, o service buscará commits até o momento da execução, o que é o padrão.
-        # --- Fim da lógica 'until_datetime' ---
+                print(f"Tentando novamente a tarefa sync_pull_request_task para repo ID {repo_id}...")
+                self.retry(exc=e)
+            except self.MaxRetriesExceededError:
+                print(f"Limite de tentativas excedido para sync_pull_request_task (repo ID: {repo_id}).")
+                return f"Falha após múltiplas tentativas para o repositório ID {repo_id}."
 
 
-        # Chama a função de service, passando os argumentos de filtro
-        sync_repository_commits(
-            repo,
-            since_datetime=effective_since_datetime,
-            until_datetime=effective_until_datetime
-        )
+@shared_task(bind=True, default_retry_delay=300, max_retries=5, acks_late=True, ignore_result=True)
+def sync_issue_comments_task(self, repo_id: int, full_sync: bool = False):
+    """
+    Tarefa Celery para sincronizar os comentários das issues de um repositório de forma incremental
+    (apenas os atualizados desde `last_sync_comments_at`), recalculando a primeira resposta das issues.
 
-        print(f"Sincronização de commits para '{repo.full_name}' concluída com sucesso.")
+    Args:
+        repo_id (int): O ID primário (pk) do objeto Repositorio a ser sincronizado.
+        full_sync (bool): Se True, ignora `last_sync_comments_at` e baixa todos os comentários.
+    """
+    queue, _ = _sync_queue('comments', backfill=full_sync)
+    sync_locks.clear_enqueued(repo_id, f"comments:{queue}")
 
-    except Repositorio.DoesNotExist:
-        print(f"Erro: Repositório com ID {repo_id} não encontrado no banco de dados. Tarefa ignorada.")
-        return f"Repositório com ID {repo_id} não encontrado."
+    # Impede que duas sincronizações do mesmo recurso rodem ao mesmo tempo para o mesmo repositório
+    with sync_locks.repo_sync_lock(repo_id, 'comments') as acquired:
+        if not acquired:
+            if full_sync:
+                # Backfills não podem ser descartados: tenta novamente mais tarde
+                print(f"Sincronização de comentários para o repositório ID {repo_id} já em andamento. Reagendando backfill...")
+                raise self.retry(countdown=LOCK_BUSY_RETRY_DELAY, max_retries=None)
+            print(f"Sincronização de comentários para o repositório ID {repo_id} já em andamento. Tarefa ignorada.")
+            return f"Sincronização de comentários já em andamento para o repositório ID {repo_id}."
 
-    except Exception as e:
-        print(f"Erro inesperado na tarefa sync_commit_metadata_task para repo ID {repo_id}: {e}")
         try:
-            print(f"Tentando novamente a tarefa sync_commit_metadata_task para repo ID {repo_id}...")
-            self.retry(exc=e)
-        except self.MaxRetriesExceededError:
-            print(f"Limite de tentativas excedido para sync_commit_metadata_task (repo ID: {repo_id}).")
-            return f"Falha após múltiplas tentativas para o repositório ID {repo_id}."
\ No newline at end of file
+            repo = Repositorio.objects.get(id=repo_id)
+            print(f"Iniciando sincronização de comentários para o repositório ID: {repo_id} ({repo.full_name})...")
+
+            since_datetime = None if full_sync else repo.last_sync_comments_at
+            sync_repository_issue_comments(repo, since_datetime=since_datetime)
+
+            print(f"Sincronização de comentários para '{repo.full_name}' concluída com sucesso.")
+
+        except Repositorio.DoesNotExist:
+            print(f"Erro: Repositório com ID {repo_id} não encontrado no banco de dados. Tarefa ignorada.")
+            return f"Repositório com ID {repo_id} não encontrado."
+
+        except Exception as e:
+            print(f"Erro inesperado na tarefa sync_issue_comments_task para repo ID {repo_id}: {e}")
+            try:
+                print(f"Tentando novamente a tarefa sync_issue_comments_task para repo ID {repo_id}...")
+                self.retry(exc=e)
+            except self.MaxRetriesExceededError:
+                print(f"Limite de tentativas excedido para sync_issue_comments_task (repo ID: {repo_id}).")
+                return f"Falha após múltiplas tentativas para o repositório ID {repo_id}."
+
+
+@shared_task(bind=True, default_retry_delay=300, max_retries=5, acks_late=True, ignore_result=True)
+def sync_branches_task(self, repo_id: int):
+    """
+    Tarefa Celery para sincronizar as branches de um repositório: baixa apenas os commits
+    das branches cujo head mudou e atualiza a associação branch <-> commit.
+
+    Args:
+        repo_id (int): O ID primário (pk) do objeto Repositorio a ser sincronizado.
+    """
+    queue, _ = _sync_queue('branches')
+    sync_locks.clear_enqueued(repo_id, f"branches:{queue}")
+
+    # A caminhada das branches grava commits: não pode rodar junto com outra sincronização de commits
+    with sync_locks.repo_sync_lock(repo_id, 'commits') as acquired:
+        if not acquired:
+            print(f"Sincronização de commits/branches para o repositório ID {repo_id} já em andamento. Tarefa ignorada.")
+            return f"Sincronização de commits já em andamento para o repositório ID {repo_id}."
+
+        try:
+            repo = Repositorio.objects.get(id=repo_id)
+            print(f"Iniciando sincronização de branches para o repositório ID: {repo_id} ({repo.full_name})...")
+
+            sync_repository_branches(repo)
+
+            print(f"Sincronização de branches para '{repo.full_name}' concluída com sucesso.")
+
+        except Repositorio.DoesNotExist:
+            print(f"Erro: Repositório com ID {repo_id} não encontrado no banco de dados. Tarefa ignorada.")
+            return f"Repositório com ID {repo_id} não encontrado."
+
+        except Exception as e:
+            print(f"Erro inesperado na tarefa sync_branches_task para repo ID {repo_id}: {e}")
+            try:
+                print(f"Tentando novamente a tarefa sync_branches_task para repo ID {repo_id}...")
+                self.retry(exc=e)
+            except self.MaxRetriesExceededError:
+                print(f"Limite de tentativas excedido para sync_branches_task (repo ID: {repo_id}).")
+                return f"Falha após múltiplas tentativas para o repositório ID {repo_id}."
+
+
+@shared_task(bind=True, default_retry_delay=300, max_retries=5, acks_late=True, ignore_result=True)
+def sync_commit_files_task(self, repo_id: int, limit: int = 500):
+    """
+    Tarefa Celery para baixar os arquivos alterados dos commits mais recentes que ainda não os têm.
+    Como é uma requisição por commit, roda na fila de backfill.
+
+    Args:
+        repo_id (int): O ID primário (pk) do objeto Repositorio a ser sincronizado.
+        limit (int): Número máximo de commits processados nesta execução.
+    """
+    queue, _ = _sync_queue('commit-files', backfill=True)
+    sync_locks.clear_enqueued(repo_id, f"commit-files:{queue}")
+
+    with sync_locks.repo_sync_lock(repo_id, 'commit-files') as acquired:
+        if not acquired:
+            print(f"Sincronização de arquivos de commits para o repositório ID {repo_id} já em andamento. Tarefa ignorada.")
+            return f"Sincronização de arquivos de commits já em andamento para o repositório ID {repo_id}."
+
+        try:
+            repo = Repositorio.objects.get(id=repo_id)
+            print(f"Iniciando sincronização de arquivos de commits para o repositório ID: {repo_id} ({repo.full_name})...")
+
+            sync_commit_files(repo, limit=limit)
+
+            print(f"Sincronização de arquivos de commits para '{repo.full_name}' concluída com sucesso.")
+
+        except Repositorio.DoesNotExist:
+            print(f"Erro: Repositório com ID {repo_id} não encontrado no banco de dados. Tarefa ignorada.")
+            return f"Repositório com ID {repo_id} não encontrado."
+
+        except Exception as e:
+            print(f"Erro inesperado na tarefa sync_commit_files_task para repo ID {repo_id}: {e}")
+            try:
+                print(f"Tentando novamente a tarefa sync_commit_files_task para repo ID {repo_id}...")
+                self.retry(exc=e)
+            except self.MaxRetriesExceededError:
+                print(f"Limite de tentativas excedido para sync_commit_files_task (repo ID: {repo_id}).")
+                return f"Falha após múltiplas tentativas para o repositório ID {repo_id}."
+
+
+@shared_task(bind=True, default_retry_delay=300, max_retries=5, acks_late=True, ignore_result=True)
+def export_parquet_task(self, output_dir: str, tables=('commits', 'issues', 'users'), full: bool = False,
+                        repository_ids=None, batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    Tarefa Celery para exportar commits, issues e usuários para Parquet (incremental pelo synced_at).
+    Roda na fila de backfill para não competir com as sincronizações.
+    `repository_ids` restringe a exportação a esses repositórios (sem avançar o estado incremental).
+    """
+    with sync_locks.repo_sync_lock('all', 'parquet-export') as acquired:
+        if not acquired:
+            print("Exportação Parquet já em andamento. Tarefa ignorada.")
+            return "Exportação Parquet já em andamento."
+
+        try:
+            exported = export_to_parquet(output_dir, tables=tables, repository_ids=repository_ids,
+                                         full=full, batch_size=batch_size)
+            print(f"Exportação Parquet para '{output_dir}' concluída: {exported}.")
+
+        except ImportError as e:
+            # Sem pyarrow não adianta tentar de novo
+            print(f"Erro na tarefa export_parquet_task: {e}")
+            return str(e)
+
+        except Exception as e:
+            print(f"Erro inesperado na tarefa export_parquet_task: {e}")
+            try:
+                self.retry(exc=e)
+            except self.MaxRetriesExceededError:
+                print("Limite de tentativas excedido para export_parquet_task.")
+                return "Falha após múltiplas tentativas na exportação Parquet."
@@ -0,0 +1,57 @@
+from unittest import mock
+
+from core import admin as core_admin
+from core.models import GitUser, Repositorio
+from core.tests.utils import RepositoryTestCase, commit_payload
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+
+
+class EstimatedCountPaginatorTests(RepositoryTestCase):
+    def setUp(self):
+        super().setUp()
+        GitUser.objects.bulk_create([GitUser(external_id=str(n), username=f"user{n}") for n in range(30)])
+
+    def count(self, queryset):
+        return core_admin.EstimatedCountPaginator(queryset, 10).count
+
+    def test_small_tables_are_counted_exactly(self):
+        self.assertEqual(self.count(GitUser.objects.all()), 30)
+
+    def test_large_tables_use_the_planner_estimate(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_gituser")
+        with mock.patch.object(core_admin, 'ESTIMATED_COUNT_THRESHOLD', 10), self.assertNumQueries(1):
+            self.assertEqual(self.count(GitUser.objects.all()), 30)
+        GitUser.objects.filter(username__in=['user1', 'user2']).delete()
+        with mock.patch.object(core_admin, 'ESTIMATED_COUNT_THRESHOLD', 10):
+            self.assertEqual(self.count(GitUser.objects.all()), 30) # estimativa até o próximo ANALYZE
+
+    def test_filtered_count_is_capped(self):
+        with mock.patch.object(core_admin, 'FILTERED_COUNT_LIMIT', 5):
+            self.assertEqual(self.count(GitUser.objects.filter(username__startswith='user')), 5)
+
+
+class RepositoryFilterTests(RepositoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = Repositorio.objects.create(name='other', owner='octo', full_name='octo/other')
+        self.write_commits([commit_payload(1, message="Commit do repo")])
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'senha'))
+
+    def test_changelist_filters_by_repository_and_lists_only_it(self):
+        url = reverse('admin:core_commit_changelist')
+        response = self.client.get(url, {'repository': self.repo.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Commit do repo")
+        self.assertContains(response, 'octo/repo')
+        self.assertNotContains(response, 'octo/other')
+
+        response = self.client.get(url, {'repository': self.other.id})
+        self.assertNotContains(response, "Commit do repo")
+
+    def test_repository_links_point_to_filtered_changelists(self):
+        links = core_admin.RepositorioAdmin(Repositorio, core_admin.admin.site).changelist_links(self.repo)
+        self.assertIn(f"{reverse('admin:core_issue_changelist')}?repository={self.repo.id}", links)
+        self.assertIn(f"{reverse('admin:core_commit_changelist')}?repository={self.repo.id}", links)
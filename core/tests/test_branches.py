@@ -0,0 +1,70 @@
+from unittest import mock
+
+from core.models import Branch, BranchCommit, Commit
+from core.services import git_sync
+from core.tests.utils import RepositoryTestCase, commit_payload, sha
+
+
+class FakeHistory:
+    """Responde à API de commits/branches a partir de um grafo {n: (pais)}."""
+
+    def __init__(self, graph, heads):
+        self.graph = graph
+        self.heads = heads
+        self.commit_calls = []
+
+    def ancestors(self, n):
+        pending, seen = [n], set()
+        while pending:
+            current = pending.pop()
+            if current not in seen:
+                seen.add(current)
+                pending.extend(self.graph[current])
+        return sorted(seen, reverse=True)
+
+    def fetch_repo_branches(self, owner, repo_name, page=1):
+        return [{'name': name, 'commit': {'sha': sha(head)}} for name, head in self.heads.items()]
+
+    def fetch_repo_commits(self, owner, repo_name, sha=None, page=1):
+        self.commit_calls.append(sha)
+        if page > 1:
+            return []
+        return [commit_payload(n, parents=self.graph[n]) for n in self.ancestors(int(sha, 16))]
+
+
+class BranchSyncTests(RepositoryTestCase):
+    def sync(self, history):
+        with mock.patch.multiple(git_sync.github_api, fetch_repo_branches=history.fetch_repo_branches,
+                                 fetch_repo_commits=history.fetch_repo_commits):
+            return git_sync.sync_repository_branches(self.repo)
+
+    def members(self, name):
+        return sorted(int(commit_sha, 16) for commit_sha in BranchCommit.objects.filter(
+            branch__repository=self.repo, branch__name=name).values_list('commit__sha', flat=True))
+
+    def test_only_moved_branches_are_walked(self):
+        graph = {1: (), 2: (1,), 3: (2,), 4: (2,)}
+        history = FakeHistory(graph, {'main': 3, 'feature': 4})
+        stats = self.sync(history)
+        self.assertEqual(stats['inserted'], 4) # commits compartilhados gravados uma vez só
+        self.assertEqual((self.members('main'), self.members('feature')), ([1, 2, 3], [1, 2, 4]))
+
+        history.commit_calls.clear()
+        self.sync(history)
+        self.assertEqual(history.commit_calls, []) # nenhum head mudou
+
+        graph[5] = (3,)
+        history.heads = {'main': 5}
+        self.sync(history)
+        self.assertEqual(history.commit_calls, [sha(5)])
+        self.assertEqual(self.members('main'), [1, 2, 3, 5])
+        self.assertEqual(list(Branch.objects.filter(repository=self.repo).values_list('name', flat=True)), ['main'])
+        self.assertEqual(Commit.objects.filter(repository=self.repo).count(), 5)
+
+    def test_force_push_rebuilds_membership(self):
+        graph = {1: (), 2: (1,), 3: (1,)}
+        history = FakeHistory(graph, {'main': 2})
+        self.sync(history)
+        history.heads = {'main': 3}
+        self.sync(history)
+        self.assertEqual(self.members('main'), [1, 3])
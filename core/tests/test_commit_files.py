@@ -0,0 +1,50 @@
+from unittest import mock
+
+from core.models import Commit, CommitFile, FilePath
+from core.services import git_sync
+from core.tests.utils import RepositoryTestCase, commit_payload, sha
+
+
+def commit_detail(n, files):
+    return {
+        'sha': sha(n),
+        'stats': {'additions': sum(f.get('additions', 0) for f in files), 'deletions': 0,
+                  'total': sum(f.get('additions', 0) for f in files)},
+        'files': files,
+    }
+
+
+class CommitFilesTests(RepositoryTestCase):
+    def test_commit_stats_do_not_change_the_hash(self):
+        self.write_commits([commit_payload(1)])
+        detailed = {**commit_payload(1), 'stats': {'additions': 3, 'deletions': 1, 'total': 4}}
+        self.assertEqual(self.write_commits([detailed])['skipped'], 1)
+
+    def test_files_share_interned_paths(self):
+        self.write_commits([commit_payload(1), commit_payload(2, parents=[1])])
+        details = [
+            commit_detail(1, [{'filename': 'src/app.py', 'status': 'added', 'additions': 10}]),
+            commit_detail(2, [
+                {'filename': 'src/main.py', 'previous_filename': 'src/app.py', 'status': 'renamed', 'additions': 1},
+                {'filename': 'README.md', 'status': 'modified', 'additions': 2},
+            ]),
+        ]
+        self.assertEqual(git_sync._bulk_write_commit_files(self.repo, details), 3)
+        self.assertEqual(FilePath.objects.filter(repository=self.repo).count(), 3)
+
+        renamed = CommitFile.objects.get(commit__sha=sha(2), status='renamed')
+        self.assertEqual((renamed.path.path, renamed.previous_path.path), ('src/main.py', 'src/app.py'))
+        self.assertEqual(renamed.committed_at, Commit.objects.get(sha=sha(2)).committer_date_git)
+        self.assertEqual(Commit.objects.get(sha=sha(2)).additions, 3)
+
+        # Reprocessar um commit substitui os arquivos em vez de duplicá-los
+        git_sync._bulk_write_commit_files(self.repo, details[1:])
+        self.assertEqual(CommitFile.objects.filter(repository_id=self.repo.id).count(), 3)
+
+    def test_sync_only_fetches_commits_without_files(self):
+        self.write_commits([commit_payload(1), commit_payload(2, parents=[1])])
+        detail = lambda owner, name, commit_sha, page=1: {'sha': commit_sha, 'files': []}
+        with mock.patch.object(git_sync.github_api, 'fetch_commit_detail', side_effect=detail) as fetch:
+            self.assertEqual(git_sync.sync_commit_files(self.repo, max_workers=1), (2, 0))
+            self.assertEqual(git_sync.sync_commit_files(self.repo, max_workers=1), (0, 0))
+        self.assertEqual(fetch.call_count, 2)
@@ -0,0 +1,44 @@
+from core.models import Commit
+from core.services import commit_graph
+from core.tests.utils import RepositoryTestCase, commit_payload, sha
+
+
+class CommitGraphTests(RepositoryTestCase):
+    def setUp(self):
+        super().setUp()
+        # 1 <- 2 <- 4 (merge de 2 e 3)
+        #  \<- 3 <-/
+        self.history = [
+            commit_payload(1), commit_payload(2, parents=[1]), commit_payload(3, parents=[1]),
+            commit_payload(4, parents=[2, 3]),
+        ]
+
+    def generations(self):
+        return {
+            int(commit_sha, 16): generation
+            for commit_sha, generation in Commit.objects.filter(repository=self.repo).values_list('sha', 'generation')
+        }
+
+    def test_generations_and_ancestry(self):
+        self.write_commits(self.history)
+        commit_graph.update_commit_graph(self.repo)
+        self.assertEqual(self.generations(), {1: 1, 2: 2, 3: 2, 4: 3})
+        self.assertEqual(commit_graph.update_commit_generations(self.repo), 0)
+
+        self.assertTrue(commit_graph.is_ancestor(self.repo, sha(1), sha(4)))
+        self.assertFalse(commit_graph.is_ancestor(self.repo, sha(2), sha(3)))
+        self.assertEqual(commit_graph.merge_base(self.repo, sha(2), sha(3)).sha, sha(1))
+        self.assertEqual(
+            {commit.sha for commit in commit_graph.commits_between(self.repo, sha(2), sha(4))},
+            {sha(3), sha(4)},
+        )
+
+    def test_missing_parents_are_roots_until_synced(self):
+        # Sincronização rasa: o merge chega antes dos pais
+        self.write_commits(self.history[3:])
+        commit_graph.update_commit_graph(self.repo)
+        self.assertEqual(self.generations(), {4: 1})
+
+        self.write_commits(self.history[:3])
+        commit_graph.update_commit_graph(self.repo)
+        self.assertEqual(self.generations(), {1: 1, 2: 2, 3: 2, 4: 3})
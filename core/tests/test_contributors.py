@@ -0,0 +1,35 @@
+import datetime
+
+from core.services.contributors import commit_counts_by_author
+from core.tests.utils import ALICE, BOB, RepositoryTestCase, commit_payload
+
+
+class CommitCountsByAuthorTests(RepositoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write_commits([
+            commit_payload(1, user=ALICE, email='alice@example.com'),
+            commit_payload(2, user=ALICE, email='alice@work.example.com'), # outra identidade, mesma conta
+            commit_payload(3, user=BOB, email='bob@example.com'),
+            commit_payload(4, user=None, email='ghost@example.com'),
+            commit_payload(5, user=None, email='ghost@example.com'),
+            commit_payload(6, user=None, email='other@example.com'),
+            commit_payload(7, user=ALICE, email='alice@example.com'),
+        ])
+
+    def test_identities_of_one_account_are_summed(self):
+        rows = commit_counts_by_author(self.repo.id)
+        counts = {row['username'] or row['email']: row['commits'] for row in rows}
+        self.assertEqual(counts, {'alice': 3, 'ghost@example.com': 2, 'bob': 1, 'other@example.com': 1})
+        self.assertEqual(rows[0]['username'], 'alice')
+        self.assertIsNone(rows[0]['identity_id'])
+        self.assertEqual(rows[0]['first_commit'].day, 1)
+        self.assertEqual(rows[0]['last_commit'].day, 7)
+        ghost = next(row for row in rows if row['email'] == 'ghost@example.com')
+        self.assertIsNone(ghost['user_id'])
+        self.assertIsNotNone(ghost['identity_id'])
+
+    def test_since_and_limit(self):
+        since = datetime.datetime(2024, 1, 4, tzinfo=datetime.timezone.utc)
+        rows = commit_counts_by_author(self.repo.id, since=since, limit=1)
+        self.assertEqual([(row['email'], row['commits']) for row in rows], [('ghost@example.com', 2)])
@@ -0,0 +1,21 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+
+from core.services import metrics
+
+
+class ObservedConnectionTests(TestCase):
+    def test_new_connections_are_measured(self):
+        before = metrics.DB_CONNECTIONS_OPENED.labels(connection.alias, 'direct')._value.get()
+        new_connection = connection.get_new_connection(connection.get_connection_params())
+        new_connection.close()
+        self.assertEqual(metrics.DB_CONNECTIONS_OPENED.labels(connection.alias, 'direct')._value.get(), before + 1)
+
+    def test_pool_occupancy_is_recorded(self):
+        pool = mock.Mock()
+        pool.get_stats.return_value = {'pool_size': 4, 'pool_available': 1, 'requests_waiting': 2}
+        metrics.observe_db_connection('default', 0.01, pool=pool)
+        self.assertEqual(metrics.DB_POOL_CONNECTIONS.labels('default', 'size')._value.get(), 4)
+        self.assertEqual(metrics.DB_POOL_CONNECTIONS.labels('default', 'waiting')._value.get(), 2)
@@ -0,0 +1,45 @@
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from core.db_routers import PRIMARY_ALIAS, REPLICA_ALIAS, ReplicaRouter, primary_reads, read_from_replica, replica_reads
+from core.middleware import PIN_PRIMARY_COOKIE, PrimaryPinningMiddleware
+from core.models import Issue
+
+
+@mock.patch('core.db_routers.replica_available', return_value=True)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_replica_only_inside_replica_reads(self, replica_available):
+        self.assertEqual(self.router.db_for_read(Issue), PRIMARY_ALIAS)
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Issue), REPLICA_ALIAS)
+            with primary_reads():
+                self.assertEqual(self.router.db_for_read(Issue), PRIMARY_ALIAS)
+        self.assertEqual(self.router.db_for_write(Issue), PRIMARY_ALIAS)
+
+    def test_lagging_replica_falls_back_to_primary(self, replica_available):
+        replica_available.return_value = False
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Issue), PRIMARY_ALIAS)
+
+    def test_writes_pin_the_client_to_primary(self, replica_available):
+        chosen = []
+
+        @read_from_replica
+        def view(request):
+            chosen.append(self.router.db_for_read(Issue))
+            return HttpResponse()
+
+        middleware = PrimaryPinningMiddleware(view)
+        factory = RequestFactory()
+        middleware(factory.get('/'))
+        response = middleware(factory.post('/'))
+        self.assertIn(PIN_PRIMARY_COOKIE, response.cookies)
+        pinned = factory.get('/')
+        pinned.COOKIES[PIN_PRIMARY_COOKIE] = '1'
+        middleware(pinned)
+        self.assertEqual(chosen, [REPLICA_ALIAS, PRIMARY_ALIAS, PRIMARY_ALIAS])
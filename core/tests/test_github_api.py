@@ -0,0 +1,51 @@
+from django.test import SimpleTestCase, override_settings
+
+from core.services import github_api
+from core.services.github_transport import set_transport
+from core.tests.utils import LOCMEM_CACHES, fake_response
+
+
+class FakeGitHub:
+    """Transporte falso: responde 304 quando o If-None-Match bate com o ETag atual."""
+    replaying = False
+    conditional_requests = True
+
+    def __init__(self, etag='"v1"', body=b'{"full_name": "octo/repo"}'):
+        self.etag = etag
+        self.body = body
+        self.sent_headers = []
+
+    def send(self, method, url, headers=None, params=None, json_body=None):
+        self.sent_headers.append(dict(headers or {}))
+        if (headers or {}).get('If-None-Match') == self.etag:
+            return fake_response(304, headers={'ETag': self.etag})
+        return fake_response(200, self.body, {'ETag': self.etag})
+
+    def close(self):
+        pass
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ConditionalRequestTests(SimpleTestCase):
+    def use_transport(self, transport):
+        previous = set_transport(transport)
+        self.addCleanup(set_transport, previous)
+        return transport
+
+    def test_not_modified_returns_cached_body(self):
+        fake = self.use_transport(FakeGitHub())
+        self.assertEqual(github_api.get_repo_data('octo', 'repo'), {'full_name': 'octo/repo'})
+        self.assertEqual(github_api.get_repo_data('octo', 'repo'), {'full_name': 'octo/repo'})
+        self.assertNotIn('If-None-Match', fake.sent_headers[0])
+        self.assertEqual(fake.sent_headers[1]['If-None-Match'], '"v1"')
+
+        fake.etag, fake.body = '"v2"', b'{"full_name": "octo/renamed"}'
+        self.assertEqual(github_api.get_repo_data('octo', 'repo'), {'full_name': 'octo/renamed'})
+
+    def test_recording_transport_sends_no_conditional_requests(self):
+        fake = FakeGitHub()
+        fake.conditional_requests = False
+        self.use_transport(fake)
+        github_api.get_repo_data('octo', 'repo')
+        github_api.get_repo_data('octo', 'repo')
+        self.assertFalse(any('If-None-Match' in headers for headers in fake.sent_headers))
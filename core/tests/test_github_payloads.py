@@ -0,0 +1,38 @@
+import json
+
+from core.services import git_sync, github_payloads
+from core.services.fake_github import SyntheticRepository
+from core.tests.utils import RepositoryTestCase
+
+
+class SlimPayloadTests(RepositoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dataset = SyntheticRepository(owner='octo', name='repo', issues=60, commits=40, users=8, seed=3)
+
+    def test_slim_payloads_keep_the_payload_hash(self):
+        for issue_data in self.dataset.issues:
+            self.assertEqual(
+                git_sync._payload_hash(git_sync._normalize_issue_payload(github_payloads.slim_issue(issue_data))),
+                git_sync._payload_hash(git_sync._normalize_issue_payload(issue_data)),
+            )
+        for commit_data in self.dataset.commits:
+            self.assertEqual(
+                git_sync._payload_hash(git_sync._normalize_commit_payload(github_payloads.slim_commit(commit_data))),
+                git_sync._payload_hash(git_sync._normalize_commit_payload(commit_data)),
+            )
+
+    def test_rows_written_from_slim_pages_are_skipped_for_full_pages(self):
+        page = github_payloads.decode_json(json.dumps(self.dataset.issues).encode('utf-8'))
+        self.write_issues([github_payloads.slim_issue(issue_data) for issue_data in page])
+        self.assertEqual(self.write_issues(self.dataset.issues)['skipped'], len(self.dataset.issues))
+
+        self.write_commits([github_payloads.slim_commit(commit_data) for commit_data in self.dataset.commits])
+        self.assertEqual(self.write_commits(self.dataset.commits)['skipped'], len(self.dataset.commits))
+
+    def test_slim_drops_unused_fields_only(self):
+        issue = github_payloads.slim_issue(self.dataset.issues[0])
+        self.assertNotIn('reactions', issue)
+        self.assertEqual(set(issue['user']), set(github_payloads.USER_FIELDS))
+        self.assertNotIn('assignees', github_payloads.slim_issue({'id': 1, 'number': 1}))
+        self.assertLess(len(json.dumps(issue)), len(json.dumps(self.dataset.issues[0])) / 2)
@@ -0,0 +1,83 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.services import github_transport
+from core.services.github_transport import CassetteMiss, RecordingTransport, ReplayTransport
+from core.tests.utils import fake_response
+
+ISSUES_URL = 'https://api.github.com/repos/octo/repo/issues'
+
+
+class TransportTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def record(self, *exchanges):
+        transport = RecordingTransport(self.directory)
+        with mock.patch('core.services.github_transport.requests.request', side_effect=[r for _, r in exchanges]):
+            for params, _ in exchanges:
+                transport.send('GET', ISSUES_URL, headers={'Authorization': 'token segredo'}, params=params)
+        transport.close()
+        return transport
+
+    def test_replay_returns_recorded_responses(self):
+        transport = self.record(
+            ({'page': 1, 'since': '2024-01-01T00:00:00Z'}, fake_response(200, b'[1]', {'ETag': '"a"'})),
+            ({'page': 1, 'since': '2024-01-01T00:00:00Z'}, fake_response(200, b'[2]')),
+        )
+        with gzip.open(transport.path, 'rt', encoding='utf-8') as f:
+            self.assertNotIn('segredo', f.read())
+
+        replay = ReplayTransport(self.directory)
+        # `since` é ignorado ao casar a requisição; repetições seguem a ordem da gravação
+        first = replay.send('GET', ISSUES_URL, params={'page': 1, 'since': '2025-06-01T00:00:00Z'})
+        self.assertEqual((first.status_code, first.json(), first.headers['ETag']), (200, [1], '"a"'))
+        self.assertEqual(replay.send('GET', ISSUES_URL, params={'page': 1}).json(), [2])
+        self.assertEqual(replay.send('GET', ISSUES_URL, params={'page': 1}).json(), [2])
+        with self.assertRaises(CassetteMiss):
+            replay.send('GET', ISSUES_URL, params={'page': 2})
+
+    def test_truncated_cassette_keeps_complete_exchanges(self):
+        transport = self.record(({'page': 1}, fake_response(200, b'[1]')))
+        with open(transport.path, 'rb') as f:
+            data = gzip.decompress(f.read())
+        with gzip.open(os.path.join(self.directory, 'github-truncado.jsonl.gz'), 'wb') as f:
+            f.write(data + json.dumps({'method': 'GET'}).encode('utf-8')[:10])
+        replay = ReplayTransport(self.directory)
+        self.assertEqual(replay.send('GET', ISSUES_URL, params={'page': 1}).json(), [1])
+
+    def cassettes(self):
+        return sorted(name.rsplit('-', 2)[0] for name in os.listdir(self.directory))
+
+    def test_each_sync_run_gets_its_own_cassette(self):
+        transport = RecordingTransport(self.directory)
+        previous = github_transport.set_transport(transport)
+        self.addCleanup(github_transport.set_transport, previous)
+        responses = [fake_response(200, b'[]') for _ in range(4)]
+        with mock.patch('core.services.github_transport.requests.request', side_effect=responses):
+            with github_transport.cassette_run('issues', 'octo/repo'):
+                transport.send('GET', ISSUES_URL)
+            # Tarefas Celery abrem o cassete pelos sinais de início/fim
+            task = SimpleNamespace(name='core.tasks.sync_pull_request_task')
+            github_transport._open_task_cassette(task_id='t1', task=task, args=(7,), kwargs={})
+            transport.send('GET', ISSUES_URL)
+            github_transport._close_task_cassette(task_id='t1')
+            github_transport._open_task_cassette(task_id='t2', task=task, args=(), kwargs={'repo_id': 8})
+            transport.send('GET', ISSUES_URL)
+            github_transport._close_task_cassette(task_id='t2')
+            transport.send('GET', ISSUES_URL)
+        transport.close()
+
+        self.assertEqual(self.cassettes(), [
+            'github-issues-octo_repo', 'github-process', 'github-sync_pull_request_task-7', 'github-sync_pull_request_task-8',
+        ])
+        self.assertEqual(len(ReplayTransport(self.directory)._responses[
+            github_transport._request_key('GET', ISSUES_URL)]), 4)
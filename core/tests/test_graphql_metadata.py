@@ -0,0 +1,58 @@
+from unittest import mock
+
+from core.models import Repositorio, RepositoryMetricSnapshot
+from core.services import git_sync, github_api
+from django.test import TestCase
+
+
+def _node(database_id, stars, issues=0, pulls=0):
+    return {
+        'databaseId': database_id,
+        'description': "Descrição",
+        'primaryLanguage': {'name': 'Python'},
+        'stargazerCount': stars,
+        'forkCount': 1,
+        'issues': {'totalCount': issues},
+        'pullRequests': {'totalCount': pulls},
+        'defaultBranchRef': {'name': 'main'},
+        'isPrivate': False,
+        'isArchived': False,
+        'url': f"https://github.com/octo/r{database_id}",
+        'sshUrl': f"git@github.com:octo/r{database_id}.git",
+    }
+
+
+class GraphQLQueryTests(TestCase):
+    def test_one_aliased_query_for_many_repositories(self):
+        payload = {'data': {'r0': _node(1, 5), 'r1': None}}
+        with mock.patch.object(github_api, '_make_github_graphql_request', return_value=payload) as request:
+            nodes = github_api.fetch_repos_metadata_graphql([('octo', 'a'), ('octo', 'sumiu')])
+        request.assert_called_once()
+        query = request.call_args.args[0]
+        self.assertIn('r0: repository(owner: "octo", name: "a")', query)
+        self.assertIn('r1: repository(owner: "octo", name: "sumiu")', query)
+        self.assertEqual([node and node['databaseId'] for node in nodes], [1, None])
+
+
+class RefreshRepositoriesMetadataTests(TestCase):
+    def setUp(self):
+        self.repos = [
+            Repositorio.objects.create(owner='octo', name=f"r{i}", full_name=f"octo/r{i}") for i in range(1, 4)
+        ]
+
+    def refresh(self, nodes, batch_size=2):
+        with mock.patch.object(git_sync.github_api, 'fetch_repos_metadata_graphql', side_effect=nodes) as fetch:
+            result = git_sync.refresh_repositories_metadata(Repositorio.objects.order_by('id'), batch_size=batch_size)
+        return result, fetch
+
+    def test_batches_and_writes_only_changed_rows(self):
+        (changed, requests_count), fetch = self.refresh([[_node(1, 5, issues=2, pulls=1), None], [_node(3, 0)]])
+        self.assertEqual((changed, requests_count), (2, 2))
+        self.assertEqual(fetch.call_args_list[0].args[0], [('octo', 'r1'), ('octo', 'r2')])
+        r1 = Repositorio.objects.get(full_name='octo/r1')
+        # Como no REST, open_issues_count soma issues e PRs abertos
+        self.assertEqual((r1.stars_count, r1.open_issues_count, r1.external_id), (5, 3, '1'))
+        self.assertEqual(RepositoryMetricSnapshot.objects.count(), 2) # r2 não foi encontrado
+
+        (changed, _), _ = self.refresh([[_node(1, 5, issues=2, pulls=1), None], [_node(3, 0)]])
+        self.assertEqual(changed, 0)
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone as dt_timezone
+
+from core.models import Issue, IssueComment
+from core.services import git_sync
+from core.tests.utils import ALICE, BOB, BOT, CAROL, RepositoryTestCase, comment_payload, issue_payload
+
+
+class IssueCommentTests(RepositoryTestCase):
+    def write_comments(self, comments_data):
+        return git_sync._bulk_write_issue_comments(self.repo, comments_data, git_sync._new_write_stats())
+
+    def test_link_comments_and_first_response(self):
+        self.write_comments([
+            comment_payload(1, 7, ALICE, '2024-01-02T00:00:00Z'), # Autor da issue
+            comment_payload(2, 7, BOT, '2024-01-03T00:00:00Z'),
+            comment_payload(3, 7, BOB, '2024-01-04T00:00:00Z'),
+            comment_payload(4, 7, CAROL, '2024-01-05T00:00:00Z'),
+            comment_payload(5, 8, BOB, '2024-01-02T00:00:00Z'), # PR: não vira Issue
+        ])
+        self.write_issues([issue_payload(7, user=ALICE)])
+
+        self.assertEqual(git_sync.link_issue_comments(self.repo), 1)
+        issue = Issue.objects.get(repository=self.repo, number=7)
+        self.assertEqual(issue.comments.count(), 4)
+        self.assertEqual(issue.first_response_at, datetime(2024, 1, 4, tzinfo=dt_timezone.utc))
+
+        # O comentário do PR continua pendente e não é regravado
+        with self.assertNumQueries(1):
+            self.assertEqual(git_sync.link_issue_comments(self.repo), 0)
+        self.assertTrue(IssueComment.objects.filter(issue_number=8, issue__isnull=True).exists())
+
+    def test_first_response_without_known_author(self):
+        self.write_issues([issue_payload(9, user=None)])
+        self.write_comments([comment_payload(6, 9, BOB, '2024-01-03T00:00:00Z')])
+        issue = Issue.objects.get(repository=self.repo, number=9)
+        git_sync.update_issues_first_response([issue.id])
+        issue.refresh_from_db()
+        self.assertEqual(issue.first_response_at, datetime(2024, 1, 3, tzinfo=dt_timezone.utc))
@@ -0,0 +1,57 @@
+import importlib
+from types import SimpleNamespace
+from unittest import mock
+
+from core.models import Issue, IssueLabel, Label, Milestone
+from core.tests.utils import RepositoryTestCase, issue_payload
+
+BUG = {'id': 10, 'name': 'bug', 'color': 'ff0000', 'description': None}
+DOCS = {'id': 11, 'name': 'docs', 'color': '00ff00', 'description': "Documentação"}
+V1 = {'id': 20, 'number': 1, 'title': 'v1.0', 'state': 'open', 'due_on': None, 'html_url': 'https://github.com/octo/repo/milestone/1'}
+
+normalize_migration = importlib.import_module('core.migrations.0006_normalize_issue_labels_milestones')
+
+
+class IssueLabelTests(RepositoryTestCase):
+    def labels_of(self, number):
+        return sorted(Issue.objects.get(repository=self.repo, number=number).issue_labels.values_list('name', flat=True))
+
+    def test_labels_and_milestones_are_shared_rows(self):
+        self.write_issues([
+            issue_payload(1, labels=[BUG, DOCS], milestone=V1),
+            issue_payload(2, labels=[BUG], milestone=V1),
+        ])
+        self.assertEqual(Label.objects.filter(repository=self.repo).count(), 2)
+        self.assertEqual(Milestone.objects.filter(repository=self.repo).count(), 1)
+        self.assertEqual(self.labels_of(1), ['bug', 'docs'])
+        issue = Issue.objects.get(repository=self.repo, number=1)
+        self.assertEqual((issue.labels, issue.milestone.title), (['bug', 'docs'], 'v1.0'))
+
+    def test_update_renames_label_and_replaces_links(self):
+        self.write_issues([issue_payload(1, labels=[BUG, DOCS])])
+        renamed = dict(BUG, name='defeito')
+        self.write_issues([issue_payload(1, labels=[renamed], updated_at='2024-02-01T00:00:00Z')])
+        self.assertEqual(self.labels_of(1), ['defeito'])
+        self.assertEqual(IssueLabel.objects.filter(issue__repository=self.repo).count(), 1)
+        self.assertEqual(Label.objects.get(repository=self.repo, external_id='10').name, 'defeito')
+
+
+class NormalizeMigrationTests(RepositoryTestCase):
+    def test_batch_converts_json_labels_and_milestone(self):
+        issue = Issue.objects.create(repository=self.repo, external_id='1001', number=1, title="Issue 1", state='open',
+                                     created_at_git='2024-01-01T00:00:00Z', updated_at_git='2024-01-01T00:00:00Z')
+        # Formato anterior à 0006: labels e milestone guardados como JSON na própria issue
+        legacy = SimpleNamespace(id=issue.id, repository_id=self.repo.id, labels=[BUG, DOCS, 'solta'], milestone=V1)
+        issue_model = mock.Mock()
+
+        normalize_migration._normalize_batch([legacy], Label, Milestone, IssueLabel, issue_model)
+
+        self.assertEqual(sorted(issue.issue_labels.values_list('name', flat=True)), ['bug', 'docs'])
+        self.assertEqual(legacy.labels, ['bug', 'docs', 'solta'])
+        self.assertEqual(legacy.milestone_ref_id, Milestone.objects.get(repository=self.repo, external_id='20').id)
+        issue_model.objects.bulk_update.assert_called_once_with([legacy], ['labels', 'milestone_ref'])
+
+        # Reexecutar o lote não duplica labels nem vínculos
+        legacy.labels, legacy.milestone = [BUG, DOCS], V1
+        normalize_migration._normalize_batch([legacy], Label, Milestone, IssueLabel, issue_model)
+        self.assertEqual(IssueLabel.objects.filter(issue=issue).count(), 2)
@@ -0,0 +1,39 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from core.services import metrics
+
+
+@override_settings(PROMETHEUS_PUSHGATEWAY_URL='http://pushgateway:9091', METRICS_PUSH_INTERVAL=0.05)
+class PushMetricsTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(metrics, 'push_to_gateway')
+        self.push = patcher.start()
+        self.addCleanup(patcher.stop)
+        metrics._last_push = 0.0
+
+    def wait_for_pushes(self, count, timeout=2):
+        deadline = time.monotonic() + timeout
+        while self.push.call_count < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.push.call_count
+
+    def test_throttled_push_is_flushed_at_the_end_of_the_interval(self):
+        metrics.push_metrics()
+        metrics.push_metrics()
+        metrics.push_metrics()
+        self.assertEqual(self.push.call_count, 1)
+        self.assertEqual(self.wait_for_pushes(2), 2) # um único envio agendado para os dois pedidos
+        time.sleep(0.1)
+        self.assertEqual(self.push.call_count, 2)
+        self.assertEqual(self.push.call_args.kwargs['grouping_key'], {'instance': metrics._instance_label()})
+
+    def test_forced_push_cancels_the_scheduled_one(self):
+        metrics.push_metrics()
+        metrics.push_metrics()
+        metrics.push_metrics(force=True)
+        time.sleep(0.15)
+        self.assertEqual(self.push.call_count, 2)
+        self.assertIsNone(metrics._push_timer)
@@ -0,0 +1,41 @@
+import datetime
+
+from core.models import Repositorio, RepositoryMetricSnapshot
+from core.services.metrics_history import get_metric_trend, record_metric_snapshots
+from django.test import TestCase
+
+
+class MetricHistoryTests(TestCase):
+    def setUp(self):
+        self.repo = Repositorio.objects.create(owner='octo', name='repo', full_name='octo/repo', stars_count=1)
+
+    def snapshot(self, date, stars):
+        self.repo.stars_count = stars
+        record_metric_snapshots([self.repo], date=date)
+
+    def test_same_day_updates_existing_snapshot(self):
+        day = datetime.date(2024, 3, 1)
+        self.snapshot(day, 10)
+        self.snapshot(day, 12)
+        self.assertEqual(list(RepositoryMetricSnapshot.objects.values_list('date', 'stars_count')), [(day, 12)])
+
+    def test_unsaved_repositories_are_ignored(self):
+        self.assertEqual(record_metric_snapshots([Repositorio(full_name='octo/novo')]), 0)
+
+    def test_trend_buckets_keep_the_max_of_each_period(self):
+        for day, stars in [(1, 10), (15, 14), (31, 11)]:
+            self.snapshot(datetime.date(2024, 1, day), stars)
+        self.snapshot(datetime.date(2024, 2, 2), 20)
+        other = Repositorio.objects.create(owner='octo', name='vazio', full_name='octo/vazio')
+
+        trend = get_metric_trend([self.repo.id, other.id], datetime.date(2024, 1, 1), datetime.date(2024, 2, 28), bucket='month')
+        self.assertEqual([(p['date'], p['stars']) for p in trend[self.repo.id]],
+                         [(datetime.date(2024, 1, 1), 14), (datetime.date(2024, 2, 1), 20)])
+        self.assertEqual(trend[other.id], [])
+
+        daily = get_metric_trend([self.repo.id], datetime.date(2024, 1, 10), datetime.date(2024, 1, 31))
+        self.assertEqual([p['stars'] for p in daily[self.repo.id]], [14, 11])
+
+    def test_invalid_bucket(self):
+        with self.assertRaises(ValueError):
+            get_metric_trend([self.repo.id], datetime.date(2024, 1, 1), datetime.date(2024, 1, 2), bucket='hour')
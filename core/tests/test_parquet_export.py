@@ -0,0 +1,56 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from core.services.parquet_export import export_to_parquet, load_export_state
+from core.tests.utils import RepositoryTestCase, commit_payload, issue_payload, sha
+from django.core.management import call_command
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class ExportParquetCommandTests(RepositoryTestCase):
+    def test_async_forwards_repository_and_batch_size(self):
+        with mock.patch('core.management.commands.export_parquet.export_parquet_task.delay') as delay:
+            call_command('export_parquet', '/tmp/export', '--async', '--repo', str(self.repo.id),
+                         '--batch-size', '10', '--tables', 'commits', stdout=io.StringIO())
+        delay.assert_called_once_with('/tmp/export', tables=['commits'], full=False,
+                                      repository_ids=[self.repo.id], batch_size=10)
+
+
+@mock.patch('builtins.print')
+class ParquetExportTests(RepositoryTestCase):
+    def setUp(self):
+        super().setUp()
+        if pq is None:
+            self.skipTest("pyarrow não instalado")
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        self.write_commits([commit_payload(1), commit_payload(2, parents=[1])])
+        self.write_issues([issue_payload(1)])
+
+    def commit_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self.output_dir)
+            for root, _, names in os.walk(os.path.join(self.output_dir, 'commits')) for name in names
+        )
+
+    def test_partitioned_files_and_incremental_state(self, _):
+        exported = export_to_parquet(self.output_dir, batch_size=1)
+        self.assertEqual(exported, {'commits': 2, 'issues': 1, 'users': 1})
+        files = self.commit_files()
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].startswith(f"commits/repository_id={self.repo.id}/month=2024-01/part-"))
+        table = pq.read_table(os.path.join(self.output_dir, files[0]))
+        self.assertEqual(table.column('sha').to_pylist(), [sha(1), sha(2)])
+        self.assertEqual(table.column('parents_shas').to_pylist(), [[], [sha(1)]])
+        self.assertIn('commits', load_export_state(self.output_dir))
+
+    def test_partial_export_does_not_advance_the_watermark(self, _):
+        export_to_parquet(self.output_dir, tables=['commits'], repository_ids=[self.repo.id])
+        self.assertEqual(load_export_state(self.output_dir), {})
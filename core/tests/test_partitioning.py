@@ -0,0 +1,70 @@
+import re
+
+from core.models import (Branch, BranchCommit, Commit, CommitFile, FilePath, Issue, IssueLabel, Label, PullRequest,
+                         Repositorio)
+from core.services import git_sync, partitioning
+from core.tests.utils import RepositoryTestCase, commit_payload, issue_payload
+from django.db import connection
+
+BUG = {'id': 10, 'name': 'bug', 'color': 'ff0000', 'description': None}
+
+
+class PartitionSqlTests(RepositoryTestCase):
+    def test_sql_converts_table_and_drops_incoming_foreign_keys(self):
+        self.write_issues([issue_payload(1, labels=[BUG])])
+        statements = partitioning.build_partition_sql(Label, partitions=4)
+
+        self.assertEqual(statements[0], 'LOCK TABLE "core_label" IN ACCESS EXCLUSIVE MODE')
+        # core_issuelabel.label_id aponta para core_label e não pode continuar existindo
+        self.assertTrue(any(re.match(r'ALTER TABLE "core_issuelabel" DROP CONSTRAINT', s) for s in statements))
+        self.assertIn('PARTITION BY HASH ("repository_id")', ' '.join(statements))
+        self.assertIn('CREATE TABLE "core_label_p03" PARTITION OF "core_label" FOR VALUES WITH (MODULUS 4, REMAINDER 3)',
+                      statements)
+        self.assertIn('ALTER TABLE "core_label" ADD CONSTRAINT "core_label_pkey" PRIMARY KEY (id, "repository_id")',
+                      statements)
+        self.assertEqual(partitioning.build_drop_old_sql(Label), ['DROP TABLE IF EXISTS "core_label_old"'])
+
+        with connection.cursor() as cursor:
+            # As FKs são DEFERRABLE: sem isso o ALTER TABLE esbarra nas checagens pendentes do teste
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        partitioning.execute_sql(statements)
+        self.assertTrue(partitioning.is_partitioned('core_label'))
+        self.assertEqual(list(Label.objects.values_list('name', flat=True)), ['bug'])
+        self.assertEqual(partitioning.check_partitionable(Label), ["core_label já é uma tabela particionada."])
+
+
+class DeleteRepositoryTests(RepositoryTestCase):
+    def populate(self, repo_obj):
+        stats = git_sync._new_write_stats()
+        git_sync._bulk_write_issues(repo_obj, [issue_payload(1, labels=[BUG])], stats)
+        git_sync._bulk_write_commits(repo_obj, [commit_payload(1), commit_payload(2, parents=[1], message="Fixes #1")], stats)
+        git_sync._bulk_write_commit_files(repo_obj, [{'sha': commit_payload(2)['sha'], 'files': [
+            {'filename': 'a.py', 'status': 'added'}]}])
+        branch = Branch.objects.create(repository=repo_obj, name='main', head_sha=commit_payload(2)['sha'])
+        BranchCommit.objects.bulk_create([BranchCommit(branch=branch, commit=commit) for commit in repo_obj.commits.all()])
+        PullRequest.objects.create(repository=repo_obj, external_id=f"{repo_obj.id}", number=1, title="PR", state='open',
+                                   base_ref='main', head_ref='feature', created_at_git='2024-01-01T00:00:00Z',
+                                   updated_at_git='2024-01-01T00:00:00Z', merge_commit=repo_obj.commits.first())
+
+    def test_deletes_only_the_repository_rows(self):
+        other = Repositorio.objects.create(name='other', owner='octo', full_name='octo/other')
+        self.populate(self.repo)
+        self.populate(other)
+        repo_id = self.repo.id
+
+        deleted = partitioning.delete_repository(self.repo)
+
+        self.assertEqual((deleted['core.Commit'], deleted['core.Issue'], deleted['core.Repositorio']), (2, 1, 1))
+        self.assertFalse(Repositorio.objects.filter(id=repo_id).exists())
+        for model in (Commit, Issue, CommitFile, FilePath, Label, PullRequest):
+            self.assertFalse(model.objects.filter(repository_id=repo_id).exists(), model)
+            self.assertTrue(model.objects.filter(repository=other).exists(), model)
+        self.assertEqual(IssueLabel.objects.count(), 1)
+        self.assertEqual(BranchCommit.objects.count(), 2)
+        self.assertEqual(Commit.issues.through.objects.count(), 1)
+
+    def test_repository_filter_reads_a_single_partition(self):
+        if not partitioning.is_partitioned('core_commit'):
+            self.skipTest("core_commit não está particionada neste banco")
+        plan = Commit.objects.filter(repository_id=self.repo.id).explain()
+        self.assertEqual(len(set(re.findall(r'core_commit_p\d+', plan))), 1)
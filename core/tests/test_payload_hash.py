@@ -0,0 +1,31 @@
+from core.models import Commit, Issue
+from core.tests.utils import RepositoryTestCase, commit_payload, issue_payload, sha
+
+
+class PayloadHashTests(RepositoryTestCase):
+    def test_issues_skip_unchanged_payloads(self):
+        self.assertEqual(self.write_issues([issue_payload(1), issue_payload(2)]),
+                         {'inserted': 2, 'updated': 0, 'skipped': 0})
+        self.assertEqual(self.write_issues([issue_payload(1), issue_payload(2)]),
+                         {'inserted': 0, 'updated': 0, 'skipped': 2})
+        self.assertEqual(self.write_issues([issue_payload(1, title="Novo título"), issue_payload(2)]),
+                         {'inserted': 0, 'updated': 1, 'skipped': 1})
+        self.assertEqual(Issue.objects.get(repository=self.repo, number=1).title, "Novo título")
+
+    def test_commits_skip_unchanged_payloads(self):
+        self.assertEqual(self.write_commits([commit_payload(1), commit_payload(2, parents=[1])]),
+                         {'inserted': 2, 'updated': 0, 'skipped': 0})
+        self.assertEqual(self.write_commits([commit_payload(1), commit_payload(2, parents=[1])]),
+                         {'inserted': 0, 'updated': 0, 'skipped': 2})
+        self.assertEqual(self.write_commits([commit_payload(1, message="Reescrito")]),
+                         {'inserted': 0, 'updated': 1, 'skipped': 0})
+
+    def test_unchanged_commit_is_linked_to_issue_synced_later(self):
+        payload = commit_payload(1, message="Fixes #5")
+        self.write_commits([payload])
+        commit = Commit.objects.get(repository=self.repo, sha=sha(1))
+        self.assertFalse(commit.issues.exists())
+
+        self.write_issues([issue_payload(5)])
+        self.assertEqual(self.write_commits([payload])['skipped'], 1)
+        self.assertEqual(list(commit.issues.values_list('number', flat=True)), [5])
@@ -0,0 +1,57 @@
+import marshal
+import shutil
+import tempfile
+import time
+
+from core.models import SyncRun
+from core.services import git_sync
+from core.services.profiling import _fingerprint, run_profiled_sync
+from core.tests.utils import RepositoryTestCase, commit_payload
+from django.test import override_settings
+
+
+def _write_commits(repo_obj, count):
+    stats = git_sync._new_write_stats()
+    git_sync._bulk_write_commits(repo_obj, [commit_payload(n) for n in range(1, count + 1)], stats)
+    time.sleep(0.03) # o profiler por amostragem precisa de algumas amostras
+    return stats
+
+
+class ProfiledSyncTests(RepositoryTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_sampling_run_records_stats_sql_and_folded_stacks(self):
+        run = run_profiled_sync(self.repo, 'commits', _write_commits, options={'full_sync': True}, count=3)
+        run.refresh_from_db()
+        self.assertEqual((run.status, run.stats['inserted'], run.options), ('success', 3, {'full_sync': True}))
+        self.assertIsNotNone(run.finished_at)
+        self.assertGreater(run.profile_summary['sql']['count'], 0)
+        self.assertTrue(run.profile_file.name.endswith(f"octo-repo-commits-{run.id}.folded"))
+        folded = run.profile_file.read().decode('utf-8')
+        self.assertIn('_write_commits', folded)
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in folded.splitlines()))
+
+    def test_cprofile_artifact_is_loadable(self):
+        run = run_profiled_sync(self.repo, 'commits', _write_commits, profiler='cprofile', count=1)
+        stats = marshal.loads(run.profile_file.read())
+        self.assertTrue(any(name == '_bulk_write_commits' for (_, _, name) in stats))
+        self.assertTrue(run.profile_summary['profiler']['top_cumulative'])
+
+    def test_failure_is_recorded_and_raised(self):
+        def _broken(repo_obj):
+            raise RuntimeError("API fora do ar")
+
+        with self.assertRaises(RuntimeError):
+            run_profiled_sync(self.repo, 'issues', _broken)
+        run = SyncRun.objects.get(repository=self.repo)
+        self.assertEqual((run.status, run.error), ('failed', "API fora do ar"))
+
+    def test_sql_fingerprint_collapses_parameter_lists(self):
+        self.assertEqual(_fingerprint("SELECT 1 WHERE id IN (%s, %s, %s)"), "SELECT 1 WHERE id IN (...)")
+        self.assertEqual(_fingerprint("INSERT INTO t VALUES (...), (...), (...)"), "INSERT INTO t VALUES (...)")
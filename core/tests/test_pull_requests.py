@@ -0,0 +1,64 @@
+import datetime
+from unittest import mock
+
+from core.models import PullRequest
+from core.services import git_sync
+from core.tests.utils import BOB, CAROL, RepositoryTestCase, commit_payload, sha
+
+
+def pull_payload(number, updated_at, merge_commit=None, reviewers=()):
+    return {
+        'id': 5000 + number,
+        'number': number,
+        'title': f"PR {number}",
+        'body': None,
+        'state': 'closed' if merge_commit else 'open',
+        'draft': False,
+        'user': BOB,
+        'requested_reviewers': list(reviewers),
+        'base': {'ref': 'main', 'sha': sha(1)},
+        'head': {'ref': f"feature-{number}", 'sha': sha(2)},
+        'merge_commit_sha': sha(merge_commit) if merge_commit else None,
+        'created_at': '2024-01-01T00:00:00Z',
+        'updated_at': updated_at,
+        'closed_at': updated_at if merge_commit else None,
+        'merged_at': updated_at if merge_commit else None,
+        'html_url': f"https://github.com/octo/repo/pull/{number}",
+    }
+
+
+class PullRequestSyncTests(RepositoryTestCase):
+    def sync(self, pages, since=None):
+        with mock.patch.object(git_sync.github_api, 'fetch_repo_pulls', side_effect=pages) as fetch:
+            stats = git_sync.sync_repository_pull_requests(self.repo, since_datetime=since)
+        return stats, fetch
+
+    def test_stops_paginating_at_first_already_synced_pull(self):
+        full_page = [pull_payload(n, '2024-03-01T00:00:00Z') for n in range(1, git_sync.github_api.PER_PAGE_DEFAULT + 1)]
+        full_page[-1] = pull_payload(500, '2024-01-15T00:00:00Z')
+        since = datetime.datetime(2024, 2, 1, tzinfo=datetime.timezone.utc)
+
+        stats, fetch = self.sync([full_page, []], since=since)
+
+        fetch.assert_called_once() # a segunda página nem é pedida
+        self.assertEqual(stats['inserted'], len(full_page) - 1)
+        self.assertFalse(PullRequest.objects.filter(number=500).exists())
+        self.repo.refresh_from_db()
+        self.assertIsNotNone(self.repo.last_sync_pulls_at)
+
+    def test_unchanged_pulls_are_skipped_and_merges_linked(self):
+        self.write_commits([commit_payload(1), commit_payload(3, parents=[1])])
+        pulls = [pull_payload(1, '2024-03-01T00:00:00Z', merge_commit=3, reviewers=[CAROL]),
+                 pull_payload(2, '2024-03-01T00:00:00Z', merge_commit=7)] # merge ainda não sincronizado
+        self.sync([pulls])
+        stats, _ = self.sync([pulls])
+        self.assertEqual((stats['inserted'], stats['skipped']), (0, 2))
+
+        merged = PullRequest.objects.get(number=1)
+        self.assertEqual(merged.merge_commit.sha, sha(3))
+        self.assertEqual(list(merged.requested_reviewers.values_list('username', flat=True)), ['carol'])
+        self.assertIsNone(PullRequest.objects.get(number=2).merge_commit_id)
+
+        self.write_commits([commit_payload(7, parents=[3])])
+        self.assertEqual(git_sync.link_merged_pull_requests(self.repo), 1)
+        self.assertEqual(git_sync.link_merged_pull_requests(self.repo), 0)
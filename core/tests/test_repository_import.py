@@ -0,0 +1,50 @@
+from unittest import mock
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from core.models import Repositorio, RepositoryMetricSnapshot
+from core.services import git_sync
+
+
+def _repo_payload(repo_id, name, stars=0, owner='octo'):
+    return {
+        'id': repo_id,
+        'name': name,
+        'full_name': f"{owner}/{name}",
+        'owner': {'login': owner},
+        'stargazers_count': stars,
+        'html_url': f"https://github.com/{owner}/{name}",
+    }
+
+
+class ImportOwnerRepositoriesTests(TestCase):
+    def import_pages(self, *pages):
+        responses = [(list(page), len(pages)) for page in pages]
+        with mock.patch.object(git_sync.github_api, 'fetch_owner_repos', side_effect=responses):
+            return git_sync.import_owner_repositories('octo', max_workers=1)
+
+    def test_creates_then_updates_by_external_id(self):
+        self.assertEqual(self.import_pages([_repo_payload(10, 'api')], [_repo_payload(11, 'web')]), (2, 0))
+        self.assertEqual(RepositoryMetricSnapshot.objects.count(), 2)
+
+        # Renomeado no GitHub: mesmo id, novo full_name
+        self.assertEqual(self.import_pages([_repo_payload(10, 'api-v2', stars=5), _repo_payload(11, 'web')]), (0, 2))
+        self.assertEqual(
+            list(Repositorio.objects.order_by('external_id').values_list('external_id', 'full_name', 'stars_count')),
+            [('10', 'octo/api-v2', 5), ('11', 'octo/web', 0)],
+        )
+
+    def test_manually_added_repository_is_claimed_by_full_name(self):
+        manual = Repositorio.objects.create(owner='octo', name='api', full_name='octo/api')
+        self.assertEqual(self.import_pages([_repo_payload(10, 'api', stars=3)]), (0, 1))
+        manual.refresh_from_db()
+        self.assertEqual((manual.external_id, manual.stars_count), ('10', 3))
+        self.assertEqual(Repositorio.objects.count(), 1)
+
+    def test_external_id_is_unique(self):
+        Repositorio.objects.create(owner='octo', name='a', full_name='octo/a', external_id='10')
+        Repositorio.objects.create(owner='octo', name='b', full_name='octo/b')
+        Repositorio.objects.create(owner='octo', name='c', full_name='octo/c') # Vários NULLs são permitidos
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Repositorio.objects.create(owner='octo', name='d', full_name='octo/d', external_id='10')
@@ -0,0 +1,48 @@
+from core.services.search import search_commits, search_issues
+from core.tests.utils import RepositoryTestCase, commit_payload, issue_payload
+
+SHAS = ['abc1' + '0' * 36, 'abc2' + '0' * 36, 'def3' + '0' * 36]
+
+
+def _commit(n, message):
+    payload = commit_payload(n, message=message)
+    payload['sha'] = SHAS[n - 1]
+    return payload
+
+
+class SearchTests(RepositoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write_commits([
+            _commit(1, "Fix parser crash on empty files"),
+            _commit(2, "Add caching layer"),
+            _commit(3, "Parser: handle unicode"),
+        ])
+        self.write_issues([
+            issue_payload(1, title="Parser crashes on empty input"),
+            issue_payload(2, title="Slow dashboard"),
+        ])
+
+    def test_hex_term_searches_sha_prefix(self):
+        results, has_next = search_commits(" ABC2 ")
+        self.assertEqual([c.sha for c in results], [SHAS[1]])
+        self.assertFalse(has_next)
+        results, _ = search_commits("abc")
+        self.assertEqual(results, [])  # curto demais para SHA: vira busca textual
+
+    def test_text_term_uses_full_text_ranked(self):
+        results, _ = search_commits("parser")
+        self.assertEqual({c.sha for c in results}, {SHAS[0], SHAS[2]})
+        # "crash" casa com "crashes" pelo stemming da configuração de busca
+        issues, _ = search_issues("crash")
+        self.assertEqual([i.number for i in issues], [1])
+
+    def test_issue_partial_title_and_pagination(self):
+        issues, _ = search_issues("dashb")
+        self.assertEqual([i.number for i in issues], [2])
+
+        page, has_next = search_commits("parser", repository_id=self.repo.id, per_page=1)
+        self.assertEqual(len(page), 1)
+        self.assertTrue(has_next)
+        _, has_next = search_commits("parser", page=2, per_page=1)
+        self.assertFalse(has_next)
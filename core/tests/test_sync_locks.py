@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from core import tasks
+from core.services import sync_locks
+from core.tests.utils import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class QueueRoutingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_queue_and_priority_by_resource(self):
+        self.assertEqual(tasks._sync_queue('metadata', backfill=True), (tasks.QUEUE_METADATA, tasks.PRIORITY_METADATA))
+        self.assertEqual(tasks._sync_queue('issues'), (tasks.QUEUE_INCREMENTAL, tasks.PRIORITY_INCREMENTAL))
+        self.assertEqual(tasks._sync_queue('commits', backfill=True), (tasks.QUEUE_BACKFILL, tasks.PRIORITY_BACKFILL))
+
+    def test_duplicate_enqueue_collapses_until_the_task_starts(self):
+        task = mock.Mock()
+        self.assertTrue(tasks.enqueue_repo_sync(task, 7, 'issues', full_sync=False))
+        task.apply_async.assert_called_once_with(
+            args=(7,), kwargs={'full_sync': False}, queue=tasks.QUEUE_INCREMENTAL, priority=tasks.PRIORITY_INCREMENTAL,
+        )
+        self.assertFalse(tasks.enqueue_repo_sync(task, 7, 'issues'))
+        # Outra fila (backfill) não colapsa com a incremental
+        self.assertTrue(tasks.enqueue_repo_sync(task, 7, 'issues', backfill=True))
+
+        sync_locks.clear_enqueued(7, f"issues:{tasks.QUEUE_INCREMENTAL}")
+        self.assertTrue(tasks.enqueue_repo_sync(task, 7, 'issues'))
+
+    def test_broker_failure_releases_the_dedup_mark(self):
+        task = mock.Mock()
+        task.apply_async.side_effect = ConnectionError("broker fora do ar")
+        with self.assertRaises(ConnectionError):
+            tasks.enqueue_repo_sync(task, 7, 'commits')
+        task.apply_async.side_effect = None
+        self.assertTrue(tasks.enqueue_repo_sync(task, 7, 'commits'))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RepoSyncLockTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_one_sync_per_repository_and_resource(self):
+        with sync_locks.repo_sync_lock(1, 'issues') as acquired:
+            self.assertTrue(acquired)
+            with sync_locks.repo_sync_lock(1, 'issues') as second:
+                self.assertFalse(second)
+            with sync_locks.repo_sync_lock(1, 'commits') as other_resource:
+                self.assertTrue(other_resource)
+        with sync_locks.repo_sync_lock(1, 'issues') as acquired:
+            self.assertTrue(acquired)
+
+    def test_release_does_not_delete_a_lock_taken_by_another_worker(self):
+        key = sync_locks._lock_key(1, 'issues')
+        with sync_locks.repo_sync_lock(1, 'issues', heartbeat=3600):
+            # O lock expirou e outro worker o obteve
+            cache.set(key, 'outro-worker')
+        self.assertEqual(cache.get(key), 'outro-worker')
+
+    def test_heartbeat_renews_the_lock(self):
+        lock = sync_locks._CacheLock(sync_locks._lock_key(1, 'issues'), timeout=60)
+        self.assertTrue(lock.acquire())
+        with mock.patch.object(cache, 'touch', wraps=cache.touch) as touch:
+            stop = mock.Mock()
+            stop.wait.side_effect = [False, True]
+            sync_locks._heartbeat(lock, stop, interval=1)
+        touch.assert_called_once_with(lock.name, 60)
+
+    @mock.patch('core.tasks.sync_repository_metadata')
+    def test_task_skips_when_the_lock_is_held(self, sync_repository_metadata):
+        with sync_locks.repo_sync_lock(5, 'metadata'):
+            result = tasks.sync_repo_metadata_task.run(5)
+        self.assertIn("já em andamento", result)
+        sync_repository_metadata.assert_not_called()
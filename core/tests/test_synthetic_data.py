@@ -0,0 +1,38 @@
+from core.models import Commit, CommitParent, Issue, IssueLabel, Repositorio
+from core.services import commit_graph
+from core.services.synthetic_data import BASE_COMMITS, BASE_ISSUES, generate_synthetic_dataset
+from django.test import TestCase
+
+SCALE = 0.001
+
+
+class SyntheticDatasetTests(TestCase):
+    def generate(self, **kwargs):
+        [(repo, counts, _)] = generate_synthetic_dataset(repos=1, scale=SCALE, seed=7, **kwargs)
+        return repo, counts
+
+    def snapshot(self, repo):
+        return list(Commit.objects.filter(repository=repo).order_by('sha').values_list('sha', 'message', 'generation'))
+
+    def test_copy_generates_a_consistent_repository(self):
+        repo, counts = self.generate()
+        self.assertEqual((counts['commits'], counts['issues']), (int(BASE_COMMITS * SCALE), int(BASE_ISSUES * SCALE)))
+        self.assertEqual(Commit.objects.filter(repository=repo).count(), counts['commits'])
+        self.assertEqual(CommitParent.objects.filter(commit__repository=repo).count(), counts['commit_parents'])
+        self.assertEqual(IssueLabel.objects.filter(issue__repository=repo).count(), counts['issue_labels'])
+        self.assertEqual(repo.open_issues_count, Issue.objects.filter(repository=repo, state='open').count())
+        # As gerações gravadas pelo gerador batem com as calculadas a partir do grafo
+        self.assertEqual(commit_graph.update_commit_generations(repo), 0)
+
+        # Os ids reservados na sequência não colidem com inserts normais
+        Commit.objects.create(repository=repo, sha='f' * 40, message="Depois do COPY",
+                              author_date_git=repo.last_sync_commits_at, committer_date_git=repo.last_sync_commits_at)
+
+    def test_same_seed_same_data(self):
+        repo, _ = self.generate()
+        first = self.snapshot(repo)
+        with self.assertRaises(ValueError):
+            self.generate()
+        repo, _ = self.generate(replace=True)
+        self.assertEqual(self.snapshot(repo), first)
+        self.assertEqual(Repositorio.objects.filter(owner='synthetic').count(), 1)
@@ -0,0 +1,87 @@
+"""Payloads da API do GitHub e base comum dos testes do app core."""
+import requests
+from django.test import TestCase
+
+from core.models import Repositorio
+from core.services import git_sync
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+ALICE = {'id': 1, 'login': 'alice', 'type': 'User'}
+BOB = {'id': 2, 'login': 'bob', 'type': 'User'}
+CAROL = {'id': 3, 'login': 'carol', 'type': 'User'}
+BOT = {'id': 4, 'login': 'ci[bot]', 'type': 'Bot'}
+
+
+def sha(n):
+    return f"{n:040x}"
+
+
+def commit_payload(n, parents=(), message=None, user=ALICE, email='alice@example.com'):
+    person = {'name': 'Alice', 'email': email, 'date': f"2024-01-{n:02d}T12:00:00Z"}
+    return {
+        'sha': sha(n),
+        'html_url': f"https://github.com/octo/repo/commit/{sha(n)}",
+        'commit': {'message': message or f"Commit {n}", 'author': person, 'committer': person},
+        'parents': [{'sha': sha(parent)} for parent in parents],
+        'author': user,
+        'committer': user,
+    }
+
+
+def issue_payload(number, user=ALICE, title=None, labels=(), milestone=None, updated_at='2024-01-01T00:00:00Z'):
+    return {
+        'id': 1000 + number,
+        'number': number,
+        'title': title or f"Issue {number}",
+        'body': None,
+        'state': 'open',
+        'created_at': '2024-01-01T00:00:00Z',
+        'updated_at': updated_at,
+        'closed_at': None,
+        'user': user,
+        'closed_by': None,
+        'assignees': [],
+        'labels': list(labels),
+        'milestone': milestone,
+        'comments': 0,
+        'html_url': f"https://github.com/octo/repo/issues/{number}",
+    }
+
+
+def comment_payload(comment_id, issue_number, user, created_at):
+    return {
+        'id': comment_id,
+        'issue_url': f"https://api.github.com/repos/octo/repo/issues/{issue_number}",
+        'user': user,
+        'author_association': 'NONE',
+        'body': "Comentário",
+        'created_at': created_at,
+        'updated_at': created_at,
+        'html_url': f"https://github.com/octo/repo/issues/{issue_number}#issuecomment-{comment_id}",
+    }
+
+
+def fake_response(status, body=b'', headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    return response
+
+
+class RepositoryTestCase(TestCase):
+    """Cria um repositório e expõe os gravadores em lote do git_sync com contadores novos."""
+
+    def setUp(self):
+        self.repo = Repositorio.objects.create(name='repo', owner='octo', full_name='octo/repo')
+
+    def write_issues(self, issues_data):
+        stats = git_sync._new_write_stats()
+        git_sync._bulk_write_issues(self.repo, issues_data, stats)
+        return stats
+
+    def write_commits(self, commits_data):
+        stats = git_sync._new_write_stats()
+        git_sync._bulk_write_commits(self.repo, commits_data, stats)
+        return stats
@@ -13,4 +13,13 @@ urlpatterns = [
     path('repositorios/<int:pk>/sincronizar_issues/', views.sync_issues_view, name='sync_issues'),
     # formulário de parâmetros e sincronização de commits
     path('repositorios/<int:pk>/sincronizar_commits/', views.sync_commits_view, name='sync_commits'),
+    # listas (paginadas) de commits e issues sincronizados
+    path('repositorios/<int:pk>/commits/', views.commit_list_view, name='commit_list'),
+    path('repositorios/<int:pk>/issues/', views.issue_list_view, name='issue_list'),
+    # API (JSON) com as estatísticas de um repositório
+    path('api/repositorios/<int:pk>/estatisticas/', views.repository_stats_api, name='repository_stats_api'),
+    # API (JSON) com a série temporal de métricas dos repositórios
+    path('api/metricas/', views.repository_metrics_trend_api, name='repository_metrics_trend_api'),
+    # API (JSON) de busca textual em commits e issues
+    path('api/busca/', views.search_api, name='search_api'),
 ]
\ No newline at end of file
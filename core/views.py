@@ -1,51 +1,280 @@
 # core.views
-from django.shortcuts import get_object_or_404, redirect, render
+import os
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, redirect
+from django.template.response import TemplateResponse
 from django.urls import reverse
 from django.contrib import messages
-from core.models import Repositorio
+from django.db.models import Count, Max, Min, Q, Sum
+from core.db_routers import read_from_replica
+from core.models import Commit, Issue, Repositorio
 from core.tasks import (
+    enqueue_repo_sync,
     sync_repo_metadata_task,
     sync_issue_metadata_task,
     sync_commit_metadata_task
 )
 from core.forms import IssueSyncForm, CommitSyncForm
+from core.services.metrics_history import get_metric_trend
+from core.services.search import SEARCH_PAGE_SIZE_DEFAULT, SEARCH_PAGE_SIZE_MAX, search_commits, search_issues
+from django.http import HttpResponse, JsonResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
 from django.utils import timezone
-from datetime import datetime
+from datetime import date, datetime, timedelta
+
+LIST_PAGE_SIZE_DEFAULT = 50
+LIST_PAGE_SIZE_MAX = 200
+
+# As views de leitura são assíncronas: sob ASGI (Gunicorn + Uvicorn) um único processo
+# atende muitos clientes simultâneos enquanto as consultas aguardam o banco.
+# Os querysets são materializados na view (o ORM não pode ser chamado dentro do template
+# em contexto assíncrono) e o TemplateResponse é renderizado pelo Django fora do event loop.
+
+
+def _page_params(request):
+    """Lê page/per_page da query string (ValueError se não forem inteiros)."""
+    page = max(1, int(request.GET.get('page', 1)))
+    per_page = min(LIST_PAGE_SIZE_MAX, max(1, int(request.GET.get('per_page', LIST_PAGE_SIZE_DEFAULT))))
+    return page, per_page
 
 
-def repository_list(request):
+async def _apaginate_without_count(queryset, page, per_page):
+    """Versão assíncrona da paginação sem COUNT(*): retorna (resultados, tem_proxima_pagina)."""
+    offset = (page - 1) * per_page
+    rows = [row async for row in queryset[offset:offset + per_page + 1].aiterator()]
+    return rows[:per_page], len(rows) > per_page
+
+
+@read_from_replica
+async def repository_list(request):
     """View para listar todos os repositórios."""
-    repos = Repositorio.objects.all().order_by('full_name')
-    return render(request, 'core/repository_list.html', {'repos': repos})
+    repos = [repo async for repo in Repositorio.objects.all().order_by('full_name').aiterator()]
+    return TemplateResponse(request, 'core/repository_list.html', {'repos': repos})
 
 
-def repository_detail(request, pk):
+@read_from_replica
+async def repository_detail(request, pk):
     """View para exibir detalhes de um repositório."""
-    repo = get_object_or_404(Repositorio, pk=pk)
-    return render(request, 'core/repository_detail.html', {'repo': repo})
+    repo = await aget_object_or_404(Repositorio, pk=pk)
+    return TemplateResponse(request, 'core/repository_detail.html', {'repo': repo})
+
+
+@read_from_replica
+async def commit_list_view(request, pk):
+    """View para listar os commits sincronizados de um repositório (mais recentes primeiro)."""
+    repo = await aget_object_or_404(Repositorio, pk=pk)
+    try:
+        page, per_page = _page_params(request)
+    except ValueError:
+        page, per_page = 1, LIST_PAGE_SIZE_DEFAULT
+    commits = (
+        Commit.objects
+        .filter(repository=repo)
+        .select_related('author')
+        .only('sha', 'short_sha', 'message', 'committer_date_git', 'additions', 'deletions', 'web_url', 'author__username')
+        .order_by('-committer_date_git', '-id')
+    )
+    commits, has_next = await _apaginate_without_count(commits, page, per_page)
+    return TemplateResponse(request, 'core/commit_list.html', {
+        'repo': repo,
+        'commits': commits,
+        'page': page,
+        'per_page': per_page,
+        'has_next': has_next,
+    })
+
+
+@read_from_replica
+async def issue_list_view(request, pk):
+    """
+    View para listar as issues sincronizadas de um repositório (mais recentes primeiro).
+    Parâmetros GET: estado ('open' ou 'closed', padrão: todas), page e per_page.
+    """
+    repo = await aget_object_or_404(Repositorio, pk=pk)
+    try:
+        page, per_page = _page_params(request)
+    except ValueError:
+        page, per_page = 1, LIST_PAGE_SIZE_DEFAULT
+    state = request.GET.get('estado')
+    issues = Issue.objects.filter(repository=repo)
+    if state in ('open', 'closed'):
+        issues = issues.filter(state=state)
+    issues = (
+        issues
+        .select_related('author')
+        .only('number', 'title', 'state', 'is_pull_request', 'comments_count', 'created_at_git',
+              'closed_at_git', 'web_url', 'author__username')
+        .order_by('-created_at_git', '-id')
+    )
+    issues, has_next = await _apaginate_without_count(issues, page, per_page)
+    return TemplateResponse(request, 'core/issue_list.html', {
+        'repo': repo,
+        'issues': issues,
+        'state': state if state in ('open', 'closed') else '',
+        'page': page,
+        'per_page': per_page,
+        'has_next': has_next,
+    })
+
+
+@read_from_replica
+async def repository_stats_api(request, pk):
+    """
+    API (JSON) com as estatísticas de um repositório: totais de commits (linhas
+    adicionadas/removidas, período coberto) e de issues/pull requests por estado.
+    """
+    repo = await aget_object_or_404(Repositorio, pk=pk)
+    commits = await Commit.objects.filter(repository=repo).aaggregate(
+        total=Count('id'),
+        autores=Count('author', distinct=True),
+        linhas_adicionadas=Sum('additions'),
+        linhas_removidas=Sum('deletions'),
+        primeiro=Min('committer_date_git'),
+        ultimo=Max('committer_date_git'),
+    )
+    issues = await Issue.objects.filter(repository=repo).aaggregate(
+        issues_abertas=Count('id', filter=Q(state='open', is_pull_request=False)),
+        issues_fechadas=Count('id', filter=Q(state='closed', is_pull_request=False)),
+        pull_requests_abertos=Count('id', filter=Q(state='open', is_pull_request=True)),
+        pull_requests_fechados=Count('id', filter=Q(state='closed', is_pull_request=True)),
+    )
+    return JsonResponse({
+        'id': repo.id,
+        'repositorio': repo.full_name,
+        'estrelas': repo.stars_count,
+        'forks': repo.forks_count,
+        'ultima_sinc_issues': repo.last_sync_issues_at,
+        'ultima_sinc_commits': repo.last_sync_commits_at,
+        'commits': {
+            **commits,
+            'linhas_adicionadas': commits['linhas_adicionadas'] or 0,
+            'linhas_removidas': commits['linhas_removidas'] or 0,
+        },
+        'issues': issues,
+    })
+
+
+@read_from_replica
+def repository_metrics_trend_api(request):
+    """
+    API (JSON) com a série temporal de estrelas, forks e issues abertas.
+    Parâmetros GET:
+        repos: IDs dos repositórios separados por vírgula (padrão: todos os ativos).
+        inicio / fim: datas no formato AAAA-MM-DD (padrão: últimos 365 dias).
+        bucket: granularidade do downsampling ('day', 'week', 'month', 'quarter', 'year').
+    """
+    try:
+        repo_ids = [int(repo_id) for repo_id in request.GET.get('repos', '').split(',') if repo_id.strip()]
+        end_date = date.fromisoformat(request.GET['fim']) if request.GET.get('fim') else timezone.localdate()
+        start_date = date.fromisoformat(request.GET['inicio']) if request.GET.get('inicio') else end_date - timedelta(days=365)
+    except ValueError:
+        return JsonResponse({'erro': "Parâmetros inválidos. Use repos=1,2,3 e datas no formato AAAA-MM-DD."}, status=400)
+
+    if not repo_ids:
+        repo_ids = list(Repositorio.objects.filter(active=True).values_list('id', flat=True))
+
+    bucket = request.GET.get('bucket', 'day')
+    try:
+        trend = get_metric_trend(repo_ids, start_date, end_date, bucket=bucket)
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+
+    return JsonResponse({
+        'inicio': start_date,
+        'fim': end_date,
+        'bucket': bucket,
+        'series': trend,
+    })
+
 
+@read_from_replica
+def search_api(request):
+    """
+    API (JSON) de busca textual em commits ou issues, ordenada por relevância.
+    Parâmetros GET:
+        q: termo de busca (texto livre ou SHA/SHA curto para commits).
+        tipo: 'issues' (padrão) ou 'commits'.
+        repo: ID do repositório (opcional).
+        page / per_page: paginação (sem contagem total, apenas indica se há próxima página).
+    """
+    text = request.GET.get('q', '').strip()
+    kind = request.GET.get('tipo', 'issues')
+    if not text:
+        return JsonResponse({'erro': "Informe o termo de busca no parâmetro 'q'."}, status=400)
+    if kind not in ('issues', 'commits'):
+        return JsonResponse({'erro': "Parâmetro 'tipo' deve ser 'issues' ou 'commits'."}, status=400)
+    try:
+        repository_id = int(request.GET['repo']) if request.GET.get('repo') else None
+        page = max(1, int(request.GET.get('page', 1)))
+        per_page = min(SEARCH_PAGE_SIZE_MAX, max(1, int(request.GET.get('per_page', SEARCH_PAGE_SIZE_DEFAULT))))
+    except ValueError:
+        return JsonResponse({'erro': "Parâmetros 'repo', 'page' e 'per_page' devem ser números inteiros."}, status=400)
+
+    if kind == 'commits':
+        commits, has_next = search_commits(text, repository_id=repository_id, page=page, per_page=per_page)
+        results = [{
+            'id': commit.id,
+            'repositorio': commit.repository.full_name,
+            'sha': commit.sha,
+            'short_sha': commit.short_sha,
+            'mensagem': commit.message.splitlines()[0] if commit.message else '',
+            'autor': commit.author.username if commit.author else None,
+            'data': commit.committer_date_git,
+            'relevancia': getattr(commit, 'rank', None),
+            'web_url': commit.web_url,
+        } for commit in commits]
+    else:
+        issues, has_next = search_issues(text, repository_id=repository_id, page=page, per_page=per_page)
+        results = [{
+            'id': issue.id,
+            'repositorio': issue.repository.full_name,
+            'numero': issue.number,
+            'titulo': issue.title,
+            'estado': issue.state,
+            'autor': issue.author.username if issue.author else None,
+            'criada_em': issue.created_at_git,
+            'relevancia': issue.rank,
+            'web_url': issue.web_url,
+        } for issue in issues]
+
+    return JsonResponse({
+        'q': text,
+        'tipo': kind,
+        'page': page,
+        'has_next': has_next,
+        'next_page': page + 1 if has_next else None,
+        'resultados': results,
+    })
 
-def sync_repository_view(request, pk):
+
+async def sync_repository_view(request, pk):
     """View para acionar a sincronização de metadados de um repositório via Celery."""
-    repo = get_object_or_404(Repositorio, pk=pk)
+    repo = await aget_object_or_404(Repositorio, pk=pk)
 
     if request.method == 'POST': # É uma boa prática usar POST para ações que modificam dados
         # Enfileira a tarefa Celery para sincronizar APENAS os metadados do repositório
-        sync_repo_metadata_task.delay(repo.id)
+        # (cliques repetidos enquanto a tarefa ainda está na fila são descartados).
+        # O acesso ao Redis/broker roda em uma thread, sem bloquear o event loop.
+        enqueued = await sync_to_async(enqueue_repo_sync)(sync_repo_metadata_task, repo.id, 'metadata')
 
         # Se você quiser sincronizar TUDO (metadados, issues e commits):
         # full_sync_repository_task.delay(repo.id)
 
-        messages.success(request, f"Sincronização para '{repo.full_name}' enfileirada com sucesso! As informações serão atualizadas em breve.")
+        if enqueued:
+            messages.success(request, f"Sincronização para '{repo.full_name}' enfileirada com sucesso! As informações serão atualizadas em breve.")
+        else:
+            messages.info(request, f"Já existe uma sincronização pendente para '{repo.full_name}'.")
         return redirect('repository_detail', pk=repo.id) # Redireciona de volta para a página de detalhes do repo
     
     # Se for uma requisição GET, apenas exibe um formulário de confirmação
-    return render(request, 'core/confirm_sync.html', {'repo': repo})
+    return TemplateResponse(request, 'core/confirm_sync.html', {'repo': repo})
 
 
-def sync_issues_view(request, pk):
+async def sync_issues_view(request, pk):
     """View para acionar a sincronização de issues de um repositório via Celery."""
-    repo = get_object_or_404(Repositorio, pk=pk)
+    repo = await aget_object_or_404(Repositorio, pk=pk)
 
     if request.method == 'POST':
         form = IssueSyncForm(request.POST)
@@ -73,14 +302,21 @@ def sync_issues_view(request, pk):
 
             # Enfileira a tarefa Celery com os filtros.
             # Note o nome da task: sync_issue_metadata_task
-            sync_issue_metadata_task.delay(
+            # Sincronizações completas vão para a fila de backfill.
+            enqueued = await sync_to_async(enqueue_repo_sync)(
+                sync_issue_metadata_task,
                 repo.id,
+                'issues',
+                backfill=full_sync,
                 state=state,
                 since_datetime_str=since_datetime_str,
                 full_sync=full_sync
             )
 
-            messages.success(request, f"Sincronização de issues para '{repo.full_name}' enfileirada com os filtros selecionados.")
+            if enqueued:
+                messages.success(request, f"Sincronização de issues para '{repo.full_name}' enfileirada com os filtros selecionados.")
+            else:
+                messages.info(request, f"Já existe uma sincronização de issues pendente para '{repo.full_name}'.")
             return redirect('repository_detail', pk=repo.id) # Redireciona para a página de detalhes do repositório
         else:
             # Se o formulário não for válido, re-renderiza com erros
@@ -99,15 +335,15 @@ def sync_issues_view(request, pk):
 
         form = IssueSyncForm(initial=initial_data)
 
-    return render(request, 'core/issue_sync_form.html', {'form': form, 'repo': repo})
+    return TemplateResponse(request, 'core/issue_sync_form.html', {'form': form, 'repo': repo})
 
 
-def sync_commits_view(request, pk):
+async def sync_commits_view(request, pk):
     """
     View para exibir um formulário de filtro para sincronização de commits
     e para acionar a tarefa Celery com esses filtros.
     """
-    repo = get_object_or_404(Repositorio, pk=pk)
+    repo = await aget_object_or_404(Repositorio, pk=pk)
 
     if request.method == 'POST':
         form = CommitSyncForm(request.POST)
@@ -137,14 +373,21 @@ def sync_commits_view(request, pk):
                     until_datetime_str += 'Z'
 
             # Enfileira a tarefa Celery com os filtros
-            sync_commit_metadata_task.delay(
+            # Sincronizações completas vão para a fila de backfill.
+            enqueued = await sync_to_async(enqueue_repo_sync)(
+                sync_commit_metadata_task,
                 repo.id,
+                'commits',
+                backfill=full_sync,
                 since_datetime_str=since_datetime_str,
                 until_datetime_str=until_datetime_str,
                 full_sync=full_sync
             )
 
-            messages.success(request, f"Sincronização de commits para '{repo.full_name}' enfileirada com os filtros selecionados.")
+            if enqueued:
+                messages.success(request, f"Sincronização de commits para '{repo.full_name}' enfileirada com os filtros selecionados.")
+            else:
+                messages.info(request, f"Já existe uma sincronização de commits pendente para '{repo.full_name}'.")
             return redirect('repository_detail', pk=repo.id) # Redireciona para a página de detalhes do repositório
         else:
             # Se o formulário não for válido, re-renderiza com erros
@@ -159,19 +402,17 @@ def sync_commits_view(request, pk):
 
         form = CommitSyncForm(initial=initial_data)
 
-    return render(request, 'core/commit_sync_form.html', {'form': form, 'repo': repo})
+    return TemplateResponse(request, 'core/commit_sync_form.html', {'form': form, 'repo': repo})
 
 
-# Opcional: Uma view para listar os commits, similar a issue_list_view
-def commit_list_view(request, pk):
+def metrics_view(request):
     """
-    View para listar os commits sincronizados de um repositório.
+    Métricas Prometheus da aplicação web (formato texto de exposição).
+    Sob o Gunicorn (PROMETHEUS_MULTIPROC_DIR definido) agrega os arquivos de todos os
+    workers; sem ele, serve o registro do próprio processo (ex: runserver).
     """
-    repo = get_object_or_404(Repositorio, pk=pk)
-    # Assumindo que você tem um modelo 'Commit' e ele tem uma ForeignKey para 'Repositorio'
-    commits = Commit.objects.filter(repository=repo).order_by('-committer_date_git') # Ordena pelos mais recentes
-    
-    return render(request, 'core/commit_list.html', {
-        'repo': repo,
-        'commits': commits
-    })
\ No newline at end of file
+    registry = REGISTRY
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,45 @@
+# Configuração do Gunicorn para produção (carregada automaticamente a partir do diretório de trabalho).
+# Uso: gunicorn repositoriogit.asgi:application
+#
+# Cada processo roda um worker Uvicorn (ASGI): as views assíncronas de leitura atendem
+# muitos clientes simultâneos por processo enquanto aguardam o banco; as views síncronas
+# continuam funcionando (o Django as executa em uma thread).
+import multiprocessing
+import os
+import shutil
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = 'uvicorn_worker.UvicornWorker'
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# Workers que passam desse tempo sem responder ao master são reiniciados
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+# Recicla os workers periodicamente (com variação, para não reiniciarem todos juntos)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+# O Nginx fica na frente: só os cabeçalhos X-Forwarded-* vindos do endereço dele são aceitos
+# (lista de IPs/redes separados por vírgula; '*' deixaria qualquer cliente forjar o IP e o esquema).
+# O padrão serve para o Nginx no mesmo host; no docker-compose o Nginx roda em outro container
+# e o compose passa o endereço fixo dele (NGINX_IPV4_ADDRESS).
+forwarded_allow_ips = os.getenv('GUNICORN_FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+# Métricas Prometheus: cada worker grava as suas em arquivos neste diretório e /metrics
+# (core.views.metrics_view) agrega todos; precisa estar no ambiente antes de os workers
+# importarem o prometheus_client
+_prometheus_multiproc_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus-multiproc')
+
+
+def on_starting(server):
+    # Arquivos de uma execução anterior somariam valores de processos que não existem mais
+    shutil.rmtree(_prometheus_multiproc_dir, ignore_errors=True)
+    os.makedirs(_prometheus_multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Worker reciclado ou morto: remove os gauges "live*" dele (contadores e histogramas continuam somados)
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
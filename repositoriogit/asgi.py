@@ -3,6 +3,9 @@ ASGI config for repositoriogit project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Em produção é servido pelo Gunicorn com workers Uvicorn (ver gunicorn.conf.py):
+    gunicorn repositoriogit.asgi:application
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -2,6 +2,7 @@
 
 import os
 from celery import Celery
+from celery.signals import worker_process_init
 
 # Define o módulo de configurações padrão do Django para o programa 'celery'.
 # Isso garante que o Celery use as configurações do seu projeto Django.
@@ -21,6 +22,30 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # e registrar as funções decoradas com @shared_task como tarefas.
 app.autodiscover_tasks()
 
+
+@worker_process_init.connect
+def _configure_worker_db_pool(**kwargs):
+    """
+    Com DB_POOL=True, cada processo filho do worker cria o próprio pool, dimensionado por
+    CELERY_DB_POOL_MIN_SIZE/CELERY_DB_POOL_MAX_SIZE (o processo executa uma tarefa por vez,
+    então não precisa do pool da web). Um pool herdado do processo pai é descartado.
+    """
+    from django.conf import settings
+    from django.db import connections
+
+    for alias in connections:
+        options = connections.settings[alias].get('OPTIONS', {})
+        if not options.get('pool'):
+            continue
+        pool_options = options['pool'] if isinstance(options['pool'], dict) else {}
+        options['pool'] = {
+            **pool_options,
+            'min_size': settings.CELERY_DB_POOL_MIN_SIZE,
+            'max_size': settings.CELERY_DB_POOL_MAX_SIZE,
+        }
+        connections[alias].close_pool()
+
+
 # Definições opcionais para fins de depuração
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
@@ -12,7 +12,9 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 import os
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
+from kombu import Queue
 
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
@@ -43,6 +45,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_celery_beat',
     'repositoriogit',
     'core',
@@ -50,6 +53,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.PrimaryPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -84,15 +88,71 @@ WSGI_APPLICATION = 'repositoriogit.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # Backend PostgreSQL do Django com métricas de abertura/espera de conexões (core/postgresql)
+        'ENGINE': 'core.postgresql',
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST', 'db'), # O nome do serviço do seu banco de dados no docker-compose é 'db'
         'PORT': os.getenv('DB_PORT', '5432'),
+        # Conexões persistentes: reaproveitadas por até DB_CONN_MAX_AGE segundos (0 = uma por requisição/tarefa)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        # Testa a conexão reaproveitada antes de usá-la (evita erros após restart do Postgres/pgbouncer)
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true',
+        'OPTIONS': {},
     }
 }
 
+# Pool de conexões do psycopg 3 (DB_POOL=True; requer `pip install -r requirements-pool.txt`,
+# ou a imagem construída com `--build-arg DB_POOL=True`).
+# Cada processo (worker do Gunicorn ou processo do Celery) tem o próprio pool; com pool, CONN_MAX_AGE é 0.
+# Sob ASGI as conexões persistentes ficam presas às threads do executor, então o pool é o modo recomendado para a web.
+DB_POOL = os.getenv('DB_POOL', 'False').lower() == 'true'
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 2))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10)) # Segundos esperando uma conexão livre antes de falhar
+# Tamanho do pool em cada processo filho do Celery (prefork: uma tarefa por vez, mais as threads de sync_commit_files)
+CELERY_DB_POOL_MIN_SIZE = int(os.getenv('CELERY_DB_POOL_MIN_SIZE', 1))
+CELERY_DB_POOL_MAX_SIZE = int(os.getenv('CELERY_DB_POOL_MAX_SIZE', 4))
+if DB_POOL:
+    try:
+        import psycopg_pool # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured(
+            "DB_POOL=True requer o psycopg 3 com o pacote de pool, que não está instalado "
+            "(requirements.txt só traz o psycopg2). Instale com `pip install -r requirements-pool.txt` "
+            "ou defina DB_POOL=False."
+        )
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': DB_POOL_MIN_SIZE,
+        'max_size': DB_POOL_MAX_SIZE,
+        'timeout': DB_POOL_TIMEOUT,
+    }
+
+# Modo compatível com o pgbouncer em transaction pooling (DB_PGBOUNCER=True): a conexão do
+# servidor muda a cada transação, então cursores do lado do servidor (usados por .iterator())
+# não podem atravessar transações. O pool fica a cargo do pgbouncer.
+DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'False').lower() == 'true'
+if DB_PGBOUNCER:
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Réplica de leitura opcional (DB_REPLICA_HOST): views de leitura, APIs e exportações leem dela
+# enquanto o atraso for até DB_REPLICA_MAX_LAG segundos; gravações e sincronizações ficam no primário.
+DB_REPLICA_HOST = os.getenv('DB_REPLICA_HOST')
+if DB_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST,
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'OPTIONS': {**DATABASES['default']['OPTIONS']},
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['core.db_routers.ReplicaRouter']
+REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', 10))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_LAG_CHECK_INTERVAL', 5)) # Segundos entre consultas do atraso
+REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 15)) # Leituras no primário após um POST do cliente
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -149,6 +209,43 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'America/Rio_Branco' # Ou seu fuso horário
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler' # Se estiver usando Celery Beat
 
+# Topologia de filas: metadados rápidos, sincronizações incrementais e backfills longos
+# ficam separados para que um backfill completo não bloqueie as atualizações rápidas.
+CELERY_TASK_QUEUES = (
+    Queue('metadata'),
+    Queue('incremental'),
+    Queue('backfill'),
+)
+CELERY_TASK_DEFAULT_QUEUE = 'incremental'
+CELERY_TASK_ROUTES = {
+    'core.tasks.sync_repo_metadata_task': {'queue': 'metadata'},
+    'core.tasks.sync_issue_metadata_task': {'queue': 'incremental'},
+    'core.tasks.sync_commit_metadata_task': {'queue': 'incremental'},
+    'core.tasks.import_owner_repositories_task': {'queue': 'metadata'},
+    'core.tasks.refresh_all_repositories_metadata_task': {'queue': 'metadata'},
+    'core.tasks.sync_pull_request_task': {'queue': 'incremental'},
+    'core.tasks.sync_issue_comments_task': {'queue': 'incremental'},
+    'core.tasks.sync_branches_task': {'queue': 'incremental'},
+    'core.tasks.sync_commit_files_task': {'queue': 'backfill'},
+    'core.tasks.export_parquet_task': {'queue': 'backfill'},
+}
+# Prioridades no Redis (0 = mais alta). 'visibility_timeout' precisa ser maior que a
+# tarefa mais longa, senão tarefas com acks_late são reentregues no meio da execução.
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'queue_order_strategy': 'priority',
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'visibility_timeout': int(os.getenv('CELERY_VISIBILITY_TIMEOUT', 12 * 60 * 60)),
+}
+CELERY_TASK_DEFAULT_PRIORITY = 5
+# Tarefas longas: cada processo pega apenas uma mensagem por vez
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.getenv('CELERY_WORKER_PREFETCH_MULTIPLIER', 1))
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+
+# Métricas Prometheus: a web expõe /metrics; os workers do Celery enviam ao Pushgateway (se configurado)
+PROMETHEUS_PUSHGATEWAY_URL = os.getenv('PROMETHEUS_PUSHGATEWAY_URL') # ex: 'pushgateway:9091'
+METRICS_PUSH_INTERVAL = int(os.getenv('METRICS_PUSH_INTERVAL', 15)) # Segundos entre envios de cada processo
+
 # Configurações de Cache (se você estiver usando)
 CACHES = {
     'default': {
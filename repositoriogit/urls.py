@@ -17,7 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from core.views import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('core/', include('core.urls')),
+    # Métricas Prometheus (sincronizações disparadas pela web; os workers usam o Pushgateway)
+    path('metrics', metrics_view, name='metrics'),
 ]